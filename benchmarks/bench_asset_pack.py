@@ -0,0 +1,81 @@
+'''
+Asset loading benchmark: every image of the character set from the loose PNGs
+against the memory-mapped asset pack, in both pack encodings.
+
+- "load" opens the pack (or walks the directory) and creates every Surface
+- "load + blit" also blits each Surface once, so lazily paged pixels are touched
+
+Each line is the median of --repeat runs, in milliseconds for the whole set.
+The packs are built in a temporary directory first.
+
+Usage:
+    python benchmarks/bench_asset_pack.py --repeat 50
+'''
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pygame
+from game.core.settings import ASSET_DIR
+from game.utils.asset_pack import AssetPack, build_pack, find_images
+
+
+def load_loose(directory):
+    return {key: pygame.image.load(path) for key, path in find_images(directory).items()}
+
+
+def load_pack(pack_file):
+    pack = AssetPack(pack_file)
+    images = pack.load_all()
+    pack.close()
+    return images
+
+
+def measure(load, repeat, blit):
+    target = pygame.Surface((128, 128), pygame.SRCALPHA)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        images = load()
+        if blit:
+            for image in images.values():
+                target.blit(image, (0, 0))
+        times.append((time.perf_counter() - start) * 1000.0)
+        del images
+    return statistics.median(times), len(load())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default=ASSET_DIR)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    directory = os.path.join(PROJECT_ROOT, args.directory) # ASSET_DIR is relative to the project root
+    pygame.init()
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = [("loose PNGs", lambda: load_loose(directory), sum(
+            os.path.getsize(path) for path in find_images(directory).values()))]
+        for encoding in ("rgba", "png"):
+            pack_file = os.path.join(tmp, f"assets_{encoding}.pack")
+            build_pack(directory, pack_file, encoding)
+            sources.append((f"pack ({encoding})", lambda pack_file=pack_file: load_pack(pack_file),
+                            os.path.getsize(pack_file)))
+
+        print(f"{'source':<14} {'images':>7} {'bytes':>10} {'load ms':>9} {'load + blit ms':>15}")
+        for label, load, size in sources:
+            load_ms, count = measure(load, args.repeat, blit=False)
+            blit_ms, _ = measure(load, args.repeat, blit=True)
+            print(f"{label:<14} {count:>7} {size:>10} {load_ms:>9.2f} {blit_ms:>15.2f}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+'''
+Co-op snapshot bandwidth: a CoopServer with --npcs NPCs and --clients UDP clients on
+127.0.0.1, stepped --ticks times. Each client walks its player around, and fires now and then.
+
+Bytes per tick (one client, averaged over the run; the simulation ticks at FPS and sends
+snapshots at COOP_SNAPSHOT_RATE) for:
+- "delta + interest": what the server actually sent (UDP payloads, headers included)
+- "full + interest": the same views encoded without a baseline
+- "full world": every entity, quantized, without a baseline or interest management
+- "naive floats": every entity as id, kind, x, y, health, facing x/y as 32-bit values
+
+Usage:
+    python benchmarks/bench_coop_snapshots.py --npcs 1000 --clients 4 --ticks 1200
+'''
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pygame
+from game.core.settings import FPS, WORLD_WIDTH, WORLD_HEIGHT, COOP_SNAPSHOT_RATE
+from game.core.simulation import Simulation
+from game.entities.npc import NPC
+from game.net import protocol
+from game.net.coop_client import CoopClient
+from game.net.coop_server import CoopServer
+
+NAIVE_ENTITY_BYTES = 4 * 7 # id, kind, x, y, health, facing x, facing y
+
+
+def connect(server, client):
+    # The server only answers while it is stepped, so step it between HELLOs
+    hello = protocol.HELLO.pack(protocol.MSG_HELLO, protocol.PROTOCOL_VERSION)
+    for _ in range(200):
+        client._socket.send(hello)
+        server.step()
+        time.sleep(0.001)
+        client.poll()
+        if client.connected:
+            return
+    raise RuntimeError("client could not join")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--npcs", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=1200)
+    parser.add_argument("--snapshot-rate", type=int, default=COOP_SNAPSHOT_RATE)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()): # Entity constructors print
+        simulation = Simulation()
+        for _ in range(args.npcs):
+            simulation.entity_manager.add_entity(NPC(random.randint(0, WORLD_WIDTH - 30), random.randint(0, WORLD_HEIGHT - 30),
+                                                     event_manager=simulation.event_manager), "npc")
+        server = CoopServer(simulation, port=0, snapshot_rate=args.snapshot_rate).start()
+        clients = [CoopClient(port=server.port) for _ in range(args.clients)]
+        for client in clients:
+            connect(server, client)
+        for session in server.sessions.values():
+            session.player.health = session.player.max_health = 60000 # Keep everyone alive for the whole run
+        server.ticks = server.bytes_sent = server.snapshots_sent = server.full_snapshots = server.snapshot_bytes = 0
+        server.datagrams_sent = 0
+        server.snapshot_seconds = 0.0
+
+        alternatives = {"full + interest": 0, "full world": 0, "naive floats": 0}
+        everything = pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+        server_seconds = 0.0
+        for tick in range(args.ticks):
+            for index, client in enumerate(clients):
+                client.poll()
+                phase = (tick // 90 + index) % 4 # Walk a square, each client out of step with the others
+                movement = ((1, 0), (0, 1), (-1, 0), (0, -1))[phase]
+                client.send_input(movement, fire=tick % 15 == index, weapon="shotgun" if tick == 30 * (index + 1) else None)
+            started = time.perf_counter()
+            server.step()
+            server_seconds += time.perf_counter() - started
+            if server.ticks % server.snapshot_interval == 0:
+                world, world_pellets = protocol.capture_view(simulation.entity_manager, everything)
+                for session in server.sessions.values():
+                    view, pellets = protocol.capture_view(simulation.entity_manager,
+                                                          session.camera.camera_rect.inflate(2 * server.interest_margin,
+                                                                                             2 * server.interest_margin))
+                    for label, entities, points in (("full + interest", view, pellets), ("full world", world, world_pellets)):
+                        payload = bytearray(protocol.SNAPSHOT.size)
+                        protocol.encode_entities(payload, entities, {})
+                        protocol.encode_pellets(payload, points)
+                        alternatives[label] += len(payload) + protocol.FRAGMENT.size * len(
+                            protocol.fragments(0, payload, server.max_datagram))
+                    alternatives["naive floats"] += protocol.SNAPSHOT.size + NAIVE_ENTITY_BYTES * (len(world) + len(world_pellets))
+
+    per_client_tick = args.clients * server.ticks
+    print(f"{args.npcs} NPCs, {args.clients} clients, {server.ticks} ticks at {FPS} FPS, "
+          f"{args.snapshot_rate} snapshots/s ({server.full_snapshots} full snapshots sent)")
+    print(f"{'encoding':<18} {'bytes/tick':>11} {'kbit/s':>9}")
+    rows = [("delta + interest", server.bytes_sent)] + list(alternatives.items())
+    for label, total in rows:
+        per_tick = total / per_client_tick
+        print(f"{label:<18} {per_tick:>11.1f} {per_tick * FPS * 8 / 1000:>9.1f}")
+    print(f"server: {server_seconds * 1000 / server.ticks:.2f} ms/tick including the simulation, "
+          f"{server.snapshot_seconds * 1000 / max(server.snapshots_sent, 1):.2f} ms per client snapshot")
+    for client in clients:
+        client.close()
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+'''
+Bot environment throughput: env steps per second of one in-process GameEnv, then of a
+VectorGameEnv with --envs envs over each worker count in --workers. Actions are random
+(seeded): walk in a random direction, fire a third of the time, now and then switch weapons.
+Each env step is --frame-skip simulation steps.
+
+Usage:
+    python benchmarks/bench_game_env.py --envs 8 --workers 1,2,4 --steps 300
+'''
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from game.core.settings import ENV_FRAME_SKIP
+from game.env.game_env import GameEnv
+from game.env.vector_env import VectorGameEnv
+
+
+def random_action(rng):
+    weapon = rng.randint(1, 5) if rng.random() < 0.02 else 0
+    return (rng.randint(-1, 1), rng.randint(-1, 1), int(rng.random() < 0.33), weapon)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--steps", type=int, default=300, help="env steps per run")
+    parser.add_argument("--frame-skip", type=int, default=ENV_FRAME_SKIP)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU(s), frame skip {args.frame_skip}")
+    print(f"{'setup':<28} {'env steps/s':>12} {'sim steps/s':>12}")
+
+    rng = random.Random(args.seed)
+    with contextlib.redirect_stdout(io.StringIO()): # Entity constructors print
+        env = GameEnv(frame_skip=args.frame_skip)
+        env.reset(seed=args.seed)
+        started = time.perf_counter()
+        for _ in range(args.steps):
+            _, _, terminated, truncated, _ = env.step(random_action(rng))
+            if terminated or truncated:
+                env.reset()
+        elapsed = time.perf_counter() - started
+    rate = args.steps / elapsed
+    print(f"{'1 env, in process':<28} {rate:>12.0f} {rate * args.frame_skip:>12.0f}")
+
+    for workers in [int(count) for count in args.workers.split(",")]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector = VectorGameEnv(args.envs, num_workers=workers, frame_skip=args.frame_skip)
+            vector.reset(seed=args.seed)
+            started = time.perf_counter()
+            for _ in range(args.steps):
+                vector.step([random_action(rng) for _ in range(args.envs)])
+            elapsed = time.perf_counter() - started
+            vector.close()
+        rate = args.steps * args.envs / elapsed
+        label = f"{args.envs} envs, {vector.num_workers} worker(s)"
+        print(f"{label:<28} {rate:>12.0f} {rate * args.frame_skip:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
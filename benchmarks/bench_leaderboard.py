@@ -0,0 +1,159 @@
+'''
+Leaderboard store benchmark: insert, top-10 and rank latency at several table sizes.
+
+"legacy" reproduces the previous store (new SQLAlchemy session per call,
+default rollback journal, no index, Score ORM objects); "tuned" is the
+current Leaderboard (persistent WAL connection, synchronous=NORMAL,
+composite score/timestamp index, column projections, rank from the score
+histogram). The legacy rank is the naive COUNT(*) of higher scores. Tables are seeded
+directly with sqlite3 so that building a 10M-row table takes seconds, not hours.
+
+Usage:
+    python benchmarks/bench_leaderboard.py --sizes 10000 1000000 10000000 --ops 200
+'''
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, desc, asc
+from sqlalchemy.orm import sessionmaker
+from game.ui.leaderboard import Leaderboard
+from game.ui.leaderboard_sqlalchemy import Base, Score
+
+SEED_BATCH = 50000
+
+
+def seed(db_path, rows, rng):
+    '''Appends `rows` random scores with sqlite3 executemany in large transactions.'''
+    connection = sqlite3.connect(db_path)
+    start = datetime.datetime(2024, 1, 1)
+    remaining = rows
+    while remaining:
+        batch = min(SEED_BATCH, remaining)
+        connection.executemany(
+            "INSERT INTO scores (name, score, timestamp) VALUES (?, ?, ?)",
+            ((f"P{rng.randrange(1000000)}", rng.randrange(100000),
+              (start + datetime.timedelta(seconds=rng.randrange(10 ** 8))).isoformat(sep=' '))
+             for _ in range(batch)))
+        connection.commit()
+        remaining -= batch
+    connection.close()
+
+
+class LegacyLeaderboard:
+    '''The store as it was: one session per call, ORM objects, no index, default journaling.'''
+    def __init__(self, db_path):
+        self.engine = create_engine(f"sqlite:///{db_path}")
+        self.Session = sessionmaker(bind=self.engine)
+
+    def add_score(self, name, score):
+        session = self.Session()
+        try:
+            session.add(Score(name=name, score=score))
+            session.commit()
+        finally:
+            session.close()
+
+    def get_top_scores(self, count=10):
+        session = self.Session()
+        try:
+            rows = session.query(Score).order_by(desc(Score.score), asc(Score.timestamp)).limit(count).all()
+            return [(s.name, s.score, s.timestamp) for s in rows]
+        finally:
+            session.close()
+
+    def get_rank(self, score):
+        session = self.Session()
+        try:
+            return session.query(Score).filter(Score.score > score).count() + 1
+        finally:
+            session.close()
+
+    def close(self):
+        self.engine.dispose()
+
+
+def build_legacy_db(db_path, rows, rng):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    connection = sqlite3.connect(db_path)
+    connection.execute("DROP INDEX IF EXISTS ix_scores_score_desc_timestamp")
+    connection.close()
+    seed(db_path, rows, rng)
+
+
+def build_tuned_db(db_path, rows, rng):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Leaderboard(db_name=db_path).close() # Schema, WAL mode and index
+    seed(db_path, rows, rng) # Bypasses add_score, so the histogram is built when the store is opened
+
+
+def measure(store, ops, rng):
+    insert_ms = []
+    top_ms = []
+    rank_ms = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(ops):
+            start = time.perf_counter()
+            store.add_score(f"Bench{i}", rng.randrange(100000))
+            insert_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            store.get_top_scores(10)
+            top_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            store.get_rank(rng.randrange(100000))
+            rank_ms.append((time.perf_counter() - start) * 1000)
+    return insert_ms, top_ms, rank_ms
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    parser.add_argument("--ops", type=int, default=200, help="Inserts and top-10 reads measured per store")
+    parser.add_argument("--legacy-ops", type=int, default=None,
+                        help="Ops for the legacy store (default: --ops; its top-10 and rank full-scan, so keep it low at 10M)")
+    parser.add_argument("--dir", default=None, help="Directory for the benchmark databases (default: a temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'store':<7} {'open':>9} {'insert p50':>11} {'insert p99':>11} {'top10 p50':>10} {'top10 p99':>10} "
+          f"{'rank p50':>9} {'rank p99':>9}  (ms)")
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for size in args.sizes:
+            for name, build, factory, ops in (
+                    ("legacy", build_legacy_db, LegacyLeaderboard, args.legacy_ops or args.ops),
+                    ("tuned", build_tuned_db, lambda path: Leaderboard(db_name=path), args.ops)):
+                db_path = os.path.join(tmp, f"{name}_{size}.db")
+                rng = random.Random(size)
+                build(db_path, size, rng)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    store = factory(db_path)
+                open_ms = (time.perf_counter() - start) * 1000 # Includes the one-off histogram build for "tuned"
+                insert_ms, top_ms, rank_ms = measure(store, ops, rng)
+                store.close()
+                print(f"{size:>10} {name:<7} {open_ms:>9.1f} {statistics.median(insert_ms):>11.3f} {percentile(insert_ms, 0.99):>11.3f} "
+                      f"{statistics.median(top_ms):>10.3f} {percentile(top_ms, 0.99):>10.3f} "
+                      f"{statistics.median(rank_ms):>9.4f} {percentile(rank_ms, 0.99):>9.4f}")
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(db_path + suffix):
+                        os.remove(db_path + suffix)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+'''
+Leaderboard bulk throughput benchmark, in rows/sec:
+
+- add_score() one row per call, which is the baseline
+- add_scores() batched executemany
+- export_scores() / import_scores() for CSV and JSONL
+
+Each run starts from a fresh database. With --trace-memory, a "peak MiB"
+column shows the tracemalloc peak of each operation. That peak shows import
+and export streaming instead of loading the table. tracemalloc slows Python
+down a lot, so the rows/sec of that run are not comparable.
+
+Usage:
+    python benchmarks/bench_leaderboard_bulk.py --rows 500000 --single-rows 5000
+    python benchmarks/bench_leaderboard_bulk.py --rows 500000 --trace-memory
+'''
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game.ui.leaderboard import Leaderboard
+
+
+def generate(rows, rng):
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(rows):
+        yield f"P{rng.randrange(1000000)}", rng.randrange(100000), start + datetime.timedelta(seconds=i)
+
+
+def timed(label, rows, action, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = action()
+    elapsed = time.perf_counter() - start
+    line = f"{label:<24} {rows:>10} {elapsed:>9.2f} {rows / elapsed:>12,.0f}"
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f" {peak / 2 ** 20:>9.1f}"
+    print(line)
+    return result
+
+
+def open_store(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Leaderboard(db_name=path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="Rows for the batched/import/export runs")
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows for the one-commit-per-row baseline")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--trace-memory", action="store_true", help="Report the tracemalloc peak (slows every run)")
+    parser.add_argument("--dir", default=None, help="Directory for the benchmark files (default: a temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'operation':<24} {'rows':>10} {'seconds':>9} {'rows/sec':>12}" + (f" {'peak MiB':>9}" if args.trace_memory else ""))
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        store = open_store(os.path.join(tmp, "single.db"))
+        rows = list(generate(args.single_rows, random.Random(1)))
+        timed("add_score (per row)", args.single_rows,
+              lambda: [store.add_score(name, score) for name, score, _ in rows], args.trace_memory)
+        store.close()
+
+        store = open_store(os.path.join(tmp, "bulk.db"))
+        timed("add_scores (batched)", args.rows,
+              lambda: store.add_scores(generate(args.rows, random.Random(2)), args.batch_size), args.trace_memory)
+        for extension in ("csv", "jsonl"):
+            path = os.path.join(tmp, f"scores.{extension}")
+            timed(f"export_scores ({extension})", args.rows, lambda: store.export_scores(path, batch_size=args.batch_size), args.trace_memory)
+            target = open_store(os.path.join(tmp, f"import_{extension}.db"))
+            timed(f"import_scores ({extension})", args.rows, lambda: target.import_scores(path, batch_size=args.batch_size), args.trace_memory)
+            target.close()
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
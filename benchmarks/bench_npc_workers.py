@@ -0,0 +1,91 @@
+'''
+Headless benchmark for NPC AI: main-thread NPC.update() vs NPCWorkerPool
+with 1..N worker processes over shared memory.
+
+Usage:
+    python benchmarks/bench_npc_workers.py --npcs 20000 --ticks 100 --workers 1 2 4
+'''
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pygame
+from game.core.settings import WORLD_WIDTH, WORLD_HEIGHT, NPC_WIDTH, NPC_HEIGHT
+from game.core.blackboard import Blackboard
+from game.entities.player import Player
+from game.entities.npc import NPC
+from game.systems.entity_manager import EntityManager
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.utils.effects import EffectManager
+
+
+def build_world(npc_count, seed=1234):
+    random.seed(seed)
+    entity_manager = EntityManager()
+    effect_manager = EffectManager()
+    combat_manager = CombatManager(entity_manager)
+    blackboard = Blackboard(WORLD_WIDTH, WORLD_HEIGHT)
+    weapon_system = WeaponSystem(entity_manager, effect_manager, combat_manager, blackboard=blackboard)
+    player = Player(WORLD_WIDTH / 2, WORLD_HEIGHT / 2)
+    player.health = 10 ** 9 # Keep the player alive for the whole run
+    entity_manager.add_entity(player, "player")
+    for _ in range(npc_count):
+        npc = NPC(random.randint(0, WORLD_WIDTH - NPC_WIDTH), random.randint(0, WORLD_HEIGHT - NPC_HEIGHT))
+        npc.detection_radius = 600 # Make a good share of the horde chase the player
+        entity_manager.add_entity(npc, "npc")
+    return entity_manager, effect_manager, combat_manager, weapon_system, blackboard
+
+
+def run(npc_count, ticks, workers):
+    with contextlib.redirect_stdout(io.StringIO()):
+        entity_manager, effect_manager, combat_manager, weapon_system, blackboard = build_world(npc_count)
+        pool = None
+        if workers > 0:
+            from game.systems.npc_workers import NPCWorkerPool
+            pool = NPCWorkerPool(workers, capacity=npc_count + 16)
+        try:
+            start = time.perf_counter()
+            for tick in range(ticks):
+                blackboard.refresh(entity_manager, current_time=tick * 16)
+                if pool is not None:
+                    pool.step(entity_manager, blackboard, weapon_system, combat_manager, effect_manager)
+                else:
+                    for npc in entity_manager.npcs:
+                        npc.update(entity_manager, combat_manager, effect_manager, weapon_system, blackboard=blackboard)
+            elapsed = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.close()
+    return elapsed / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--npcs", type=int, default=20000)
+    parser.add_argument("--ticks", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"CPU cores available: {os.cpu_count()}  NPCs: {args.npcs}  ticks: {args.ticks}")
+    baseline = run(args.npcs, args.ticks, 0)
+    print(f"{'main thread':>14}: {baseline:8.2f} ms/tick")
+    one_worker = None
+    for workers in args.workers:
+        ms = run(args.npcs, args.ticks, workers)
+        if one_worker is None:
+            one_worker = ms
+        print(f"{workers:>6} worker(s): {ms:8.2f} ms/tick  speedup vs 1 worker: {one_worker / ms:4.2f}x  "
+              f"vs main thread: {baseline / ms:4.2f}x")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
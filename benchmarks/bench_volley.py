@@ -0,0 +1,94 @@
+'''
+Headless benchmark for multi-pellet shots: one Volley of N pellets against
+N separate Projectile sprites and against a single bullet, through the same
+WeaponSystem.use_weapon / update / handle_collisions path the game uses.
+
+Usage:
+    python benchmarks/bench_volley.py --npcs 500 --shots 300
+'''
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pygame
+from game.core.settings import NPC_WIDTH, NPC_HEIGHT
+from game.core.blackboard import Blackboard
+from game.entities.player import Player
+from game.entities.npc import NPC
+from game.entities.projectile import Projectile
+from game.systems.entity_manager import EntityManager
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.utils.effects import EffectManager
+from game.utils.weapon import Weapon, WEAPON_DATA
+
+ARENA = 1200
+
+
+def run(mode, npc_count, shots, seed=1234):
+    random.seed(seed)
+    entity_manager = EntityManager()
+    effect_manager = EffectManager()
+    blackboard = Blackboard()
+    weapon_system = WeaponSystem(entity_manager, effect_manager, CombatManager(entity_manager), blackboard=blackboard)
+    player = Player(ARENA / 2, ARENA / 2)
+    entity_manager.add_entity(player, "player")
+    player.equip_weapon("pistol" if mode == "bullet" else "shotgun")
+    shotgun = Weapon(**WEAPON_DATA["shotgun"])
+    for _ in range(npc_count):
+        npc = NPC(random.randint(0, ARENA - NPC_WIDTH), random.randint(0, ARENA - NPC_HEIGHT))
+        npc.health = npc.max_health = 10 ** 9 # Keep the crowd constant
+        entity_manager.add_entity(npc, "npc")
+    # NPCs don't move or die here, so build the grid once and leave the per-frame
+    # rebuild (the same for every mode) out of the timing
+    entity_manager.npc_grid.rebuild(entity_manager.npcs)
+    entity_manager.npc_grid.rebuild = lambda sprites: None
+
+    start = time.perf_counter()
+    for shot in range(shots):
+        blackboard.current_time = shot * 1000 # Past every cooldown
+        player.direction = pygame.math.Vector2(1, 0).rotate(random.uniform(0, 360))
+        if mode == "sprites":
+            # What use_weapon could do without Volley: one Projectile per pellet
+            for c, s in shotgun.pellet_rotations:
+                d = player.direction
+                direction = pygame.math.Vector2(d.x * c - d.y * s, d.x * s + d.y * c)
+                entity_manager.add_entity(Projectile(player.rect.centerx, player.rect.centery, direction, shotgun,
+                                                     blackboard=blackboard), "projectile")
+        else:
+            weapon_system.use_weapon(player)
+        for _ in range(5): # A few frames of flight per shot
+            for entity in entity_manager.projectiles.sprites() + entity_manager.volleys.sprites():
+                entity.update()
+            entity_manager.handle_collisions(effect_manager)
+    return (time.perf_counter() - start) / shots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--npcs", type=int, default=500)
+    parser.add_argument("--shots", type=int, default=300)
+    args = parser.parse_args()
+
+    pygame.init()
+    pellets = WEAPON_DATA["shotgun"]["pellets"]
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode in ("bullet", "volley", "sprites"):
+            results[mode] = run(mode, args.npcs, args.shots)
+    print(f"{args.npcs} NPCs, {args.shots} shots, 5 frames of flight each, grid rebuild excluded (ms per shot incl. flight)")
+    print(f"  single bullet:                  {results['bullet'] * 1000:.3f}")
+    print(f"  {pellets}-pellet Volley:              {results['volley'] * 1000:.3f}")
+    print(f"  {pellets} separate Projectile sprites: {results['sprites'] * 1000:.3f}")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import pygame
+from game.core.settings import WORLD_WIDTH, WORLD_HEIGHT
+
+class Blackboard:
+    '''
+    Per-frame shared view of the world that AI and systems read from.
+
+    The Game refreshes it once at the top of each simulation step, so NPCs,
+    WeaponSystem, WaveManager and Grenades don't each repeat the same lookups
+    (player sprite list, player centre, get_ticks(), world bounds Rect, ...).
+    New AI inputs should be added here rather than looked up per entity.
+    '''
+    def __init__(self, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+        # World bounds never change, so a single Rect is shared by everyone clamping to it
+        self.world_rect = pygame.Rect(0, 0, world_width, world_height)
+        self.frame = 0
+        self.current_time = 0
+
+        # Player snapshot: `player` is the first player (camera, velocity), the lists hold every living player
+        self.players = []
+        self.player_rects = []
+        self.player_centers = []
+        self.player = None
+        self.player_rect = None
+        self.player_center = (0, 0)
+        self.player_velocity = pygame.math.Vector2(0, 0)
+        self._last_player_center = None
+        self._last_player = None # Velocity is reset when the player is replaced (e.g. reset_game)
+
+        # Camera snapshot (world-space rect currently on screen)
+        self.camera_rect = pygame.Rect(0, 0, 0, 0)
+
+        # Alive counts
+        self.npc_count = 0
+        self.projectile_count = 0
+        self.player_count = 0
+
+    def refresh(self, entity_manager, camera=None, current_time=None):
+        '''
+        Rebuilds the blackboard for the current frame.
+
+        Args:
+            entity_manager (EntityManager): Source of players/NPCs/projectiles.
+            camera (Camera): Optional camera; its rect is copied for culling/AI.
+            current_time (int): Time in ms. Defaults to pygame.time.get_ticks().
+        '''
+        self.frame += 1
+        self.current_time = pygame.time.get_ticks() if current_time is None else current_time
+
+        players = entity_manager.players.sprites()
+        self.players = players
+        self.player_rects = [player.rect for player in players]
+        self.player_centers = [rect.center for rect in self.player_rects]
+        self.player_count = len(players)
+        self.player = players[0] if players else None
+
+        if self.player is not None:
+            self.player_rect = self.player.rect
+            center = self.player.rect.center
+            if self._last_player_center is not None and self.player is self._last_player:
+                self.player_velocity.x = center[0] - self._last_player_center[0]
+                self.player_velocity.y = center[1] - self._last_player_center[1]
+            else:
+                self.player_velocity.update(0, 0)
+            self.player_center = center
+            self._last_player_center = center
+            self._last_player = self.player
+        else:
+            self.player_rect = None
+            self.player_velocity.update(0, 0)
+            self._last_player_center = None
+
+        if camera is not None:
+            self.camera_rect.update(camera.camera_rect)
+
+        self.npc_count = len(entity_manager.npcs)
+        self.projectile_count = len(entity_manager.projectiles)
+
+    def nearest_player(self, x, y):
+        '''
+        The living player closest to (x, y), as of the last refresh().
+
+        Returns:
+            tuple: (Player, its centre), or (None, None) when no player is alive.
+        '''
+        centers = self.player_centers
+        if len(centers) == 1: # Single player: nothing to compare
+            return self.players[0], centers[0]
+        best, best_center, best_sq = None, None, None
+        for player, center in zip(self.players, centers):
+            dx, dy = center[0] - x, center[1] - y
+            d_sq = dx * dx + dy * dy
+            if best_sq is None or d_sq < best_sq:
+                best, best_center, best_sq = player, center, d_sq
+        return best, best_center
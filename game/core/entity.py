@@ -13,12 +13,15 @@ class Entity(pygame.sprite.Sprite):
         self.health = health
         self.max_health = health
         self.alive = True
+        self.killed_by = None # Source of the killing blow, see take_damage()
         
-    def take_damage(self, amount):
+    def take_damage(self, amount, source=None):
+        # source: who dealt the damage (the Player behind a shot, grenade or melee hit), kept for kill credit
         self.health -= amount
         if self.health <= 0:
             self.health = 0 # Ensure health doesn't go below 0
             self.alive = False
+            self.killed_by = source
             self.kill() # kill() is a method from pygame.sprite.Sprite to remove it from all groups
             
     def update(self, dt): # dt for delta time, common in game loops
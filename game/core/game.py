@@ -1,3 +1,7 @@
+import queue
+import sys
+import threading
+import time
 import pygame
 from game.core.settings import ( # Adjusted import
     SCREEN_WIDTH, SCREEN_HEIGHT, FPS, CAPTION, LIGHT_GRAY,
@@ -6,7 +10,9 @@ from game.core.settings import ( # Adjusted import
     WORLD_WIDTH, WORLD_HEIGHT,
     MELEE_VISUAL_DURATION, MELEE_ATTACK_COLOR, BLACK,
     MINIMAP_WIDTH, MINIMAP_HEIGHT, MINIMAP_MARGIN, MINIMAP_BG_COLOR,
-    MINIMAP_ROOM_COLOR, MINIMAP_PLAYER_COLOR, MINIMAP_BORDER_COLOR
+    MINIMAP_ROOM_COLOR, MINIMAP_PLAYER_COLOR, MINIMAP_BORDER_COLOR,
+    NPC_AI_WORKERS, THREADED_SIMULATION, NPC_HEALTH_BAR_HEIGHT, NPC_HEALTH_BAR_Y_OFFSET,
+    LEADERBOARD_SERVER, GAME_FONT_NAME, SAVE_FILE, MEMORY_MONITOR
 )
 import game.core.settings as settings_module # Adjusted import for LeaderboardSprite
 from game.entities.player import Player # Adjusted import
@@ -15,8 +21,9 @@ from game.entities.projectile import Projectile # Adjusted import
 from game.entities.npc import NPC # Adjusted import
 from game.entities.grenade import Grenade # Adjusted import
 from game.systems.wave_manager import WaveManager # Already correct
-from game.ui.leaderboard import Leaderboard # Adjusted import
+from game.ui.leaderboard_client import AsyncLeaderboardClient
 from game.ui.leaderboard_sprite import LeaderboardSprite # Adjusted import
+from game.ui.font_manager import FontManager # Fonts resolved once, paths cached across runs
 from game.systems.entity_manager import EntityManager # Added import
 from game.systems.combat_system import CombatManager # Added import
 from game.ui.ui_manager import UIManager # Added import
@@ -24,12 +31,36 @@ from game.core.camera import Camera # Added import
 from game.utils.effects import EffectManager # Import EffectManager
 from game.systems.weapon_system import WeaponSystem # Import WeaponSystem
 from game.core.event_manager import EventManager # Import EventManager
+from game.core.blackboard import Blackboard # Per-frame shared AI/system state
+from game.core.render_snapshot import SnapshotBuffer # Simulation -> renderer hand-off
+from game.core.timer_wheel import TimerWheel # Fuses, cooldowns, effect expiry, wave rests
+from game.core.startup import BackgroundLoader # Leaderboard and NPC workers load while the first frames are drawn
+from game.core import world_save # Binary save/load of the simulation state
+from game.core.memory_monitor import MemoryMonitor # Optional tracemalloc checkpoints at wave boundaries
 
 class Game:
-    def __init__(self):
+    def __init__(self, threaded_simulation=THREADED_SIMULATION, startup_profiler=None, input_source=None,
+                 soak_monitor=None, memory_monitor=MEMORY_MONITOR):
+        """
+        Args:
+            threaded_simulation (bool): Run the simulation on its own thread (see run()).
+            startup_profiler (StartupProfiler): Optional; gets a mark per startup phase and reports
+                                                once the first frame is on screen.
+            input_source: Optional; drives the player instead of the keyboard (e.g. a BotInput).
+                          A non-human source restarts the game on game over.
+            soak_monitor (SoakMonitor): Optional; gets each frame's time, and ends the run when it says so.
+            memory_monitor (bool): Trace allocations and checkpoint them at each wave boundary; the
+                                   report is written when run() returns (see MemoryMonitor).
+        """
+        # Started first so the world built below is traced too
+        self.memory_monitor = MemoryMonitor().start() if memory_monitor else None
+        self.input_source = input_source # Kept for the players of later runs
+        self.soak_monitor = soak_monitor
+        self.startup_profiler = startup_profiler
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(CAPTION)
+        self._profile_mark("pygame init + window")
         self.clock = pygame.time.Clock()
         self.running = True
         self.game_over = False # Added game_over state
@@ -46,9 +77,15 @@ class Game:
         self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT)
         self.entity_manager = EntityManager()
         self.combat_manager = CombatManager(self.entity_manager)
-        self.effect_manager = EffectManager() # Instantiate EffectManager
-        self.weapon_system = WeaponSystem(self.entity_manager, self.effect_manager, self.combat_manager) # Instantiate WeaponSystem
+        self.timers = TimerWheel(start_time=pygame.time.get_ticks()) # Advanced once per simulation step
+        self.effect_manager = EffectManager(timers=self.timers) # Instantiate EffectManager
+        self.blackboard = Blackboard(WORLD_WIDTH, WORLD_HEIGHT) # Refreshed once per simulation step
+        self.weapon_system = WeaponSystem(self.entity_manager, self.effect_manager, self.combat_manager,
+                                          blackboard=self.blackboard, timers=self.timers) # Instantiate WeaponSystem
         self.event_manager = EventManager() # Instantiate EventManager
+        # Optional multi-process NPC AI over shared memory (settings.NPC_AI_WORKERS).
+        # Started by the background loader; NPCs update on this thread until it is ready.
+        self.npc_worker_pool = None
         # Note: settings_module is already imported as 'import game.core.settings as settings_module'
         self.ui_manager = UIManager(self.screen, settings_module) 
         # self.all_sprites, self.projectiles, self.npcs pygame.sprite.Group() initializations are removed.
@@ -57,14 +94,19 @@ class Game:
         # Player setup
         start_x = ROOM_WIDTH / 2
         start_y = ROOM_HEIGHT / 2
-        self.player = Player(start_x, start_y)
+        self.player = Player(start_x, start_y, input_source=self.input_source)
         self.entity_manager.add_entity(self.player, "player") # Add player via entity_manager
         # self.all_sprites.add(self.player) # Removed
 
         # WaveManager setup
-        self.wave_manager = WaveManager(self.entity_manager, self.player, self.event_manager) # Pass event_manager
+        self.blackboard.refresh(self.entity_manager) # So WaveManager starts from the current time
+        self.wave_manager = WaveManager(self.entity_manager, self.player, self.event_manager,
+                                        blackboard=self.blackboard, timers=self.timers) # Pass event_manager
+        if self.memory_monitor is not None:
+            self.memory_monitor.watch(self) # Subscribes to the wave events, which outlive WaveManager resets
         
         print(f"Initial Weapon: {self.player.weapon}")
+        self._profile_mark("world + managers")
 
         # Old self.camera_x and self.camera_y direct attributes are removed.
         # Access via self.camera.x and self.camera.y (properties of Camera class)
@@ -77,46 +119,122 @@ class Game:
         self.radar_pos_x = self.radar_actual_radius + RADAR_MARGIN
         self.radar_pos_y = SCREEN_HEIGHT - self.radar_actual_radius - RADAR_MARGIN
 
-        # Font for displaying weapon name
-        self.font = pygame.font.SysFont(None, 36) # Using a default system font
-        self.game_over_font = pygame.font.SysFont(None, 72) # Font for Game Over message
-        self.restart_font = pygame.font.SysFont(None, 48) # Font for Restart prompt
+        # Fonts come from the FontManager: pygame's built-in font needs no system font scan,
+        # and a named GAME_FONT_NAME is resolved once and remembered in FONT_CACHE_FILE
+        self.fonts = FontManager()
+        self.font = self.fonts.get(GAME_FONT_NAME, 36) # Font for displaying weapon name
+        self.game_over_font = self.fonts.get(GAME_FONT_NAME, 72) # Font for Game Over message
+        self.restart_font = self.fonts.get(GAME_FONT_NAME, 48) # Font for Restart prompt
 
         # Fonts for LeaderboardSprite
-        self.leaderboard_font_prompt = pygame.font.SysFont(None, 48)
-        self.leaderboard_font_input = pygame.font.SysFont(None, 40)
-        self.leaderboard_font_scores = pygame.font.SysFont(None, 36)
-
-        # Leaderboard setup
-        self.leaderboard_manager = Leaderboard() # Instantiate Leaderboard manager
-        self.leaderboard_display = LeaderboardSprite(
-            screen=self.screen,
-            font_prompt=self.leaderboard_font_prompt,
-            font_input=self.leaderboard_font_input,
-            font_scores=self.leaderboard_font_scores,
-            leaderboard_manager=self.leaderboard_manager,
-            settings=settings_module # Pass the imported settings_module
-        )
-        
+        self.leaderboard_font_prompt = self.fonts.get(GAME_FONT_NAME, 48)
+        self.leaderboard_font_input = self.fonts.get(GAME_FONT_NAME, 40)
+        self.leaderboard_font_scores = self.fonts.get(GAME_FONT_NAME, 36)
+        self._profile_mark("fonts")
+
+        # Leaderboard setup. Opening the store (imports, schema, histogram and window backfill) and
+        # starting NPC worker processes happen on a background thread so the first frame isn't
+        # held up; _poll_startup() installs them. Only the game-over screen needs the leaderboard,
+        # and it shows the loading progress if the player gets there first.
+        self.leaderboard_manager = None
+        self.leaderboard_client = None
+        self.leaderboard_display = None
+        startup_tasks = [("leaderboard", self._open_leaderboard)]
+        if NPC_AI_WORKERS > 0:
+            startup_tasks.append(("npc workers", self._start_npc_workers))
+        self.startup_loader = BackgroundLoader(startup_tasks).start()
+        self._startup_reported = False
+        self._profile_mark("background loader started")
+
         # Subscribe to events
         self.event_manager.subscribe("NPC_DIED_EVENT", self.handle_npc_killed)
 
+        # Simulation/render split: input is queued as commands, frames are drawn from snapshots
+        self.pending_commands = queue.SimpleQueue()
+        self.snapshot_buffer = SnapshotBuffer()
+        self.threaded_simulation = threaded_simulation
+        self._sim_thread = None
+        self._sim_lock = threading.Lock() # Held by the simulation thread for each step; reset_game() takes it too
+        self._sim_resume = threading.Event() # Set on quit to wake an idle simulation thread
+
+    def _profile_mark(self, label):
+        if self.startup_profiler is not None:
+            self.startup_profiler.mark(label)
+
+    # --- Background startup tasks (run on the loader thread; results are installed by _poll_startup) ---
+
+    def _open_leaderboard(self):
+        # Imported here: the store modules (sqlite3, csv, sockets...) stay off the startup path
+        if LEADERBOARD_SERVER:
+            # Shared rankings: scores go to a LeaderboardServer instead of the local file
+            from game.ui.leaderboard_remote import RemoteLeaderboard
+            host, port = LEADERBOARD_SERVER.rsplit(":", 1)
+            return RemoteLeaderboard(host, int(port))
+        from game.ui.leaderboard import Leaderboard
+        return Leaderboard()
+
+    def _start_npc_workers(self):
+        from game.systems.npc_workers import NPCWorkerPool
+        return NPCWorkerPool(NPC_AI_WORKERS)
+
+    def _poll_startup(self):
+        """Installs whatever the background loader has finished. Called once per frame on the main thread."""
+        loader = self.startup_loader
+        if self.leaderboard_display is None and "leaderboard" in loader.results:
+            self.leaderboard_manager = loader.results["leaderboard"]
+            # Score writes go through a background thread so the game-over screen never waits on disk
+            self.leaderboard_client = AsyncLeaderboardClient(self.leaderboard_manager)
+            self.leaderboard_display = LeaderboardSprite(
+                screen=self.screen,
+                font_prompt=self.leaderboard_font_prompt,
+                font_input=self.leaderboard_font_input,
+                font_scores=self.leaderboard_font_scores,
+                leaderboard_manager=self.leaderboard_manager,
+                settings=settings_module, # Pass the imported settings_module
+                leaderboard_client=self.leaderboard_client
+            )
+        if self.npc_worker_pool is None and "npc workers" in loader.results:
+            with self._sim_lock: # NPCs switch from NPC.update() to the pool between two steps
+                self.npc_worker_pool = loader.results.pop("npc workers")
+        if loader.done and not self._startup_reported:
+            self._startup_reported = True
+            if self.startup_profiler is not None:
+                self.startup_profiler.report_background(loader)
+            if "leaderboard" in loader.errors:
+                print("Game: leaderboard unavailable; scores from this session won't be saved.")
+
+    def draw_loading_progress(self, center=None):
+        """Draws a progress bar with the name of the task being loaded (HUD corner, or centered on the game-over screen)."""
+        loader = self.startup_loader
+        width, height = 200, 14
+        if center is None:
+            x, y = SCREEN_WIDTH - width - MINIMAP_MARGIN, SCREEN_HEIGHT - height - MINIMAP_MARGIN
+        else:
+            x, y = center[0] - width // 2, center[1] - height // 2
+        pygame.draw.rect(self.screen, MINIMAP_BG_COLOR, (x, y, width, height))
+        pygame.draw.rect(self.screen, MINIMAP_PLAYER_COLOR, (x, y, int(width * loader.progress), height))
+        pygame.draw.rect(self.screen, MINIMAP_BORDER_COLOR, (x, y, width, height), 1)
+        label = self.font.render(f"Loading {loader.current or ''}...", True, BLACK)
+        self.screen.blit(label, (x, y - label.get_height() - 4))
+
     def handle_npc_killed(self, event_data):
-        # Assuming self.player is valid and has increment_kills method
-        if self.player and hasattr(self.player, 'increment_kills'):
-            self.player.increment_kills()
-            print(f"Game: Player kills updated to {self.player.kills} via NPC_DIED_EVENT. Event data: {event_data}")
+        # Only the player who dealt the killing blow is credited (not NPCs cleared by a reset), as in Simulation
+        killer = event_data.get("killer")
+        if isinstance(killer, Player):
+            killer.increment_kills()
+            print(f"Game: Player kills updated to {killer.kills} via NPC_DIED_EVENT. Event data: {event_data}")
         else:
-            print(f"Game: Player or increment_kills method not found. Cannot update kills for NPC_DIED_EVENT.")
+            print(f"Game: NPC died without a killing player; no kill credited. Event data: {event_data}")
 
     def update_camera(self):
         self.camera.update(self.player) # Use Camera object
 
-    def draw_radar(self):
+    def draw_radar(self, snapshot):
         radar_surface = pygame.Surface((self.radar_actual_radius * 2, self.radar_actual_radius * 2), pygame.SRCALPHA)
         pygame.draw.circle(radar_surface, RADAR_BG_COLOR, (self.radar_actual_radius, self.radar_actual_radius), self.radar_actual_radius)
         center_x, center_y = self.radar_actual_radius, self.radar_actual_radius
-        direction_normalized = self.player.direction.normalize() if self.player.direction.length_squared() > 0 else pygame.math.Vector2(0,1)
+        direction = pygame.math.Vector2(snapshot.player_direction)
+        direction_normalized = direction.normalize() if direction.length_squared() > 0 else pygame.math.Vector2(0,1)
         line_len = self.radar_actual_radius - 5 
         end_x = center_x + direction_normalized.x * line_len
         end_y = center_y + direction_normalized.y * line_len
@@ -125,19 +243,11 @@ class Game:
         blit_pos_y = self.radar_pos_y - self.radar_actual_radius
         self.screen.blit(radar_surface, (blit_pos_x, blit_pos_y))
 
-    def draw_status_bar(self):
-        weapon_name = "None"
-        if self.player.weapon:
-            weapon_name = self.player.weapon.name
-        
-        player_health = self.player.health
-        player_kills = self.player.kills
-        wave_status_text = self.wave_manager.get_wave_status_text()
-
-        weapon_text = f"Weapon: {weapon_name}"
-        health_text = f"Health: {player_health}"
-        kills_text = f"Kills: {player_kills}"
-        wave_text = f"Wave: {wave_status_text}"
+    def draw_status_bar(self, snapshot):
+        weapon_text = f"Weapon: {snapshot.weapon_name}"
+        health_text = f"Health: {snapshot.player_health}"
+        kills_text = f"Kills: {snapshot.player_kills}"
+        wave_text = f"Wave: {snapshot.wave_text}"
 
         weapon_surface = self.font.render(weapon_text, True, BLACK)
         health_surface = self.font.render(health_text, True, BLACK)
@@ -153,7 +263,7 @@ class Game:
         kills_text_width = kills_surface.get_width()
         self.screen.blit(kills_surface, (SCREEN_WIDTH - kills_text_width - 10, 10 + wave_surface.get_height() + 5))
 
-    def draw_minimap(self):
+    def draw_minimap(self, snapshot):
         map_x = SCREEN_WIDTH - MINIMAP_WIDTH - MINIMAP_MARGIN
         map_y = SCREEN_HEIGHT - MINIMAP_HEIGHT - MINIMAP_MARGIN
 
@@ -174,16 +284,251 @@ class Game:
             pygame.draw.rect(minimap_surface, MINIMAP_BORDER_COLOR,
                              (mini_room_x, mini_room_y, mini_room_width, mini_room_height), 1)
 
-        player_mini_x = self.player.rect.centerx * scale_x
-        player_mini_y = self.player.rect.centery * scale_y
+        player_mini_x = snapshot.player_center[0] * scale_x
+        player_mini_y = snapshot.player_center[1] * scale_y
         pygame.draw.circle(minimap_surface, MINIMAP_PLAYER_COLOR, 
                            (int(player_mini_x), int(player_mini_y)), 3)
 
         pygame.draw.rect(self.screen, MINIMAP_BORDER_COLOR, (map_x -1, map_y -1, MINIMAP_WIDTH + 2, MINIMAP_HEIGHT + 2), 1)
         self.screen.blit(minimap_surface, (map_x, map_y))
 
+    def handle_gameplay_event(self, event):
+        """Translates a pygame event into a simulation command (queued, applied at the next step)."""
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                # Player attack logic now handled by WeaponSystem
+                self.pending_commands.put(("fire", None))
+            elif event.key == pygame.K_1:
+                self.pending_commands.put(("equip", "pistol"))
+            elif event.key == pygame.K_2:
+                self.pending_commands.put(("equip", "knife"))
+            elif event.key == pygame.K_3:
+                self.pending_commands.put(("equip", "grenade_launcher"))
+            elif event.key == pygame.K_4:
+                self.pending_commands.put(("equip", "laser"))
+            elif event.key == pygame.K_5:
+                self.pending_commands.put(("equip", "shotgun"))
+            elif event.key == pygame.K_F5:
+                self.pending_commands.put(("save", SAVE_FILE))
+            elif event.key == pygame.K_F9:
+                self.pending_commands.put(("load", SAVE_FILE))
+
+    def apply_commands(self):
+        """Applies input commands queued by the main thread to the simulation."""
+        while True:
+            try:
+                command, argument = self.pending_commands.get_nowait()
+            except queue.Empty:
+                break
+            if command == "fire":
+                self.weapon_system.use_weapon(self.player)
+            elif command == "equip":
+                self.player.equip_weapon(argument)
+            elif command == "save":
+                self.save_game(argument)
+            elif command == "load":
+                self.load_game(argument)
+
+    def save_game(self, path=SAVE_FILE):
+        """
+        Saves the simulation state (see game.core.world_save). Call between simulation steps:
+        from apply_commands(), or with the simulation paused.
+
+        Returns:
+            bool: True if the save was written.
+        """
+        started = time.perf_counter()
+        try:
+            size = world_save.save_world(self, path)
+        except OSError as e:
+            print(f"Game: could not save to {path}: {e}")
+            return False
+        print(f"Game: saved {len(self.entity_manager.npcs)} NPCs to {path} "
+              f"({size} bytes, {(time.perf_counter() - started) * 1000:.1f} ms).")
+        return True
+
+    def load_game(self, path=SAVE_FILE):
+        """
+        Replaces the current world with a save written by save_game(). The file is read
+        completely before anything is reset, so a bad file leaves the running world alone.
+
+        Returns:
+            bool: True if the save was loaded.
+        """
+        started = time.perf_counter()
+        try:
+            state = world_save.read_world(path)
+        except (OSError, world_save.WorldSaveError) as e:
+            print(f"Game: could not load {path}: {e}")
+            return False
+        self._reset_world()
+        world_save.restore_world(self, state)
+        print(f"Game: loaded {len(self.entity_manager.npcs)} NPCs from {path} "
+              f"({(time.perf_counter() - started) * 1000:.1f} ms).")
+        return True
+
+    def update_simulation(self):
+        """Advances the world by one step. Runs on the main thread, or on the simulation thread when threaded."""
+        # Fire due timers (grenade fuses, cooldown and effect expiry, wave starts) before the
+        # blackboard is built, so its alive counts include anything they spawned or removed
+        now = pygame.time.get_ticks()
+        self.timers.advance(now)
+        # Build the per-frame blackboard once; NPCs, WeaponSystem, WaveManager and Grenades read from it
+        self.blackboard.refresh(self.entity_manager, self.camera, current_time=now)
+        for command in self.player.input_source.poll(self.player): # A bot's fire/equip; the keyboard's come as events
+            self.pending_commands.put(command)
+        self.apply_commands()
+
+        # Update entities - This will later be handled by specific systems (Movement, AI etc.)
+        # For now, direct update calls for Player and NPC, other entities handled by entity_manager.update()
+        self.player.update() # Player movement and input
+        if self.npc_worker_pool is not None:
+            # AI and movement computed by worker processes, results written back to the sprites
+            self.npc_worker_pool.step(self.entity_manager, self.blackboard, self.weapon_system,
+                                      self.combat_manager, self.effect_manager)
+        else:
+            for npc in self.entity_manager.npcs: # Update NPCs specifically if they have complex updates
+                 npc.update(self.entity_manager, self.combat_manager, self.effect_manager, self.weapon_system,
+                            blackboard=self.blackboard) # Pass weapon_system and the shared blackboard
+        
+        # Update EffectManager
+        self.effect_manager.update() # Call EffectManager's update
+
+        # For other entities like projectiles, their update is simple and called if they are in entity_manager.entities
+        for entity in self.entity_manager.entities:
+            if not isinstance(entity, (Player, NPC)): # Player and NPC already updated
+                entity.update()
+
+        self.wave_manager.update() # WaveManager uses entity_manager.npcs
+        
+        if self.player.health <= 0 and not self.game_over:
+            self.game_over = True
+
+        # Call EntityManager to handle collisions, passing EffectManager
+        self.entity_manager.handle_collisions(self.effect_manager)
+                            
+        self.update_camera() 
+
+    def capture_snapshot(self, snapshot):
+        """Fills a RenderSnapshot with everything draw_snapshot() needs, in world coordinates."""
+        snapshot.frame = self.blackboard.frame
+        snapshot.camera_x = self.camera.x
+        snapshot.camera_y = self.camera.y
+
+        for npc_sprite in self.entity_manager.npcs:
+            if not npc_sprite.is_following_player:
+                snapshot.patrol_rects.append((npc_sprite.patrol_limit_left, npc_sprite.rect.top,
+                                              npc_sprite.patrol_limit_right - npc_sprite.patrol_limit_left,
+                                              npc_sprite.rect.height))
+            if npc_sprite.is_following_player and npc_sprite.health > 0:
+                health_percentage = npc_sprite.health / npc_sprite.max_health
+                snapshot.health_bars.append((npc_sprite.rect.x, npc_sprite.rect.top - NPC_HEALTH_BAR_Y_OFFSET,
+                                             npc_sprite.rect.width, npc_sprite.rect.width * health_percentage))
+
+        append_sprite = snapshot.sprites.append
+        for sprite in self.entity_manager.entities:
+            render_items = getattr(sprite, 'render_items', None)
+            if render_items is not None:
+                snapshot.sprites.extend(render_items()) # Entities drawn as several images (e.g. Volley pellets)
+            else:
+                append_sprite((sprite.image, sprite.rect.x, sprite.rect.y))
+        for effect in self.effect_manager.effects:
+            snapshot.effects.append((effect.image, effect.rect.x, effect.rect.y))
+        for rect, creation_time, color in self.melee_attack_visuals:
+            if self.blackboard.current_time - creation_time <= MELEE_VISUAL_DURATION:
+                snapshot.melee_visuals.append((rect.copy(), color))
+
+        snapshot.weapon_name = self.player.weapon.name if self.player.weapon else "None"
+        snapshot.player_health = self.player.health
+        snapshot.player_kills = self.player.kills
+        snapshot.wave_text = self.wave_manager.get_wave_status_text()
+        snapshot.player_direction = (self.player.direction.x, self.player.direction.y)
+        snapshot.player_center = self.player.rect.center
+        snapshot.game_over = self.game_over
+
+    def draw_snapshot(self, snapshot):
+        """Draws one frame from a snapshot. Only touches the snapshot and static world data (rooms)."""
+        camera_x, camera_y = snapshot.camera_x, snapshot.camera_y
+        screen = self.screen
+        screen.fill(LIGHT_GRAY) 
+
+        for room in self.rooms:
+            room.draw(screen, camera_x, camera_y)
+        
+        # Draw NPC patrol areas and health bars
+        for x, y, width, height in snapshot.patrol_rects:
+            pygame.draw.rect(screen, (255, 255, 0, 100), (x - camera_x, y - camera_y, width, height), 1)
+        for x, y, width, fg_width in snapshot.health_bars:
+            pygame.draw.rect(screen, (255, 0, 0), (x - camera_x, y - camera_y, width, NPC_HEALTH_BAR_HEIGHT))
+            pygame.draw.rect(screen, (0, 255, 0), (x - camera_x, y - camera_y, fg_width, NPC_HEALTH_BAR_HEIGHT))
+
+        # Draw all entities with the camera offset
+        screen.blits([(image, (x - camera_x, y - camera_y)) for image, x, y in snapshot.sprites], False)
+
+        for rect, color in snapshot.melee_visuals:
+            temp_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
+            temp_surface.fill(color)
+            screen.blit(temp_surface, (rect.x - camera_x, rect.y - camera_y))
+        
+        # Draw effects managed by EffectManager
+        screen.blits([(image, (x - camera_x, y - camera_y)) for image, x, y in snapshot.effects], False)
+
+        self.draw_radar(snapshot)
+        self.draw_status_bar(snapshot)
+        self.draw_minimap(snapshot)
+
+    def _simulation_loop(self):
+        """Simulation thread body: step at FPS and publish a snapshot after each step."""
+        step_interval = 1.0 / FPS
+        next_step = time.perf_counter()
+        while self.running:
+            if self.game_over:
+                # Game over screen is handled by the main thread; idle until reset_game() or quit
+                self._sim_resume.wait(0.05)
+                next_step = time.perf_counter()
+                continue
+            with self._sim_lock:
+                self.update_simulation()
+                snapshot = self.snapshot_buffer.begin_write()
+                self.capture_snapshot(snapshot)
+                self.snapshot_buffer.publish()
+            next_step += step_interval
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.perf_counter() # Running behind; don't try to catch up in a burst
+
     def run(self):
+        if self.threaded_simulation:
+            gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+            print(f"Game: simulation running on its own thread (GIL {'enabled' if gil_enabled else 'disabled'}).")
+            self._sim_thread = threading.Thread(target=self._simulation_loop, name="simulation", daemon=True)
+            self._sim_thread.start()
+
+        if self.soak_monitor is not None:
+            self.soak_monitor.start(self)
+        first_frame = True
         while self.running:
+            frame_started = time.perf_counter()
+            self._poll_startup()
+            if self.game_over and not self.player.input_source.human:
+                self.reset_game() # Nobody to enter a name: play on
+                if self.soak_monitor is not None:
+                    self.soak_monitor.restarted()
+            if self.game_over and self.leaderboard_display is None:
+                # Died before the leaderboard finished loading: show its progress until it's ready
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                self.screen.fill(LIGHT_GRAY)
+                if self.startup_loader.done: # The leaderboard failed to open: no score entry, straight back in
+                    self.reset_game()
+                else:
+                    self.draw_loading_progress(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+                pygame.display.flip()
+                self.clock.tick(FPS)
+                continue
             if self.game_over:
                 if not self.leaderboard_display.is_active:
                     self.leaderboard_display.activate(self.player.kills)
@@ -208,115 +553,59 @@ class Game:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        # Player attack logic now handled by WeaponSystem
-                        self.weapon_system.use_weapon(self.player)
-                        # Old logic for player.shoot and player.melee_attack, including melee visual creation, is removed.
-                    elif event.key == pygame.K_1:
-                        self.player.equip_weapon("pistol")
-                    elif event.key == pygame.K_2:
-                        self.player.equip_weapon("knife")
-                    elif event.key == pygame.K_3:
-                        self.player.equip_weapon("grenade_launcher")
-
-            # Update entities - This will later be handled by specific systems (Movement, AI etc.)
-            # For now, direct update calls for Player and NPC, other entities handled by entity_manager.update()
-            self.player.update() # Player movement and input
-            for npc in self.entity_manager.npcs: # Update NPCs specifically if they have complex updates
-                 npc.update(self.entity_manager, self.combat_manager, self.effect_manager, self.weapon_system) # Pass weapon_system
-            
-            # Update EffectManager
-            self.effect_manager.update() # Call EffectManager's update
-
-            # self.entity_manager.update(dt) # dt is not yet consistently used.
-            # For other entities like projectiles, their update is simple and called if they are in entity_manager.entities
-            # and the main loop below iterates through entity_manager.entities.
-            # This part of update logic needs further refinement with systems.
-            # For now, this loop updates projectiles, effects etc. if their update() takes no args.
-            for entity in self.entity_manager.entities:
-                if not isinstance(entity, (Player, NPC)): # Player and NPC already updated
-                    entity.update()
-
-            self.wave_manager.update() # WaveManager uses entity_manager.npcs
-            
-            if self.player.health <= 0 and not self.game_over:
-                self.game_over = True
-
-            # Call EntityManager to handle collisions, passing EffectManager
-            self.entity_manager.handle_collisions(self.effect_manager)
-            # The projectile-NPC collision loop has been moved to EntityManager.handle_collisions()
-                            
-            self.update_camera() 
-
-            self.screen.fill(LIGHT_GRAY) 
-
-            for room in self.rooms:
-                room.draw(self.screen, self.camera.x, self.camera.y) # Use camera object's x, y
-            
-            # Draw NPC patrol areas and health bars using camera object's x, y
-            for npc_sprite in self.entity_manager.npcs: # Use entity_manager group
-                if not npc_sprite.is_following_player:
-                    patrol_rect_world = pygame.Rect(
-                        npc_sprite.patrol_limit_left, 
-                        npc_sprite.rect.top,
-                        npc_sprite.patrol_limit_right - npc_sprite.patrol_limit_left, 
-                        npc_sprite.rect.height
-                    )
-                    # Use camera.x for offset
-                    patrol_rect_screen_x = patrol_rect_world.x - self.camera.x 
-                    patrol_rect_screen_y = patrol_rect_world.y - self.camera.y
-                    pygame.draw.rect(self.screen, (255, 255, 0, 100), 
-                                     (patrol_rect_screen_x, patrol_rect_screen_y, patrol_rect_world.width, patrol_rect_world.height), 1)
-
-                if npc_sprite.is_following_player and npc_sprite.health > 0:
-                    HEALTH_BAR_HEIGHT = 5
-                    HEALTH_BAR_Y_OFFSET = 10
-                    health_percentage = npc_sprite.health / npc_sprite.max_health
-                    
-                    bg_bar_width = npc_sprite.rect.width
-                    bg_bar_x_world = npc_sprite.rect.x
-                    bg_bar_y_world = npc_sprite.rect.top - HEALTH_BAR_Y_OFFSET
-                    # Use camera.x, camera.y for offset
-                    bg_bar_screen_x = bg_bar_x_world - self.camera.x
-                    bg_bar_screen_y = bg_bar_y_world - self.camera.y
-                    pygame.draw.rect(self.screen, (255, 0, 0), 
-                                     (bg_bar_screen_x, bg_bar_screen_y, bg_bar_width, HEALTH_BAR_HEIGHT))
-
-                    fg_bar_width = bg_bar_width * health_percentage
-                    pygame.draw.rect(self.screen, (0, 255, 0), 
-                                     (bg_bar_screen_x, bg_bar_screen_y, fg_bar_width, HEALTH_BAR_HEIGHT))
-
-            # Draw all entities using camera.apply()
-            for sprite in self.entity_manager.entities: # Use entity_manager group
-                self.screen.blit(sprite.image, self.camera.apply(sprite.rect))
-
-            current_time = pygame.time.get_ticks()
-            for visual in list(self.melee_attack_visuals):
-                rect, creation_time, color = visual
-                if current_time - creation_time > MELEE_VISUAL_DURATION:
-                    self.melee_attack_visuals.remove(visual)
-                else:
-                    temp_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-                    temp_surface.fill(color)
-                    # Apply camera offset to melee visual's rect
-                    self.screen.blit(temp_surface, self.camera.apply(rect))
-            
-            # Draw effects managed by EffectManager
-            self.effect_manager.draw(self.screen, self.camera)
-
-            self.draw_radar()
-            self.draw_status_bar()
-            self.draw_minimap()
+                self.handle_gameplay_event(event)
+
+            if self.threaded_simulation:
+                # Main thread only presents the latest complete snapshot
+                snapshot = self.snapshot_buffer.latest()
+            else:
+                self.update_simulation()
+                snapshot = self.snapshot_buffer.begin_write()
+                self.capture_snapshot(snapshot)
+                self.snapshot_buffer.publish()
+                snapshot = self.snapshot_buffer.latest()
+
+            self.draw_snapshot(snapshot)
+            if not self.startup_loader.done:
+                self.draw_loading_progress()
             pygame.display.flip() 
+            if first_frame:
+                first_frame = False
+                self._profile_mark("first frame")
+                if self.startup_profiler is not None:
+                    self.startup_profiler.report()
+            if self.soak_monitor is not None and self.soak_monitor.frame(time.perf_counter() - frame_started, self):
+                self.running = False
             self.clock.tick(FPS)
 
+        if self._sim_thread is not None:
+            self._sim_resume.set()
+            self._sim_thread.join(timeout=1.0)
+        self.startup_loader.wait() # Don't exit underneath a store or worker pool that is still opening
+        self._poll_startup()
+        if self.npc_worker_pool is not None:
+            self.npc_worker_pool.close()
+        if self.leaderboard_client is not None:
+            self.leaderboard_client.close() # Flush scores still queued for the database
+            self.leaderboard_manager.close()
+        print(f"Game: timer wheel stats {self.timers.stats()}")
+        if self.soak_monitor is not None:
+            self.soak_monitor.summary()
+        if self.memory_monitor is not None:
+            self.memory_monitor.close() # Last checkpoint and the report
         pygame.quit()
 
     def reset_game(self):
+        with self._sim_lock: # Never reset in the middle of a simulation step
+            self._reset_world()
+
+    def _reset_world(self):
         print("Resetting game...")
         self.game_over = False
-        if self.leaderboard_display.is_active:
+        # Drop pending fuses/cooldowns/effect expiries/wave starts of the old run
+        self.timers.clear(now=pygame.time.get_ticks())
+        self.weapon_system.clear_cooldowns()
+        if self.leaderboard_display is not None and self.leaderboard_display.is_active:
             self.leaderboard_display.deactivate()
 
         start_x = ROOM_WIDTH / 2
@@ -325,14 +614,17 @@ class Game:
         if self.player: # Ensure player exists before trying to kill
             self.player.kill() 
 
-        self.player = Player(start_x, start_y)
-        self.entity_manager.add_entity(self.player, "player") # Add new player to entity_manager
-
-        # Clear existing NPCs and Projectiles from entity_manager groups
+        # Clear existing NPCs and Projectiles from entity_manager groups before the new player exists,
+        # so the NPC_DIED_EVENTs of the cleared NPCs can't count for it
         for npc in list(self.entity_manager.npcs): 
             npc.kill()
         for projectile in list(self.entity_manager.projectiles): 
             projectile.kill()
+        for volley in list(self.entity_manager.volleys):
+            volley.kill()
+
+        self.player = Player(start_x, start_y, input_source=self.input_source)
+        self.entity_manager.add_entity(self.player, "player") # Add new player to entity_manager
         self.melee_attack_visuals.clear()
         self.effect_manager.effects.empty() # Clear existing effects
         # Re-initialize EffectManager (optional, emptying might suffice)
@@ -340,7 +632,9 @@ class Game:
 
 
         # Re-initialize WaveManager with entity_manager groups
-        self.wave_manager = WaveManager(self.entity_manager, self.player) # Already updated
+        self.blackboard.refresh(self.entity_manager, self.camera, current_time=self.timers.current_time) # Pick up the new player
+        self.wave_manager = WaveManager(self.entity_manager, self.player, self.event_manager,
+                                        blackboard=self.blackboard, timers=self.timers)
         # Camera position is reset by its update method based on player
         self.update_camera() 
 
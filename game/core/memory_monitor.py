@@ -0,0 +1,199 @@
+import gc
+import time
+import tracemalloc
+import pygame
+from game.core.settings import MEMORY_REPORT_FILE, MEMORY_TOP_SITES, MEMORY_TRACE_FRAMES
+
+# Containers that could grow with play, as (label, function of the world); a world without one skips it
+CONTAINERS = [
+    ("weapon_system.last_use_times", lambda world: len(world.weapon_system.last_use_times)),
+    ("weapon_system.cooldowns rows", lambda world: world.weapon_system.cooldowns.rows),
+    ("entity_manager handle slots", lambda world: world.entity_manager.handle_capacity),
+    ("entity_manager.entities", lambda world: len(world.entity_manager.entities)),
+    ("effect_manager.effects", lambda world: len(world.effect_manager.effects)),
+    ("timers pending", lambda world: world.timers.stats()["pending"]),
+    ("melee_attack_visuals", lambda world: len(world.melee_attack_visuals)), # Game only
+]
+
+def _surface_bytes(sprite):
+    # Pixel memory is allocated by SDL, so tracemalloc doesn't see it: count the sprite's Surfaces instead
+    total = 0
+    for name in ("image", "original_image"):
+        surface = getattr(sprite, name, None)
+        if isinstance(surface, pygame.Surface):
+            total += surface.get_width() * surface.get_height() * surface.get_bytesize()
+    return total
+
+def live_sprites():
+    """
+    Counts the sprites alive in the process, per class.
+
+    Returns:
+        dict: Class name -> (instances, of those still in a group, their Surface bytes). Instances not in a
+              group are killed sprites something still holds on to.
+    """
+    counts = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, pygame.sprite.Sprite): # Entity shadows Sprite.alive() with an attribute: ask for the groups
+            name = type(obj).__name__
+            total, in_groups, surface_bytes = counts.get(name, (0, 0, 0))
+            counts[name] = (total + 1, in_groups + (1 if obj.groups() else 0), surface_bytes + _surface_bytes(obj))
+    return counts
+
+def _site(statistic):
+    frame = statistic.traceback[0]
+    return f"{frame.filename}:{frame.lineno}"
+
+class MemoryMonitor:
+    '''
+    Optional allocation tracking per wave (main.py --memory-report, settings.MEMORY_MONITOR).
+
+    start() turns on tracemalloc; watch(world) subscribes to the WAVE_STARTED_EVENT and
+    WAVE_CLEARED_EVENT of the world's WaveManager. At each wave boundary a checkpoint takes a
+    tracemalloc snapshot and records the top allocation sites, the sites that grew most since the
+    previous checkpoint, the live sprites per class (and how many of them were killed but are still
+    referenced, with their Surface memory) and the sizes of containers that could grow with play
+    (CONTAINERS). close() takes a last checkpoint and writes the report.
+
+    Nothing of this exists unless a monitor is made: the game then doesn't start tracemalloc and
+    the WaveManager's events have no listener. A checkpoint walks the whole heap, so expect a
+    hitch of some milliseconds at each wave boundary while it is on.
+    '''
+    def __init__(self, report_path=MEMORY_REPORT_FILE, top=MEMORY_TOP_SITES, frames=MEMORY_TRACE_FRAMES):
+        """
+        Args:
+            report_path (str): Where close() writes the report; None only prints the checkpoints.
+            top (int): Allocation sites listed per checkpoint.
+            frames (int): Stack frames tracemalloc keeps per allocation (see tracemalloc.start()).
+        """
+        self.report_path = report_path
+        self.top = top
+        self.frames = frames
+        self.checkpoints = []
+        self.world = None
+        self._started_tracing = False
+        self._previous = None # Snapshot of the last checkpoint; only one is kept
+        self._filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+
+    def start(self):
+        """Starts tracemalloc (unless something else already did). Call early: only later allocations are traced."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        return self
+
+    def watch(self, world):
+        """Checkpoints at the wave boundaries of `world` (a Game or Simulation), starting with one now."""
+        self.world = world
+        world.event_manager.subscribe("WAVE_STARTED_EVENT", self._on_wave_started)
+        world.event_manager.subscribe("WAVE_CLEARED_EVENT", self._on_wave_cleared)
+        self.checkpoint("start")
+        return self
+
+    def _on_wave_started(self, event_data):
+        self.checkpoint(f"wave {event_data['wave']} started")
+
+    def _on_wave_cleared(self, event_data):
+        self.checkpoint(f"wave {event_data['wave']} cleared")
+
+    def checkpoint(self, label):
+        """
+        Takes a snapshot and records it (see the class docstring), printing a one-line summary.
+
+        Returns:
+            dict: The checkpoint.
+        """
+        started = time.perf_counter()
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        _, peak = tracemalloc.get_traced_memory()
+        statistics = snapshot.statistics("lineno")
+        current = sum(stat.size for stat in statistics) # Without the monitor's own snapshots, unlike get_traced_memory()
+        top_sites = [(_site(stat), stat.size, stat.count) for stat in statistics[:self.top]]
+        growth = []
+        if self._previous is not None:
+            for stat in snapshot.compare_to(self._previous, "lineno")[:self.top]:
+                if stat.size_diff:
+                    growth.append((_site(stat), stat.size_diff, stat.count_diff))
+        self._previous = snapshot
+
+        containers = {}
+        if self.world is not None:
+            for name, size in CONTAINERS:
+                try:
+                    containers[name] = size(self.world)
+                except AttributeError:
+                    pass
+        checkpoint = {
+            "label": label,
+            "time": self.world.timers.current_time if self.world is not None else None,
+            "traced": current,
+            "peak": peak,
+            "top_sites": top_sites,
+            "growth": growth,
+            "sprites": live_sprites(),
+            "containers": containers,
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        self.checkpoints.append(checkpoint)
+
+        first = self.checkpoints[0]
+        held = sum(total - in_groups for total, in_groups, _ in checkpoint["sprites"].values())
+        print(f"MemoryMonitor: {label}: traced {current / 1024:.0f} KB ({(current - first['traced']) / 1024:+.0f} KB "
+              f"since start), {held} killed sprite(s) still referenced, checkpoint {checkpoint['ms']:.1f} ms")
+        return checkpoint
+
+    def format_report(self):
+        """The report of all checkpoints so far, as text."""
+        lines = [f"Memory report: {len(self.checkpoints)} checkpoint(s), tracemalloc keeping {self.frames} frame(s)"]
+        if not self.checkpoints:
+            return "\n".join(lines) + "\n"
+        first, last = self.checkpoints[0], self.checkpoints[-1]
+        lines.append(f"Traced memory {first['traced'] / 1024:.0f} KB at '{first['label']}' -> "
+                     f"{last['traced'] / 1024:.0f} KB at '{last['label']}' (peak {last['peak'] / 1024:.0f} KB)")
+        lines.append("")
+        lines.append(f"{'checkpoint':<24} {'game ms':>10} {'traced KB':>10} {'delta KB':>9} {'held sprites':>13}")
+        previous = first
+        for checkpoint in self.checkpoints:
+            held = sum(total - in_groups for total, in_groups, _ in checkpoint["sprites"].values())
+            game_ms = "" if checkpoint["time"] is None else f"{checkpoint['time']:.0f}"
+            lines.append(f"{checkpoint['label']:<24} {game_ms:>10} {checkpoint['traced'] / 1024:>10.0f} "
+                         f"{(checkpoint['traced'] - previous['traced']) / 1024:>+9.0f} {held:>13}")
+            previous = checkpoint
+
+        for checkpoint in self.checkpoints:
+            lines.append("")
+            lines.append(f"== {checkpoint['label']} ==")
+            lines.append("Top allocation sites:")
+            for site, size, count in checkpoint["top_sites"]:
+                lines.append(f"  {size / 1024:9.1f} KB {count:8} blocks  {site}")
+            if checkpoint["growth"]:
+                lines.append("Growth since the previous checkpoint:")
+                for site, size_diff, count_diff in checkpoint["growth"]:
+                    lines.append(f"  {size_diff / 1024:+9.1f} KB {count_diff:+8} blocks  {site}")
+            lines.append("Live sprites (instances / in a group / Surface KB):")
+            for name, (total, in_groups, surface_bytes) in sorted(checkpoint["sprites"].items()):
+                lines.append(f"  {name:<22} {total:6} {in_groups:6} {surface_bytes / 1024:9.1f}")
+            if checkpoint["containers"]:
+                lines.append("Containers:")
+                for name, size in checkpoint["containers"].items():
+                    lines.append(f"  {name:<32} {size}")
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Takes a last checkpoint, writes the report and stops tracemalloc if start() started it."""
+        if self.world is not None:
+            self.world.event_manager.unsubscribe("WAVE_STARTED_EVENT", self._on_wave_started)
+            self.world.event_manager.unsubscribe("WAVE_CLEARED_EVENT", self._on_wave_cleared)
+        if tracemalloc.is_tracing():
+            self.checkpoint("exit")
+        if self.report_path is not None:
+            try:
+                with open(self.report_path, "w") as report:
+                    report.write(self.format_report())
+                print(f"MemoryMonitor: report written to {self.report_path}.")
+            except OSError as e:
+                print(f"MemoryMonitor: could not write {self.report_path}: {e}")
+        self._previous = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -0,0 +1,81 @@
+import threading
+
+class RenderSnapshot:
+    '''
+    Everything the renderer needs to draw one frame, captured from the simulation.
+
+    Sprites and effects are stored as (image, world_x, world_y) tuples. Images
+    are shared Surfaces that the simulation replaces rather than mutates (e.g.
+    Player._create_player_image builds a new Surface), so holding a reference is
+    enough. Once published to a SnapshotBuffer a snapshot must be treated as
+    read-only until the buffer hands it back to the writer.
+    '''
+    def __init__(self):
+        self.frame = 0
+        self.camera_x = 0
+        self.camera_y = 0
+        self.sprites = []        # (image, world_x, world_y)
+        self.effects = []        # (image, world_x, world_y)
+        self.patrol_rects = []   # (world_x, world_y, width, height)
+        self.health_bars = []    # (world_x, world_y, width, fg_width)
+        self.melee_visuals = []  # (world_rect, color)
+        # HUD values
+        self.weapon_name = "None"
+        self.player_health = 0
+        self.player_kills = 0
+        self.wave_text = ""
+        self.player_direction = (0, 1)
+        self.player_center = (0, 0)
+        self.game_over = False
+
+    def clear(self):
+        '''Empties the per-frame lists so the snapshot can be refilled without reallocating.'''
+        self.sprites.clear()
+        self.effects.clear()
+        self.patrol_rects.clear()
+        self.health_bars.clear()
+        self.melee_visuals.clear()
+
+
+class SnapshotBuffer:
+    '''
+    Triple buffer of RenderSnapshots between the simulation (writer) and the
+    renderer (reader).
+
+    The writer always has a back snapshot to fill and never waits for the
+    reader; publish() swaps it with the middle slot. The reader swaps the middle
+    slot with its front snapshot only when a newer one was published, so it
+    always draws the latest complete frame and never sees a half-written one.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._back = RenderSnapshot()
+        self._middle = RenderSnapshot()
+        self._front = RenderSnapshot()
+        self._fresh = False
+        self.published = 0
+        self.consumed = 0
+
+    def begin_write(self):
+        '''Returns the (cleared) back snapshot for the writer to fill.'''
+        self._back.clear()
+        return self._back
+
+    def publish(self):
+        '''Makes the back snapshot the latest one available to the reader.'''
+        with self._lock:
+            self._back, self._middle = self._middle, self._back
+            self._fresh = True
+            self.published += 1
+
+    def latest(self):
+        '''
+        Returns the newest published snapshot. The same object is returned again
+        until a newer one is published, so a slow writer just repeats frames.
+        '''
+        with self._lock:
+            if self._fresh:
+                self._front, self._middle = self._middle, self._front
+                self._fresh = False
+                self.consumed += 1
+            return self._front
@@ -4,6 +4,7 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
 FPS = 60
 CAPTION = "My Pygame Window"
+THREADED_SIMULATION = False # Run the simulation on a worker thread; the main thread only draws snapshots
 
 # Colors
 LIGHT_GRAY = (200, 200, 200)
@@ -31,6 +32,8 @@ UI_FONT_NAME = "arial"  # Default font name
 UI_FONT_SIZE_TITLE = 36
 UI_FONT_SIZE_SCORE = 28
 UI_FONT_SIZE_INPUT = 24
+GAME_FONT_NAME = None # Font family of the HUD and game-over screens; None is pygame's built-in font (no system font scan)
+FONT_CACHE_FILE = "font_cache.json" # Resolved system font paths, reused across runs (see game/ui/font_manager.py)
 
 # Consolidating UI Colors into a dictionary for easier management in tests or UI components
 UI_COLORS = {
@@ -47,6 +50,31 @@ UI_COLORS = {
     "overlay": UI_LEADERBOARD_OVERLAY_COLOR
 }
 
+# Leaderboard Settings
+LEADERBOARD_TOP_COUNT = 10 # Entries shown on the leaderboard screen
+LEADERBOARD_QUEUE_SIZE = 64 # Max requests waiting for the background leaderboard thread
+LEADERBOARD_FLUSH_TIMEOUT = 5.0 # Seconds to wait for pending leaderboard writes on exit
+LEADERBOARD_BACKEND = "sqlite3" # Leaderboard storage: "sqlite3" (standard library) or "sqlalchemy" (imported only if chosen)
+LEADERBOARD_SQLITE_CACHE_KIB = 8192 # SQLite page cache per leaderboard connection (PRAGMA cache_size)
+LEADERBOARD_TOP_CACHE_SIZE = 100 # Top scores held in memory by Leaderboard (0 disables the cache)
+LEADERBOARD_BATCH_SIZE = 50000 # Rows per transaction for Leaderboard.add_scores / import_scores / export_scores
+LEADERBOARD_WINDOW_SIZE = 100 # Top scores kept per daily/weekly leaderboard period
+LEADERBOARD_WINDOW_RETENTION = {"daily": 7, "weekly": 8} # Periods kept per window (incl. the current one) before compaction
+
+# Shared leaderboard server (game/ui/leaderboard_server.py) and its client backend (RemoteLeaderboard)
+LEADERBOARD_SERVER = None # "host:port" to use a shared LeaderboardServer; None keeps the local leaderboard.db
+LEADERBOARD_SERVER_HOST = "127.0.0.1"
+LEADERBOARD_SERVER_PORT = 8765
+LEADERBOARD_SERVER_BATCH_INTERVAL = 0.02 # Seconds the server collects submissions before one add_scores() transaction
+LEADERBOARD_REMOTE_TIMEOUT = 2.0 # Seconds to wait for a connection or response
+LEADERBOARD_REMOTE_RETRIES = 4 # Extra attempts per request after a failure
+LEADERBOARD_REMOTE_BACKOFF = 0.05 # First retry delay in seconds; doubles per attempt
+LEADERBOARD_REMOTE_BACKOFF_MAX = 2.0
+LEADERBOARD_REMOTE_BATCH_SIZE = 100 # Buffered scores that trigger a send
+LEADERBOARD_REMOTE_BATCH_INTERVAL = 1.0 # Longest a score waits in the client buffer (seconds)
+LEADERBOARD_REMOTE_TOP_TTL = 5.0 # Seconds a fetched top-N is served from the client cache
+LEADERBOARD_REMOTE_MAX_PENDING = 10000 # Scores kept while the server is unreachable
+
 # Player settings
 PLAYER_RADIUS = 15
 PLAYER_SPEED = 4
@@ -94,11 +122,14 @@ RADAR_MARGIN = 10
 PROJECTILE_WIDTH = 10
 PROJECTILE_HEIGHT = 5
 PROJECTILE_MAX_RANGE = 300 # Default maximum distance a projectile can travel
+PELLET_SIZE = 4 # Pixels, side of a multi-pellet weapon's pellet (e.g. shotgun)
 DEFAULT_PROJECTILE_COLOR = (255, 0, 0) # Red, as requested
 
 # Melee Attack Visuals
 MELEE_VISUAL_DURATION = 100  # milliseconds
 MELEE_ATTACK_COLOR = (255, 0, 0, 150) # Red, slightly transparent for alpha
+HITSCAN_BEAM_WIDTH = 3 # Pixels, thickness of the beam drawn for hitscan weapons
+HITSCAN_BEAM_DURATION = 40 # milliseconds
 
 # NPC Settings
 NPC_WIDTH = 30
@@ -112,6 +143,10 @@ NPC_CHASE_AREA_MULTIPLIER = 10 # Multiplier for detection radius when chasing
 NPC_PATROL_COLOR_HORIZONTAL = (255, 255, 0, 100) # Yellow, semi-transparent
 NPC_PATROL_COLOR_VERTICAL = (0, 255, 255, 100) # Cyan, semi-transparent
 NPC_MELEE_COOLDOWN = 1000 # Milliseconds (1 second) between NPC attacks - This can be a default if weapon has no fire_rate
+NPC_AI_WORKERS = 0 # Worker processes for NPC AI over shared memory (0 = update NPCs on the main thread)
+NPC_HEALTH_BAR_HEIGHT = 5
+NPC_HEALTH_BAR_Y_OFFSET = 10
+NPC_AI_CAPACITY = 4096 # Max NPCs held in the shared-memory AI state; extra NPCs fall back to the main thread
 
 # Item Settings
 ITEM_SIZE = (20, 20) # Default size for items
@@ -127,10 +162,23 @@ GRENADE_THROW_SPEED = 7 # Speed at which grenade is thrown
 GRENADE_MAX_THROW_DISTANCE_FACTOR = 0.25 # Factor of SCREEN_WIDTH
 GRENADE_EXPLOSION_RADIUS_FACTOR = 0.05 # Factor of average screen dimension ( (SCREEN_WIDTH + SCREEN_HEIGHT) / 2 )
 GRENADE_DAMAGE = 75
+GRENADE_DAMAGE_FALLOFF = "none" # "none", "linear" or "quadratic" (see spatial_grid.FALLOFF_CURVES)
 MIN_WAVE_FOR_GRENADE = 3 # Example: Grenades available from wave 3
 
 # Wave Manager Settings
 WAVE_REST_TIME = 3000 # Milliseconds (3 seconds)
+WAVE_FIRST_WAVE = 8 # Wave the game starts at; wave k has Fibonacci F(k) NPCs (21 at wave 8)
+
+# Timer Wheel Settings (fuses, cooldowns, effect expiry, wave rests)
+TIMER_WHEEL_TICK_MS = 1 # Resolution of the wheel in milliseconds
+TIMER_WHEEL_SLOT_BITS = 6 # 64 slots per level
+TIMER_WHEEL_LEVELS = 4 # 64^4 ticks (~4.6 hours at 1ms) before timers are parked and re-filed
+
+# Spatial Grid Settings (collision broad phase)
+SPATIAL_GRID_CELL_SIZE = 64 # Pixels per cell; about twice the NPC size keeps most NPCs in 1-4 cells
+
+# Entity Handle Settings
+ENTITY_HANDLE_INDEX_BITS = 20 # Low bits of a handle are the slot index (~1M live entities), high bits the generation
 
 # Minimap Settings
 MINIMAP_WIDTH = 150
@@ -141,3 +189,43 @@ MINIMAP_ROOM_COLOR = (100, 100, 100) # Gray for rooms
 MINIMAP_PLAYER_COLOR = (255, 0, 0)   # Red for player
 MINIMAP_BORDER_COLOR = (150, 150, 150) # Light gray for border
 MINIMAP_HEALTH_PACK_COLOR = (0, 255, 0, 200) # Green, semi-transparent for minimap
+
+# Save Settings
+SAVE_FILE = "savegame.bin" # Quick save (F5) / quick load (F9) slot, see game/core/world_save.py
+
+# Asset Settings
+ASSET_DIR = "Platformer Characters" # Loose character sprites
+ASSET_PACK_FILE = "assets.pack" # Built from ASSET_DIR by `python -m game.utils.asset_pack pack`
+
+# Co-op Network Settings (game/net: headless authoritative server, UDP clients)
+COOP_SERVER_HOST = "127.0.0.1" # Use "0.0.0.0" to accept players from the LAN
+COOP_SERVER_PORT = 8766
+COOP_SNAPSHOT_RATE = 20 # Snapshots per second sent to each client (the simulation still steps at FPS)
+COOP_SNAPSHOT_HISTORY = 32 # Snapshots kept per client as delta baselines; an older ack gets a full snapshot
+COOP_INTEREST_MARGIN = 200 # Pixels around a client's camera view whose entities are still sent
+COOP_CLIENT_TIMEOUT = 5.0 # Seconds without input before a client's player is removed
+COOP_MAX_DATAGRAM = 1200 # Snapshot bytes per UDP datagram; bigger snapshots are split into fragments
+
+# Bot Environment Settings (game/env: step/reset API over headless games, for training bots)
+ENV_FRAME_SKIP = 4 # Simulation steps per env step; the action is repeated (firing only on the first one)
+ENV_MAX_STEPS = 9000 # Env steps before an episode is truncated (10 minutes of game time at 60 FPS and frame skip 4)
+ENV_OBSERVED_NPCS = 8 # Nearest NPCs in each observation; fewer are padded with zeros
+ENV_OBSERVATION_RADIUS = 600 # Pixels around the player within which NPCs are observed
+ENV_KILL_REWARD = 1.0 # Per NPC killed
+ENV_DAMAGE_PENALTY = 1.0 # Per full player health lost
+ENV_DEATH_PENALTY = 5.0 # Once, when the player dies
+
+# Wave-Balancing Sweep Settings (python -m game.env.wave_sweep)
+SWEEP_RESULTS_FILE = "sweep_results.jsonl" # One line per finished game; an interrupted sweep resumes from it
+SWEEP_SUMMARY_FILE = "sweep_summary.csv" # Aggregates per configuration
+SWEEP_GAME_MINUTES = 10 # Game time after which a game the bot survives is stopped
+
+# Bot Soak Test Settings (python main.py --bot [--headless]: the ScriptedBot plays for hours)
+SOAK_MINUTES = 60 # Game time a headless soak runs for (a windowed one runs until the window is closed)
+SOAK_REPORT_MINUTES = 1 # Game time between soak reports (frame time, memory, live entities)
+
+# Memory Monitor Settings (python main.py --memory-report: tracemalloc snapshots at wave boundaries)
+MEMORY_MONITOR = False # Off costs nothing: tracemalloc isn't started and no wave listener is subscribed
+MEMORY_REPORT_FILE = "memory_report.txt" # Written when the game (or a headless soak) exits
+MEMORY_TOP_SITES = 10 # Allocation sites listed per snapshot, by size and by growth since the last one
+MEMORY_TRACE_FRAMES = 1 # Stack frames tracemalloc keeps per allocation; more costs more memory and time
@@ -0,0 +1,151 @@
+from game.core.settings import FPS, ROOM_WIDTH, ROOM_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT
+from game.entities.player import Player
+from game.entities.npc import NPC
+from game.systems.wave_manager import WaveManager
+from game.systems.entity_manager import EntityManager
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.utils.effects import EffectManager
+from game.core.camera import Camera
+from game.core.event_manager import EventManager
+from game.core.blackboard import Blackboard
+from game.core.timer_wheel import TimerWheel
+from game.utils.weapon import Weapon, WEAPON_DATA
+
+class Simulation:
+    '''
+    The game world without a window: the managers of Game and the step order of
+    Game.update_simulation(), for any number of players whose input comes from the caller
+    instead of the keyboard.
+
+    The clock is fixed-step: it only moves in step(), by `step_ms` each time, so a headless
+    run can go faster or slower than real time and the world doesn't jump after a stall.
+    Attribute names match Game (entity_manager, weapon_system, wave_manager, blackboard,
+    timers, player, ...), so code written against a Game (e.g. world_save) works on both.
+
+    No pygame display is needed; sprites still get their Surfaces.
+    '''
+    def __init__(self, step_ms=1000 / FPS, start_time=0, wave_options=None, weapon_stats=None):
+        """
+        Args:
+            step_ms (float): Game time advanced by each step().
+            start_time (int): Game time of the first step, in ms.
+            wave_options (dict): Extra WaveManager arguments (first_wave, rest_period, npc_speed, npc_health).
+            weapon_stats (dict): Weapon key -> {stat: value} set on the players' weapons of that kind
+                                 when they are equipped (e.g. {"grenade_launcher": {"damage": 50}}).
+        """
+        self.step_ms = step_ms
+        self.start_time = start_time
+        self.wave_options = wave_options or {}
+        self.weapon_stats = weapon_stats or {}
+        self.steps = 0
+        self.current_time = start_time
+        self.kills = 0 # Shared by all players
+
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT) # Follows the first player
+        self.entity_manager = EntityManager()
+        self.combat_manager = CombatManager(self.entity_manager)
+        self.timers = TimerWheel(start_time=start_time)
+        self.effect_manager = EffectManager(timers=self.timers)
+        self.blackboard = Blackboard(WORLD_WIDTH, WORLD_HEIGHT)
+        self.weapon_system = WeaponSystem(self.entity_manager, self.effect_manager, self.combat_manager,
+                                          blackboard=self.blackboard, timers=self.timers)
+        self.event_manager = EventManager()
+        self.event_manager.subscribe("NPC_DIED_EVENT", self._on_npc_died)
+
+        self.player = self.add_player()
+        self.blackboard.refresh(self.entity_manager, current_time=start_time) # So WaveManager starts from the current time
+        self.wave_manager = WaveManager(self.entity_manager, self.player, self.event_manager,
+                                        blackboard=self.blackboard, timers=self.timers, **self.wave_options)
+
+    def _on_npc_died(self, event_data):
+        self.kills += 1
+        killer = event_data.get("killer") # The player whose shot, grenade or melee hit killed the NPC
+        if isinstance(killer, Player):
+            killer.increment_kills()
+
+    @property
+    def players(self):
+        """Players still alive, in the order they joined (NPCs chase the nearest one, see Blackboard)."""
+        return self.entity_manager.players.sprites()
+
+    @property
+    def game_over(self):
+        return not self.entity_manager.players
+
+    def add_player(self, x=None, y=None):
+        """
+        Adds a player, by default in the middle of the first room.
+
+        Returns:
+            Player: The new player; pass it to step() to move it.
+        """
+        player = Player(ROOM_WIDTH / 2 if x is None else x, ROOM_HEIGHT / 2 if y is None else y)
+        self._apply_weapon_stats(player, "pistol") # Player's initial weapon
+        self.entity_manager.add_entity(player, "player")
+        return player
+
+    def _apply_weapon_stats(self, player, weapon_key):
+        stats = self.weapon_stats.get(weapon_key)
+        if stats and weapon_key in WEAPON_DATA:
+            player.weapon = Weapon(**{**WEAPON_DATA[weapon_key], **stats}) # Rebuilt, so derived values (cooldown) follow
+
+    def remove_player(self, player):
+        player.kill()
+
+    def step(self, movement=None, commands=()):
+        """
+        Advances the world by one fixed step.
+
+        Args:
+            movement (dict): Player -> (dx, dy) in -1..1; players not in it stand still.
+            commands (iterable): (player, command, argument) applied after the blackboard is built,
+                                 like Game.apply_commands(): ("fire", None) or ("equip", weapon key).
+        """
+        self.steps += 1
+        now = self.start_time + round(self.steps * self.step_ms)
+        self.current_time = now
+        self.timers.advance(now)
+        self.blackboard.refresh(self.entity_manager, self.camera, current_time=now)
+        for player, command, argument in commands:
+            if not player.groups(): # Died or left earlier in this step's input
+                continue
+            if command == "fire":
+                self.weapon_system.use_weapon(player)
+            elif command == "equip":
+                player.equip_weapon(argument)
+                self._apply_weapon_stats(player, argument)
+
+        movement = movement or {}
+        for player in self.entity_manager.players:
+            player.update(movement.get(player, (0, 0)))
+        blackboard = self.blackboard
+        for npc in self.entity_manager.npcs:
+            npc.update(self.entity_manager, self.combat_manager, self.effect_manager, self.weapon_system,
+                       blackboard=blackboard)
+        self.effect_manager.update()
+        for entity in self.entity_manager.entities:
+            if not isinstance(entity, (Player, NPC)):
+                entity.update()
+        self.wave_manager.update()
+        self.entity_manager.handle_collisions(self.effect_manager)
+
+        players = self.entity_manager.players.sprites()
+        if self.player not in players: # Died: the next player takes over the camera
+            self.player = players[0] if players else None
+        if self.player is not None:
+            self.camera.update(self.player)
+
+    def reset(self):
+        """Starts a new run: clears the world and the timers, keeps the clock. Returns the new first player."""
+        self.timers.clear(now=self.current_time)
+        self.weapon_system.clear_cooldowns()
+        for entity in list(self.entity_manager.entities):
+            entity.kill()
+        self.effect_manager.effects.empty()
+        self.kills = 0
+        self.player = self.add_player()
+        self.blackboard.refresh(self.entity_manager, self.camera, current_time=self.current_time)
+        self.wave_manager = WaveManager(self.entity_manager, self.player, self.event_manager,
+                                        blackboard=self.blackboard, timers=self.timers, **self.wave_options)
+        return self.player
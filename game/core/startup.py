@@ -0,0 +1,102 @@
+import threading
+import time
+
+class StartupProfiler:
+    '''
+    Records named checkpoints from process start to the first frame (main.py --startup-profile).
+
+    Each mark() closes the phase that began at the previous mark; report() prints the phases and
+    the total time to first frame. Background loads are reported separately when they finish.
+    '''
+    def __init__(self, started=None):
+        """
+        Args:
+            started (float): time.perf_counter() at process start (default: now).
+        """
+        self.started = time.perf_counter() if started is None else started
+        self.marks = [] # (label, perf_counter)
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def phases(self):
+        """Returns [(label, milliseconds)] for each phase, in order."""
+        phases = []
+        previous = self.started
+        for label, at in self.marks:
+            phases.append((label, (at - previous) * 1000.0))
+            previous = at
+        return phases
+
+    def report(self):
+        print("Startup profile (ms):")
+        for label, ms in self.phases():
+            print(f"  {label:<28}{ms:9.1f}")
+        if self.marks:
+            print(f"  {'time to first frame':<28}{(self.marks[-1][1] - self.started) * 1000.0:9.1f}")
+
+    def report_background(self, loader):
+        """Prints the task timings of a finished BackgroundLoader."""
+        print(f"Startup profile: background loading finished "
+              f"{(loader.finished_at - self.started) * 1000.0:.1f} ms after start:")
+        for label, ms in loader.timings.items():
+            print(f"  {label:<28}{ms:9.1f}")
+
+
+class BackgroundLoader:
+    '''
+    Runs startup tasks one after another on a daemon thread while the game already draws frames.
+
+    Tasks are (label, function) pairs. A task's return value goes to results[label]; a task that
+    raises is reported in errors[label] and the remaining tasks still run. The game thread polls
+    `progress` / `done` and picks up the results itself, so nothing it owns is touched from here.
+    '''
+    def __init__(self, tasks):
+        """
+        Args:
+            tasks (list[tuple[str, callable]]): Work to run, in order.
+        """
+        self.tasks = list(tasks)
+        self.results = {}
+        self.errors = {}
+        self.timings = {} # label -> milliseconds
+        self.completed = 0
+        self.current = None # Label of the running task
+        self.finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="startup-loader", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        for label, function in self.tasks:
+            self.current = label
+            started = time.perf_counter()
+            try:
+                self.results[label] = function()
+            except Exception as e: # Keep loading the rest; the game decides how to do without it
+                print(f"BackgroundLoader: '{label}' failed: {e}")
+                self.errors[label] = e
+            self.timings[label] = (time.perf_counter() - started) * 1000.0
+            self.completed += 1
+        self.current = None
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+    @property
+    def progress(self):
+        """Fraction of tasks finished, 0.0 to 1.0."""
+        return self.completed / len(self.tasks) if self.tasks else 1.0
+
+    @property
+    def done(self):
+        return self._done.is_set() or not self.tasks
+
+    def wait(self, timeout=None):
+        """Blocks until every task has run. Returns False on timeout."""
+        if not self.tasks:
+            return True
+        return self._done.wait(timeout)
@@ -0,0 +1,178 @@
+from game.core.settings import TIMER_WHEEL_TICK_MS, TIMER_WHEEL_SLOT_BITS, TIMER_WHEEL_LEVELS
+
+class Timer:
+    '''A scheduled callback. Returned by TimerWheel.schedule() so it can be cancelled.'''
+    __slots__ = ("deadline", "expiry_tick", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, expiry_tick, callback, args):
+        self.deadline = deadline
+        self.expiry_tick = expiry_tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerWheel:
+    '''
+    Hierarchical timing wheel for game-time deadlines (fuses, cooldowns, effect
+    expiry, wave rests).
+
+    Level 0 has one slot per tick; each higher level covers SLOTS times the
+    range of the level below. A timer is filed in the lowest level whose range
+    reaches its expiry tick and cascades down as time approaches it, so
+    advance() only touches the slots it passes and the timers that fire, not
+    every timer that exists. Cancelled timers are dropped lazily when their
+    slot is reached.
+    '''
+    def __init__(self, start_time=0, tick_ms=TIMER_WHEEL_TICK_MS, slot_bits=TIMER_WHEEL_SLOT_BITS, levels=TIMER_WHEEL_LEVELS):
+        self.tick_ms = tick_ms
+        self.slot_bits = slot_bits
+        self.slots_per_level = 1 << slot_bits
+        self.slot_mask = self.slots_per_level - 1
+        self.levels = levels
+        self.wheels = [[[] for _ in range(self.slots_per_level)] for _ in range(levels)]
+        self.current_time = start_time
+        self.current_tick = start_time // tick_ms
+        self._due = [] # Timers scheduled at or before the current tick; fired on the next advance()
+
+        # Counters
+        self.scheduled = 0
+        self.fired = 0
+        self.cancelled = 0
+        self.cleared = 0
+        self.pending = 0
+
+    def schedule(self, deadline, callback, *args):
+        '''
+        Schedules callback(*args) to run on the first advance() with now >= deadline.
+
+        Args:
+            deadline (int): Game time in ms.
+        Returns:
+            Timer: Handle that can be passed to cancel().
+        '''
+        expiry_tick = int(-(-deadline // self.tick_ms)) # ceil, so a timer never fires before its deadline
+        timer = Timer(deadline, expiry_tick, callback, args)
+        self.scheduled += 1
+        self.pending += 1
+        self._insert(timer)
+        return timer
+
+    def schedule_in(self, delay, callback, *args):
+        '''Schedules callback(*args) delay ms after the wheel's current time.'''
+        return self.schedule(self.current_time + delay, callback, *args)
+
+    def cancel(self, timer):
+        if timer is not None and not timer.cancelled:
+            timer.cancelled = True
+            self.cancelled += 1
+
+    def _insert(self, timer):
+        delta = timer.expiry_tick - self.current_tick
+        if delta <= 0:
+            self._due.append(timer)
+            return
+        bits = self.slot_bits
+        for level in range(self.levels):
+            if delta < 1 << (bits * (level + 1)):
+                slot = (timer.expiry_tick >> (bits * level)) & self.slot_mask
+                self.wheels[level][slot].append(timer)
+                return
+        # Beyond the wheel's range: park in the farthest slot, it is re-filed when it cascades
+        top = self.levels - 1
+        slot = ((self.current_tick >> (bits * top)) - 1) & self.slot_mask
+        self.wheels[top][slot].append(timer)
+
+    def _fire(self, timers):
+        for timer in timers:
+            if timer.cancelled:
+                self.pending -= 1
+                continue
+            if timer.expiry_tick > self.current_tick:
+                self._insert(timer) # Parked overflow timer that isn't due yet
+                continue
+            self.pending -= 1
+            self.fired += 1
+            timer.callback(*timer.args)
+
+    def _cascade(self):
+        '''Re-files the higher-level slots that have come into range of the level below.'''
+        bits = self.slot_bits
+        for level in range(1, self.levels):
+            if (self.current_tick >> (bits * (level - 1))) & self.slot_mask:
+                break # Lower level hasn't wrapped, nothing to cascade from this level up
+            slot = (self.current_tick >> (bits * level)) & self.slot_mask
+            bucket = self.wheels[level][slot]
+            if bucket:
+                self.wheels[level][slot] = []
+                for timer in bucket:
+                    if timer.cancelled:
+                        self.pending -= 1
+                    else:
+                        self._insert(timer)
+
+    def advance(self, now):
+        '''
+        Moves the wheel to game time `now` (ms) and fires every timer whose
+        deadline has passed, in tick order.
+
+        Returns:
+            int: Number of callbacks fired.
+        '''
+        fired_before = self.fired
+        if self._due:
+            due, self._due = self._due, []
+            self._fire(due)
+
+        target_tick = int(now // self.tick_ms)
+        if self.pending == 0:
+            # Nothing to fire on the way: jump straight to the target
+            if target_tick > self.current_tick:
+                self.current_tick = target_tick
+        else:
+            level0 = self.wheels[0]
+            while self.current_tick < target_tick:
+                self.current_tick += 1
+                self.current_time = max(self.current_time, self.current_tick * self.tick_ms) # For schedule_in() from callbacks
+                if not self.current_tick & self.slot_mask:
+                    self._cascade()
+                slot = self.current_tick & self.slot_mask
+                bucket = level0[slot]
+                if bucket:
+                    level0[slot] = []
+                    self._fire(bucket)
+                if self._due:
+                    # Callbacks may schedule already-due timers; run them in this tick
+                    due, self._due = self._due, []
+                    self._fire(due)
+                if self.pending == 0:
+                    self.current_tick = target_tick
+                    break
+        if now > self.current_time:
+            self.current_time = now
+        return self.fired - fired_before
+
+    def clear(self, now=None):
+        '''
+        Drops every pending timer (e.g. on game reset). Counters are kept.
+
+        Args:
+            now (int): Optional game time to move the wheel to, skipping the ticks in between.
+        '''
+        self.wheels = [[[] for _ in range(self.slots_per_level)] for _ in range(self.levels)]
+        self._due = []
+        self.cleared += self.pending
+        self.pending = 0
+        if now is not None:
+            self.current_time = now
+            self.current_tick = int(now // self.tick_ms)
+
+    def stats(self):
+        '''Returns the scheduled/fired/cancelled/cleared/pending counters as a dict.'''
+        return {
+            "scheduled": self.scheduled,
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+            "cleared": self.cleared,
+            "pending": self.pending,
+        }
@@ -0,0 +1,371 @@
+import mmap
+import os
+import random
+import struct
+from types import SimpleNamespace
+import pygame
+from game.entities.npc import NPC
+from game.entities.projectile import Projectile
+from game.entities.grenade import Grenade
+from game.entities.volley import Volley
+from game.utils.weapon import WEAPON_DATA
+
+# Binary save format for a running world (Game.save_game / Game.load_game).
+#
+# Everything is little endian and written with struct, no pickling of sprites:
+#   header    MAGIC, VERSION, flags (unused), game time of the save (ms), section count
+#   sections  tag (4 bytes), payload length (u32), payload
+#
+# Fixed-size records (NPCs, projectiles, grenades) are packed back to back so a section is
+# read with one struct.iter_unpack. A reader skips section tags it doesn't know, so sections
+# can be added without a version bump; VERSION changes when an existing layout changes.
+#
+# Times (cooldowns, grenade throws, the end of the last wave) are stored relative to the save
+# and moved onto the loading game's clock. Visual effects and melee swings are not saved.
+
+MAGIC = b"MWSV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHdI")
+SECTION = struct.Struct("<4sI")
+
+NO_STRING = 0xFFFF # String index for "none" (e.g. an unarmed NPC)
+
+# Strings used by the records (weapon keys, weapon types, falloff curves), referenced by index
+STRINGS = struct.Struct("<H") # Followed by that many (length u16, UTF-8 bytes)
+# rect x/y, health, max health, kills, facing x/y, weapon key
+PLAYER = struct.Struct("<iiddqddH")
+# weapon type, ready-at time relative to the save
+COOLDOWN = struct.Struct("<Hd")
+# wave number, NPCs of the wave, wave active, last wave end, initial delay passed,
+# Fibonacci a/b, rest period, next wave start pending
+WAVE = struct.Struct("<qqBdBQQdB")
+# random.getstate(): version, 625 Mersenne Twister words, has gauss_next, gauss_next
+RANDOM = struct.Struct("<I625IBd")
+# rect x/y, start x/y, health, max health, patrol direction, facing x/y, following player,
+# weapon key, ready-at of that weapon (relative; <= 0 = ready)
+NPC_RECORD = struct.Struct("<iiddddbddBHd")
+# rect x/y, start x/y, previous centre x/y, direction x/y, speed, damage, color RGBA + channel count
+PROJECTILE_RECORD = struct.Struct("<iiddddddddBBBBB")
+# PROJECTILE_RECORD + fuse time, explosion radius, grenade damage, throw time (relative), falloff curve
+GRENADE_RECORD = struct.Struct(PROJECTILE_RECORD.format + "ddddH")
+# rect x/y/w/h, speed, damage, color RGBA + channel count, distance travelled, live pellets, pellets;
+# followed by xs, ys, prev_xs, prev_ys, dir_x, dir_y (doubles) and live flags (bytes)
+VOLLEY_RECORD = struct.Struct("<iiiiddBBBBBdII")
+
+class WorldSaveError(ValueError):
+    """The file is not a world save this version can read."""
+
+
+class _StringTable:
+    def __init__(self, strings=()):
+        self.strings = list(strings)
+        self._indices = {string: index for index, string in enumerate(self.strings)}
+
+    def index(self, string):
+        if string is None:
+            return NO_STRING
+        index = self._indices.get(string)
+        if index is None:
+            index = self._indices[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def get(self, index):
+        return None if index == NO_STRING else self.strings[index]
+
+    def pack(self):
+        parts = [STRINGS.pack(len(self.strings))]
+        for string in self.strings:
+            data = string.encode("utf-8")
+            parts.append(STRINGS.pack(len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, view):
+        count, = STRINGS.unpack_from(view)
+        offset = STRINGS.size
+        strings = []
+        for _ in range(count):
+            length, = STRINGS.unpack_from(view, offset)
+            offset += STRINGS.size
+            strings.append(bytes(view[offset:offset + length]).decode("utf-8"))
+            offset += length
+        return cls(strings)
+
+
+_WEAPON_KEYS = {data["name"]: key for key, data in WEAPON_DATA.items()} # Weapon.name -> WEAPON_DATA key
+
+def _weapon_key(weapon):
+    return _WEAPON_KEYS.get(weapon.name) if weapon is not None else None
+
+def _color_fields(color):
+    channels = len(color)
+    return (color[0], color[1], color[2], color[3] if channels > 3 else 255, channels)
+
+def _color(r, g, b, a, channels):
+    return (r, g, b, a) if channels > 3 else (r, g, b)
+
+def _projectile_fields(projectile):
+    return (projectile.rect.x, projectile.rect.y, projectile.start_x, projectile.start_y,
+            projectile.prev_x, projectile.prev_y, projectile.direction.x, projectile.direction.y,
+            projectile.speed, projectile.damage) + _color_fields(projectile.color)
+
+# --- Saving ---------------------------------------------------------------------------
+
+def save_world(game, path):
+    """
+    Writes the simulation state of `game` to `path` (replaced atomically).
+
+    Call it between simulation steps (Game does so from apply_commands()).
+
+    Returns:
+        int: Bytes written.
+    """
+    now = game.blackboard.current_time
+    strings = _StringTable()
+    cooldowns = game.weapon_system.cooldowns
+    sections = []
+
+    player = game.player
+    sections.append((b"PLYR", PLAYER.pack(player.rect.x, player.rect.y, player.health, player.max_health, player.kills,
+                                          player.direction.x, player.direction.y, strings.index(_weapon_key(player.weapon)))))
+    player_cooldowns = cooldowns.ready_times(player.handle) if getattr(player, "handle", None) is not None else {}
+    sections.append((b"PCDN", b"".join(COOLDOWN.pack(strings.index(weapon_type), ready_at - now)
+                                       for weapon_type, ready_at in player_cooldowns.items())))
+
+    wave = game.wave_manager
+    sections.append((b"WAVE", WAVE.pack(wave.current_wave_number, wave.npcs_to_spawn_this_wave, wave.wave_active,
+                                        wave.last_wave_end_time - now, wave.initial_delay_passed, wave.fib_a, wave.fib_b,
+                                        wave.rest_period, wave.next_wave_timer is not None)))
+
+    rng_version, rng_words, gauss_next = random.getstate()
+    sections.append((b"RAND", RANDOM.pack(rng_version, *rng_words, gauss_next is not None,
+                                          gauss_next if gauss_next is not None else 0.0)))
+
+    # The hot loop: one pack_into per NPC into a preallocated buffer. Cooldowns are read one
+    # column at a time (NPCs normally all carry the same weapon type).
+    npcs = game.entity_manager.npcs.sprites()
+    buffer = bytearray(NPC_RECORD.size * len(npcs))
+    pack_into = NPC_RECORD.pack_into
+    handles = [npc.handle for npc in npcs]
+    ready_by_type = {weapon_type: cooldowns.ready_at_many(handles, weapon_type)
+                     for weapon_type in {npc.weapon.type for npc in npcs if npc.weapon is not None}}
+    weapon_indices = {} # Weapon.name -> string index, so each NPC costs one dict lookup
+    for i, npc in enumerate(npcs):
+        weapon = npc.weapon
+        if weapon is None:
+            weapon_index, ready_in = NO_STRING, 0.0
+        else:
+            weapon_index = weapon_indices.get(weapon.name)
+            if weapon_index is None:
+                weapon_index = weapon_indices[weapon.name] = strings.index(_weapon_key(weapon))
+            ready_in = ready_by_type[weapon.type][i] - now
+        rect, direction = npc.rect, npc.direction
+        pack_into(buffer, i * NPC_RECORD.size, rect.x, rect.y, npc.start_x, npc.start_y, npc.health, npc.max_health,
+                  int(npc.movement_direction.x), direction.x, direction.y, npc.is_following_player,
+                  weapon_index, ready_in)
+    sections.append((b"NPCS", buffer))
+
+    projectiles, grenades = [], []
+    for projectile in game.entity_manager.projectiles:
+        if isinstance(projectile, Grenade):
+            grenades.append(GRENADE_RECORD.pack(*_projectile_fields(projectile), projectile.fuse_time,
+                                                 projectile.explosion_radius, projectile.grenade_damage,
+                                                 projectile.creation_time - now, strings.index(projectile.damage_falloff)))
+        else:
+            projectiles.append(PROJECTILE_RECORD.pack(*_projectile_fields(projectile)))
+    sections.append((b"PROJ", b"".join(projectiles)))
+    sections.append((b"GREN", b"".join(grenades)))
+
+    volleys = []
+    for volley in game.entity_manager.volleys:
+        rect = volley.rect
+        volleys.append(VOLLEY_RECORD.pack(rect.x, rect.y, rect.width, rect.height, volley.speed, volley.damage,
+                                          *_color_fields(volley.color), volley.distance_traveled,
+                                          volley.live_count, len(volley.xs)))
+        pellets = len(volley.xs)
+        volleys.append(struct.pack(f"<{6 * pellets}d", *volley.xs, *volley.ys, *volley.prev_xs, *volley.prev_ys,
+                                   *volley.dir_x, *volley.dir_y))
+        volleys.append(bytes(volley.live))
+    sections.append((b"VOLL", b"".join(volleys)))
+
+    sections.insert(0, (b"STRS", strings.pack())) # Last, once every record has registered its strings
+
+    parts = [HEADER.pack(MAGIC, VERSION, 0, now, len(sections))]
+    for tag, payload in sections:
+        parts.append(SECTION.pack(tag, len(payload)))
+        parts.append(payload)
+    data = b"".join(parts)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path) # A crash mid-write never leaves a truncated save behind
+    return len(data)
+
+# --- Loading --------------------------------------------------------------------------
+
+def read_world(path):
+    """
+    Reads a save written by save_world() through a memory map.
+
+    Returns:
+        SimpleNamespace: saved_at, strings and the decoded records of each section.
+
+    Raises:
+        WorldSaveError: If the file is not a save of this version or is truncated.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise WorldSaveError(f"{path} is not a world save.")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    sections = {}
+    try:
+        magic, version, _, saved_at, section_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise WorldSaveError(f"{path} is not a world save.")
+        if version != VERSION:
+            raise WorldSaveError(f"{path} is a version {version} save; this game reads version {VERSION}.")
+        offset = HEADER.size
+        try:
+            for _ in range(section_count):
+                tag, length = SECTION.unpack_from(view, offset)
+                offset += SECTION.size
+                if offset + length > len(view):
+                    raise WorldSaveError(f"{path} is truncated.")
+                sections[tag] = view[offset:offset + length]
+                offset += length
+        except struct.error as e:
+            raise WorldSaveError(f"{path} is truncated.") from e
+
+        state = SimpleNamespace(saved_at=saved_at)
+        state.strings = _StringTable.unpack(sections[b"STRS"])
+        state.player = PLAYER.unpack(sections[b"PLYR"])
+        state.player_cooldowns = list(COOLDOWN.iter_unpack(sections[b"PCDN"]))
+        state.wave = WAVE.unpack(sections[b"WAVE"])
+        random_fields = RANDOM.unpack(sections[b"RAND"])
+        state.random = (random_fields[0], random_fields[1:626], random_fields[627] if random_fields[626] else None)
+        state.npcs = list(NPC_RECORD.iter_unpack(sections[b"NPCS"]))
+        state.projectiles = list(PROJECTILE_RECORD.iter_unpack(sections[b"PROJ"]))
+        state.grenades = list(GRENADE_RECORD.iter_unpack(sections[b"GREN"]))
+        state.volleys = _unpack_volleys(sections[b"VOLL"])
+    except KeyError as e:
+        raise WorldSaveError(f"{path} has no {e.args[0].decode()} section.") from e
+    except struct.error as e:
+        raise WorldSaveError(f"{path} has a malformed section: {e}") from e
+    finally:
+        for section in sections.values():
+            section.release()
+        view.release()
+        mapped.close()
+    return state
+
+def _unpack_volleys(view):
+    volleys = []
+    offset = 0
+    while offset < len(view):
+        header = VOLLEY_RECORD.unpack_from(view, offset)
+        offset += VOLLEY_RECORD.size
+        pellets = header[-1]
+        values = struct.unpack_from(f"<{6 * pellets}d", view, offset)
+        offset += 6 * pellets * 8
+        live = [bool(flag) for flag in bytes(view[offset:offset + pellets])]
+        offset += pellets
+        lists = [list(values[i * pellets:(i + 1) * pellets]) for i in range(6)]
+        volleys.append((header, lists, live))
+    return volleys
+
+def restore_world(game, state):
+    """
+    Rebuilds the saved entities and counters in `game`, whose world was just reset (see Game.load_game).
+    Saved times are moved onto the game's current clock.
+    """
+    now = game.blackboard.current_time
+    strings = state.strings
+    entity_manager = game.entity_manager
+    cooldowns = game.weapon_system.cooldowns
+
+    player = game.player
+    x, y, health, max_health, kills, facing_x, facing_y, weapon = state.player
+    weapon_key = strings.get(weapon)
+    if weapon_key is not None:
+        player.equip_weapon(weapon_key)
+    player.rect.x, player.rect.y = x, y
+    player.health, player.max_health, player.kills = health, max_health, kills
+    player.face((facing_x, facing_y))
+    for weapon_type, ready_in in state.player_cooldowns:
+        cooldowns.start(player.handle, strings.get(weapon_type), now + ready_in)
+
+    for (x, y, start_x, start_y, health, max_health, move_x, facing_x, facing_y, following, weapon,
+         ready_in) in state.npcs:
+        npc = NPC(start_x, start_y, event_manager=game.event_manager) # Start position sets the patrol limits
+        npc.rect.x, npc.rect.y = x, y
+        npc.health, npc.max_health = health, max_health
+        npc.movement_direction.x = move_x
+        npc.direction.update(facing_x, facing_y)
+        npc.is_following_player = bool(following)
+        weapon_key = strings.get(weapon)
+        if weapon_key is None:
+            npc.weapon = None
+        elif weapon_key != "knife":
+            npc.weapon = type(npc.weapon)(**WEAPON_DATA[weapon_key])
+        entity_manager.add_entity(npc, "npc")
+        if npc.weapon is not None and ready_in > 0:
+            cooldowns.start(npc.handle, npc.weapon.type, now + ready_in)
+
+    for record in state.projectiles:
+        projectile = Projectile(0, 0, pygame.math.Vector2(record[6], record[7]), _stats(record),
+                                blackboard=game.blackboard, owner=player)
+        _restore_projectile(projectile, record)
+        entity_manager.add_entity(projectile, "projectile")
+
+    for record in state.grenades:
+        fuse_time, explosion_radius, grenade_damage, thrown_in, falloff = record[15:]
+        stats = _stats(record, fuse_time=fuse_time, explosion_radius=explosion_radius, damage=grenade_damage,
+                       damage_falloff=strings.get(falloff))
+        grenade = Grenade(0, 0, pygame.math.Vector2(record[6], record[7]), stats, entity_manager.npcs, player,
+                          blackboard=game.blackboard, effect_manager=game.effect_manager, timers=game.timers,
+                          spatial_index=entity_manager.npc_grid, creation_time=now + thrown_in)
+        _restore_projectile(grenade, record)
+        entity_manager.add_entity(grenade, "projectile")
+
+    for header, (xs, ys, prev_xs, prev_ys, dir_x, dir_y), live in state.volleys:
+        x, y, width, height, speed, damage, r, g, b, a, channels, distance, live_count, pellets = header
+        stats = SimpleNamespace(projectile_speed=speed, damage=damage, projectile_color=_color(r, g, b, a, channels),
+                                pellet_rotations=[(1.0, 0.0)] * pellets)
+        volley = Volley(x, y, pygame.math.Vector2(1, 0), stats, blackboard=game.blackboard, owner=player)
+        volley.xs, volley.ys, volley.prev_xs, volley.prev_ys = xs, ys, prev_xs, prev_ys
+        volley.dir_x, volley.dir_y = dir_x, dir_y
+        volley.live, volley.live_count, volley.distance_traveled = live, live_count, distance
+        volley.rect.update(x, y, width, height)
+        entity_manager.add_entity(volley, "volley")
+
+    wave = game.wave_manager
+    (wave.current_wave_number, wave.npcs_to_spawn_this_wave, wave_active, last_end_in, initial_delay_passed,
+     wave.fib_a, wave.fib_b, wave.rest_period, next_wave_pending) = state.wave
+    wave.wave_active, wave.initial_delay_passed = bool(wave_active), bool(initial_delay_passed)
+    wave.last_wave_end_time = now + last_end_in
+    if wave.timers is not None:
+        if next_wave_pending:
+            wave.schedule_next_wave(wave.last_wave_end_time + wave.rest_period)
+        elif wave.next_wave_timer is not None: # The fresh WaveManager's first wave; the save decides instead
+            wave.timers.cancel(wave.next_wave_timer)
+            wave.next_wave_timer = None
+
+    random.setstate(state.random) # Last: building the world above must not advance the saved sequence
+    game.blackboard.refresh(entity_manager, game.camera, current_time=now)
+
+def _stats(record, **extra):
+    # Weapon-like stats for rebuilding a projectile; the record overrides everything else afterwards
+    stats = {"projectile_speed": record[8], "damage": record[9], "projectile_color": _color(*record[10:15])}
+    stats.update(extra)
+    return SimpleNamespace(**stats)
+
+def _restore_projectile(projectile, record):
+    x, y, start_x, start_y, prev_x, prev_y, dir_x, dir_y, speed, damage = record[:10]
+    projectile.rect.x, projectile.rect.y = x, y
+    projectile.start_x, projectile.start_y = start_x, start_y
+    projectile.prev_x, projectile.prev_y = prev_x, prev_y
+    projectile.direction.update(dir_x, dir_y) # Already unit length; skip re-normalizing
+    projectile.speed, projectile.damage = speed, damage
@@ -4,76 +4,83 @@ from game.entities.projectile import Projectile # Corrected import
 from game.core.settings import ( 
     GRENADE_COLOR, GRENADE_FUSE_TIME, GRENADE_EXPLOSION_RADIUS_FACTOR, 
     GRENADE_DAMAGE, SCREEN_WIDTH, SCREEN_HEIGHT, GRENADE_EXPLOSION_COLOR,
-    PROJECTILE_WIDTH, PROJECTILE_HEIGHT
+    PROJECTILE_WIDTH, PROJECTILE_HEIGHT, GRENADE_MAX_THROW_DISTANCE_FACTOR, WORLD_WIDTH, WORLD_HEIGHT,
+    GRENADE_DAMAGE_FALLOFF
 )
+from game.systems.spatial_grid import falloff_weights
 # Import ExplosionEffect from its new location (it's used in the original explode method,
 # but will be replaced by effect_manager.create_explosion)
 # from game.utils.effects import ExplosionEffect # Not strictly needed if we remove the direct instantiation
 
 class Grenade(Projectile):
-    def __init__(self, x, y, direction_vector, weapon_stats, npcs_group, owner=None): # all_sprites_group removed
+    def __init__(self, x, y, direction_vector, weapon_stats, npcs_group, owner=None, blackboard=None,
+                 effect_manager=None, timers=None, spatial_index=None, creation_time=None): # all_sprites_group removed
         # Grenade-specific stats from weapon_stats (or use defaults if not provided)
-        self.fuse_time = getattr(weapon_stats, 'fuse_time', GRENADE_FUSE_TIME)
+        self.fuse_time = getattr(weapon_stats, 'fuse_time', GRENADE_FUSE_TIME) # Milliseconds
         self.explosion_radius = getattr(weapon_stats, 'explosion_radius', 
                                         (SCREEN_WIDTH + SCREEN_HEIGHT) / 2 * GRENADE_EXPLOSION_RADIUS_FACTOR)
         self.grenade_damage = getattr(weapon_stats, 'damage', GRENADE_DAMAGE) # Grenade has its own damage from weapon
         
-        super().__init__(x, y, direction_vector, weapon_stats) # weapon_stats now includes grenade damage
+        super().__init__(x, y, direction_vector, weapon_stats, blackboard=blackboard, owner=owner) # weapon_stats now includes grenade damage
 
         self.image.fill(GRENADE_COLOR) # Ensure grenade has its specific color
 
-        self.creation_time = pygame.time.get_ticks()
+        if creation_time is None: # Thrown now; a restored save passes the original time to keep the fuse running
+            creation_time = blackboard.current_time if blackboard is not None else pygame.time.get_ticks()
+        self.creation_time = creation_time
         self.detonated = False
         # self.all_sprites = all_sprites_group # Removed
         self.npcs = npcs_group # To find NPCs to damage
-        self.owner = owner # Store the owner (player) of the grenade
+        self.spatial_index = spatial_index # Optional SpatialGrid of NPCs; explode() then only looks at nearby cells
+        self.damage_falloff = getattr(weapon_stats, 'damage_falloff', GRENADE_DAMAGE_FALLOFF)
+        # Thrown grenades fly up to the max throw distance, then rest until the fuse runs out
+        self.max_throw_distance = SCREEN_WIDTH * GRENADE_MAX_THROW_DISTANCE_FACTOR
 
-        # Grenades might not move like regular projectiles or might have a limited range/arc.
-        # For simplicity, they will use projectile's speed from weapon_stats for now.
-        # If they need to arc or stop, that logic would go into update().
+        # Keeping the effect manager lets the fuse detonate the grenade through the same explode() path
+        self.effect_manager = effect_manager
+        self.timers = timers
+        self.fuse_timer = None
+        if timers is not None and effect_manager is not None:
+            self.fuse_timer = timers.schedule(self.creation_time + self.fuse_time, self._on_fuse_expired)
+
+    def _on_fuse_expired(self):
+        self.fuse_timer = None
+        if not self.detonated and self.groups(): # Still in the world (not removed by reset etc.)
+            self.explode(self.effect_manager)
 
     def update(self):
-        if not self.detonated:
-            super().update() # Move the grenade like a projectile
+        if self.detonated:
+            return
+
+        self.prev_x, self.prev_y = self.rect.center
+        if self.speed > 0:
+            self.rect.x += self.direction.x * self.speed
+            self.rect.y += self.direction.y * self.speed
+            distance_traveled = pygame.math.Vector2(self.rect.centerx - self.start_x, self.rect.centery - self.start_y).length()
+            if distance_traveled >= self.max_throw_distance:
+                self.speed = 0 # Landed
 
-            current_time = pygame.time.get_ticks()
-            # Use self.fuse_time (which is in seconds) and convert to milliseconds
-            if current_time - self.creation_time > self.fuse_time * 1000: 
-                # explode() now needs effect_manager, which Grenade doesn't have directly.
-                # This indicates a potential design issue: Grenade.update() cannot call self.explode()
-                # if explode() needs an external manager passed as an argument.
-                # For now, we'll assume this will be handled by the calling context (e.g., EntityManager)
-                # or Grenade will get effect_manager in its __init__.
-                # The subtask for EntityManager.handle_collisions mentions it will call projectile.explode(effect_manager).
-                # So, Grenade.update() should not call self.explode() directly if it can't provide effect_manager.
-                # A common pattern is for update to return a status, and the manager handles the explosion.
-                # For now, to match the prompt, we'll assume explode will be called externally.
-                # To prevent automatic explosion from update, we might need to comment out self.explode() here,
-                # or ensure it's called from a context that can provide effect_manager.
-                # Let's assume the main game loop or a system will call explode with effect_manager.
-                # For now, if it's called from update, it won't create a visual.
-                # This is a known limitation based on the current refactoring step.
-                # The subtask for EntityManager.handle_collisions will call projectile.explode(effect_manager).
-                # This means the auto-explosion by fuse time in update needs to be re-thought or the
-                # EntityManager needs to be responsible for checking fuse times.
-                # For now, let's leave self.explode() here, but it won't create a visual.
-                # This will be fixed when EntityManager calls it with the effect_manager.
-                # A better solution: self.explode() should not take effect_manager.
-                # Instead, it should return data for the manager to create the effect.
-                # OR, the grenade stores effect_manager.
-                # Given the prompt, we modify explode to take effect_manager.
-                # This means Grenade.update() cannot call self.explode(effect_manager) unless effect_manager is stored.
-                # This is a conflict. Let's assume the prompt implies `explode` is called by something that *has* effect_manager.
-                # The `EntityManager`'s `handle_collisions` is described as calling `projectile.explode(effect_manager)`.
-                # So, the `update()` method's `self.explode()` call will not work as intended without `effect_manager`.
-                # I will comment out the self.explode() in update for now as per this reasoning.
-                # self.explode() 
-                pass # Explosion due to fuse time will be handled by a manager that can pass effect_manager
+            world_rect = self.blackboard.world_rect if self.blackboard is not None else pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+            if not world_rect.colliderect(self.rect):
+                if self.fuse_timer is not None:
+                    self.timers.cancel(self.fuse_timer)
+                    self.fuse_timer = None
+                self.kill()
+                return
+
+        if self.fuse_timer is None and self.effect_manager is not None:
+            # No timer wheel: poll the fuse
+            current_time = self.blackboard.current_time if self.blackboard is not None else pygame.time.get_ticks()
+            if current_time - self.creation_time > self.fuse_time:
+                self.explode(self.effect_manager)
         
     def explode(self, effect_manager): # effect_manager added to signature
         if self.detonated: # Prevent multiple explosions
             return
         self.detonated = True
+        if self.fuse_timer is not None: # Exploded on contact before the fuse ran out
+            self.timers.cancel(self.fuse_timer)
+            self.fuse_timer = None
         print(f"Grenade exploded at ({self.rect.centerx}, {self.rect.centery}) with radius {self.explosion_radius}")
         
         # Create a visual for the explosion using EffectManager
@@ -85,18 +92,28 @@ class Grenade(Projectile):
         # self.all_sprites.add(explosion_visual) # Removed
 
         # Damage NPCs in radius
-        for npc in self.npcs:
-            distance_to_npc = pygame.math.Vector2(npc.rect.centerx - self.rect.centerx,
-                                                  npc.rect.centery - self.rect.centery).length()
-            if distance_to_npc <= self.explosion_radius:
-                # Check if NPC is not already dead to prevent multiple kill counts from one explosion
-                if npc.health > 0:
-                    npc.take_damage(self.grenade_damage) # Apply damage
-                    # Check if the NPC died from *this* grenade hit for kill count
-                    if npc.health <= 0 and self.owner: 
-                        # self.owner.increment_kills() # Player instance handles its own kill increment via NPC.take_damage
-                        pass # Kill is now incremented in NPC.take_damage when player_instance is passed to NPC
-                print(f"Grenade damaged NPC {npc} for {self.grenade_damage}")
+        center_x, center_y = self.rect.center
+        if self.spatial_index is not None:
+            targets, dist_sqs = self.spatial_index.query_radius(center_x, center_y, self.explosion_radius, skip_dead=True)
+        else:
+            # No grid: same squared-distance test over every NPC
+            radius_sq = self.explosion_radius * self.explosion_radius
+            targets, dist_sqs = [], []
+            for npc in self.npcs:
+                npc_x, npc_y = npc.rect.center
+                d_sq = (npc_x - center_x) * (npc_x - center_x) + (npc_y - center_y) * (npc_y - center_y)
+                if d_sq <= radius_sq:
+                    targets.append(npc)
+                    dist_sqs.append(d_sq)
+
+        damaged = 0
+        for npc, weight in zip(targets, falloff_weights(dist_sqs, self.explosion_radius, self.damage_falloff)):
+            # Check if NPC is not already dead to prevent multiple kill counts from one explosion
+            if npc.health > 0:
+                npc.take_damage(self.grenade_damage if weight == 1.0 else self.grenade_damage * weight,
+                                self.owner) # Kill is credited to the owner through NPC_DIED_EVENT
+                damaged += 1
+        print(f"Grenade damaged {damaged} NPCs for up to {self.grenade_damage}")
         self.kill() # Remove grenade projectile after explosion logic
 
 # ExplosionEffect class has been moved to game/utils/effects.py
@@ -0,0 +1,26 @@
+import pygame
+
+class KeyboardInput:
+    '''
+    Where a Player's input comes from: the keyboard, unless something else drives it (see
+    game.env.bot_input.BotInput).
+
+    An input source is polled once per simulation step, before the step's commands are applied:
+    poll() returns the (command, argument) pairs to queue ("fire", None) or ("equip", weapon key),
+    then Player.update() asks movement() for its (dx, dy). The keyboard's fire and equip keys
+    arrive as KEYDOWN events instead (Game.handle_gameplay_event), so poll() has nothing to add.
+    '''
+    human = True # A person is at the controls: Game shows the leaderboard on game over
+
+    def poll(self, player):
+        return ()
+
+    def movement(self, player):
+        """(dx, dy) in -1..1 from WASD."""
+        keys = pygame.key.get_pressed()
+        dx, dy = 0, 0
+        if keys[pygame.K_w]: dy -= 1
+        if keys[pygame.K_s]: dy += 1
+        if keys[pygame.K_a]: dx -= 1
+        if keys[pygame.K_d]: dx += 1
+        return dx, dy
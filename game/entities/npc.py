@@ -13,8 +13,9 @@ from game.utils.weapon import Weapon, WEAPON_DATA # Corrected import for Weapon
 from game.utils.effects import AttackVisual # New import for AttackVisual
 
 class NPC(Entity): # Inherit from Entity
-    def __init__(self, start_x, start_y, event_manager=None): # event_manager added
-        super().__init__(x=start_x, y=start_y, health=NPC_HEALTH) # Call Entity\'s __init__
+    def __init__(self, start_x, start_y, event_manager=None, speed=None, health=None): # event_manager added
+        # speed / health override NPC_SPEED / NPC_HEALTH (e.g. for a wave-balancing sweep)
+        super().__init__(x=start_x, y=start_y, health=NPC_HEALTH if health is None else health) # Call Entity\'s __init__
         self.image = pygame.Surface([NPC_WIDTH, NPC_HEIGHT])
         self.image.fill(NPC_COLOR)
         self.rect = self.image.get_rect()
@@ -24,7 +25,7 @@ class NPC(Entity): # Inherit from Entity
         self.start_y = start_y
         self.event_manager = event_manager # Store event_manager
 
-        self.speed = NPC_SPEED
+        self.speed = NPC_SPEED if speed is None else speed
         self.movement_direction = pygame.math.Vector2(1, 0) # Initial movement direction for patrol
         self.direction = pygame.math.Vector2(1, 0) # Initial facing direction, matches patrol
         self.movement_range = NPC_MOVEMENT_RANGE
@@ -42,20 +43,27 @@ class NPC(Entity): # Inherit from Entity
             self.weapon = None 
             print("Warning: Knife not found in WEAPON_DATA for NPC. NPC will be unarmed.")
 
-    def update(self, entity_manager, combat_manager, effect_manager, weapon_system): # weapon_system added
-        players = entity_manager.players.sprites()
-        player_sprite = None
-        if players:
-            player_sprite = players[0] # Assuming single player
+    def update(self, entity_manager, combat_manager, effect_manager, weapon_system, blackboard=None): # blackboard added
+        # Chase the nearest living player
+        if blackboard is not None:
+            # Per-frame shared lookups, built once by the Game for all NPCs
+            player_sprite, player_center = blackboard.nearest_player(self.rect.centerx, self.rect.centery)
+            world_rect = blackboard.world_rect
+        else:
+            x, y = self.rect.center
+            player_sprite = min(entity_manager.players.sprites(), default=None,
+                                key=lambda p: (p.rect.centerx - x) ** 2 + (p.rect.centery - y) ** 2)
+            player_center = player_sprite.rect.center if player_sprite else None
+            world_rect = pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
 
         if player_sprite:
             player_rect = player_sprite.rect
-            vec_to_player = pygame.math.Vector2(player_rect.centerx - self.rect.centerx, 
-                                                player_rect.centery - self.rect.centery)
+            vec_to_player = pygame.math.Vector2(player_center[0] - self.rect.centerx, 
+                                                player_center[1] - self.rect.centery)
             distance_to_player = vec_to_player.length()
             direction_to_player = pygame.math.Vector2(0,0)
             if distance_to_player > 0:
-                direction_to_player = vec_to_player.normalize()
+                direction_to_player = vec_to_player / distance_to_player
 
             # Determine if following player (simplified logic for now)
             # Consider chase_area_radius for more persistent following later
@@ -84,7 +92,7 @@ class NPC(Entity): # Inherit from Entity
             self._patrol()
         
         # Keep NPC within world boundaries
-        self.rect.clamp_ip(pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT))
+        self.rect.clamp_ip(world_rect)
 
     def _patrol(self):
         """Handles NPC patrol behavior and updates facing direction."""
@@ -109,7 +117,9 @@ class NPC(Entity): # Inherit from Entity
         
         # Emit NPC_DIED_EVENT
         if self.event_manager:
-            self.event_manager.emit("NPC_DIED_EVENT", {"npc_id": id(self), "position": self.rect.center})
+            # killer: the Player credited with the kill (None when nobody dealt the killing blow, e.g. a reset)
+            self.event_manager.emit("NPC_DIED_EVENT", {"npc_handle": getattr(self, "handle", None), "position": self.rect.center,
+                                                       "killer": self.killed_by})
 
         # Placeholder for item drop, using existing random chance from original take_damage
         if random.random() < HEALTH_PACK_DROP_CHANCE: # HEALTH_PACK_DROP_CHANCE is imported from settings
@@ -7,10 +7,12 @@ from game.utils.weapon import Weapon, WEAPON_DATA # Import Weapon class and WEAP
 from game.entities.projectile import Projectile # Corrected import for Projectile
 from game.entities.grenade import Grenade # Corrected import for Grenade
 from game.core.entity import Entity # Import Entity
+from game.entities.input_sources import KeyboardInput
 
 class Player(Entity): # Inherit from Entity
-    def __init__(self, start_x, start_y, initial_weapon_key="pistol"):
+    def __init__(self, start_x, start_y, initial_weapon_key="pistol", input_source=None):
         super().__init__(x=start_x, y=start_y, health=PLAYER_HEALTH) # Call Entity's __init__
+        self.input_source = input_source if input_source is not None else KeyboardInput() # Read by update() when no movement is passed in
         self.radius = PLAYER_RADIUS
         self.circle_color = PINK
         self.arrow_color = WHITE
@@ -35,6 +37,11 @@ class Player(Entity): # Inherit from Entity
 
     # take_damage method removed, inherited from Entity
 
+    def face(self, direction):
+        """Turns the player towards `direction` (a Vector2) and redraws the arrow."""
+        self.direction = pygame.math.Vector2(direction)
+        self._create_player_image()
+
     def _create_player_image(self):
         surface_size = self.radius * 2
         new_image = pygame.Surface((surface_size, surface_size), pygame.SRCALPHA)
@@ -63,14 +70,17 @@ class Player(Entity): # Inherit from Entity
         # No need to re-get rect if only image content changes, unless size changes.
         # If image size could change, then: self.rect = self.image.get_rect(center=self.rect.center)
 
-    def update(self):
-        keys = pygame.key.get_pressed()
-        dx, dy = 0, 0
-
-        if keys[pygame.K_w]: dy -= 1
-        if keys[pygame.K_s]: dy += 1
-        if keys[pygame.K_a]: dx -= 1
-        if keys[pygame.K_d]: dx += 1
+    def update(self, movement=None):
+        """
+        Moves the player one step.
+
+        Args:
+            movement (tuple): (dx, dy) in -1..1 from another source (e.g. a network client);
+                              None asks the player's input_source (the keyboard by default).
+        """
+        if movement is None:
+            movement = self.input_source.movement(self)
+        dx, dy = movement
 
         direction_changed = False
         if dx != 0 or dy != 0:
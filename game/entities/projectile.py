@@ -5,8 +5,10 @@ from game.core.settings import PROJECTILE_WIDTH, PROJECTILE_HEIGHT, WORLD_WIDTH,
 from game.core.entity import Entity # Corrected import for Entity
 
 class Projectile(Entity): # Inherit from Entity
-    def __init__(self, x, y, direction_vector, weapon_stats): # weapon_stats is a Weapon object
+    def __init__(self, x, y, direction_vector, weapon_stats, blackboard=None, owner=None): # weapon_stats is a Weapon object
         super().__init__(x=x, y=y, health=1) # Call Entity's __init__ with nominal health
+        self.blackboard = blackboard # Optional per-frame shared state (world bounds, current time)
+        self.owner = owner # Entity that fired it; credited with the kills it makes
         # Directly access attributes from the Weapon object
         self.color = weapon_stats.projectile_color 
         self.speed = weapon_stats.projectile_speed
@@ -21,6 +23,8 @@ class Projectile(Entity): # Inherit from Entity
         # Store original position for range calculation
         self.start_x = x
         self.start_y = y
+        # Centre before the last move; collisions sweep from here to the current centre
+        self.prev_x, self.prev_y = self.rect.center
 
         # Ensure direction_vector is normalized
         if direction_vector.length_squared() > 0:
@@ -29,14 +33,17 @@ class Projectile(Entity): # Inherit from Entity
             self.direction = pygame.math.Vector2(0, -1) # Default to up if direction is zero
 
     def update(self):
+        self.prev_x, self.prev_y = self.rect.center
         self.rect.x += self.direction.x * self.speed
         self.rect.y += self.direction.y * self.speed
 
         # Calculate distance traveled
         distance_traveled = pygame.math.Vector2(self.rect.centerx - self.start_x, self.rect.centery - self.start_y).length()
 
+        world_rect = self.blackboard.world_rect if self.blackboard is not None else pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+
         # Remove projectile if it goes off the world boundaries or exceeds max range
-        if not pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT).colliderect(self.rect) or \
+        if not world_rect.colliderect(self.rect) or \
            distance_traveled > PROJECTILE_MAX_RANGE:
             self.kill() # Remove from all sprite groups
 
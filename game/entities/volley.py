@@ -0,0 +1,120 @@
+import pygame
+from game.core.settings import PELLET_SIZE, PROJECTILE_MAX_RANGE, WORLD_WIDTH, WORLD_HEIGHT
+
+from game.core.entity import Entity
+
+class Volley(Entity):
+    '''
+    All pellets of one multi-pellet shot (e.g. a shotgun blast) as a single entity.
+
+    Pellets are not sprites: their positions and directions live in parallel
+    lists that are advanced together in update(), they share one cached image,
+    and EntityManager resolves all of them against NPCs with a single grid
+    query per volley. A pellet that hits something or leaves the world is
+    marked dead; the volley is removed once none are left or the shot has
+    travelled its full range.
+    '''
+    _pellet_images = {} # color -> Surface shared by every volley of that color
+
+    def __init__(self, x, y, direction_vector, weapon_stats, blackboard=None, owner=None):
+        super().__init__(x=x, y=y, health=1)
+        self.blackboard = blackboard # Optional per-frame shared state (world bounds)
+        self.owner = owner # Entity that fired the shot; credited with the kills its pellets make
+        self.speed = weapon_stats.projectile_speed
+        self.damage = weapon_stats.damage # Per pellet
+        self.color = weapon_stats.projectile_color
+
+        self.image = Volley.pellet_image(weapon_stats.projectile_color)
+        self.half_size = PELLET_SIZE / 2
+        self.rect = self.image.get_rect(center=(x, y)) # Bounds of the live pellets, updated every frame
+
+        if direction_vector.length_squared() > 0:
+            direction = direction_vector.normalize()
+        else:
+            direction = pygame.math.Vector2(0, -1) # Default to up if direction is zero
+        # Rotate the aim by each pellet's precomputed (cos, sin); a weapon without pellets fires one straight pellet
+        rotations = getattr(weapon_stats, 'pellet_rotations', None) or [(1.0, 0.0)]
+        fx, fy = direction.x, direction.y
+        self.dir_x = [fx * c - fy * s for c, s in rotations]
+        self.dir_y = [fx * s + fy * c for c, s in rotations]
+
+        count = len(rotations)
+        self.xs = [float(x)] * count
+        self.ys = [float(y)] * count
+        self.prev_xs = self.xs
+        self.prev_ys = self.ys
+        self.live = [True] * count
+        self.live_count = count
+        self.distance_traveled = 0
+
+    @classmethod
+    def pellet_image(cls, color):
+        image = cls._pellet_images.get(color)
+        if image is None:
+            image = pygame.Surface([PELLET_SIZE, PELLET_SIZE])
+            image.fill(color)
+            cls._pellet_images[color] = image
+        return image
+
+    def update(self):
+        speed = self.speed
+        self.prev_xs = self.xs
+        self.prev_ys = self.ys
+        self.xs = [x + dx * speed for x, dx in zip(self.prev_xs, self.dir_x)]
+        self.ys = [y + dy * speed for y, dy in zip(self.prev_ys, self.dir_y)]
+        self.distance_traveled += speed
+
+        if self.distance_traveled > PROJECTILE_MAX_RANGE:
+            self.kill()
+            return
+
+        world_rect = self.blackboard.world_rect if self.blackboard is not None else pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT)
+        left, top, right, bottom = world_rect.left, world_rect.top, world_rect.right, world_rect.bottom
+        min_x = min_y = float('inf')
+        max_x = max_y = float('-inf')
+        live = self.live
+        for i, (x, y) in enumerate(zip(self.xs, self.ys)):
+            if not live[i]:
+                continue
+            if x < left or x > right or y < top or y > bottom:
+                live[i] = False
+                self.live_count -= 1
+                continue
+            if x < min_x:
+                min_x = x
+            if x > max_x:
+                max_x = x
+            if y < min_y:
+                min_y = y
+            if y > max_y:
+                max_y = y
+        if self.live_count <= 0:
+            self.kill()
+            return
+        size = self.half_size * 2
+        self.rect.update(int(min_x - self.half_size), int(min_y - self.half_size),
+                         int(max_x - min_x + size), int(max_y - min_y + size))
+
+    def pellet_segments(self):
+        '''
+        Returns (pellet indices, segments) for the live pellets, each segment being
+        (x0, y0, x1, y1, half_w, half_h) from the pellet's previous to its current position.
+        '''
+        half = self.half_size
+        indices = [i for i, alive in enumerate(self.live) if alive]
+        prev_xs, prev_ys, xs, ys = self.prev_xs, self.prev_ys, self.xs, self.ys
+        return indices, [(prev_xs[i], prev_ys[i], xs[i], ys[i], half, half) for i in indices]
+
+    def pellet_hit(self, index):
+        '''Marks a pellet as spent; the volley is removed with its last pellet.'''
+        if self.live[index]:
+            self.live[index] = False
+            self.live_count -= 1
+            if self.live_count <= 0:
+                self.kill()
+
+    def render_items(self):
+        '''(image, world_x, world_y) for every live pellet, for the render snapshot.'''
+        image = self.image
+        half = self.half_size
+        return [(image, int(x - half), int(y - half)) for x, y, alive in zip(self.xs, self.ys, self.live) if alive]
@@ -0,0 +1,54 @@
+from array import array
+from game.core.settings import ENV_FRAME_SKIP, ENV_OBSERVED_NPCS, ENV_OBSERVATION_RADIUS
+from game.env.game_env import observe_world, observation_size
+from game.env.scripted_bot import ScriptedBot
+from game.net.protocol import WEAPON_KEYS
+
+class BotInput:
+    '''
+    Player input source (see game.entities.input_sources) that lets a ScriptedBot play: it kites
+    away from the nearest NPCs, fires at the densest cluster and switches to grenades when crowded.
+
+    Works on a Game (windowed) and on a Simulation (headless): both have the entity_manager,
+    wave_manager, weapon_system and timers it reads. Like a GameEnv with `decide_every` as its
+    frame skip, the bot decides every `decide_every` polls and its movement holds in between, so it
+    plays the same game the wave sweep measured.
+    '''
+    human = False # Game restarts by itself on game over instead of asking for a name
+
+    def __init__(self, world, bot=None, decide_every=ENV_FRAME_SKIP, observed_npcs=ENV_OBSERVED_NPCS,
+                 observation_radius=ENV_OBSERVATION_RADIUS):
+        """
+        Args:
+            world: The Game or Simulation the player is in.
+            bot (ScriptedBot): Optional; a default ScriptedBot for this observation radius otherwise.
+            decide_every (int): Polls (simulation steps) per decision.
+            observed_npcs (int), observation_radius (float): What the bot sees, see GameEnv.
+        """
+        self.world = world
+        self.bot = bot if bot is not None else ScriptedBot(observation_radius=observation_radius)
+        self.decide_every = max(1, int(decide_every))
+        self.observed_npcs = observed_npcs
+        self.observation_radius = observation_radius
+        self.observation = array('f', bytes(4 * observation_size(observed_npcs))) # Reused by every decision
+        self.polls = 0
+        self._movement = (0, 0)
+
+    def poll(self, player):
+        """Decides on every `decide_every`-th call. Returns the (command, argument) pairs of the decision."""
+        self.polls += 1
+        if (self.polls - 1) % self.decide_every:
+            return ()
+        observe_world(self.world, player, self.world.timers.current_time, self.observation,
+                      observed_npcs=self.observed_npcs, observation_radius=self.observation_radius)
+        dx, dy, fire, weapon = self.bot.act(self.observation)
+        self._movement = (dx, dy)
+        commands = []
+        if weapon:
+            commands.append(("equip", WEAPON_KEYS[weapon - 1]))
+        if fire:
+            commands.append(("fire", None))
+        return commands
+
+    def movement(self, player):
+        return self._movement
@@ -0,0 +1,200 @@
+import random
+from array import array
+from game.core.settings import (
+    FPS, WORLD_WIDTH, WORLD_HEIGHT, ENV_FRAME_SKIP, ENV_MAX_STEPS, ENV_OBSERVED_NPCS, ENV_OBSERVATION_RADIUS,
+    ENV_KILL_REWARD, ENV_DAMAGE_PENALTY, ENV_DEATH_PENALTY
+)
+from game.core.simulation import Simulation
+from game.net.protocol import WEAPON_KEYS, weapon_index
+
+# Observation layout: float32, OBS_NPCS + ENV_OBSERVED_NPCS * NPC_FIELDS values
+OBS_HEALTH = 0 # Fraction of max health
+OBS_WAVE = 1 # Wave number
+OBS_NPCS_ALIVE = 2 # NPCs alive in the whole world
+OBS_WAVE_ACTIVE = 3 # 1 during a wave, 0 while resting
+OBS_WEAPON = 4 # WEAPON_KEYS index of the equipped weapon
+OBS_WEAPON_READY = 5 # 1 if the equipped weapon is off cooldown
+OBS_X = 6 # Player centre as a fraction of the world size
+OBS_Y = 7
+OBS_FACING_X = 8 # Unit facing vector
+OBS_FACING_Y = 9
+OBS_NPCS = 10 # Then one record per observed NPC, nearest first:
+NPC_DX = 0 # Offset from the player, as a fraction of the observation radius
+NPC_DY = 1
+NPC_HEALTH = 2 # Fraction of max health
+NPC_PRESENT = 3 # 1 for an NPC, 0 for padding
+NPC_FIELDS = 4
+
+ACTION_SIZE = 4 # (dx, dy, fire, weapon), see GameEnv.step()
+
+def observation_size(observed_npcs=ENV_OBSERVED_NPCS):
+    return OBS_NPCS + observed_npcs * NPC_FIELDS
+
+def observe_world(world, player, current_time, out, offset=0, observed_npcs=ENV_OBSERVED_NPCS,
+                  observation_radius=ENV_OBSERVATION_RADIUS):
+    """
+    Writes the observation of `player` into `out[offset:offset + observation_size(observed_npcs)]`.
+
+    Args:
+        world: A Simulation or a Game (reads entity_manager, wave_manager and weapon_system).
+        player (Player): The observing player.
+        current_time (int): Game time in ms, for the weapon cooldown.
+        out (sequence): Any float sequence.
+    """
+    wave_manager = world.wave_manager
+    center_x, center_y = player.rect.center
+    weapon = player.weapon
+    out[offset + OBS_HEALTH] = max(player.health, 0) / player.max_health
+    out[offset + OBS_WAVE] = wave_manager.get_wave_number()
+    out[offset + OBS_NPCS_ALIVE] = len(world.entity_manager.npcs)
+    out[offset + OBS_WAVE_ACTIVE] = 1.0 if wave_manager.wave_active else 0.0
+    out[offset + OBS_WEAPON] = weapon_index(weapon)
+    ready = weapon is not None and world.weapon_system.cooldowns.is_ready(player.handle, weapon.type, current_time)
+    out[offset + OBS_WEAPON_READY] = 1.0 if ready else 0.0
+    out[offset + OBS_X] = center_x / WORLD_WIDTH
+    out[offset + OBS_Y] = center_y / WORLD_HEIGHT
+    out[offset + OBS_FACING_X] = player.direction.x
+    out[offset + OBS_FACING_Y] = player.direction.y
+
+    # Nearest NPCs, from the grid handle_collisions() rebuilt at the end of the last step
+    radius = observation_radius
+    npcs, dist_sqs = world.entity_manager.npc_grid.query_radius(center_x, center_y, radius, skip_dead=True)
+    nearest = sorted(range(len(npcs)), key=dist_sqs.__getitem__)[:observed_npcs]
+    position = offset + OBS_NPCS
+    for index in nearest:
+        npc = npcs[index]
+        npc_x, npc_y = npc.rect.center
+        out[position + NPC_DX] = (npc_x - center_x) / radius
+        out[position + NPC_DY] = (npc_y - center_y) / radius
+        out[position + NPC_HEALTH] = max(npc.health, 0) / npc.max_health if npc.max_health > 0 else 0.0
+        out[position + NPC_PRESENT] = 1.0
+        position += NPC_FIELDS
+    end = offset + observation_size(observed_npcs)
+    while position < end:
+        out[position] = 0.0
+        position += 1
+
+class GameEnv:
+    '''
+    Step/reset API over one headless Simulation, in the style of a Gym environment.
+
+    An action is (dx, dy, fire, weapon): movement in -1..1 on each axis, 1 to fire, and 0 to
+    keep the weapon or WEAPON_KEYS index + 1 to switch (the codes of a co-op INPUT). It is
+    repeated for `frame_skip` simulation steps, firing only on the first one. Observations
+    are flat float32 arrays (see the OBS_* / NPC_* indices above). The reward is
+    ENV_KILL_REWARD per kill, minus ENV_DAMAGE_PENALTY per full health lost and
+    ENV_DEATH_PENALTY on death. An episode terminates when the player dies and is truncated
+    after `max_steps` env steps.
+
+    NPC spawns draw from the `random` module, so reset(seed) seeds it: envs sharing a process
+    share one random stream.
+    '''
+    def __init__(self, frame_skip=ENV_FRAME_SKIP, max_steps=ENV_MAX_STEPS, observed_npcs=ENV_OBSERVED_NPCS,
+                 observation_radius=ENV_OBSERVATION_RADIUS, step_ms=1000 / FPS, wave_options=None, weapon_stats=None):
+        """
+        Args:
+            frame_skip (int): Simulation steps per env step.
+            max_steps (int): Env steps before an episode is truncated; None never truncates.
+            observed_npcs (int): NPC records in each observation.
+            observation_radius (float): Pixels around the player within which NPCs are observed.
+            step_ms (float): Game time per simulation step.
+            wave_options, weapon_stats (dict): Balance overrides, see Simulation.
+        """
+        self.frame_skip = max(1, int(frame_skip))
+        self.max_steps = max_steps
+        self.observed_npcs = observed_npcs
+        self.observation_radius = observation_radius
+        self.step_ms = step_ms
+        self.wave_options = wave_options
+        self.weapon_stats = weapon_stats
+        self.observation_size = observation_size(observed_npcs)
+        self.observation = array('f', bytes(4 * self.observation_size)) # Reused by every step()
+        self.simulation = None # Built by the first reset()
+        self.player = None
+        self.episode_steps = 0
+        self.episode_return = 0.0
+        self._last_health = 0
+        self._last_kills = 0
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode.
+
+        Args:
+            seed (int): Seeds the `random` module first (NPC spawn positions); None continues its stream.
+
+        Returns:
+            tuple: (observation, info)
+        """
+        if seed is not None:
+            random.seed(seed)
+        if self.simulation is None:
+            self.simulation = Simulation(step_ms=self.step_ms, wave_options=self.wave_options,
+                                         weapon_stats=self.weapon_stats)
+            self.player = self.simulation.player
+        else:
+            self.player = self.simulation.reset()
+        entity_manager = self.simulation.entity_manager
+        entity_manager.npc_grid.rebuild(entity_manager.npcs) # Otherwise it holds the last episode's NPCs until the first step
+        self.episode_steps = 0
+        self.episode_return = 0.0
+        self._last_health = self.player.health
+        self._last_kills = self.simulation.kills
+        self.observe(self.observation)
+        return self.observation, self.info()
+
+    def step(self, action):
+        """
+        Applies one action for `frame_skip` simulation steps.
+
+        Args:
+            action (sequence): (dx, dy, fire, weapon), see the class docstring.
+
+        Returns:
+            tuple: (observation, reward, terminated, truncated, info). The observation array is
+                   reused: copy it to keep it past the next step().
+        """
+        dx, dy, fire, weapon = action
+        simulation = self.simulation
+        player = self.player
+        commands = []
+        if weapon and weapon - 1 != weapon_index(player.weapon):
+            commands.append((player, "equip", WEAPON_KEYS[weapon - 1]))
+        if fire:
+            commands.append((player, "fire", None))
+        movement = {player: (dx, dy)}
+        for _ in range(self.frame_skip):
+            simulation.step(movement, commands)
+            commands = ()
+            if not player.groups():
+                break
+        self.episode_steps += 1
+
+        terminated = not player.groups()
+        health = max(player.health, 0)
+        kills = simulation.kills
+        reward = (ENV_KILL_REWARD * (kills - self._last_kills)
+                  - ENV_DAMAGE_PENALTY * (self._last_health - health) / player.max_health)
+        if terminated:
+            reward -= ENV_DEATH_PENALTY
+        self._last_health = health
+        self._last_kills = kills
+        self.episode_return += reward
+        truncated = not terminated and self.max_steps is not None and self.episode_steps >= self.max_steps
+        self.observe(self.observation)
+        return self.observation, reward, terminated, truncated, self.info()
+
+    def info(self):
+        simulation = self.simulation
+        return {"wave": simulation.wave_manager.get_wave_number(), "kills": simulation.kills,
+                "episode_steps": self.episode_steps, "episode_return": self.episode_return,
+                "time": simulation.current_time}
+
+    def observe(self, out, offset=0):
+        """Writes the current observation into `out[offset:offset + observation_size]` (any float sequence)."""
+        observe_world(self.simulation, self.player, self.simulation.current_time, out, offset,
+                      self.observed_npcs, self.observation_radius)
+
+    def close(self):
+        self.simulation = None
+        self.player = None
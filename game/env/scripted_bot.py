@@ -0,0 +1,145 @@
+import math
+import random
+from game.env.game_env import (
+    OBS_WEAPON, OBS_WEAPON_READY, OBS_X, OBS_Y, OBS_FACING_X, OBS_FACING_Y, OBS_NPCS, NPC_DX, NPC_DY,
+    NPC_PRESENT, NPC_FIELDS
+)
+from game.net.protocol import WEAPON_KEYS
+from game.core.settings import ENV_OBSERVATION_RADIUS, NPC_WIDTH, PLAYER_RADIUS, WORLD_WIDTH, WORLD_HEIGHT
+
+SHOTGUN = WEAPON_KEYS.index("shotgun")
+GRENADE_LAUNCHER = WEAPON_KEYS.index("grenade_launcher")
+
+# Waypoints (fractions of the world size) of the search for NPCs: three rows, one observation
+# radius apart, walked there and back
+SEARCH_ROUTE = [(0.05, 1 / 6), (0.95, 1 / 6), (0.95, 0.5), (0.05, 0.5), (0.05, 5 / 6), (0.95, 5 / 6),
+                (0.95, 0.5), (0.05, 0.5)]
+WAYPOINT_REACHED = 0.02 # Distance (fraction of the world size) at which the next waypoint is taken
+# Player centre positions (fractions of the world size) at which it touches the world edge
+EDGE_X = (PLAYER_RADIUS + 2) / WORLD_WIDTH
+EDGE_Y = (PLAYER_RADIUS + 2) / WORLD_HEIGHT
+
+def _direction8(x, y):
+    """(dx, dy) in -1..1 closest to the direction of (x, y): the 8 directions a GameEnv action can move in."""
+    if x == 0 and y == 0:
+        return 0, 0
+    angle = round(math.atan2(y, x) / (math.pi / 4)) * (math.pi / 4)
+    return round(math.cos(angle)), round(math.sin(angle))
+
+class ScriptedBot:
+    '''
+    Rule-based GameEnv player: acts on observations only, like a trained policy would.
+
+    It keeps the nearest NPC beyond `kite_radius`, shoots at the densest cluster of NPCs it can
+    see with the shotgun and switches to grenades when `crowd_size` NPCs are within
+    `crowd_radius`. An action only moves in 8 directions and the player faces the way it
+    moves, so it first strafes until the target (with its width) lies within `aim_tolerance` of
+    one of those directions, then takes a step towards it to face it (the shot of an action goes off before
+    its movement) and fires. With no NPC in sight it sweeps the world row by row (SEARCH_ROUTE).
+    '''
+    def __init__(self, seed=None, kite_radius=120, engage_radius=260, crowd_radius=200, crowd_size=4, cluster_radius=80,
+                 aim_tolerance=10, observation_radius=ENV_OBSERVATION_RADIUS):
+        """
+        Args:
+            seed (int): Picks the waypoint the search starts from.
+            kite_radius (float): Pixels the bot keeps between itself and the nearest NPC.
+            engage_radius (float): Pixels beyond which it closes in on its target.
+            crowd_radius (float), crowd_size (int): NPCs this close, this many, make it throw grenades.
+            cluster_radius (float): NPCs within this of each other count as one cluster.
+            aim_tolerance (float): Degrees between the edge of the target and the firing direction it
+                                   accepts (half the shotgun's pellet spread).
+            observation_radius (float): The GameEnv's observation radius (NPC offsets are fractions of it).
+        """
+        self.waypoint = random.Random(seed).randrange(len(SEARCH_ROUTE)) # Own stream: the game's isn't touched
+        self.kite_radius = kite_radius
+        self.engage_radius = engage_radius
+        self.crowd_radius = crowd_radius
+        self.crowd_size = crowd_size
+        self.cluster_radius = cluster_radius
+        self.aim_tolerance = math.radians(aim_tolerance)
+        self.observation_radius = observation_radius
+
+    def _npcs(self, observation):
+        """Offsets (x, y) in pixels of the observed NPCs, nearest first."""
+        radius = self.observation_radius
+        npcs = []
+        for start in range(OBS_NPCS, len(observation), NPC_FIELDS):
+            if not observation[start + NPC_PRESENT]:
+                break
+            npcs.append((observation[start + NPC_DX] * radius, observation[start + NPC_DY] * radius))
+        return npcs
+
+    def _cluster_centre(self, npcs):
+        """Centre of the NPC with the most neighbours within cluster_radius, and of those neighbours."""
+        radius_sq = self.cluster_radius * self.cluster_radius
+        best = None
+        for x, y in npcs: # Nearest first, so ties go to the nearest cluster
+            members = [(ox, oy) for ox, oy in npcs if (ox - x) * (ox - x) + (oy - y) * (oy - y) <= radius_sq]
+            if best is None or len(members) > len(best):
+                best = members
+        return sum(x for x, _ in best) / len(best), sum(y for _, y in best) / len(best)
+
+    def _away_from_walls(self, move, observation):
+        dx, dy = move
+        x, y = observation[OBS_X], observation[OBS_Y]
+        if (x < EDGE_X and dx < 0) or (x > 1 - EDGE_X and dx > 0):
+            dx = 0
+            dy = dy or (1 if y < 0.5 else -1)
+        if (y < EDGE_Y and dy < 0) or (y > 1 - EDGE_Y and dy > 0):
+            dy = 0
+            dx = dx or (1 if x < 0.5 else -1)
+        return dx, dy
+
+    def act(self, observation):
+        """
+        Returns:
+            tuple: GameEnv action (dx, dy, fire, weapon).
+        """
+        npcs = self._npcs(observation)
+        if not npcs:
+            x, y = observation[OBS_X], observation[OBS_Y]
+            goal_x, goal_y = SEARCH_ROUTE[self.waypoint]
+            if abs(goal_x - x) < WAYPOINT_REACHED and abs(goal_y - y) < WAYPOINT_REACHED:
+                self.waypoint = (self.waypoint + 1) % len(SEARCH_ROUTE)
+                goal_x, goal_y = SEARCH_ROUTE[self.waypoint]
+            # Per axis, so the last stretch isn't a zig-zag between two diagonal directions
+            dx = 0 if abs(goal_x - x) < WAYPOINT_REACHED / 2 else (1 if goal_x > x else -1)
+            dy = 0 if abs(goal_y - y) < WAYPOINT_REACHED / 2 else (1 if goal_y > y else -1)
+            return dx, dy, 0, 0
+
+        nearest_x, nearest_y = npcs[0]
+        nearest = math.hypot(nearest_x, nearest_y)
+        crowd_sq = self.crowd_radius * self.crowd_radius
+        crowded = sum(1 for x, y in npcs if x * x + y * y <= crowd_sq) >= self.crowd_size
+        wanted = GRENADE_LAUNCHER if crowded else SHOTGUN
+        weapon = wanted + 1 if int(observation[OBS_WEAPON]) != wanted else 0
+
+        target_x, target_y = self._cluster_centre(npcs)
+        aim = _direction8(target_x, target_y)
+        angle = math.atan2(target_y, target_x)
+        error = abs((angle - math.atan2(aim[1], aim[0]) + math.pi) % (2 * math.pi) - math.pi)
+        aligned = error <= self.aim_tolerance + math.atan2(NPC_WIDTH / 2, math.hypot(target_x, target_y))
+        facing = _direction8(observation[OBS_FACING_X], observation[OBS_FACING_Y])
+        away = self._away_from_walls(_direction8(-nearest_x, -nearest_y), observation)
+        ready = observation[OBS_WEAPON_READY] and not weapon # A switch goes first; fire on the next step
+
+        if ready and aligned and facing == aim:
+            move = away if nearest < self.kite_radius else (0, 0)
+            return move[0], move[1], 1, weapon
+        if nearest < self.kite_radius / 2:
+            move = away # Too close to line up a shot
+        elif nearest > self.engage_radius:
+            move = aim # Close in
+        elif not aligned:
+            # Strafe across the line to the target, towards the side it is on
+            strafe = (-aim[1], aim[0])
+            if strafe[0] * target_x + strafe[1] * target_y < 0:
+                strafe = (aim[1], -aim[0])
+            move = self._away_from_walls(strafe, observation)
+        elif ready:
+            move = aim # Turn to face the target
+        elif nearest < self.kite_radius:
+            move = away
+        else:
+            move = (0, 0) # Lined up, wait for the weapon
+        return move[0], move[1], 0, weapon
@@ -0,0 +1,199 @@
+'''
+Soak test: the ScriptedBot (through a BotInput) plays for hours, and every SOAK_REPORT_MINUTES
+of game time a line reports frame time, process memory and what is alive, so memory growth
+and frame-time degradation show up as trends.
+
+Windowed, Game(soak_monitor=...) feeds the monitor once per frame (python main.py --bot).
+Headless, run_soak() steps a Simulation as fast as it goes (python main.py --bot --headless
+--minutes 600, or python -m game.env.soak). Either way the bot restarts the game when it dies.
+'''
+import argparse
+import contextlib
+import gc
+import os
+import random
+import sys
+import time
+from game.core.settings import FPS, SOAK_MINUTES, SOAK_REPORT_MINUTES
+from game.core.simulation import Simulation
+from game.core.memory_monitor import MemoryMonitor
+from game.env.bot_input import BotInput
+
+def resident_memory():
+    """Resident set size of this process in bytes (its peak where /proc isn't available), or None."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource # Unix only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Bytes on macOS, KiB elsewhere
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class SoakMonitor:
+    '''
+    Collects frame times and reports once per `report_minutes` of the world's game time
+    (world.timers.current_time, which keeps running across restarts).
+
+    Each report (also kept in `reports`) has the frame time (mean, p99, max) of the frames
+    since the last one, the process's resident memory, the number of objects the garbage
+    collector tracks, and the live sprites per group.
+    '''
+    def __init__(self, report_minutes=SOAK_REPORT_MINUTES, minutes=None, stream=None):
+        """
+        Args:
+            report_minutes (float): Game time between reports.
+            minutes (float): Game time after which frame() returns True; None runs until stopped.
+            stream (file): Where reports go; sys.stdout at the time of each report otherwise.
+        """
+        self.report_ms = report_minutes * 60000
+        self.duration_ms = minutes * 60000 if minutes is not None else None
+        self.stream = stream
+        self.reports = []
+        self.frames = 0
+        self.restarts = 0
+        self._frame_times = []
+        self._start_ms = None
+        self._next_report_ms = None
+
+    def start(self, world):
+        """Starts the clock at the world's current game time (otherwise the first frame starts it)."""
+        self._start_ms = world.timers.current_time
+        self._next_report_ms = self._start_ms + self.report_ms
+
+    def restarted(self):
+        self.restarts += 1
+
+    def frame(self, seconds, world):
+        """
+        Records one frame.
+
+        Args:
+            seconds (float): Wall time the frame took.
+            world: The Game or Simulation being played.
+
+        Returns:
+            bool: True once `minutes` of game time have passed.
+        """
+        if self._start_ms is None:
+            self.start(world)
+        now = world.timers.current_time
+        self.frames += 1
+        self._frame_times.append(seconds)
+        if now >= self._next_report_ms:
+            self.report(world)
+            self._next_report_ms += self.report_ms
+        return self.duration_ms is not None and now - self._start_ms >= self.duration_ms
+
+    def report(self, world):
+        """Prints (and keeps) a report of the frames since the last one."""
+        times = sorted(self._frame_times)
+        self._frame_times = []
+        entity_manager = world.entity_manager
+        rss = resident_memory()
+        row = {
+            "minutes": (world.timers.current_time - self._start_ms) / 60000,
+            "frames": self.frames,
+            "frame_ms_mean": sum(times) / len(times) * 1000 if times else 0.0,
+            "frame_ms_p99": _percentile(times, 0.99) * 1000 if times else 0.0,
+            "frame_ms_max": times[-1] * 1000 if times else 0.0,
+            "rss_mb": rss / 2 ** 20 if rss is not None else None,
+            "gc_objects": len(gc.get_objects()),
+            "entities": len(entity_manager.entities),
+            "npcs": len(entity_manager.npcs),
+            "projectiles": len(entity_manager.projectiles),
+            "effects": len(world.effect_manager.effects),
+            "wave": world.wave_manager.get_wave_number(),
+            "restarts": self.restarts,
+        }
+        self.reports.append(row)
+        rss_text = f"{row['rss_mb']:.1f} MB" if rss is not None else "n/a"
+        if rss is not None and self.reports[0]["rss_mb"] is not None:
+            rss_text += f" ({row['rss_mb'] - self.reports[0]['rss_mb']:+.1f})"
+        print(f"Soak: {row['minutes']:6.1f} min, frame ms mean {row['frame_ms_mean']:.2f} "
+              f"p99 {row['frame_ms_p99']:.2f} max {row['frame_ms_max']:.2f}, RSS {rss_text}, "
+              f"gc objects {row['gc_objects']}, entities {row['entities']} (npcs {row['npcs']}, "
+              f"projectiles {row['projectiles']}, effects {row['effects']}), wave {row['wave']}, "
+              f"restarts {row['restarts']}", file=self.stream or sys.stdout, flush=True)
+        return row
+
+    def summary(self):
+        """Prints how frame time and memory moved from the first report to the last."""
+        stream = self.stream or sys.stdout
+        if len(self.reports) < 2:
+            print(f"Soak: {self.frames} frames, too short to compare reports.", file=stream)
+            return
+        first, last = self.reports[0], self.reports[-1]
+        text = (f"Soak done: {last['minutes']:.1f} min, {last['frames']} frames, {last['restarts']} restarts; "
+                f"first -> last report: frame ms mean {first['frame_ms_mean']:.2f} -> {last['frame_ms_mean']:.2f}, "
+                f"p99 {first['frame_ms_p99']:.2f} -> {last['frame_ms_p99']:.2f}, "
+                f"gc objects {first['gc_objects']} -> {last['gc_objects']}")
+        if first["rss_mb"] is not None:
+            text += f", RSS {first['rss_mb']:.1f} -> {last['rss_mb']:.1f} MB"
+        print(text, file=stream, flush=True)
+
+def run_soak(minutes=SOAK_MINUTES, report_minutes=SOAK_REPORT_MINUTES, seed=None, step_ms=1000 / FPS, quiet=True,
+             memory_monitor=None):
+    """
+    Headless soak: the bot plays a Simulation for `minutes` of game time, as fast as it can.
+
+    Args:
+        minutes (float): Game time to play.
+        report_minutes (float): Game time between reports.
+        seed (int): Seeds the `random` module (NPC spawns); None leaves it alone.
+        step_ms (float): Game time per simulation step.
+        quiet (bool): Silence the game's own prints (the reports still show).
+        memory_monitor (MemoryMonitor): Optional; checkpoints each wave and writes its report at the end.
+
+    Returns:
+        SoakMonitor: With the reports.
+    """
+    if seed is not None:
+        random.seed(seed)
+    monitor = SoakMonitor(report_minutes=report_minutes, minutes=minutes, stream=sys.stdout)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        if memory_monitor is not None:
+            memory_monitor.start()
+        simulation = Simulation(step_ms=step_ms)
+        if memory_monitor is not None:
+            memory_monitor.watch(simulation)
+        bot = BotInput(simulation)
+        monitor.start(simulation)
+        try:
+            while True:
+                player = simulation.player
+                commands = [(player, command, argument) for command, argument in bot.poll(player)]
+                started = time.perf_counter()
+                simulation.step({player: bot.movement(player)}, commands)
+                if monitor.frame(time.perf_counter() - started, simulation):
+                    break
+                if simulation.game_over:
+                    simulation.reset()
+                    monitor.restarted()
+        except KeyboardInterrupt:
+            pass
+    monitor.summary()
+    if memory_monitor is not None:
+        memory_monitor.close()
+    return monitor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=SOAK_MINUTES, help="game minutes to play")
+    parser.add_argument("--report-minutes", type=float, default=SOAK_REPORT_MINUTES)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true", help="keep the game's prints")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="checkpoint allocations at each wave and write MEMORY_REPORT_FILE (slows the run)")
+    args = parser.parse_args()
+    run_soak(args.minutes, args.report_minutes, seed=args.seed, quiet=not args.verbose,
+             memory_monitor=MemoryMonitor() if args.memory_report else None)
+
+if __name__ == '__main__':
+    main()
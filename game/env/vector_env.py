@@ -0,0 +1,239 @@
+'''
+N GameEnvs stepped together in worker processes.
+
+Actions, observations, rewards and episode counters live in one multiprocessing.shared_memory
+block (the layout npc_workers uses for NPC state), so a step only sends a one-word message per
+worker over its Pipe and nothing is pickled. Each worker owns a contiguous range of envs.
+Observations come back as one (num_envs, observation_size) float32 batch: a NumPy array over
+the shared block when NumPy is installed, a 2-D memoryview (index it as obs[env, field], or
+call .tolist()) otherwise. Neither is a copy, so the next step() overwrites it.
+
+Envs whose episode ended in a step are reset right away in their worker. For those envs the
+returned observation is the first one of the next episode, while terminated/truncated and the
+"wave", "kills", "episode_steps" and "episode_return" infos describe the episode that ended.
+'''
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+from game.env.game_env import GameEnv, ACTION_SIZE, observation_size
+from game.core.settings import ENV_OBSERVED_NPCS
+
+STATS = ("wave", "kills", "episode_steps", "episodes") # Per env, as int32
+STAT_WAVE, STAT_KILLS, STAT_EPISODE_STEPS, STAT_EPISODES = range(len(STATS))
+
+def _layout(num_envs, obs_size):
+    '''Byte offsets of the regions of the shared block, each 8-byte aligned.'''
+    regions = {}
+    offset = 0
+    for name, size in (("observations", 4 * num_envs * obs_size), ("actions", num_envs * ACTION_SIZE),
+                       ("rewards", 4 * num_envs), ("returns", 4 * num_envs), ("terminated", num_envs),
+                       ("truncated", num_envs), ("stats", 4 * num_envs * len(STATS))):
+        regions[name] = (offset, offset + size)
+        offset += (size + 7) & ~7
+    return regions, max(offset, 8)
+
+def _as_batch(memory, format, shape):
+    """The bytes of `memory` as a NumPy array of `shape` if NumPy is installed, else as a typed memoryview."""
+    try:
+        import numpy # Optional: only used for the returned batches
+    except ImportError:
+        return memory.cast(format, shape)
+    return numpy.frombuffer(memory, dtype=numpy.dtype(format)).reshape(shape)
+
+def _env_worker_main(conn, shm_name, num_envs, start, end, env_kwargs, quiet):
+    '''Worker process loop: build envs start..end-1, then reset/step them on request.'''
+    if quiet:
+        sys.stdout = open(os.devnull, "w") # Entity constructors and wave changes print
+    shm = shared_memory.SharedMemory(name=shm_name)
+    envs = [GameEnv(**env_kwargs) for _ in range(start, end)]
+    obs_size = envs[0].observation_size if envs else 0
+    regions, _ = _layout(num_envs, obs_size)
+    buf = shm.buf
+    observations = buf[slice(*regions["observations"])].cast('f')
+    actions = buf[slice(*regions["actions"])].cast('b')
+    rewards = buf[slice(*regions["rewards"])].cast('f')
+    returns = buf[slice(*regions["returns"])].cast('f')
+    terminated = buf[slice(*regions["terminated"])].cast('B')
+    truncated = buf[slice(*regions["truncated"])].cast('B')
+    stats = buf[slice(*regions["stats"])].cast('i')
+    views = (observations, actions, rewards, returns, terminated, truncated, stats)
+    episodes = [0] * len(envs)
+
+    def write_stats(index, env):
+        info = env.info()
+        base = index * len(STATS)
+        stats[base + STAT_WAVE] = info["wave"]
+        stats[base + STAT_KILLS] = info["kills"]
+        stats[base + STAT_EPISODE_STEPS] = info["episode_steps"]
+        stats[base + STAT_EPISODES] = episodes[index - start]
+        returns[index] = info["episode_return"]
+
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            command, seed = message
+            if command == "reset":
+                for index, env in enumerate(envs, start):
+                    env.reset(seed=None if seed is None else seed + index)
+                    env.observe(observations, index * obs_size)
+                    rewards[index] = 0.0
+                    terminated[index] = truncated[index] = 0
+                    write_stats(index, env)
+            else:
+                for index, env in enumerate(envs, start):
+                    base = index * ACTION_SIZE
+                    _, reward, done, cut, _ = env.step(actions[base:base + ACTION_SIZE])
+                    rewards[index] = reward
+                    terminated[index] = done
+                    truncated[index] = cut
+                    if done or cut:
+                        episodes[index - start] += 1
+                        write_stats(index, env) # The episode that ended
+                        env.reset()
+                    else:
+                        write_stats(index, env)
+                    env.observe(observations, index * obs_size)
+            conn.send(end - start)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for view in views:
+            view.release()
+        shm.close()
+
+
+class VectorGameEnv:
+    def __init__(self, num_envs, num_workers=None, quiet=True, **env_kwargs):
+        '''
+        Starts the worker processes and allocates the shared batches.
+
+        Args:
+            num_envs (int): Number of GameEnvs.
+            num_workers (int): Worker processes; None uses one per CPU (at most one per env).
+            quiet (bool): Silence the prints of the simulations in the workers.
+            **env_kwargs: Passed to every GameEnv (frame_skip, max_steps, observed_npcs, ...).
+        '''
+        self.num_envs = max(1, int(num_envs))
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        self.num_workers = max(1, min(int(num_workers), self.num_envs))
+        self.observation_size = observation_size(env_kwargs.get("observed_npcs", ENV_OBSERVED_NPCS))
+        regions, size = _layout(self.num_envs, self.observation_size)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        buf = self._shm.buf
+        n = self.num_envs
+        self._actions = buf[slice(*regions["actions"])].cast('b')
+        self._stats = buf[slice(*regions["stats"])].cast('i')
+        self._returns = buf[slice(*regions["returns"])].cast('f')
+        self.observations = _as_batch(buf[slice(*regions["observations"])], 'f', (n, self.observation_size))
+        self.rewards = _as_batch(buf[slice(*regions["rewards"])], 'f', (n,))
+        self.terminated = _as_batch(buf[slice(*regions["terminated"])], '?', (n,))
+        self.truncated = _as_batch(buf[slice(*regions["truncated"])], '?', (n,))
+        # Counters
+        self.steps = 0
+        self.step_seconds = 0.0
+
+        self._connections = []
+        self._processes = []
+        chunk = -(-self.num_envs // self.num_workers)
+        for start in range(0, self.num_envs, chunk):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_env_worker_main,
+                args=(child_conn, self._shm.name, self.num_envs, start, min(start + chunk, self.num_envs), env_kwargs, quiet),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        self.num_workers = len(self._processes)
+        print(f"VectorGameEnv: {self.num_envs} env(s) in {self.num_workers} worker process(es).")
+
+    def _run(self, command, seed=None):
+        for conn in self._connections:
+            conn.send((command, seed))
+        for conn in self._connections:
+            conn.recv()
+
+    def reset(self, seed=None):
+        """
+        Resets every env.
+
+        Args:
+            seed (int): Env i is seeded with seed + i; None continues the workers' random streams.
+
+        Returns:
+            tuple: (observations, infos)
+        """
+        self._run("reset", seed)
+        return self.observations, self.infos()
+
+    def step(self, actions):
+        """
+        Steps every env once.
+
+        Args:
+            actions (sequence): One (dx, dy, fire, weapon) per env (see GameEnv.step()); a NumPy
+                                (num_envs, 4) integer array works too.
+
+        Returns:
+            tuple: (observations, rewards, terminated, truncated, infos), as shared batches.
+        """
+        flat = self._actions
+        for index, action in enumerate(actions):
+            base = index * ACTION_SIZE
+            for field in range(ACTION_SIZE):
+                flat[base + field] = int(action[field])
+        started = time.perf_counter()
+        self._run("step")
+        self.step_seconds += time.perf_counter() - started
+        self.steps += 1
+        return self.observations, self.rewards, self.terminated, self.truncated, self.infos()
+
+    def infos(self):
+        """{"wave", "kills", "episode_steps", "episodes", "episode_return"}: one list entry per env."""
+        stats = self._stats.tolist()
+        count = len(STATS)
+        infos = {name: stats[field::count] for field, name in enumerate(STATS)}
+        infos["episode_return"] = self._returns.tolist()
+        return infos
+
+    def report(self):
+        steps_per_second = self.steps * self.num_envs / self.step_seconds if self.step_seconds else 0.0
+        return (f"VectorGameEnv: {self.steps} step(s) of {self.num_envs} env(s) in {self.num_workers} worker(s), "
+                f"{steps_per_second:.0f} env steps/s")
+
+    def close(self):
+        '''Stops the workers and frees the shared memory.'''
+        if self._shm is None:
+            return
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+        print(self.report())
+        for view in (self.observations, self.rewards, self.terminated, self.truncated, self._actions, self._stats,
+                     self._returns):
+            if isinstance(view, memoryview): # NumPy batches are released when the last reference goes
+                view.release()
+        self.observations = self.rewards = self.terminated = self.truncated = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass # A caller still holds one of the batches; the mapping goes away with it
+        self._shm.unlink()
+        self._shm = None
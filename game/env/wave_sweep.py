@@ -0,0 +1,297 @@
+'''
+Wave-balancing sweep: headless games played by the ScriptedBot over a grid of balance settings.
+
+Every configuration of the grid (each combination of the --grid values) plays --games games,
+seeded 0..games-1, so all configurations face the same NPC spawns. A game ends when the bot
+dies or after --minutes of game time. The games run in a multiprocessing pool whose workers
+stay up for the whole sweep; every game gets a new GameEnv, so its result depends only on its
+configuration and seed, not on which worker played it or what that worker played before.
+
+Each finished game is appended to the results file as it comes in; a sweep started again
+with the same results file skips the games already in it, so an interrupted sweep resumes
+where it stopped. The summary (survival wave, kills, time to death and frame cost per
+configuration) is printed and written as CSV.
+
+Tunable parameters: NPC_SPEED, NPC_HEALTH, WAVE_REST_TIME, WAVE_FIRST_WAVE, GRENADE_DAMAGE,
+or any weapon stat as <weapon key>.<stat> (e.g. shotgun.pellets).
+
+Usage:
+    python -m game.env.wave_sweep --grid NPC_SPEED=2,3,4 --grid NPC_HEALTH=30,50,80 --games 20
+'''
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from game.core.settings import FPS, ENV_FRAME_SKIP, SWEEP_RESULTS_FILE, SWEEP_SUMMARY_FILE, SWEEP_GAME_MINUTES
+from game.env.game_env import GameEnv
+from game.env.scripted_bot import ScriptedBot
+from game.utils.weapon import WEAPON_DATA
+
+# Grid parameter -> WaveManager argument (see Simulation's wave_options)
+WAVE_PARAMETERS = {"NPC_SPEED": "npc_speed", "NPC_HEALTH": "npc_health", "WAVE_REST_TIME": "rest_period",
+                   "WAVE_FIRST_WAVE": "first_wave"}
+# Grid parameter -> (weapon key, stat) (see Simulation's weapon_stats)
+WEAPON_PARAMETERS = {"GRENADE_DAMAGE": ("grenade_launcher", "damage")}
+
+SUMMARY_COLUMNS = ["config", "games", "deaths", "wave_mean", "wave_median", "wave_min", "kills_mean",
+                   "death_time_mean_s", "frame_ms_mean", "frame_ms_max"]
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+def parse_grid(specs):
+    """
+    Parses NAME=v1,v2,... specs.
+
+    Returns:
+        list: One {name: value} dict per configuration, in grid order.
+
+    Raises:
+        ValueError: For an unknown parameter or a malformed spec.
+    """
+    names, values = [], []
+    for spec in specs:
+        name, _, text = spec.partition("=")
+        name = name.strip()
+        if not text:
+            raise ValueError(f"expected NAME=v1,v2,... but got '{spec}'")
+        if name not in WAVE_PARAMETERS and name not in WEAPON_PARAMETERS:
+            weapon, _, stat = name.partition(".")
+            if weapon not in WEAPON_DATA or not stat:
+                raise ValueError(f"unknown parameter '{name}' (expected one of "
+                                 f"{', '.join([*WAVE_PARAMETERS, *WEAPON_PARAMETERS])} or <weapon key>.<stat>)")
+        names.append(name)
+        values.append([_number(value) for value in text.split(",")])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+def config_key(params):
+    """Stable name of a configuration, e.g. 'NPC_HEALTH=30 NPC_SPEED=2' ('default' for no overrides)."""
+    return " ".join(f"{name}={params[name]}" for name in sorted(params)) or "default"
+
+def env_options(params):
+    """GameEnv wave_options / weapon_stats for a configuration."""
+    wave_options, weapon_stats = {}, {}
+    for name, value in params.items():
+        if name in WAVE_PARAMETERS:
+            wave_options[WAVE_PARAMETERS[name]] = value
+        else:
+            weapon, stat = WEAPON_PARAMETERS.get(name) or name.split(".", 1)
+            weapon_stats.setdefault(weapon, {})[stat] = value
+    return wave_options, weapon_stats
+
+def _init_worker(quiet):
+    if quiet:
+        sys.stdout = open(os.devnull, "w") # Entity constructors and wave changes print
+
+def play_game(task):
+    """
+    Plays one game with the ScriptedBot, in a new GameEnv: a reset one keeps its clock, entity
+    handles and cooldown rows, which changes how a seeded game plays out.
+
+    Args:
+        task (tuple): (params, seed, max_steps, frame_skip).
+
+    Returns:
+        dict: The result line for the results file.
+    """
+    params, seed, max_steps, frame_skip = task
+    key = config_key(params)
+    wave_options, weapon_stats = env_options(params)
+    env = GameEnv(frame_skip=frame_skip, max_steps=max_steps, wave_options=wave_options, weapon_stats=weapon_stats)
+    bot = ScriptedBot(seed=seed)
+    perf_counter = time.perf_counter
+    observation, info = env.reset(seed=seed)
+    simulation = env.simulation
+    started = perf_counter()
+    slowest = 0.0
+    terminated = truncated = False
+    while not (terminated or truncated):
+        step_started = perf_counter()
+        observation, _, terminated, truncated, info = env.step(bot.act(observation))
+        elapsed = perf_counter() - step_started
+        if elapsed > slowest:
+            slowest = elapsed
+    seconds = perf_counter() - started
+    env.close()
+    frames = max(1, simulation.steps)
+    return {"config": key, "params": params, "seed": seed, "max_steps": max_steps, "frame_skip": frame_skip,
+            "died": terminated, "wave": info["wave"],
+            "kills": info["kills"], "time_ms": simulation.current_time, "frames": frames,
+            "frame_ms_mean": seconds * 1000 / frames, "frame_ms_max": slowest * 1000 / frame_skip}
+
+def _play_in_process(tasks, quiet):
+    with open(os.devnull, "w") as devnull:
+        for task in tasks:
+            with contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                result = play_game(task)
+            yield result
+
+def load_results(path):
+    """Results already in `path` (a results file of an earlier run), skipping a torn last line."""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as file:
+        for line in file:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass # Cut short when the sweep was killed; the game runs again
+    return results
+
+def _ends_torn(path):
+    if not os.path.getsize(path):
+        return False
+    with open(path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) != b"\n"
+
+def summarize(configs, results, games=None):
+    """
+    Aggregates results per configuration.
+
+    Args:
+        games (int): Only count the games of seeds 0..games-1 (None: all).
+
+    Returns:
+        list: One dict per configuration with games (SUMMARY_COLUMNS), in grid order.
+    """
+    by_config = {}
+    for result in results:
+        if games is not None and result["seed"] >= games:
+            continue
+        by_config.setdefault(result["config"], []).append(result)
+    rows = []
+    for params in configs:
+        key = config_key(params)
+        played = by_config.get(key)
+        if not played:
+            continue
+        waves = [game["wave"] for game in played]
+        death_times = [game["time_ms"] / 1000 for game in played if game["died"]]
+        total_frames = sum(game["frames"] for game in played)
+        rows.append({
+            "config": key, "games": len(played), "deaths": len(death_times),
+            "wave_mean": statistics.fmean(waves), "wave_median": statistics.median(waves), "wave_min": min(waves),
+            "kills_mean": statistics.fmean(game["kills"] for game in played),
+            "death_time_mean_s": statistics.fmean(death_times) if death_times else None,
+            "frame_ms_mean": sum(game["frame_ms_mean"] * game["frames"] for game in played) / total_frames,
+            "frame_ms_max": max(game["frame_ms_max"] for game in played),
+        })
+    return rows
+
+def format_summary(rows):
+    lines = [f"{'config':<40} {'games':>5} {'deaths':>6} {'wave':>5} {'median':>6} {'min':>4} {'kills':>7} "
+             f"{'death s':>8} {'frame ms':>8} {'max ms':>7}"]
+    for row in rows:
+        death_time = f"{row['death_time_mean_s']:.1f}" if row["death_time_mean_s"] is not None else "-"
+        lines.append(f"{row['config']:<40} {row['games']:>5} {row['deaths']:>6} {row['wave_mean']:>5.1f} "
+                     f"{row['wave_median']:>6} {row['wave_min']:>4} {row['kills_mean']:>7.1f} {death_time:>8} "
+                     f"{row['frame_ms_mean']:>8.3f} {row['frame_ms_max']:>7.2f}")
+    return "\n".join(lines)
+
+def write_summary(path, rows):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows({name: round(value, 4) if isinstance(value, float) else value for name, value in row.items()}
+                         for row in rows)
+
+def run_sweep(configs, games, workers=None, results_path=SWEEP_RESULTS_FILE, minutes=SWEEP_GAME_MINUTES,
+              frame_skip=ENV_FRAME_SKIP, quiet=True):
+    """
+    Plays the games of every configuration that aren't in `results_path` yet.
+
+    Args:
+        configs (list): {parameter: value} dicts, see parse_grid().
+        games (int): Games per configuration (seeds 0..games-1).
+        workers (int): Worker processes; None uses one per CPU, 0 plays in this process.
+        results_path (str): Results file, appended to as games finish.
+        minutes (float): Game time limit of a game.
+        frame_skip (int): Simulation steps per bot decision.
+        quiet (bool): Silence the games' prints.
+
+    Returns:
+        list: Every result of the sweep, earlier runs' included.
+    """
+    max_steps = max(1, round(minutes * 60 * FPS / frame_skip))
+    # Games played with another time limit or frame skip don't count
+    results = [result for result in load_results(results_path)
+               if result.get("max_steps") == max_steps and result.get("frame_skip") == frame_skip]
+    done = {(result["config"], result["seed"]) for result in results}
+    tasks = [(params, seed, max_steps, frame_skip) for params in configs for seed in range(games)
+             if (config_key(params), seed) not in done]
+    total = len(configs) * games
+    print(f"Sweep: {len(configs)} configuration(s) x {games} game(s); {total - len(tasks)} already in "
+          f"{results_path}, {len(tasks)} to play.")
+    if not tasks:
+        return results
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 0:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(quiet,))
+        outcomes = pool.imap_unordered(play_game, tasks)
+    else:
+        outcomes = _play_in_process(tasks, quiet)
+    started = time.perf_counter()
+    report_every = max(1, len(tasks) // 20)
+    try:
+        with open(results_path, "a") as file:
+            if _ends_torn(results_path):
+                file.write("\n") # Keep the first new result off the torn line
+            for count, result in enumerate(outcomes, 1):
+                file.write(json.dumps(result) + "\n")
+                file.flush() # A killed sweep keeps every game it finished
+                results.append(result)
+                if count % report_every == 0 or count == len(tasks):
+                    elapsed = time.perf_counter() - started
+                    print(f"Sweep: {count}/{len(tasks)} games, {elapsed:.0f} s, "
+                          f"about {elapsed / count * (len(tasks) - count):.0f} s to go.")
+    except KeyboardInterrupt:
+        print(f"Sweep interrupted; run the same command again to resume from {results_path}.")
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="values of one parameter (repeat for more parameters)")
+    parser.add_argument("--games", type=int, default=10, help="games per configuration")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU, 0: none)")
+    parser.add_argument("--minutes", type=float, default=SWEEP_GAME_MINUTES, help="game time limit per game")
+    parser.add_argument("--frame-skip", type=int, default=ENV_FRAME_SKIP)
+    parser.add_argument("--results", default=SWEEP_RESULTS_FILE)
+    parser.add_argument("--summary", default=SWEEP_SUMMARY_FILE)
+    parser.add_argument("--verbose", action="store_true", help="keep the games' prints")
+    args = parser.parse_args()
+
+    try:
+        configs = parse_grid(args.grid)
+    except ValueError as e:
+        parser.error(str(e))
+    try:
+        results = run_sweep(configs, args.games, workers=args.workers, results_path=args.results, minutes=args.minutes,
+                            frame_skip=args.frame_skip, quiet=not args.verbose)
+    except KeyboardInterrupt:
+        return 1
+    rows = summarize(configs, results, args.games)
+    print(format_summary(rows))
+    write_summary(args.summary, rows)
+    print(f"Summary written to {args.summary}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import collections
+import socket
+import time
+from types import SimpleNamespace
+from game.core.settings import COOP_SERVER_HOST, COOP_SERVER_PORT, COOP_SNAPSHOT_HISTORY
+from game.net import protocol
+
+RECEIVE_BUFFER = 1 << 16
+HELLO_INTERVAL = 0.2 # Seconds between HELLO resends while joining
+INCOMPLETE_SNAPSHOTS = 4 # Partly received snapshots kept while their other fragments may still arrive
+
+class CoopClient:
+    '''
+    Client side of a co-op session with a CoopServer (see game/net/protocol.py).
+
+    send_input() sends the local player's input; poll() reads whatever snapshots arrived,
+    reassembles their fragments, applies each delta to the baseline it names and returns the
+    newest world view. The tick of that view is acknowledged with the next input, which lets
+    the server encode against it. Decoded views are kept for COOP_SNAPSHOT_HISTORY snapshots,
+    as long as the server may still use them as baselines.
+    '''
+    def __init__(self, host=COOP_SERVER_HOST, port=COOP_SERVER_PORT, history=COOP_SNAPSHOT_HISTORY):
+        """
+        Args:
+            host (str), port (int): Address of the CoopServer.
+            history (int): Decoded snapshots kept as baselines.
+        """
+        self.address = (host, port)
+        self.history = history
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.connect(self.address) # Only datagrams from the server get through
+        self._socket.setblocking(False)
+        self.connected = False
+        self.snapshot_rate = None
+        self._views = collections.OrderedDict() # tick -> {net id: (kind, x, y, health, facing, flags)}
+        self._fragments = {} # tick -> [fragment bytes or None]
+        self._sequence = 0
+        self._fire_counter = 0 # Cumulative, so a lost input doesn't lose the shot
+        self._weapon_code = 0 # Last weapon picked (WEAPON_KEYS index + 1), 0 = none picked yet
+        self.latest = None # Newest decoded snapshot (see _decode)
+        self.previous = None # The one before it, for interpolating between the two
+        # Counters
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+        self.dropped = 0 # Snapshots that couldn't be decoded (missing fragments or baseline)
+
+    def connect(self, timeout=5.0):
+        """
+        Joins the server: sends HELLO until it answers.
+
+        Returns:
+            bool: True once the server accepted us; False on timeout.
+        """
+        hello = protocol.HELLO.pack(protocol.MSG_HELLO, protocol.PROTOCOL_VERSION)
+        deadline = time.monotonic() + timeout
+        while not self.connected and time.monotonic() < deadline:
+            try:
+                self._socket.send(hello)
+            except ConnectionRefusedError: # Nothing listening yet (reported on Linux loopback)
+                pass
+            resend_at = min(deadline, time.monotonic() + HELLO_INTERVAL)
+            while not self.connected and time.monotonic() < resend_at:
+                self.poll()
+                time.sleep(0.005)
+        return self.connected
+
+    @property
+    def acked_tick(self):
+        return self.latest.tick if self.latest is not None else 0
+
+    def send_input(self, movement=(0, 0), fire=False, weapon=None, respawn=False):
+        """
+        Sends one frame of input.
+
+        Args:
+            movement (tuple): (dx, dy) in -1..1.
+            fire (bool): True on the frame the fire button was pressed.
+            weapon (str): WEAPON_DATA key to switch to; None keeps the current weapon.
+            respawn (bool): Ask for a new player after dying.
+        """
+        self._sequence += 1
+        if fire:
+            self._fire_counter = (self._fire_counter + 1) & 0xFF
+        if weapon is not None:
+            self._weapon_code = protocol.WEAPON_KEYS.index(weapon) + 1 # Sent with every input from now on
+        message = protocol.INPUT.pack(protocol.MSG_INPUT, self._sequence, self.acked_tick, int(movement[0]),
+                                      int(movement[1]), self._fire_counter, self._weapon_code,
+                                      protocol.BUTTON_RESPAWN if respawn else 0)
+        try:
+            self._socket.send(message)
+        except (BlockingIOError, ConnectionRefusedError):
+            pass # Lost like any datagram; the next frame sends the current state again
+
+    def poll(self):
+        """
+        Reads every datagram that has arrived.
+
+        Returns:
+            SimpleNamespace: The newest snapshot decoded by this call, or None if there was none.
+        """
+        newest = None
+        while True:
+            try:
+                data = self._socket.recv(RECEIVE_BUFFER)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionRefusedError:
+                continue # ICMP from an earlier send; the server may not be up yet
+            self.bytes_received += len(data)
+            kind = data[:1]
+            if kind == protocol.MSG_SNAPSHOT:
+                snapshot = self._on_fragment(data)
+                if snapshot is not None:
+                    newest = snapshot
+            elif kind == protocol.MSG_WELCOME:
+                _, version, self.snapshot_rate = protocol.WELCOME.unpack(data)
+                self.connected = True
+        return newest
+
+    def _on_fragment(self, data):
+        _, tick, index, count = protocol.FRAGMENT.unpack_from(data)
+        if tick <= self.acked_tick:
+            return None # Older than what we already have
+        parts = self._fragments.get(tick)
+        if parts is None:
+            parts = self._fragments[tick] = [None] * count
+            for stale in sorted(self._fragments)[:-INCOMPLETE_SNAPSHOTS]:
+                del self._fragments[stale]
+                self.dropped += 1
+        parts[index] = data[protocol.FRAGMENT.size:]
+        if None in parts:
+            return None
+        del self._fragments[tick]
+        for stale in [stale for stale in self._fragments if stale < tick]: # Superseded before they completed
+            del self._fragments[stale]
+            self.dropped += 1
+        return self._decode(b"".join(parts))
+
+    def _decode(self, payload):
+        (tick, baseline_tick, game_time, input_ack, player_id, health, kills, wave, npcs_alive, weapon,
+         state_bits) = protocol.SNAPSHOT.unpack_from(payload)
+        if baseline_tick:
+            baseline = self._views.get(baseline_tick)
+            if baseline is None: # Shouldn't happen: we only ack views we keep
+                self.dropped += 1
+                return None
+        else:
+            baseline = {}
+            self.full_snapshots += 1
+        entities, new_ids, offset = protocol.decode_entities(payload, protocol.SNAPSHOT.size, baseline)
+        pellets, _ = protocol.decode_pellets(payload, offset)
+        self._views[tick] = entities
+        while len(self._views) > self.history:
+            self._views.popitem(last=False)
+        self.snapshots += 1
+        self.previous = self.latest
+        self.latest = SimpleNamespace(
+            tick=tick, baseline_tick=baseline_tick, time=game_time, input_ack=input_ack, player_id=player_id,
+            health=health, kills=kills, wave=wave, npcs_alive=npcs_alive, weapon=weapon,
+            weapon_key=protocol.WEAPON_KEYS[weapon], wave_active=bool(state_bits & protocol.STATE_WAVE_ACTIVE),
+            game_over=bool(state_bits & protocol.STATE_GAME_OVER), entities=entities, new_ids=new_ids, pellets=pellets,
+            received_at=time.monotonic())
+        return self.latest
+
+    def close(self):
+        """Tells the server we left (best effort) and closes the socket."""
+        if self._socket is None:
+            return
+        try:
+            self._socket.send(protocol.MSG_BYE)
+        except OSError:
+            pass
+        self._socket.close()
+        self._socket = None
@@ -0,0 +1,313 @@
+import argparse
+import collections
+import socket
+import threading
+import time
+from game.core.settings import (
+    FPS, SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, ROOM_WIDTH, ROOM_HEIGHT,
+    COOP_SERVER_HOST, COOP_SERVER_PORT, COOP_SNAPSHOT_RATE, COOP_SNAPSHOT_HISTORY, COOP_INTEREST_MARGIN,
+    COOP_CLIENT_TIMEOUT, COOP_MAX_DATAGRAM
+)
+from game.core.camera import Camera
+from game.core.simulation import Simulation
+from game.net import protocol
+
+RECEIVE_BUFFER = 1 << 16
+
+class _Session:
+    """Server-side state of one connected client."""
+    def __init__(self, address, player, now):
+        self.address = address
+        self.player = player # None while dead
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT)
+        self.history = collections.OrderedDict() # snapshot tick -> view sent at that tick (delta baselines)
+        self.acked = 0 # Newest snapshot tick the client decoded
+        self.input_sequence = 0
+        self.movement = (0, 0)
+        self.fire_counter = None # Last fire counter seen; a change means the player fired
+        self.weapon = 0
+        self.pending_commands = [] # (player, command, argument) for the next step
+        self.last_heard = now
+
+
+class CoopServer:
+    '''
+    Headless, authoritative co-op server: one Simulation (WaveManager, EntityManager,
+    WeaponSystem... stepping at FPS) and any number of UDP clients, each with its own player.
+
+    Clients only send input (movement, a fire counter, weapon choice); the server applies it,
+    steps the world and, COOP_SNAPSHOT_RATE times a second, sends every client the entities near
+    its camera, delta-encoded against the last snapshot that client acknowledged (see
+    game/net/protocol.py). A lost snapshot costs nothing extra: the next one is simply encoded
+    against an older baseline. NPCs chase the nearest living player, and each kill is credited
+    to the player who dealt the killing blow.
+
+    step() does one tick and is what tests and benchmarks drive; run() / start_in_thread() step
+    in real time.
+    '''
+    def __init__(self, simulation=None, host=COOP_SERVER_HOST, port=COOP_SERVER_PORT, snapshot_rate=COOP_SNAPSHOT_RATE,
+                 history=COOP_SNAPSHOT_HISTORY, interest_margin=COOP_INTEREST_MARGIN, client_timeout=COOP_CLIENT_TIMEOUT,
+                 max_datagram=COOP_MAX_DATAGRAM):
+        """
+        Args:
+            simulation (Simulation): World to serve; a new one by default. Its first player is given
+                                     to the first client that joins.
+            host (str), port (int): Address to listen on; port 0 picks a free one (see self.port after start()).
+            snapshot_rate (int): Snapshots per second per client.
+            history (int): Snapshots kept per client as delta baselines.
+            interest_margin (int): Pixels around a client's view whose entities are still sent.
+            client_timeout (float): Seconds of silence before a client is dropped.
+            max_datagram (int): Snapshot bytes per datagram.
+        """
+        self.simulation = simulation if simulation is not None else Simulation()
+        self.host = host
+        self.port = port
+        self.snapshot_interval = max(1, round(FPS / snapshot_rate)) # Steps between snapshots
+        self.snapshot_rate = snapshot_rate
+        self.history = history
+        self.interest_margin = interest_margin
+        self.client_timeout = client_timeout
+        self.max_datagram = max_datagram
+        self.sessions = {} # address -> _Session
+        self._unclaimed_player = self.simulation.player # Given to the first client
+        self._socket = None
+        self._thread = None
+        self._running = False
+        # Counters, printed by report()
+        self.ticks = 0
+        self.snapshots_sent = 0
+        self.full_snapshots = 0
+        self.snapshot_bytes = 0 # Snapshot payloads, before fragmenting
+        self.bytes_sent = 0 # Everything on the wire (UDP payloads)
+        self.datagrams_sent = 0
+        self.snapshot_seconds = 0.0 # Time spent capturing and encoding snapshots
+
+    def start(self):
+        """Binds the UDP socket. Returns self."""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((self.host, self.port))
+        self._socket.setblocking(False)
+        self.port = self._socket.getsockname()[1]
+        print(f"CoopServer: listening on {self.host}:{self.port} (UDP)")
+        return self
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            print(f"CoopServer: stopped. {self.report()}")
+
+    # --- One tick ---------------------------------------------------------------------
+
+    def step(self):
+        """Reads client messages, steps the world once and sends snapshots when one is due."""
+        now = time.monotonic()
+        self._receive(now)
+        for address in [address for address, session in self.sessions.items()
+                        if now - session.last_heard > self.client_timeout]:
+            print(f"CoopServer: {address} timed out.")
+            self._drop(address)
+
+        simulation = self.simulation
+        movement = {}
+        commands = []
+        for session in self.sessions.values():
+            player = session.player
+            if player is None:
+                continue
+            if not player.groups(): # Killed since the last tick
+                session.player = None
+                continue
+            movement[player] = session.movement
+            commands.extend(session.pending_commands)
+            session.pending_commands.clear()
+        simulation.step(movement, commands)
+        self.ticks += 1
+        if self.ticks % self.snapshot_interval == 0:
+            self._send_snapshots()
+
+    def _receive(self, now):
+        while True:
+            try:
+                data, address = self._socket.recvfrom(RECEIVE_BUFFER)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionResetError: # Windows reports an unreachable client on the next read
+                continue
+            if not data:
+                continue
+            kind = data[:1]
+            try:
+                if kind == protocol.MSG_INPUT:
+                    self._on_input(address, protocol.INPUT.unpack(data), now)
+                elif kind == protocol.MSG_HELLO:
+                    self._on_hello(address, protocol.HELLO.unpack(data), now)
+                elif kind == protocol.MSG_BYE and address in self.sessions:
+                    print(f"CoopServer: {address} left.")
+                    self._drop(address)
+            except Exception as e: # A malformed datagram must not take the server down
+                print(f"CoopServer: ignoring bad message from {address}: {e}")
+
+    def _on_hello(self, address, message, now):
+        _, version = message
+        if version != protocol.PROTOCOL_VERSION:
+            print(f"CoopServer: {address} speaks protocol {version}, not {protocol.PROTOCOL_VERSION}; ignored.")
+            return
+        if address not in self.sessions:
+            session = _Session(address, self._spawn_player(), now)
+            self.sessions[address] = session
+            print(f"CoopServer: {address} joined ({len(self.sessions)} players).")
+        self.sessions[address].last_heard = now
+        self._send(protocol.WELCOME.pack(protocol.MSG_WELCOME, protocol.PROTOCOL_VERSION, self.snapshot_rate),
+                   address) # Also re-sent if the first WELCOME was lost
+
+    def _spawn_player(self):
+        simulation = self.simulation
+        if simulation.game_over: # Everyone died: a new run
+            self._unclaimed_player = None
+            return simulation.reset()
+        player = self._unclaimed_player
+        if player is not None and player.groups():
+            self._unclaimed_player = None
+            return player
+        offset = 40 * (len(simulation.players) % 8) # Side by side in the first room
+        return simulation.add_player(ROOM_WIDTH / 2 + offset, ROOM_HEIGHT / 2 + offset)
+
+    def _on_input(self, address, message, now):
+        session = self.sessions.get(address)
+        if session is None:
+            return # Not joined (or timed out): the client will say HELLO again
+        _, sequence, ack, dx, dy, fire_counter, weapon, buttons = message
+        session.last_heard = now
+        if ack in session.history and ack > session.acked:
+            session.acked = ack
+        if sequence <= session.input_sequence:
+            return # Late or duplicate datagram
+        session.input_sequence = sequence
+        session.movement = (max(-1, min(1, dx)), max(-1, min(1, dy)))
+        if session.player is None:
+            if buttons & protocol.BUTTON_RESPAWN:
+                session.player = self._spawn_player()
+                session.weapon = 0 # The new player starts with the default weapon; re-apply the client's choice
+            return
+        if weapon and weapon != session.weapon and weapon <= len(protocol.WEAPON_KEYS):
+            session.pending_commands.append((session.player, "equip", protocol.WEAPON_KEYS[weapon - 1]))
+        session.weapon = weapon
+        # The counter is cumulative, so a lost INPUT doesn't lose the shot; presses in between collapse into one
+        if session.fire_counter is not None and fire_counter != session.fire_counter:
+            session.pending_commands.append((session.player, "fire", None))
+        session.fire_counter = fire_counter
+
+    def _drop(self, address):
+        session = self.sessions.pop(address)
+        if session.player is not None and session.player.groups():
+            self.simulation.remove_player(session.player)
+
+    # --- Snapshots --------------------------------------------------------------------
+
+    def _send_snapshots(self):
+        started = time.perf_counter()
+        simulation = self.simulation
+        tick = simulation.steps
+        wave = simulation.wave_manager
+        state_bits = (protocol.STATE_WAVE_ACTIVE if wave.wave_active else 0) | \
+                     (protocol.STATE_GAME_OVER if simulation.game_over else 0)
+        for session in self.sessions.values():
+            player = session.player
+            if player is not None:
+                session.camera.update(player)
+            interest = session.camera.camera_rect.inflate(2 * self.interest_margin, 2 * self.interest_margin)
+            view, pellets = protocol.capture_view(simulation.entity_manager, interest)
+
+            baseline = session.history.get(session.acked)
+            if baseline is None:
+                baseline = {}
+                self.full_snapshots += 1
+            payload = bytearray(protocol.SNAPSHOT.pack(
+                tick, session.acked if baseline else 0, simulation.current_time & 0xFFFFFFFF, session.input_sequence,
+                protocol.net_id(player) if player is not None else protocol.NO_ENTITY,
+                int(min(max(player.health, 0), 0xFFFF)) if player is not None else 0, simulation.kills, wave.current_wave_number,
+                min(simulation.blackboard.npc_count, 0xFFFF),
+                protocol.weapon_index(player.weapon) if player is not None else 0, state_bits))
+            protocol.encode_entities(payload, view, baseline)
+            protocol.encode_pellets(payload, pellets)
+
+            session.history[tick] = view
+            while len(session.history) > self.history:
+                session.history.popitem(last=False)
+            if session.acked not in session.history:
+                session.acked = 0 # Too old to be a baseline any more
+            for datagram in protocol.fragments(tick, payload, self.max_datagram):
+                self._send(datagram, session.address)
+            self.snapshots_sent += 1
+            self.snapshot_bytes += len(payload)
+        self.snapshot_seconds += time.perf_counter() - started
+
+    def _send(self, datagram, address):
+        try:
+            self._socket.sendto(datagram, address)
+        except OSError as e: # Full buffer or unreachable client: this one is lost, the next snapshot covers it
+            print(f"CoopServer: send to {address} failed: {e}")
+            return
+        self.bytes_sent += len(datagram)
+        self.datagrams_sent += 1
+
+    def report(self):
+        """One-line summary of the traffic so far."""
+        per_tick = self.bytes_sent / self.ticks if self.ticks else 0.0
+        per_snapshot = self.snapshot_bytes / self.snapshots_sent if self.snapshots_sent else 0.0
+        encode_ms = self.snapshot_seconds * 1000 / self.snapshots_sent if self.snapshots_sent else 0.0
+        return (f"{self.ticks} ticks, {self.snapshots_sent} snapshots ({self.full_snapshots} full), "
+                f"{self.bytes_sent} bytes in {self.datagrams_sent} datagrams = {per_tick:.0f} bytes/tick, "
+                f"{per_snapshot:.0f} bytes/snapshot, {encode_ms:.2f} ms/snapshot to build")
+
+    # --- Real-time loop ---------------------------------------------------------------
+
+    def run(self):
+        """Steps at FPS until stop() (or Ctrl+C)."""
+        if self._socket is None:
+            self.start()
+        self._running = True
+        step_interval = 1.0 / FPS
+        next_step = time.perf_counter()
+        while self._running:
+            self.step()
+            next_step += step_interval
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_step = time.perf_counter() # Running behind; don't try to catch up in a burst
+
+    def start_in_thread(self):
+        """Runs the server on its own thread (e.g. in a test). Returns once the socket is bound."""
+        self.start()
+        self._thread = threading.Thread(target=self.run, name="coop-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stops run() / a server started with start_in_thread() and closes the socket."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless co-op server for players on the local network.")
+    parser.add_argument("--host", default=COOP_SERVER_HOST, help='address to listen on ("0.0.0.0" for the LAN)')
+    parser.add_argument("--port", type=int, default=COOP_SERVER_PORT)
+    parser.add_argument("--snapshot-rate", type=int, default=COOP_SNAPSHOT_RATE)
+    args = parser.parse_args()
+
+    server = CoopServer(host=args.host, port=args.port, snapshot_rate=args.snapshot_rate)
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == '__main__':
+    main()
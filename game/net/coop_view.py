@@ -0,0 +1,145 @@
+import pygame
+from game.core.settings import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, CAPTION, LIGHT_GRAY, BLACK, PINK, WHITE, WORLD_ROOM_ROWS, WORLD_ROOM_COLS,
+    ROOM_COLORS, WORLD_WIDTH, WORLD_HEIGHT, PLAYER_RADIUS, NPC_WIDTH, NPC_HEIGHT, NPC_COLOR, PROJECTILE_WIDTH,
+    PROJECTILE_HEIGHT, DEFAULT_PROJECTILE_COLOR, GRENADE_COLOR, PELLET_SIZE, NPC_HEALTH_BAR_HEIGHT,
+    NPC_HEALTH_BAR_Y_OFFSET, MINIMAP_PLAYER_COLOR, GAME_FONT_NAME
+)
+from game.core.camera import Camera
+from game.world.room import Room
+from game.ui.font_manager import FontManager
+from game.net import protocol
+
+WEAPON_KEYS_BY_KEY = {pygame.K_1: "pistol", pygame.K_2: "knife", pygame.K_3: "grenade_launcher",
+                      pygame.K_4: "laser", pygame.K_5: "shotgun"} # Same keys as Game.handle_gameplay_event
+
+class CoopView:
+    '''
+    Window for a co-op client: keyboard in, snapshots out.
+
+    Nothing is simulated here. Each frame sends the keyboard state through the CoopClient and
+    draws the latest snapshot, with positions interpolated from the previous snapshot so
+    movement stays smooth between the COOP_SNAPSHOT_RATE updates (the view runs one snapshot
+    interval behind the server).
+    '''
+    def __init__(self, client):
+        """
+        Args:
+            client (CoopClient): Connected client.
+        """
+        self.client = client
+        pygame.init()
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"{CAPTION} (co-op)")
+        self.clock = pygame.time.Clock()
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT)
+        self.rooms = [Room(col, row, ROOM_COLORS[(row * WORLD_ROOM_COLS + col) % len(ROOM_COLORS)])
+                      for row in range(WORLD_ROOM_ROWS) for col in range(WORLD_ROOM_COLS)]
+        self.font = FontManager().get(GAME_FONT_NAME, 36)
+        self._camera_target = pygame.sprite.Sprite() # Camera.update() follows a sprite's rect
+        self._camera_target.rect = pygame.Rect(0, 0, 1, 1)
+        self._latest_tick = None # Snapshot being interpolated towards, and when it was first drawn (s)
+        self._latest_shown_at = 0.0
+
+    def run(self):
+        running = True
+        while running:
+            fire = respawn = False
+            weapon = None
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_SPACE:
+                        fire = True
+                    elif event.key == pygame.K_r:
+                        respawn = True
+                    elif event.key in WEAPON_KEYS_BY_KEY:
+                        weapon = WEAPON_KEYS_BY_KEY[event.key]
+            keys = pygame.key.get_pressed()
+            movement = (keys[pygame.K_d] - keys[pygame.K_a], keys[pygame.K_s] - keys[pygame.K_w])
+            self.client.send_input(movement, fire=fire, weapon=weapon, respawn=respawn)
+            self.client.poll()
+            self.draw()
+            pygame.display.flip()
+            self.clock.tick(FPS)
+        self.client.close()
+        pygame.quit()
+
+    def _positions(self, latest, previous):
+        """
+        {net id: (x, y)} of the latest snapshot, interpolated from the previous one. Entities decoded as
+        new (latest.new_ids: a reused slot is another entity) are drawn where they are, not slid there.
+        """
+        if previous is None or not self.client.snapshot_rate:
+            return {entity_id: (state[1], state[2]) for entity_id, state in latest.entities.items()}
+        alpha = min(1.0, (pygame.time.get_ticks() / 1000.0 - self._latest_shown_at) * self.client.snapshot_rate)
+        before = previous.entities
+        new_ids = latest.new_ids
+        positions = {}
+        for entity_id, state in latest.entities.items():
+            old = before.get(entity_id)
+            if old is None or entity_id in new_ids:
+                positions[entity_id] = (state[1], state[2])
+            else:
+                positions[entity_id] = (old[1] + (state[1] - old[1]) * alpha, old[2] + (state[2] - old[2]) * alpha)
+        return positions
+
+    def draw(self):
+        screen = self.screen
+        screen.fill(LIGHT_GRAY)
+        latest = self.client.latest
+        if latest is None:
+            screen.blit(self.font.render("Waiting for the server...", True, BLACK), (10, 10))
+            return
+        if self._latest_tick != latest.tick: # A new snapshot: interpolation starts over
+            self._latest_tick = latest.tick
+            self._latest_shown_at = pygame.time.get_ticks() / 1000.0
+        positions = self._positions(latest, self.client.previous)
+
+        own = positions.get(latest.player_id)
+        if own is not None:
+            self._camera_target.rect.center = own
+            self.camera.update(self._camera_target)
+        camera_x, camera_y = self.camera.x, self.camera.y
+        for room in self.rooms:
+            room.draw(screen, camera_x, camera_y)
+
+        for entity_id, (kind, _, _, health, facing, flags) in latest.entities.items():
+            x, y = positions[entity_id]
+            x, y = int(x - camera_x), int(y - camera_y)
+            if kind == protocol.KIND_NPC:
+                rect = pygame.Rect(0, 0, NPC_WIDTH, NPC_HEIGHT)
+                rect.center = (x, y)
+                pygame.draw.rect(screen, NPC_COLOR, rect)
+                if flags & protocol.FLAG_FOLLOWING:
+                    bar_y = rect.top - NPC_HEALTH_BAR_Y_OFFSET
+                    pygame.draw.rect(screen, (255, 0, 0), (rect.x, bar_y, rect.width, NPC_HEALTH_BAR_HEIGHT))
+                    pygame.draw.rect(screen, (0, 255, 0), (rect.x, bar_y, rect.width * health // 255, NPC_HEALTH_BAR_HEIGHT))
+            elif kind == protocol.KIND_PLAYER:
+                pygame.draw.circle(screen, PINK, (x, y), PLAYER_RADIUS)
+                if entity_id == latest.player_id:
+                    pygame.draw.circle(screen, MINIMAP_PLAYER_COLOR, (x, y), PLAYER_RADIUS, 2)
+                fx, fy = protocol.facing_vector(facing)
+                pygame.draw.line(screen, WHITE, (x, y), (x + fx * PLAYER_RADIUS, y + fy * PLAYER_RADIUS), 3)
+            else:
+                color = GRENADE_COLOR if kind == protocol.KIND_GRENADE else DEFAULT_PROJECTILE_COLOR
+                rect = pygame.Rect(0, 0, PROJECTILE_WIDTH, PROJECTILE_HEIGHT)
+                rect.center = (x, y)
+                pygame.draw.rect(screen, color, rect)
+        for x, y in latest.pellets:
+            pygame.draw.rect(screen, DEFAULT_PROJECTILE_COLOR, (x - camera_x - PELLET_SIZE // 2, y - camera_y - PELLET_SIZE // 2,
+                                                               PELLET_SIZE, PELLET_SIZE))
+
+        wave_state = "Active" if latest.wave_active else "Resting"
+        lines = [f"Weapon: {latest.weapon_key}", f"Health: {latest.health}", f"Kills: {latest.kills}",
+                 f"Wave: {latest.wave} ({wave_state} - {latest.npcs_alive} left)"]
+        if latest.player_id == protocol.NO_ENTITY:
+            lines.append("You died - press R to respawn")
+        y = 10
+        for line in lines:
+            surface = self.font.render(line, True, BLACK)
+            screen.blit(surface, (10, y))
+            y += surface.get_height() + 5
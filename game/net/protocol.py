@@ -0,0 +1,267 @@
+import math
+import struct
+from game.core.settings import ENTITY_HANDLE_INDEX_BITS
+from game.entities.grenade import Grenade
+from game.utils.weapon import WEAPON_DATA
+
+# Wire format of co-op sessions (game/net/coop_server.py <-> game/net/coop_client.py), over UDP.
+#
+# Every datagram starts with a one-byte message type:
+#   client -> server   HELLO (join), INPUT (every client frame), BYE (leave)
+#   server -> client   WELCOME (join accepted), SNAPSHOT (one fragment of a world snapshot)
+#
+# A snapshot is what one client can see: the entities inside its interest rect (its camera view
+# plus COOP_INTEREST_MARGIN), as {net id: state}. It is encoded as a delta against the last
+# snapshot that client acknowledged (its INPUT carries the newest snapshot tick it decoded):
+# entities that left the view, then one record per new or changed entity. Unchanged entities
+# cost nothing. With no usable baseline the same encoding against an empty view is a full snapshot.
+#
+# Entity records are quantized: centre positions in whole pixels (u16, or i8 steps against the
+# baseline), health as a fraction of max health in a byte, facing as an angle in a byte. The
+# entity's flags ride in the record's header byte, next to the bits that say which fields follow.
+# Net ids are entity handle slot indices: small and dense, so the sorted ids are gap-coded in
+# (usually) one varint byte each. A slot reused by another entity is sent as a new entity.
+
+PROTOCOL_VERSION = 1
+
+MSG_HELLO = b"H"
+MSG_WELCOME = b"W"
+MSG_INPUT = b"I"
+MSG_BYE = b"B"
+MSG_SNAPSHOT = b"S"
+
+HELLO = struct.Struct("<cH") # type, protocol version
+WELCOME = struct.Struct("<cHH") # type, protocol version, snapshot rate
+# type, input sequence, newest snapshot tick decoded, dx, dy, fire counter, weapon (0 = keep, else
+# WEAPON_KEYS index + 1), buttons
+INPUT = struct.Struct("<cIIbbBBB")
+BUTTON_RESPAWN = 0x01
+FRAGMENT = struct.Struct("<cIBB") # type, snapshot tick, fragment index, fragment count; then the bytes
+# tick, baseline tick (0 = full snapshot), game time (ms), last input sequence applied, own net id
+# (NO_ENTITY while dead), own health, team kills, wave, NPCs alive, weapon (WEAPON_KEYS index), state bits
+SNAPSHOT = struct.Struct("<IIIIIHIHHBB")
+STATE_WAVE_ACTIVE = 0x01
+STATE_GAME_OVER = 0x02 # Every player is dead
+NO_ENTITY = 0xFFFFFFFF
+
+WEAPON_KEYS = list(WEAPON_DATA)
+_WEAPON_INDICES = {data["name"]: index for index, data in enumerate(WEAPON_DATA.values())} # Weapon.name -> index
+
+KIND_PLAYER = 0
+KIND_NPC = 1
+KIND_PROJECTILE = 2
+KIND_GRENADE = 3
+
+# Entity record header byte: which fields follow (bits 0-4) and the entity's flags (bits 5-7)
+REC_NEW = 0x01 # kind (u8), then position, health and facing as below
+REC_POS = 0x02 # x, y (u16 each)
+REC_POS_STEP = 0x04 # dx, dy against the baseline (i8 each)
+REC_HEALTH = 0x08 # u8
+REC_FACING = 0x10 # u8
+FLAG_SHIFT = 5
+FLAG_FOLLOWING = 0x01 # NPC chasing a player
+FLAG_RESTING = 0x02 # Grenade on the ground, waiting for its fuse
+FLAG_HURT = 0x04 # Below half health
+
+_U16 = struct.Struct("<HH")
+_I8 = struct.Struct("<bb")
+
+_INDEX_MASK = (1 << ENTITY_HANDLE_INDEX_BITS) - 1
+
+def net_id(entity):
+    return entity.handle & _INDEX_MASK
+
+def weapon_index(weapon):
+    return _WEAPON_INDICES.get(weapon.name, 0) if weapon is not None else 0
+
+def _quantize_facing(direction):
+    return round(math.atan2(direction.y, direction.x) * (128 / math.pi)) & 0xFF
+
+def facing_vector(facing):
+    """Unit (x, y) of a quantized facing byte."""
+    angle = facing * (math.pi / 128)
+    return math.cos(angle), math.sin(angle)
+
+def _state(entity, kind, flags):
+    # (kind, x, y, health, facing, flags, handle); clients see the first six fields
+    center = entity.rect.center
+    # int(): health turns float with grenade falloff or fractional weapon damage, and the wire format holds a byte
+    health = int(entity.health * 255 // entity.max_health) if entity.max_health > 0 else 0
+    if health < 128:
+        flags |= FLAG_HURT
+    return (kind, min(max(center[0], 0), 0xFFFF), min(max(center[1], 0), 0xFFFF), min(max(health, 0), 255),
+            _quantize_facing(entity.direction), flags, entity.handle)
+
+def capture_view(entity_manager, interest):
+    """
+    Quantized states of the entities touching `interest` (a Rect in world coordinates).
+
+    Returns:
+        tuple: ({net id: (kind, x, y, health, facing, flags, handle)}, [(x, y) of each live volley pellet])
+    """
+    view = {}
+    colliderect = interest.colliderect
+    for player in entity_manager.players:
+        if colliderect(player.rect):
+            view[net_id(player)] = _state(player, KIND_PLAYER, 0)
+    for npc in entity_manager.npcs:
+        if colliderect(npc.rect):
+            view[net_id(npc)] = _state(npc, KIND_NPC, FLAG_FOLLOWING if npc.is_following_player else 0)
+    for projectile in entity_manager.projectiles:
+        if colliderect(projectile.rect):
+            if isinstance(projectile, Grenade):
+                state = _state(projectile, KIND_GRENADE, FLAG_RESTING if projectile.speed == 0 else 0)
+            else:
+                state = _state(projectile, KIND_PROJECTILE, 0)
+            view[net_id(projectile)] = state
+    pellets = []
+    left, top, right, bottom = interest.left, interest.top, interest.right, interest.bottom
+    for volley in entity_manager.volleys:
+        if colliderect(volley.rect):
+            pellets.extend((round(x), round(y)) for x, y, live in zip(volley.xs, volley.ys, volley.live)
+                           if live and left <= x < right and top <= y < bottom)
+    return view, pellets
+
+# --- Varints (LEB128) ------------------------------------------------------------------
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+# --- Entity deltas ---------------------------------------------------------------------
+
+def encode_entities(out, view, baseline):
+    """
+    Appends the delta from `baseline` to `view` (both {net id: state}, see capture_view) to `out`.
+    An empty baseline gives a full snapshot.
+    """
+    removed = [entity_id for entity_id in baseline if entity_id not in view]
+    removed.sort()
+    _write_varint(out, len(removed))
+    previous = 0
+    for entity_id in removed:
+        _write_varint(out, entity_id - previous)
+        previous = entity_id
+
+    records = bytearray()
+    count = 0
+    previous = 0
+    get_base = baseline.get
+    for entity_id in sorted(view):
+        state = view[entity_id]
+        base = get_base(entity_id)
+        if base == state:
+            continue
+        kind, x, y, health, facing, flags, handle = state
+        header = flags << FLAG_SHIFT
+        if base is None or base[6] != handle: # New to this client (or a reused slot)
+            body = bytes((kind,)) + _U16.pack(x, y) + bytes((health, facing))
+            header |= REC_NEW
+        else:
+            body = b""
+            dx, dy = x - base[1], y - base[2]
+            if dx or dy:
+                if -128 <= dx < 128 and -128 <= dy < 128:
+                    header |= REC_POS_STEP
+                    body = _I8.pack(dx, dy)
+                else:
+                    header |= REC_POS
+                    body = _U16.pack(x, y)
+            if health != base[3]:
+                header |= REC_HEALTH
+                body += bytes((health,))
+            if facing != base[4]:
+                header |= REC_FACING
+                body += bytes((facing,))
+        _write_varint(records, entity_id - previous)
+        previous = entity_id
+        records.append(header)
+        records += body
+        count += 1
+    _write_varint(out, count)
+    out += records
+
+def decode_entities(data, offset, baseline):
+    """
+    Applies an encode_entities() delta at `offset` of `data` to `baseline` ({net id: (kind, x, y, health,
+    facing, flags)}; not modified).
+
+    Returns:
+        tuple: (new view, set of the net ids decoded as REC_NEW, offset after the delta). A new id is a
+               different entity from the one the baseline had under it (if any), so don't interpolate it.
+
+    Raises:
+        ValueError: If the delta changes an entity the baseline doesn't have.
+    """
+    view = dict(baseline)
+    new_ids = set()
+    count, offset = _read_varint(data, offset)
+    entity_id = 0
+    for _ in range(count):
+        gap, offset = _read_varint(data, offset)
+        entity_id += gap
+        view.pop(entity_id, None)
+    count, offset = _read_varint(data, offset)
+    entity_id = 0
+    for _ in range(count):
+        gap, offset = _read_varint(data, offset)
+        entity_id += gap
+        header = data[offset]
+        offset += 1
+        flags = header >> FLAG_SHIFT
+        if header & REC_NEW:
+            kind = data[offset]
+            x, y = _U16.unpack_from(data, offset + 1)
+            health, facing = data[offset + 5], data[offset + 6]
+            offset += 7
+            new_ids.add(entity_id)
+        else:
+            base = view.get(entity_id)
+            if base is None:
+                raise ValueError(f"delta for entity {entity_id}, which is not in the baseline")
+            kind, x, y, health, facing, _ = base
+            if header & REC_POS_STEP:
+                dx, dy = _I8.unpack_from(data, offset)
+                x, y = x + dx, y + dy
+                offset += 2
+            elif header & REC_POS:
+                x, y = _U16.unpack_from(data, offset)
+                offset += 4
+            if header & REC_HEALTH:
+                health = data[offset]
+                offset += 1
+            if header & REC_FACING:
+                facing = data[offset]
+                offset += 1
+        view[entity_id] = (kind, x, y, health, facing, flags)
+    return view, new_ids, offset
+
+def encode_pellets(out, pellets):
+    _write_varint(out, len(pellets))
+    for x, y in pellets:
+        out += _U16.pack(min(max(x, 0), 0xFFFF), min(max(y, 0), 0xFFFF))
+
+def decode_pellets(data, offset):
+    count, offset = _read_varint(data, offset)
+    pellets = [_U16.unpack_from(data, offset + 4 * i) for i in range(count)]
+    return pellets, offset + 4 * count
+
+def fragments(tick, payload, max_datagram):
+    """Splits a snapshot into SNAPSHOT datagrams of at most `max_datagram` payload bytes each."""
+    count = max(1, -(-len(payload) // max_datagram))
+    if count > 255:
+        raise ValueError(f"snapshot of {len(payload)} bytes needs more than 255 fragments")
+    return [FRAGMENT.pack(MSG_SNAPSHOT, tick, index, count) + payload[index * max_datagram:(index + 1) * max_datagram]
+            for index in range(count)]
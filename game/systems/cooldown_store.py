@@ -0,0 +1,87 @@
+from array import array
+from game.core.settings import ENTITY_HANDLE_INDEX_BITS
+
+class CooldownStore:
+    '''
+    Weapon cooldowns stored in flat arrays indexed by entity handle.
+
+    One 'ready at' column (ms) per weapon type, one row per handle index.
+    Handle indices are recycled by EntityManager, so the arrays only grow to
+    the peak number of live entities, and each row remembers the generation it
+    belongs to: a new entity that reuses an index never inherits the previous
+    owner's cooldown. release() is called when an entity leaves the world.
+    '''
+    def __init__(self, index_bits=ENTITY_HANDLE_INDEX_BITS):
+        self.index_bits = index_bits
+        self.index_mask = (1 << index_bits) - 1
+        self._generations = array('L') # Generation owning each row (0 = free)
+        self._columns = {} # weapon type -> array('d') of ready-at times
+
+    def _column(self, weapon_type):
+        column = self._columns.get(weapon_type)
+        if column is None:
+            column = array('d', [0.0]) * len(self._generations)
+            self._columns[weapon_type] = column
+        return column
+
+    def _ensure_row(self, index):
+        missing = index + 1 - len(self._generations)
+        if missing > 0:
+            self._generations.extend([0] * missing)
+            for column in self._columns.values():
+                column.extend([0.0] * missing)
+
+    def is_ready(self, handle, weapon_type, now):
+        '''Returns True if the entity behind `handle` may use a weapon of this type at time `now`.'''
+        index = handle & self.index_mask
+        if index >= len(self._generations) or self._generations[index] != handle >> self.index_bits:
+            return True # No cooldown recorded for this entity (or the row belonged to a dead one)
+        column = self._columns.get(weapon_type)
+        return column is None or now >= column[index]
+
+    def start(self, handle, weapon_type, ready_at):
+        '''Records that the entity can't use this weapon type again before `ready_at` (ms).'''
+        index = handle & self.index_mask
+        generation = handle >> self.index_bits
+        self._ensure_row(index)
+        column = self._column(weapon_type)
+        if self._generations[index] != generation:
+            # Row was free or belonged to an earlier entity with this index: reset it
+            self._generations[index] = generation
+            for other in self._columns.values():
+                other[index] = 0.0
+        column[index] = ready_at
+
+    def ready_at_many(self, handles, weapon_type):
+        '''
+        Returns, for each handle, when that entity may next use this weapon type
+        (0.0 if it has no cooldown). One pass over the column, e.g. for saving every NPC.
+        '''
+        column = self._columns.get(weapon_type)
+        if column is None:
+            return [0.0] * len(handles)
+        generations, mask, bits, rows = self._generations, self.index_mask, self.index_bits, len(self._generations)
+        return [column[handle & mask] if (handle & mask) < rows and generations[handle & mask] == handle >> bits else 0.0
+                for handle in handles]
+
+    def ready_times(self, handle):
+        '''Returns {weapon type: ready-at time} of the cooldowns recorded for `handle` (e.g. for a save).'''
+        index = handle & self.index_mask
+        if index >= len(self._generations) or self._generations[index] != handle >> self.index_bits:
+            return {}
+        return {weapon_type: column[index] for weapon_type, column in self._columns.items() if column[index] > 0.0}
+
+    def release(self, handle):
+        '''Frees the row of a removed entity.'''
+        index = handle & self.index_mask
+        if index < len(self._generations) and self._generations[index] == handle >> self.index_bits:
+            self._generations[index] = 0
+
+    def clear(self):
+        for index in range(len(self._generations)):
+            self._generations[index] = 0
+
+    @property
+    def rows(self):
+        '''Number of rows allocated (peak concurrent handle index + 1).'''
+        return len(self._generations)
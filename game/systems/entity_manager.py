@@ -1,20 +1,88 @@
 import pygame
+from array import array
+from game.core.settings import ENTITY_HANDLE_INDEX_BITS
+from game.systems.spatial_grid import SpatialGrid
+from game.entities.grenade import Grenade # Imported once here; a failing import attempt per frame walked sys.path every call
+
+class _ManagedGroup(pygame.sprite.Group):
+    '''
+    The 'entities' group. Every way a sprite leaves it (kill(), remove(),
+    empty()) goes through remove_internal, so this is where handles are freed.
+    '''
+    def __init__(self, manager):
+        super().__init__()
+        self.manager = manager
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.manager._release_handle(sprite)
+
 
 class EntityManager:
     def __init__(self):
-        self.entities = pygame.sprite.Group()
+        self.entities = _ManagedGroup(self)
         self.players = pygame.sprite.Group()
         self.npcs = pygame.sprite.Group()
         self.projectiles = pygame.sprite.Group()
+        self.volleys = pygame.sprite.Group() # Multi-pellet shots; resolved apart from single projectiles
         # It might also be useful to have a group for grenades if they need special handling
         # apart from generic projectiles, or if other entity types are introduced.
         # For now, the provided structure is fine.
+        self.npc_grid = SpatialGrid() # Broad phase for NPC collision queries, rebuilt in handle_collisions()
+
+        # Generational handles: an int whose low bits index a slot and whose high
+        # bits count how many times that slot was reused, so a stale handle to a
+        # removed entity never resolves to the entity that took its slot.
+        self.handle_index_bits = ENTITY_HANDLE_INDEX_BITS
+        self.handle_index_mask = (1 << ENTITY_HANDLE_INDEX_BITS) - 1
+        self._handle_generations = array('L') # Current generation per slot
+        self._handle_entities = [] # Entity per slot, None when free
+        self._free_handle_indices = []
+        self.removal_listeners = [] # Callables taking the handle of each removed entity
+
+    def _allocate_handle(self, entity):
+        if self._free_handle_indices:
+            index = self._free_handle_indices.pop()
+        else:
+            index = len(self._handle_entities)
+            self._handle_generations.append(0)
+            self._handle_entities.append(None)
+        generation = self._handle_generations[index] + 1 # Generation 0 never appears in a handle
+        self._handle_generations[index] = generation
+        self._handle_entities[index] = entity
+        entity.handle = (generation << self.handle_index_bits) | index
+        return entity.handle
+
+    def _release_handle(self, entity):
+        handle = getattr(entity, 'handle', None)
+        if handle is None or self.resolve(handle) is not entity:
+            return
+        index = handle & self.handle_index_mask
+        self._handle_entities[index] = None
+        self._free_handle_indices.append(index)
+        for listener in self.removal_listeners:
+            listener(handle)
+
+    def resolve(self, handle):
+        '''Returns the live entity behind a handle, or None if it was removed.'''
+        index = handle & self.handle_index_mask
+        if index >= len(self._handle_entities) or self._handle_generations[index] != handle >> self.handle_index_bits:
+            return None
+        return self._handle_entities[index]
+
+    @property
+    def handle_capacity(self):
+        '''Number of handle slots ever allocated (peak concurrent entities).'''
+        return len(self._handle_entities)
 
     def add_entity(self, entity, entity_type_str: str):
         '''
         Adds an entity to the main 'entities' group and its type-specific group.
-        entity_type_str should be one of 'player', 'npc', 'projectile'.
+        entity_type_str should be one of 'player', 'npc', 'projectile', 'volley'.
+        The entity is given a generational handle (entity.handle) that is freed when it's removed.
         '''
+        if not self.entities.has(entity):
+            self._allocate_handle(entity)
         self.entities.add(entity)
         
         type_group_name = f"{entity_type_str.lower()}s" # e.g., "players", "npcs"
@@ -80,37 +148,61 @@ class EntityManager:
 
     def handle_collisions(self, effect_manager): # effect_manager added to signature
         # Projectile-NPC collisions
-        # Need to import Grenade if type checking, ensure path is correct based on current file structure
-        # For now, let's assume grenade.py is still in root, so use 'from grenade import Grenade'
-        # This import will need to be updated when grenade.py moves.
-        try:
-            from grenade import Grenade # Temporary import, adjust path as needed
-        except ImportError:
-            # Fallback if grenade.py has moved to game/entities/grenade.py
-            from game.entities.grenade import Grenade
-
-
-        for projectile in list(self.projectiles): # Iterate over a copy for safe removal
-            # Check collision between this projectile and the group of NPCs
-            hit_npcs = pygame.sprite.spritecollide(projectile, self.npcs, False) # False: don't kill npcs automatically
-
-            if hit_npcs:
-                if isinstance(projectile, Grenade):
-                    if not projectile.detonated:
-                        projectile.explode(effect_manager) # Pass effect_manager
-                    # Grenade.kill() is called by its own explode or update logic, or it might be killed by range in Projectile.update
-                    # If it was a contact grenade that explodes on first hit, ensure it's killed.
-                    # For now, assume fuse or range handles its removal after explosion.
-                    # projectile.kill() # Ensure grenade is removed after processing if it should be. 
-                    # This might be redundant if explode() or update() handles it.
-                    # For now, let's assume grenade's own logic or its Projectile parent class update handles removal.
-                    print(f"EntityManager: Grenade event processed.")
-                else: # For regular projectiles
-                    for npc in hit_npcs: # Should typically be one NPC for a non-exploding projectile
-                        npc.take_damage(projectile.damage)
-                        projectile.kill()  # Remove projectile after hit
-                        print(f"EntityManager: Projectile hit NPC for {projectile.damage} damage!")
-                        break # Projectile hits one NPC and is destroyed
+        # Broad phase: NPCs are bucketed into the grid once per frame
+        self.npc_grid.rebuild(self.npcs)
+
+        # Narrow phase: each projectile's box is swept from its previous centre to its
+        # current one, so a fast projectile can't skip over an NPC between frames
+        projectiles = self.projectiles.sprites()
+        segments = []
+        for projectile in projectiles:
+            rect = projectile.rect
+            cx, cy = rect.center
+            segments.append((getattr(projectile, 'prev_x', cx), getattr(projectile, 'prev_y', cy), cx, cy,
+                             rect.width / 2, rect.height / 2))
+        hits = self.npc_grid.sweep(segments)
+
+        for projectile, segment, (npc, t) in zip(projectiles, segments, hits):
+            if npc is None:
+                continue
+            if not npc.alive:
+                # Earliest NPC was already killed by another projectile this frame; look past it
+                npc, t = self.npc_grid.first_hit(*segment, skip_dead=True)
+                if npc is None:
+                    continue
+
+            if isinstance(projectile, Grenade):
+                if not projectile.detonated:
+                    projectile.explode(effect_manager) # Pass effect_manager
+                # Grenade.kill() is called by its own explode or update logic, or it might be killed by range in Projectile.update
+                # If it was a contact grenade that explodes on first hit, ensure it's killed.
+                # For now, assume fuse or range handles its removal after explosion.
+                # projectile.kill() # Ensure grenade is removed after processing if it should be. 
+                # This might be redundant if explode() or update() handles it.
+                # For now, let's assume grenade's own logic or its Projectile parent class update handles removal.
+                print(f"EntityManager: Grenade event processed.")
+            else: # For regular projectiles: the earliest NPC along the path takes the hit
+                npc.take_damage(projectile.damage, projectile.owner)
+                projectile.kill()  # Remove projectile after hit
+                print(f"EntityManager: Projectile hit NPC for {projectile.damage} damage!")
+
+        # Volleys: all pellets of a shot share one grid query
+        for volley in self.volleys.sprites():
+            indices, segments = volley.pellet_segments()
+            hit_count = 0
+            for index, segment, (npc, t) in zip(indices, segments, self.npc_grid.sweep_cluster(segments)):
+                if npc is None:
+                    continue
+                if not npc.alive:
+                    # Killed by an earlier pellet or projectile this frame; look past it
+                    npc, t = self.npc_grid.first_hit(*segment, skip_dead=True)
+                    if npc is None:
+                        continue
+                npc.take_damage(volley.damage, volley.owner)
+                volley.pellet_hit(index)
+                hit_count += 1
+            if hit_count:
+                print(f"EntityManager: Volley hit NPCs with {hit_count} pellets for {volley.damage} damage each!")
 
     def handle_player_melee_on_npcs(self, attack_rect, weapon_damage, attacking_player):
         if not attack_rect:
@@ -124,6 +216,6 @@ class EntityManager:
 
             if attack_rect.colliderect(npc.rect):
                 if npc.alive: # Only damage alive NPCs
-                    npc.take_damage(weapon_damage)
+                    npc.take_damage(weapon_damage, attacking_player)
                     print(f"EntityManager: Melee attack by {attacking_player.__class__.__name__} hit NPC for {weapon_damage} damage!")
                     # Potentially, this method could return a list of hit NPCs if needed elsewhere.
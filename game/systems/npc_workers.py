@@ -0,0 +1,337 @@
+'''
+Optional multi-process NPC AI.
+
+NPC movement state lives in a multiprocessing.shared_memory block laid out as
+one float64 array per field (struct-of-arrays). Each tick the main process
+buckets the live NPC slots by world region (one region per Room), splits the
+region-sorted slot order into one contiguous chunk per worker and lets the
+worker processes run the chase/patrol AI for their chunk in parallel. The
+main process keeps input, weapon use (melee requests raised by workers),
+collisions, region hand-over of NPCs crossing room borders and rendering.
+
+Enabled with settings.NPC_AI_WORKERS > 0; with 0 the Game keeps updating NPCs
+on the main thread through NPC.update().
+'''
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from array import array
+
+from game.core.settings import (
+    WORLD_WIDTH, WORLD_HEIGHT, ROOM_WIDTH, ROOM_HEIGHT, WORLD_ROOM_ROWS, WORLD_ROOM_COLS,
+    NPC_AI_CAPACITY, PLAYER_RADIUS
+)
+
+# Field indices into the shared state block. Field f of slot s is at f * capacity + s.
+F_X = 0            # rect.x (whole pixels, stored as float)
+F_Y = 1            # rect.y
+F_W = 2
+F_H = 3
+F_DIR_X = 4        # facing direction
+F_DIR_Y = 5
+F_MOVE_X = 6       # patrol movement direction (-1 or 1)
+F_PATROL_L = 7
+F_PATROL_R = 8
+F_SPEED = 9
+F_DETECT = 10      # detection radius
+F_ATTACK_RANGE = 11 # melee range, negative when the NPC has no melee weapon
+F_FOLLOWING = 12   # 1.0 while chasing a player
+F_ATTACK = 13      # set by a worker when the NPC is in melee range this tick
+F_TARGET = 14      # index of the nearest player (into the tick's player centres), -1 with no player
+NUM_FIELDS = 15
+
+NUM_REGIONS = WORLD_ROOM_ROWS * WORLD_ROOM_COLS
+
+# Workers are spawned, never forked: the Game starts the pool from its background loader thread while
+# the main thread (and the simulation thread) run, and a fork of a multi-threaded process can inherit
+# locks held by the other threads and deadlock. A spawned worker only imports this module.
+_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _pixel(value):
+    # What assigning `value` to a Rect coordinate stores (half away from zero), so workers lose
+    # the same sub-pixel movement NPC.update() loses and NPCs keep the same effective speed
+    return math.floor(value + 0.5) if value >= 0 else -math.floor(0.5 - value)
+
+
+def step_npc_slots(state, capacity, order, start, end, player_centers, world_w, world_h):
+    '''
+    Runs one tick of NPC AI for the slots order[start:end]. Mirrors NPC.update():
+    chase the nearest of `player_centers` (Blackboard.player_centers) inside the
+    detection radius, otherwise patrol horizontally, then clamp to the world. The
+    chosen player's index is left in F_TARGET for the melee request. Works on any
+    float sequence, so it is used both by the worker processes and for the
+    in-process (0 workers) benchmark baseline.
+    '''
+    cap = capacity
+    o_y, o_w, o_h = F_Y * cap, F_W * cap, F_H * cap
+    o_dx, o_dy, o_mx = F_DIR_X * cap, F_DIR_Y * cap, F_MOVE_X * cap
+    o_pl, o_pr, o_sp = F_PATROL_L * cap, F_PATROL_R * cap, F_SPEED * cap
+    o_det, o_ar = F_DETECT * cap, F_ATTACK_RANGE * cap
+    o_fol, o_att, o_tgt = F_FOLLOWING * cap, F_ATTACK * cap, F_TARGET * cap
+    sqrt = math.sqrt
+
+    for i in range(start, end):
+        s = order[i]
+        x = state[s]
+        y = state[o_y + s]
+        w = state[o_w + s]
+        h = state[o_h + s]
+        speed = state[o_sp + s]
+        following = False
+        attack = 0.0
+        target = -1
+
+        # Nearest player, first one on ties (as Blackboard.nearest_player()), from the Rect centre
+        center_x, center_y = x + w // 2, y + h // 2
+        best_sq = None
+        for index, (player_x, player_y) in enumerate(player_centers):
+            dx, dy = player_x - center_x, player_y - center_y
+            d_sq = dx * dx + dy * dy
+            if best_sq is None or d_sq < best_sq:
+                best_sq, target, vx, vy = d_sq, index, dx, dy
+
+        if target >= 0:
+            dist = sqrt(best_sq)
+            if dist <= state[o_det + s]:
+                following = True
+                if dist > 0:
+                    state[o_dx + s] = vx / dist
+                    state[o_dy + s] = vy / dist
+                x = _pixel(x + state[o_dx + s] * speed)
+                y = _pixel(y + state[o_dy + s] * speed)
+                attack_range = state[o_ar + s]
+                if attack_range >= 0 and dist <= attack_range:
+                    attack = 1.0
+
+        if not following:
+            move_x = state[o_mx + s]
+            x = _pixel(x + move_x * speed)
+            state[o_dx + s] = move_x
+            state[o_dy + s] = 0.0
+            if move_x == 1 and x >= state[o_pr + s]:
+                state[o_mx + s] = state[o_dx + s] = -1.0
+                x = _pixel(state[o_pr + s])
+            elif move_x == -1 and x <= state[o_pl + s]:
+                state[o_mx + s] = state[o_dx + s] = 1.0
+                x = _pixel(state[o_pl + s])
+
+        # Keep NPC within world boundaries
+        if x > world_w - w: x = world_w - w
+        if x < 0: x = 0.0
+        if y > world_h - h: y = world_h - h
+        if y < 0: y = 0.0
+
+        state[s] = x
+        state[o_y + s] = y
+        state[o_fol + s] = 1.0 if following else 0.0
+        state[o_att + s] = attack
+        state[o_tgt + s] = target
+
+
+def _npc_worker_main(conn, state_name, order_name, capacity, world_w, world_h):
+    '''Worker process loop: wait for a tick message, run AI for the given chunk, reply.'''
+    state_shm = shared_memory.SharedMemory(name=state_name)
+    order_shm = shared_memory.SharedMemory(name=order_name)
+    state = state_shm.buf.cast('d')
+    order = order_shm.buf.cast('i')
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            start, end, player_centers = msg
+            step_npc_slots(state, capacity, order, start, end, player_centers, world_w, world_h)
+            conn.send(end - start)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        state.release()
+        order.release()
+        state_shm.close()
+        order_shm.close()
+
+
+class NPCWorkerPool:
+    def __init__(self, num_workers, capacity=NPC_AI_CAPACITY, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT):
+        '''
+        Starts the worker processes and allocates the shared NPC state.
+
+        Args:
+            num_workers (int): Number of AI worker processes (>= 1).
+            capacity (int): Maximum NPCs kept in shared memory. NPCs beyond this
+                            are updated on the main thread via NPC.update().
+        '''
+        self.num_workers = max(1, int(num_workers))
+        self.capacity = capacity
+        self.world_width = world_width
+        self.world_height = world_height
+
+        self._state_shm = shared_memory.SharedMemory(create=True, size=NUM_FIELDS * capacity * 8)
+        self._order_shm = shared_memory.SharedMemory(create=True, size=capacity * 4)
+        self.state = self._state_shm.buf.cast('d')
+        self.order = self._order_shm.buf.cast('i')
+
+        self._slots = {} # npc -> slot
+        self._free_slots = list(range(capacity - 1, -1, -1))
+        self.ticks = 0
+
+        self._connections = []
+        self._processes = []
+        for _ in range(self.num_workers):
+            parent_conn, child_conn = _CONTEXT.Pipe()
+            process = _CONTEXT.Process(
+                target=_npc_worker_main,
+                args=(child_conn, self._state_shm.name, self._order_shm.name, capacity, world_width, world_height),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+        print(f"NPCWorkerPool: started {self.num_workers} AI worker(s), capacity {capacity} NPCs.")
+
+    def _assign_slot(self, npc):
+        slot = self._free_slots.pop()
+        cap = self.capacity
+        state = self.state
+        state[F_X * cap + slot] = npc.rect.x
+        state[F_Y * cap + slot] = npc.rect.y
+        state[F_W * cap + slot] = npc.rect.width
+        state[F_H * cap + slot] = npc.rect.height
+        state[F_DIR_X * cap + slot] = npc.direction.x
+        state[F_DIR_Y * cap + slot] = npc.direction.y
+        state[F_MOVE_X * cap + slot] = npc.movement_direction.x
+        state[F_PATROL_L * cap + slot] = npc.patrol_limit_left
+        state[F_PATROL_R * cap + slot] = npc.patrol_limit_right
+        state[F_SPEED * cap + slot] = npc.speed
+        state[F_DETECT * cap + slot] = npc.detection_radius
+        weapon = npc.weapon
+        if weapon is not None and weapon.type == "melee":
+            default_range = npc.rect.width / 2 + PLAYER_RADIUS + 5 # Same fallback as NPC.update()
+            state[F_ATTACK_RANGE * cap + slot] = getattr(weapon, 'range', default_range)
+        else:
+            state[F_ATTACK_RANGE * cap + slot] = -1.0
+        state[F_FOLLOWING * cap + slot] = 0.0
+        state[F_ATTACK * cap + slot] = 0.0
+        state[F_TARGET * cap + slot] = -1.0
+        self._slots[npc] = slot
+        return slot
+
+    def step(self, entity_manager, blackboard, weapon_system, combat_manager=None, effect_manager=None):
+        '''
+        Runs one AI tick for every NPC in entity_manager.npcs and writes the
+        results back onto the NPC sprites.
+        '''
+        self.ticks += 1
+        cap = self.capacity
+        state = self.state
+        slots = self._slots
+        live_npcs = entity_manager.npcs.sprites()
+
+        # Bucket live slots by Room region; NPCs that crossed a room border change bucket here
+        buckets = [[] for _ in range(NUM_REGIONS)]
+        xs = state[F_X * cap:(F_X + 1) * cap].tolist()
+        ys = state[F_Y * cap:(F_Y + 1) * cap].tolist()
+        room_w, room_h = ROOM_WIDTH, ROOM_HEIGHT
+        max_col, max_row = WORLD_ROOM_COLS - 1, WORLD_ROOM_ROWS - 1
+        new_npcs = []
+        seen = 0
+        for npc in live_npcs:
+            slot = slots.get(npc)
+            if slot is None:
+                new_npcs.append(npc)
+                continue
+            seen += 1
+            rect = npc.rect
+            col = int((xs[slot] + rect.width / 2) // room_w)
+            row = int((ys[slot] + rect.height / 2) // room_h)
+            col = 0 if col < 0 else (max_col if col > max_col else col)
+            row = 0 if row < 0 else (max_row if row > max_row else row)
+            buckets[row * WORLD_ROOM_COLS + col].append(slot)
+
+        # Release slots of NPCs that died or were removed since the last tick
+        if seen != len(slots):
+            live = set(live_npcs)
+            for npc in [n for n in slots if n not in live]:
+                self._free_slots.append(slots.pop(npc))
+
+        # Newly spawned NPCs take free slots; any beyond capacity stay on the main thread
+        overflow = []
+        for npc in new_npcs:
+            if not self._free_slots:
+                overflow.append(npc)
+                continue
+            slot = self._assign_slot(npc)
+            rect = npc.rect
+            col = min(max_col, max(0, int(rect.centerx // room_w)))
+            row = min(max_row, max(0, int(rect.centery // room_h)))
+            buckets[row * WORLD_ROOM_COLS + col].append(slot)
+
+        ordered = array('i')
+        for bucket in buckets:
+            ordered.extend(bucket)
+        total = len(ordered)
+        if total:
+            self.order[:total] = ordered
+
+        # Split the region-sorted order into balanced contiguous chunks, one per worker
+        players = blackboard.players
+        player_centers = tuple(blackboard.player_centers) # Each worker picks every NPC's nearest one
+        chunk = (total + self.num_workers - 1) // self.num_workers if total else 0
+        busy = []
+        for index, conn in enumerate(self._connections):
+            start = index * chunk
+            end = min(total, start + chunk)
+            if start < end:
+                conn.send((start, end, player_centers))
+                busy.append(conn)
+        for conn in busy:
+            conn.recv()
+
+        # Write results back to the sprites (main process owns pygame objects)
+        xs = state[F_X * cap:(F_X + 1) * cap].tolist()
+        ys = state[F_Y * cap:(F_Y + 1) * cap].tolist()
+        dxs = state[F_DIR_X * cap:(F_DIR_X + 1) * cap].tolist()
+        dys = state[F_DIR_Y * cap:(F_DIR_Y + 1) * cap].tolist()
+        mxs = state[F_MOVE_X * cap:(F_MOVE_X + 1) * cap].tolist()
+        following = state[F_FOLLOWING * cap:(F_FOLLOWING + 1) * cap].tolist()
+        attacks = state[F_ATTACK * cap:(F_ATTACK + 1) * cap].tolist()
+        targets = state[F_TARGET * cap:(F_TARGET + 1) * cap].tolist()
+        for npc, slot in slots.items():
+            rect = npc.rect
+            rect.x = xs[slot]
+            rect.y = ys[slot]
+            npc.direction.update(dxs[slot], dys[slot])
+            npc.movement_direction.x = mxs[slot]
+            npc.is_following_player = following[slot] != 0.0
+            if attacks[slot] != 0.0 and targets[slot] >= 0:
+                weapon_system.use_weapon(npc, target_info=players[int(targets[slot])]) # The NPC's nearest player
+
+        # NPCs that didn't fit in shared memory fall back to the main-thread update
+        for npc in overflow:
+            npc.update(entity_manager, combat_manager, effect_manager, weapon_system, blackboard=blackboard)
+
+    def close(self):
+        '''Stops the workers and frees the shared memory.'''
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self._connections = []
+        self._processes = []
+        self._slots.clear()
+        self.state.release()
+        self.order.release()
+        self._state_shm.close()
+        self._state_shm.unlink()
+        self._order_shm.close()
+        self._order_shm.unlink()
+        print("NPCWorkerPool: shut down.")
@@ -0,0 +1,284 @@
+from game.core.settings import SPATIAL_GRID_CELL_SIZE
+
+# Damage falloff curves for area-of-effect queries: normalized distance (0 at the centre, 1 at the edge) -> multiplier
+FALLOFF_CURVES = {
+    "none": None, # Full damage anywhere inside the radius
+    "linear": lambda d: 1.0 - d,
+    "quadratic": lambda d: 1.0 - d * d,
+}
+
+def falloff_weights(dist_sqs, radius, falloff="none"):
+    '''
+    Damage multipliers for the squared distances returned by SpatialGrid.query_radius().
+
+    Args:
+        falloff (str): Key of FALLOFF_CURVES.
+    '''
+    curve = FALLOFF_CURVES[falloff]
+    if curve is None or radius <= 0:
+        return [1.0] * len(dist_sqs)
+    inv_radius = 1.0 / radius
+    return [curve(d_sq ** 0.5 * inv_radius) for d_sq in dist_sqs]
+
+def _entry_time(x0, y0, inv_dx, inv_dy, left, top, right, bottom, t_limit):
+    '''
+    Slab test: parameter at which the line (x0, y0) + t * d enters the box,
+    clipped to [0, t_limit], or None if it misses. inv_dx/inv_dy are 1/d per
+    axis, None where that component of d is 0.
+    '''
+    if inv_dx is None:
+        if x0 < left or x0 > right:
+            return None
+        t_enter, t_exit = 0.0, t_limit
+    else:
+        t1 = (left - x0) * inv_dx
+        t2 = (right - x0) * inv_dx
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_enter = t1 if t1 > 0.0 else 0.0
+        t_exit = t2 if t2 < t_limit else t_limit
+        if t_enter > t_exit:
+            return None
+    if inv_dy is None:
+        if y0 < top or y0 > bottom:
+            return None
+    else:
+        t1 = (top - y0) * inv_dy
+        t2 = (bottom - y0) * inv_dy
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_enter:
+            t_enter = t1
+        if t2 < t_exit:
+            t_exit = t2
+        if t_enter > t_exit:
+            return None
+    return t_enter
+
+
+class SpatialGrid:
+    '''
+    Uniform grid over world space used as the broad phase for collision queries.
+
+    Rebuilt from a sprite group once per frame (EntityManager does this for
+    NPCs before resolving collisions). A sprite is filed in every cell its rect
+    overlaps, so a query only has to look at the cells it covers.
+    '''
+    def __init__(self, cell_size=SPATIAL_GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> list of sprites
+        self.count = 0
+
+    def rebuild(self, sprites):
+        cells = {}
+        cell_size = self.cell_size
+        count = 0
+        for sprite in sprites:
+            x, y, w, h = sprite.rect
+            cx0 = x // cell_size
+            cx1 = (x + max(w, 1) - 1) // cell_size
+            cy0 = y // cell_size
+            cy1 = (y + max(h, 1) - 1) // cell_size
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [sprite]
+                    else:
+                        bucket.append(sprite)
+            count += 1
+        self.cells = cells
+        self.count = count
+
+    def query_rect(self, left, top, right, bottom):
+        '''Returns the sprites (without duplicates) filed in the cells overlapping the given world-space box.'''
+        cell_size = self.cell_size
+        cells = self.cells
+        found = []
+        seen = set()
+        for cx in range(int(left // cell_size), int(right // cell_size) + 1):
+            for cy in range(int(top // cell_size), int(bottom // cell_size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for sprite in bucket:
+                        if sprite not in seen:
+                            seen.add(sprite)
+                            found.append(sprite)
+        return found
+
+    def query_radius(self, x, y, radius, skip_dead=False):
+        '''
+        Sprites whose rect centre lies within `radius` of (x, y), for area-of-effect damage.
+
+        Candidates come from the cells under the circle's bounding box in one
+        pass; the distance test is done on squared distances over the whole
+        candidate list at once, without a sqrt or Vector2 per sprite.
+
+        Returns:
+            tuple: (sprites, dist_sqs), parallel lists.
+        '''
+        candidates = self.query_rect(x - radius, y - radius, x + radius, y + radius)
+        if skip_dead:
+            candidates = [sprite for sprite in candidates if getattr(sprite, 'alive', True) is not False]
+        radius_sq = radius * radius
+        centers = [sprite.rect.center for sprite in candidates]
+        dist_sqs = [(cx - x) * (cx - x) + (cy - y) * (cy - y) for cx, cy in centers]
+        inside = [i for i, d_sq in enumerate(dist_sqs) if d_sq <= radius_sq]
+        return [candidates[i] for i in inside], [dist_sqs[i] for i in inside]
+
+    def first_hit(self, x0, y0, x1, y1, half_w=0, half_h=0, skip_dead=False):
+        '''
+        Swept test of a moving box (centre going from (x0, y0) to (x1, y1)) against the grid's sprites.
+
+        Each candidate rect is grown by the moving box's half extents, which
+        turns the box into a point moving along a segment; the segment is then
+        clipped against the grown rect (slab test).
+
+        Args:
+            half_w, half_h (float): Half the size of the moving box (0 for a point/ray).
+            skip_dead (bool): Ignore sprites whose `alive` attribute is False.
+        Returns:
+            tuple: (sprite, t) for the earliest hit, t in [0, 1] along the segment, or (None, None).
+        '''
+        dx = x1 - x0
+        dy = y1 - y0
+        candidates = self.query_rect(min(x0, x1) - half_w, min(y0, y1) - half_h,
+                                     max(x0, x1) + half_w, max(y0, y1) + half_h)
+        inv_dx = 1.0 / dx if dx else None
+        inv_dy = 1.0 / dy if dy else None
+        best = None
+        best_t = 2.0
+        for sprite in candidates:
+            if skip_dead and getattr(sprite, 'alive', True) is False:
+                continue
+            x, y, w, h = sprite.rect
+            t = _entry_time(x0, y0, inv_dx, inv_dy, x - half_w, y - half_h, x + w + half_w, y + h + half_h, 1.0)
+            if t is not None and t < best_t:
+                best_t = t
+                best = sprite
+        if best is None:
+            return None, None
+        return best, best_t
+
+    def raycast(self, x0, y0, dir_x, dir_y, max_distance, skip_dead=False):
+        '''
+        First sprite hit by a ray, walking the grid cell by cell (DDA) from the origin.
+
+        Only the cells the ray passes through are visited, and the walk stops
+        as soon as the closest hit so far lies before the next cell boundary,
+        so the cost depends on the distance to the first hit, not on the number
+        of sprites in the grid.
+
+        Args:
+            dir_x, dir_y (float): Normalized ray direction.
+            max_distance (float): Ray length in pixels.
+            skip_dead (bool): Ignore sprites whose `alive` attribute is False.
+        Returns:
+            tuple: (sprite, distance) for the closest hit, or (None, None).
+        '''
+        cell_size = self.cell_size
+        cells = self.cells
+        cx = int(x0 // cell_size)
+        cy = int(y0 // cell_size)
+        inf = float('inf')
+        if dir_x > 0:
+            step_x, t_max_x, t_delta_x = 1, ((cx + 1) * cell_size - x0) / dir_x, cell_size / dir_x
+        elif dir_x < 0:
+            step_x, t_max_x, t_delta_x = -1, (cx * cell_size - x0) / dir_x, -cell_size / dir_x
+        else:
+            step_x, t_max_x, t_delta_x = 0, inf, inf
+        if dir_y > 0:
+            step_y, t_max_y, t_delta_y = 1, ((cy + 1) * cell_size - y0) / dir_y, cell_size / dir_y
+        elif dir_y < 0:
+            step_y, t_max_y, t_delta_y = -1, (cy * cell_size - y0) / dir_y, -cell_size / dir_y
+        else:
+            step_y, t_max_y, t_delta_y = 0, inf, inf
+        inv_dx = 1.0 / dir_x if dir_x else None
+        inv_dy = 1.0 / dir_y if dir_y else None
+
+        best = None
+        best_t = max_distance
+        tested = set() # Sprites spanning several cells are only tested once
+        while True:
+            bucket = cells.get((cx, cy))
+            if bucket:
+                for sprite in bucket:
+                    if sprite in tested:
+                        continue
+                    tested.add(sprite)
+                    if skip_dead and getattr(sprite, 'alive', True) is False:
+                        continue
+                    x, y, w, h = sprite.rect
+                    t = _entry_time(x0, y0, inv_dx, inv_dy, x, y, x + w, y + h, best_t)
+                    if t is not None and (best is None or t < best_t):
+                        best_t = t
+                        best = sprite
+            t_next = t_max_x if t_max_x < t_max_y else t_max_y
+            if (best is not None and best_t <= t_next) or t_next > max_distance:
+                break
+            if t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+        if best is None:
+            return None, None
+        return best, best_t
+
+    def sweep(self, segments, skip_dead=False):
+        '''
+        Earliest hit for each of a batch of swept boxes.
+
+        Args:
+            segments (list): (x0, y0, x1, y1, half_w, half_h) tuples.
+        Returns:
+            list: (sprite, t) per segment, (None, None) where nothing was hit.
+        '''
+        first_hit = self.first_hit
+        return [first_hit(x0, y0, x1, y1, half_w, half_h, skip_dead) for x0, y0, x1, y1, half_w, half_h in segments]
+
+    def sweep_cluster(self, segments, skip_dead=False):
+        '''
+        Like sweep(), for segments that travel close together (the pellets of
+        one volley): the grid is queried once for the box covering all of them,
+        and each segment is then tested against that shared candidate list.
+        '''
+        if not segments:
+            return []
+        left = top = float('inf')
+        right = bottom = float('-inf')
+        for x0, y0, x1, y1, half_w, half_h in segments:
+            if x0 > x1:
+                x0, x1 = x1, x0
+            if y0 > y1:
+                y0, y1 = y1, y0
+            if x0 - half_w < left:
+                left = x0 - half_w
+            if x1 + half_w > right:
+                right = x1 + half_w
+            if y0 - half_h < top:
+                top = y0 - half_h
+            if y1 + half_h > bottom:
+                bottom = y1 + half_h
+        candidates = self.query_rect(left, top, right, bottom)
+        if skip_dead:
+            candidates = [sprite for sprite in candidates if getattr(sprite, 'alive', True) is not False]
+        if not candidates:
+            return [(None, None)] * len(segments)
+        boxes = [(sprite, sprite.rect) for sprite in candidates]
+        results = []
+        for x0, y0, x1, y1, half_w, half_h in segments:
+            dx = x1 - x0
+            dy = y1 - y0
+            inv_dx = 1.0 / dx if dx else None
+            inv_dy = 1.0 / dy if dy else None
+            best = None
+            best_t = 2.0
+            for sprite, (x, y, w, h) in boxes:
+                t = _entry_time(x0, y0, inv_dx, inv_dy, x - half_w, y - half_h, x + w + half_w, y + h + half_h, 1.0)
+                if t is not None and t < best_t:
+                    best_t = t
+                    best = sprite
+            results.append((best, best_t) if best is not None else (None, None))
+        return results
@@ -4,37 +4,77 @@ from game.entities.npc import NPC # Changed import path
 # Removed: from item import HealthPack
 from game.core.settings import ( # Changed import path
     WORLD_ROOM_COLS, ROOM_WIDTH, WORLD_ROOM_ROWS, ROOM_HEIGHT, 
-    NPC_WIDTH, NPC_HEIGHT, NPC_DETECTION_RADIUS, NPC_CHASE_AREA_MULTIPLIER, ITEM_SIZE, WAVE_REST_TIME
+    NPC_WIDTH, NPC_HEIGHT, NPC_DETECTION_RADIUS, NPC_CHASE_AREA_MULTIPLIER, ITEM_SIZE, WAVE_REST_TIME,
+    WAVE_FIRST_WAVE
 )
 
 class WaveManager:
-    def __init__(self, entity_manager, player_reference, event_manager=None): # event_manager added
+    def __init__(self, entity_manager, player_reference, event_manager=None, blackboard=None, timers=None,
+                 first_wave=None, rest_period=None, npc_speed=None, npc_health=None): # event_manager added
+        '''
+        Args:
+            first_wave (int): Wave to start at instead of WAVE_FIRST_WAVE.
+            rest_period (int): Milliseconds between waves instead of WAVE_REST_TIME.
+            npc_speed, npc_health: Stats of the spawned NPCs instead of NPC_SPEED / NPC_HEALTH.
+        '''
         self.entity_manager = entity_manager # Store entity_manager
         self.event_manager = event_manager # Store event_manager
+        self.blackboard = blackboard # Per-frame shared state (current time, player rect, alive counts)
+        self.timers = timers # Optional TimerWheel: rest periods end via a callback instead of polling
         # self.all_sprites and self.npcs attributes removed
         self.player_ref = player_reference # Store player reference
         
-        # Start at wave 8 (where NPC count is 21)
-        self.current_wave_number = 7 # Will be incremented to 8 on first call to start_next_wave
+        # Start at wave 8 (where NPC count is 21) by default
+        first_wave = WAVE_FIRST_WAVE if first_wave is None else max(1, int(first_wave))
+        self.current_wave_number = first_wave - 1 # Will be incremented to first_wave on first call to start_next_wave
         self.npcs_to_spawn_this_wave = 0
         self.wave_active = False
         self.time_between_waves = 1000  # 1 second in milliseconds (used for initial delay logic)
         self.last_wave_end_time = 0
         self.initial_delay_passed = False # To handle delay before first wave
-        self.rest_period = WAVE_REST_TIME
+        self.rest_period = WAVE_REST_TIME if rest_period is None else rest_period
+        self.npc_speed = npc_speed # None: NPC_SPEED
+        self.npc_health = npc_health # None: NPC_HEALTH
         
-        # Fibonacci sequence tracking, adjusted for starting at wave 8 (F(8) = 21 NPCs)
+        # Fibonacci sequence tracking, adjusted for the first wave (F(8) = 21 NPCs)
         # For wave k > 2, npc_count = fib_a + fib_b. fib_a is F(k-2), fib_b is F(k-1)
         # For first wave being 8 (k=8):
         # fib_a should be F(6) = 8
         # fib_b should be F(7) = 13
-        self.fib_a = 8 
-        self.fib_b = 13
+        # (Waves 1 and 2 set their own values in start_next_wave)
+        self.fib_a, self.fib_b = 0, 1 # F(0), F(1)
+        for _ in range(first_wave - 2):
+            self.fib_a, self.fib_b = self.fib_b, self.fib_a + self.fib_b
 
         # Start the first wave (wave 8) almost immediately by setting last_wave_end_time appropriately
-        self.last_wave_end_time = pygame.time.get_ticks() - self.rest_period 
+        self.last_wave_end_time = self._current_time() - self.rest_period 
         # This ensures the first call to update() will likely trigger start_next_wave()
 
+        self.next_wave_timer = None
+        if self.timers is not None:
+            self.initial_delay_passed = True
+            self.schedule_next_wave(self.last_wave_end_time + self.rest_period)
+
+    def schedule_next_wave(self, deadline):
+        """Starts the next wave at game time `deadline` via the timer wheel, replacing any wave start already pending."""
+        if self.next_wave_timer is not None:
+            self.timers.cancel(self.next_wave_timer)
+        self.next_wave_timer = self.timers.schedule(deadline, self._on_rest_over)
+
+    def _on_rest_over(self):
+        self.next_wave_timer = None
+        self.start_next_wave()
+
+    def _emit(self, event_type):
+        # Wave boundaries for listeners such as the MemoryMonitor; nothing is done when nobody listens
+        if self.event_manager is not None:
+            self.event_manager.emit(event_type, {"wave": self.current_wave_number, "time": self._current_time()})
+
+    def _current_time(self):
+        if self.blackboard is not None:
+            return self.blackboard.current_time
+        return pygame.time.get_ticks()
+
     def _get_spawn_location(self, player_rect):
         min_dist_from_player = 150  # pixels
         max_attempts = 20
@@ -102,16 +142,18 @@ class WaveManager:
         spawn_y_min = 0
         spawn_y_max = max(spawn_y_min, world_h - NPC_HEIGHT)
 
+        player_rect = self.player_ref.rect
         for _ in range(self.npcs_to_spawn_this_wave):
-            spawn_x, spawn_y = self._get_spawn_location(self.player_ref.rect)
+            spawn_x, spawn_y = self._get_spawn_location(player_rect)
             # all_sprites_group argument removed from NPC constructor, pass event_manager
-            npc = NPC(spawn_x, spawn_y, event_manager=self.event_manager) 
+            npc = NPC(spawn_x, spawn_y, event_manager=self.event_manager, speed=self.npc_speed, health=self.npc_health)
             self.entity_manager.add_entity(npc, "npc") # Add NPC via entity_manager
         
         if self.npcs_to_spawn_this_wave == 0 and (spawn_x_min > spawn_x_max or spawn_y_min > spawn_y_max):
              # Handles case where world is too small and no NPCs could be prepared
              print("Could not spawn NPCs for the wave due to world size constraints.")
              self.wave_active = False # Cannot proceed with an empty wave if spawning failed
+        self._emit("WAVE_STARTED_EVENT")
 
     def spawn_npcs(self, count):
         for _ in range(count):
@@ -142,7 +184,19 @@ class WaveManager:
             self.entity_manager.add_entity(npc, "npc") # Add NPC via entity_manager
             
     def update(self):
-        current_time = pygame.time.get_ticks()
+        current_time = self._current_time()
+        # Alive count from the blackboard avoids re-checking the group every frame
+        npcs_alive = self.blackboard.npc_count if self.blackboard is not None else len(self.entity_manager.npcs)
+
+        if self.timers is not None:
+            # Only the wave-cleared check is polled; the next wave starts from the timer wheel
+            if self.wave_active and not npcs_alive:
+                print(f"Wave {self.current_wave_number} cleared!")
+                self.wave_active = False
+                self.last_wave_end_time = current_time
+                self.schedule_next_wave(current_time + self.rest_period)
+                self._emit("WAVE_CLEARED_EVENT")
+            return
 
         if not self.initial_delay_passed:
             if self.last_wave_end_time == 0: # Set for the very first delay
@@ -155,15 +209,16 @@ class WaveManager:
 
         if not self.wave_active:
             # Check if all NPCs from previous wave are cleared
-            if not self.entity_manager.npcs:  # Use entity_manager.npcs
+            if not npcs_alive:
                 if current_time - self.last_wave_end_time > self.rest_period: # Use self.rest_period
                     self.start_next_wave()
         else:
             # Wave is active, check if all NPCs are defeated
-            if not self.entity_manager.npcs: # Use entity_manager.npcs
+            if not npcs_alive:
                 print(f"Wave {self.current_wave_number} cleared!")
                 self.wave_active = False
                 self.last_wave_end_time = current_time
+                self._emit("WAVE_CLEARED_EVENT")
 
     def get_wave_number(self):
         return self.current_wave_number
@@ -172,5 +227,5 @@ class WaveManager:
         if self.wave_active:
             return f"Wave: {self.current_wave_number} (Active - {len(self.entity_manager.npcs)} left)" # Use entity_manager.npcs
         else:
-            time_to_next_wave = (self.rest_period - (pygame.time.get_ticks() - self.last_wave_end_time)) / 1000
+            time_to_next_wave = (self.rest_period - (self._current_time() - self.last_wave_end_time)) / 1000
             return f"Wave: {self.current_wave_number} (Resting - Next in {max(0, time_to_next_wave):.1f}s)"
@@ -4,14 +4,26 @@
 import pygame
 from game.entities.projectile import Projectile # Corrected import
 from game.entities.grenade import Grenade     # Corrected import
-# from game.core.settings import MELEE_ATTACK_COLOR # Example, if needed directly
+from game.entities.volley import Volley
+from game.systems.cooldown_store import CooldownStore
+from game.core.settings import HITSCAN_BEAM_WIDTH, HITSCAN_BEAM_DURATION
 
 class WeaponSystem:
-    def __init__(self, entity_manager, effect_manager, combat_manager):
+    def __init__(self, entity_manager, effect_manager, combat_manager, blackboard=None, timers=None):
         self.entity_manager = entity_manager
         self.effect_manager = effect_manager
         self.combat_manager = combat_manager
-        self.last_use_times = {}
+        self.blackboard = blackboard # Per-frame shared state (current time etc.), refreshed by Game
+        self.timers = timers # Optional TimerWheel so grenades detonate on fuse
+        # Cooldowns of managed entities, indexed by their handle and freed when they're removed
+        self.cooldowns = CooldownStore()
+        entity_manager.removal_listeners.append(self.cooldowns.release)
+        self.last_use_times = {} # Only for wielders without a handle (not added to the EntityManager)
+
+    def clear_cooldowns(self):
+        """Forgets all cooldowns (e.g. on game reset)."""
+        self.cooldowns.clear()
+        self.last_use_times.clear()
 
     def _get_melee_attack_rect(self, wielder_entity):
         # ... (implementation from previous step, ensure it's correct) ...
@@ -37,21 +49,57 @@ class WeaponSystem:
         return attack_rect
 
 
+    def _fire_hitscan(self, wielder_entity, weapon):
+        '''
+        Resolves a hitscan shot instantly: one DDA raycast through the NPC grid,
+        damage to the first NPC hit, and a short beam visual. No projectile entity is created.
+        Returns the NPC hit, or None.
+        '''
+        direction = getattr(wielder_entity, 'direction', pygame.math.Vector2(0,1))
+        fire_direction = direction.normalize() if direction.length_squared() > 0 else pygame.math.Vector2(0,1)
+        radius = getattr(wielder_entity, 'radius', wielder_entity.rect.width / 2)
+        origin_x = wielder_entity.rect.centerx + fire_direction.x * radius
+        origin_y = wielder_entity.rect.centery + fire_direction.y * radius
+        max_distance = getattr(weapon, 'range', 600)
+
+        # The grid is rebuilt every frame by EntityManager.handle_collisions(); NPCs killed since are skipped
+        npc, distance = self.entity_manager.npc_grid.raycast(origin_x, origin_y, fire_direction.x, fire_direction.y,
+                                                             max_distance, skip_dead=True)
+        beam_length = distance if npc is not None else max_distance
+        self.effect_manager.create_attack_visual(
+            center_pos=(origin_x + fire_direction.x * beam_length / 2, origin_y + fire_direction.y * beam_length / 2),
+            width=max(beam_length, 1),
+            height=HITSCAN_BEAM_WIDTH,
+            direction_vector=fire_direction,
+            color=weapon.projectile_color,
+            duration=HITSCAN_BEAM_DURATION
+        )
+        if npc is not None:
+            npc.take_damage(weapon.damage, wielder_entity)
+        return npc
+
     def use_weapon(self, wielder_entity, target_info=None): # target_info for NPC->Player attacks primarily
         weapon = wielder_entity.weapon
         if not weapon:
             return False
 
-        current_time = pygame.time.get_ticks()
-        cooldown_key = (id(wielder_entity), weapon.type)
-        last_use = self.last_use_times.get(cooldown_key, 0)
-        
-        # Ensure fire_rate is a positive number to avoid division by zero or negative cooldowns
-        fire_rate_seconds = getattr(weapon, 'fire_rate', 1.0) # Default to 1s if not set
-        if fire_rate_seconds <= 0:
-            fire_rate_seconds = 0.001 # Prevent zero or negative cooldowns
+        blackboard = self.blackboard
+        current_time = blackboard.current_time if blackboard is not None else pygame.time.get_ticks()
+        handle = getattr(wielder_entity, 'handle', None)
+
+        # Weapon precomputes its cooldown; fall back for weapon-like objects that don't
+        cooldown_ms = getattr(weapon, 'cooldown_ms', None)
+        if cooldown_ms is None:
+            # Ensure fire_rate is a positive number to avoid division by zero or negative cooldowns
+            fire_rate_seconds = getattr(weapon, 'fire_rate', 1.0) # Default to 1s if not set
+            if fire_rate_seconds <= 0:
+                fire_rate_seconds = 0.001 # Prevent zero or negative cooldowns
+            cooldown_ms = fire_rate_seconds * 1000
 
-        if current_time - last_use < fire_rate_seconds * 1000:
+        if handle is not None:
+            if not self.cooldowns.is_ready(handle, weapon.type, current_time):
+                return False # Still in cooldown
+        elif current_time - self.last_use_times.get((id(wielder_entity), weapon.type), 0) < cooldown_ms:
             return False # Still in cooldown
 
         action_performed = False
@@ -68,8 +116,13 @@ class WeaponSystem:
             proj_x = wielder_entity.rect.centerx + spawn_offset.x
             proj_y = wielder_entity.rect.centery + spawn_offset.y
 
-            if weapon.type == "ranged":
-                projectile = Projectile(proj_x, proj_y, fire_direction, weapon)
+            if weapon.type == "ranged" and getattr(weapon, 'pellets', 1) > 1:
+                # Multi-pellet weapon: the whole shot is one Volley entity
+                volley = Volley(proj_x, proj_y, fire_direction, weapon, blackboard=blackboard, owner=wielder_entity)
+                self.entity_manager.add_entity(volley, "volley")
+                action_performed = True
+            elif weapon.type == "ranged":
+                projectile = Projectile(proj_x, proj_y, fire_direction, weapon, blackboard=blackboard, owner=wielder_entity)
                 self.entity_manager.add_entity(projectile, "projectile")
                 action_performed = True
             elif weapon.type == "grenade":
@@ -78,10 +131,18 @@ class WeaponSystem:
                 npcs_group = self.entity_manager.npcs # Grenade's internal targeting uses this
                 grenade = Grenade(proj_x, proj_y, fire_direction, weapon, 
                                   npcs_group, # Pass the group of NPCs for grenade's own targeting
-                                  wielder_entity) # Owner
+                                  wielder_entity, # Owner
+                                  blackboard=blackboard,
+                                  effect_manager=self.effect_manager, # So the fuse can detonate it
+                                  timers=self.timers,
+                                  spatial_index=self.entity_manager.npc_grid) # Radius query for the explosion
                 self.entity_manager.add_entity(grenade, "projectile")
                 action_performed = True
         
+        elif weapon.type == "hitscan":
+            self._fire_hitscan(wielder_entity, weapon)
+            action_performed = True
+
         elif weapon.type == "melee":
             attack_rect = self._get_melee_attack_rect(wielder_entity)
             if attack_rect:
@@ -108,8 +169,11 @@ class WeaponSystem:
                 action_performed = True
 
         if action_performed:
-            self.last_use_times[cooldown_key] = current_time
-            print(f"WeaponSystem: {wielder_entity.__class__.__name__} (ID: {id(wielder_entity)}) successfully used {weapon.name}")
+            if handle is not None:
+                self.cooldowns.start(handle, weapon.type, current_time + cooldown_ms)
+            else:
+                self.last_use_times[(id(wielder_entity), weapon.type)] = current_time
+            print(f"WeaponSystem: {wielder_entity.__class__.__name__} (handle: {handle}) successfully used {weapon.name}")
             return True
         
         return False # No action performed (e.g. wrong weapon type if not caught above, or other failure)
@@ -0,0 +1,84 @@
+import json
+import os
+import pygame
+from game.core.settings import FONT_CACHE_FILE
+
+class FontManager:
+    '''
+    Hands out pygame fonts, creating each (name, size, bold, italic) only once.
+
+    pygame.font.SysFont scans every installed font (fc-list on Linux) the first time it is
+    called, even for the built-in default font, which is most of Game's startup on some systems.
+    Here name=None goes straight to pygame's built-in font without a scan. A named font is
+    resolved to a file with pygame.font.match_font once, and the path is saved to `cache_file`
+    so later runs open the file directly. Fonts that weren't found are remembered as well.
+    '''
+    def __init__(self, cache_file=FONT_CACHE_FILE):
+        """
+        Args:
+            cache_file (str): JSON file of resolved font paths (None: don't persist).
+        """
+        self.cache_file = cache_file
+        self._fonts = {} # (name, size, bold, italic) -> pygame.font.Font
+        self._paths = self._load_paths() # "name|bold|italic" -> file path, or None when not installed
+        self.resolved = 0 # Font lookups that needed a system font scan
+
+    def _load_paths(self):
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                paths = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"FontManager: ignoring unreadable font cache {self.cache_file}: {e}")
+            return {}
+        # Drop fonts that were uninstalled or moved since they were cached
+        return {key: path for key, path in paths.items() if path is None or os.path.exists(path)}
+
+    def _save_paths(self):
+        if self.cache_file is None:
+            return
+        try:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._paths, f, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"FontManager: could not write font cache {self.cache_file}: {e}")
+
+    def font_path(self, name, bold=False, italic=False):
+        """
+        Returns the file of a system font, or None for pygame's built-in font.
+
+        Args:
+            name (str | None): Font family, e.g. "arial"; None is the built-in font.
+            bold (bool), italic (bool): Style to look for.
+        """
+        if name is None:
+            return None
+        key = f"{name.lower()}|{int(bold)}|{int(italic)}"
+        if key not in self._paths:
+            self._paths[key] = pygame.font.match_font(name, bold, italic) # The slow system scan
+            self.resolved += 1
+            if self._paths[key] is None:
+                print(f"FontManager: font '{name}' not found, using the default font.")
+            self._save_paths()
+        return self._paths[key]
+
+    def get(self, name, size, bold=False, italic=False):
+        """
+        Returns the font for `name` at `size`, creating it on first use.
+
+        Args:
+            name (str | None): Font family, or None for pygame's built-in font (same as SysFont(None, size)).
+            size (int): Point size.
+            bold (bool), italic (bool): Style.
+        """
+        key = (name, size, bold, italic)
+        font = self._fonts.get(key)
+        if font is None:
+            path = self.font_path(name, bold, italic)
+            font = pygame.font.Font(path, size)
+            if path is None: # Built-in or missing font: fake the style like SysFont does
+                font.set_bold(bold)
+                font.set_italic(italic)
+            self._fonts[key] = font
+        return font
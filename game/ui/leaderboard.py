@@ -1,41 +1,150 @@
+import csv
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, desc, asc
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.exc import SQLAlchemyError
+import heapq
+import itertools
+import json
+import os
+import threading
+from collections import Counter
+from game.core.settings import (
+    LEADERBOARD_BACKEND, LEADERBOARD_TOP_CACHE_SIZE, LEADERBOARD_WINDOW_SIZE, LEADERBOARD_WINDOW_RETENTION,
+    LEADERBOARD_BATCH_SIZE
+)
+from game.ui.leaderboard_backends import create_backend
+from game.ui.score_histogram import ScoreHistogram
 
-# Define the base for declarative models
-Base = declarative_base()
+TIME_WINDOWS = ("daily", "weekly")
+_WINDOW_LENGTHS = {"daily": datetime.timedelta(days=1), "weekly": datetime.timedelta(weeks=1)}
 
-class Score(Base):
-    """SQLAlchemy model for the scores table."""
-    __tablename__ = 'scores'
+def period_key(window, timestamp):
+    """Returns the period of `window` that `timestamp` falls in, e.g. "2024-03-09" or "2024-W10"."""
+    if window == "daily":
+        return timestamp.strftime("%Y-%m-%d")
+    year, week, _ = timestamp.isocalendar()
+    return f"{year}-W{week:02d}"
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String, nullable=False)
-    score = Column(Integer, nullable=False)
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+def period_start(window, timestamp):
+    """Returns the first instant of the period of `window` that `timestamp` falls in."""
+    day = datetime.datetime(timestamp.year, timestamp.month, timestamp.day)
+    if window == "daily":
+        return day
+    return day - datetime.timedelta(days=timestamp.weekday()) # ISO weeks start on Monday
 
-    def __repr__(self):
-        return f"<Score(name='{self.name}', score={self.score}, timestamp='{self.timestamp}')>"
+SCORE_FILE_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+def _score_file_format(path, file_format):
+    if file_format is None:
+        file_format = SCORE_FILE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format not in ("csv", "jsonl"):
+        print(f"Error: Can't tell the score file format of '{path}' (use .csv or .jsonl, or pass file_format).")
+        return None
+    return file_format
+
+def _parse_score(value):
+    if isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None # add_scores() skips the row
+
+def _naive_utc(timestamp):
+    """Timestamps are stored as naive UTC (like the default clock); an aware one is converted."""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _parse_timestamp(value):
+    if not value:
+        return None # Stamped with the current time on import
+    if isinstance(value, datetime.datetime):
+        return _naive_utc(value)
+    try:
+        return _naive_utc(datetime.datetime.fromisoformat(value)) # "...Z" and "+00:00" offsets too
+    except (TypeError, ValueError):
+        return None
+
+def valid_score(name, score):
+    """True if add_scores() would store this entry (a non-empty name and an integer score)."""
+    return isinstance(name, str) and bool(name.strip()) and isinstance(score, int)
+
+def read_score_file(path, file_format=None):
+    """
+    Yields (name, score, timestamp) tuples from a CSV (name,score,timestamp header) or JSONL file,
+    one line at a time. Unparseable scores come through as None so add_scores() can skip them.
+    """
+    file_format = _score_file_format(path, file_format)
+    if file_format is None:
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        if file_format == "csv":
+            for row in csv.DictReader(f):
+                yield row.get("name"), _parse_score(row.get("score")), _parse_timestamp(row.get("timestamp"))
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield None, None, None
+                    continue
+                yield record.get("name"), _parse_score(record.get("score")), _parse_timestamp(record.get("timestamp"))
 
 class Leaderboard:
-    def __init__(self, db_name="leaderboard.db"):
+    def __init__(self, db_name="leaderboard.db", top_cache_size=LEADERBOARD_TOP_CACHE_SIZE,
+                 window_size=LEADERBOARD_WINDOW_SIZE, clock=None, backend=None):
         """
-        Initializes the Leaderboard, setting up the SQLAlchemy engine and session.
-        It also ensures the 'scores' table is created.
+        Initializes the Leaderboard on a storage backend with one persistent, tuned
+        connection. The backend ensures the tables and their indexes exist.
 
         Args:
             db_name (str): The name of the SQLite database file.
+            top_cache_size (int): Number of top scores kept in memory (0 disables the cache).
+            window_size (int): Number of top scores kept per daily/weekly period.
+            clock (callable): Optional source of the current UTC time (defaults to datetime.utcnow).
+            backend: Optional backend name ("sqlite3" or "sqlalchemy") or backend object
+                     (see game.ui.leaderboard_backends); defaults to LEADERBOARD_BACKEND.
         """
-        db_url = f"sqlite:///{db_name}"
-        self.engine = create_engine(db_url)
-        Base.metadata.create_all(self.engine) # Creates table if it doesn't exist
-        self.Session = sessionmaker(bind=self.engine)
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend or LEADERBOARD_BACKEND, db_name)
+        self.backend = backend
+        # The lock serializes the game thread and worker threads (AsyncLeaderboardClient, LeaderboardServer)
+        self._lock = threading.Lock()
+
+        # Write-through top-N cache. The heap is a min-heap on (score, -time), so its root is the
+        # entry a new score has to beat; _top_sorted is the display order, rebuilt lazily.
+        self.top_cache_size = top_cache_size
+        self._top_heap = None # None = not loaded (or invalidated)
+        self._top_sorted = None
+        self._top_complete = False # True when the table has fewer rows than the cache holds
+        self._top_sequence = itertools.count() # Tie-breaker so heap entries never compare names
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_updates = 0 # add_score calls that changed the cached top-N
+        self.cache_skips = 0 # add_score calls that couldn't affect it (no query needed)
+
+        # Daily/weekly leaderboards: add_score keeps the top `window_size` of the current periods in
+        # window_top_scores; periods older than LEADERBOARD_WINDOW_RETENTION are compacted away on rollover
+        self.window_size = window_size
+        self.clock = clock if clock is not None else datetime.datetime.utcnow
+        self._window_states = {} # window -> [current period, rows in it, last-place score], to skip queries and detect rollover
+        with self._lock:
+            self._backfill_windows()
+
+        # Rank/percentile queries are answered from the in-memory histogram, loaded from score_histogram
+        self.histogram = ScoreHistogram()
+        with self._lock:
+            self._load_histogram()
+
+    def close(self):
+        """Closes the backend's connection."""
+        with self._lock:
+            self.backend.close()
 
     def add_score(self, name, score):
         """
-        Adds a new score to the leaderboard using SQLAlchemy.
+        Adds a new score to the leaderboard.
 
         Args:
             name (str): The name of the player.
@@ -48,44 +157,369 @@ class Leaderboard:
             print("Error: Score must be an integer.")
             return
 
-        session = self.Session()
+        timestamp = self.clock() # Set here rather than by the column default so the caches know it
+        with self._lock:
+            try:
+                self.backend.insert_scores([(name, score, timestamp)])
+                self.backend.add_to_histogram([(score, 1)])
+                for window in TIME_WINDOWS:
+                    self._add_to_window(window, name, score, timestamp)
+                self.backend.commit()
+                print(f"Score added for {name}: {score}")
+            except self.backend.errors as e:
+                self.backend.rollback()
+                self._invalidate_top_cache()
+                self._window_states.clear() # Re-read from the table on the next add
+                print(f"Database error while adding score: {e}")
+                return
+            self._cache_new_score(name, score, timestamp)
+            self.histogram.add(score)
+
+    def add_scores(self, scores, batch_size=LEADERBOARD_BATCH_SIZE, raise_errors=False):
+        """
+        Adds many scores at once, `batch_size` rows per transaction (one executemany each).
+
+        Args:
+            scores (iterable): (name, score) or (name, score, timestamp) tuples. Consumed lazily,
+                               so a generator over a huge file never sits in memory as a whole.
+            batch_size (int): Rows per transaction.
+            raise_errors (bool): Re-raise a database error (after the rollback) instead of only
+                                 stopping, for callers that must report it (LeaderboardServer).
+
+        Returns:
+            int: Number of scores added. Invalid entries are skipped and counted in a summary line;
+                 a database error stops the import after the last committed batch.
+        """
+        added = skipped = 0
+        batch = []
+        for entry in scores:
+            name, score = entry[0], entry[1]
+            if not valid_score(name, score):
+                skipped += 1
+                continue
+            timestamp = _naive_utc(entry[2]) if len(entry) > 2 and entry[2] is not None else self.clock()
+            batch.append((name, score, timestamp))
+            if len(batch) >= batch_size:
+                if not self._insert_batch(batch, raise_errors):
+                    break
+                added += len(batch)
+                batch = []
+        else:
+            if batch and self._insert_batch(batch, raise_errors):
+                added += len(batch)
+        if skipped:
+            print(f"Skipped {skipped} invalid scores.")
+        print(f"Added {added} scores.")
+        return added
+
+    def _insert_batch(self, batch, raise_errors=False):
+        buckets = Counter(score for _, score, _ in batch)
+        with self._lock:
+            try:
+                self.backend.insert_scores(batch) # executemany
+                self.backend.add_to_histogram(list(buckets.items()))
+                for window in TIME_WINDOWS:
+                    start = period_start(window, self.clock())
+                    end = start + _WINDOW_LENGTHS[window]
+                    for name, score, timestamp in batch:
+                        if start <= timestamp < end: # Rows from other periods never reach the windows
+                            self._add_to_window(window, name, score, timestamp)
+                self.backend.commit()
+            except self.backend.errors as e:
+                self.backend.rollback()
+                self._window_states.clear()
+                print(f"Database error while adding scores: {e}")
+                if raise_errors:
+                    raise
+                return False
+            except Exception:
+                # Not a database error, but the rows are already in the transaction: don't leave them
+                # for the next commit while the histogram and windows never saw them
+                self.backend.rollback()
+                self._window_states.clear()
+                raise
+            finally:
+                self._invalidate_top_cache() # One reload beats a heap update per row
+            self.histogram.add_many(buckets.items())
+        return True
+
+    def import_scores(self, path, file_format=None, batch_size=LEADERBOARD_BATCH_SIZE):
+        """
+        Streams scores from a CSV or JSONL file into the leaderboard (see read_score_file()).
+
+        Returns:
+            int: Number of scores added.
+        """
+        return self.add_scores(read_score_file(path, file_format), batch_size)
+
+    def export_scores(self, path, file_format=None, batch_size=LEADERBOARD_BATCH_SIZE):
+        """
+        Writes every score to a CSV or JSONL file, `batch_size` rows at a time.
+
+        The backend reads on its own connection, so the export sees a consistent snapshot (WAL)
+        without holding the lock that add_score() needs.
+
+        Returns:
+            int: Number of scores written, or 0 on error.
+        """
+        file_format = _score_file_format(path, file_format)
+        if file_format is None:
+            return 0
+        written = 0
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f) if file_format == "csv" else None
+                if writer is not None:
+                    writer.writerow(("name", "score", "timestamp"))
+                for rows in self.backend.iter_scores(batch_size):
+                    if writer is not None:
+                        writer.writerows((name, score, timestamp.isoformat(sep=' ') if timestamp else "")
+                                         for name, score, timestamp in rows)
+                    else:
+                        f.writelines(json.dumps({"name": name, "score": score,
+                                                 "timestamp": timestamp.isoformat(sep=' ') if timestamp else None}) + "\n"
+                                     for name, score, timestamp in rows)
+                    written += len(rows)
+        except self.backend.errors + (OSError,) as e:
+            print(f"Error while exporting scores: {e}")
+            return 0
+        print(f"Exported {written} scores to {path}.")
+        return written
+
+    def _add_to_window(self, window, name, score, timestamp):
+        """Puts a score into the window's current top table if it makes the cut. Caller holds the lock."""
+        period = period_key(window, timestamp)
+        state = self._window_states.get(window)
+        if state is None or state[0] != period:
+            # First score of a new period (or of this session): compact, then read the period's size and cutoff
+            self._compact_window(window, timestamp)
+            scores = self.backend.window_scores(window, period, self.window_size)
+            state = [period, len(scores), scores[-1] if scores else None]
+            self._window_states[window] = state
+
+        _, size, cutoff = state
+        if size >= self.window_size and score <= cutoff:
+            return # Doesn't beat the current last place (on a tie the earlier score stays); no query needed
+        self.backend.insert_window_scores(window, period, [(name, score, timestamp)])
+        if size < self.window_size:
+            state[1] = size + 1
+        else:
+            self.backend.trim_window(window, period, self.window_size) # The table was full, so one row dropped out
+        if state[1] >= self.window_size:
+            state[2] = self.backend.window_score_at(window, period, self.window_size - 1)
+
+    def _compact_window(self, window, now):
+        """Deletes the periods of `window` that fell out of its retention. Caller holds the lock."""
+        keep = LEADERBOARD_WINDOW_RETENTION[window]
+        oldest_kept = period_key(window, now - _WINDOW_LENGTHS[window] * (keep - 1))
+        removed = self.backend.delete_windows_before(window, oldest_kept)
+        if removed:
+            print(f"Leaderboard: compacted {removed} {window} rows older than {oldest_kept}.")
+
+    def compact_windows(self):
+        """Drops daily/weekly tops older than their retention. add_score() does this on every rollover."""
+        with self._lock:
+            try:
+                for window in TIME_WINDOWS:
+                    self._compact_window(window, self.clock())
+                self.backend.commit()
+            except self.backend.errors as e:
+                self.backend.rollback()
+                print(f"Database error while compacting leaderboard windows: {e}")
+
+    def _backfill_windows(self):
+        """
+        Fills the current periods from the scores table when window_top_scores is empty, e.g. for a
+        database written before the windows existed. Caller holds the lock.
+        """
+        try:
+            if self.backend.has_window_scores():
+                self.backend.commit()
+                return
+            now = self.clock()
+            for window in TIME_WINDOWS:
+                rows = self.backend.top_scores(self.window_size, since=period_start(window, now))
+                self.backend.insert_window_scores(window, period_key(window, now), rows)
+            self.backend.commit()
+        except self.backend.errors as e:
+            self.backend.rollback()
+            print(f"Database error while filling leaderboard windows: {e}")
+
+    def _load_histogram(self):
+        """Loads score_histogram into memory, building it first if the table predates it. Caller holds the lock."""
         try:
-            new_score = Score(name=name, score=score)
-            session.add(new_score)
-            session.commit()
-            print(f"Score added for {name}: {score}")
-        except SQLAlchemyError as e:
-            session.rollback()
-            print(f"Database error while adding score: {e}")
-        finally:
-            session.close()
+            rows = self.backend.histogram_counts()
+            if not rows and self.backend.has_scores():
+                self._rebuild_histogram()
+                return
+            self.backend.commit()
+            self.histogram.load(rows)
+        except self.backend.errors as e:
+            self.backend.rollback()
+            print(f"Database error while loading the score histogram: {e}")
+
+    def _rebuild_histogram(self):
+        """Recounts score_histogram from the scores table (one full pass). Caller holds the lock."""
+        rows = self.backend.recount_histogram()
+        self.backend.commit()
+        self.histogram.load(rows)
+        print(f"Leaderboard: rebuilt score histogram ({len(rows)} distinct scores, {self.histogram.total} rows).")
+
+    def rebuild_histogram(self):
+        """Recounts the rank histogram, e.g. after the scores table was changed outside add_score()."""
+        with self._lock:
+            try:
+                self._rebuild_histogram()
+            except self.backend.errors as e:
+                self.backend.rollback()
+                print(f"Database error while rebuilding the score histogram: {e}")
+
+    def get_rank(self, score):
+        """
+        Returns the leaderboard position `score` has (or would have), from the in-memory histogram.
+
+        Args:
+            score (int): The score to rank.
+
+        Returns:
+            int: 1 + the number of recorded scores strictly higher; equal scores share a rank.
+                 None if `score` is not an integer.
+        """
+        if not isinstance(score, int):
+            print("Error: Score must be an integer.")
+            return None
+        with self._lock:
+            return self.histogram.count_above(score) + 1
+
+    def get_percentile(self, score):
+        """
+        Returns how far up the leaderboard `score` is, as "top X%".
+
+        Args:
+            score (int): The score to rank.
+
+        Returns:
+            float: get_rank(score) as a percentage of the recorded scores (12.0 means top 12%),
+                   capped at 100. None if `score` is not an integer.
+        """
+        return self.get_rank_and_percentile(score)[1]
 
-    def get_top_scores(self, count=10):
+    def get_rank_and_percentile(self, score):
         """
-        Retrieves the top N scores from the leaderboard using SQLAlchemy.
+        Returns get_rank(score) and get_percentile(score) from one histogram lookup.
+
+        Args:
+            score (int): The score to rank.
+
+        Returns:
+            tuple: (rank, percentile), both None if `score` is not an integer.
+        """
+        if not isinstance(score, int):
+            print("Error: Score must be an integer.")
+            return None, None
+        with self._lock:
+            total = self.histogram.total
+            rank = self.histogram.count_above(score) + 1
+        return rank, min(100.0, rank * 100.0 / max(total, 1))
+
+    def score_count(self):
+        """Returns the number of recorded scores, without a COUNT(*) over the table."""
+        with self._lock:
+            return self.histogram.total
+
+    def _heap_entry(self, name, score, timestamp):
+        # NULL timestamps (rows written outside add_score) sort first in SQL, i.e. as the oldest
+        age = -timestamp.timestamp() if timestamp is not None else float('inf')
+        return (score, age, next(self._top_sequence), name, timestamp)
+
+    def _cache_new_score(self, name, score, timestamp):
+        """Write-through: updates the cached top-N for a committed score. Caller holds the lock."""
+        heap = self._top_heap
+        if heap is None:
+            return # Not loaded yet; the next read loads it from the table
+        entry = self._heap_entry(name, score, timestamp)
+        if len(heap) < self.top_cache_size and self._top_complete:
+            heapq.heappush(heap, entry) # Table still smaller than the cache: every score belongs in it
+        elif heap and entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry) # Beats the current last place
+        else:
+            self.cache_skips += 1
+            return
+        self._top_sorted = None
+        self.cache_updates += 1
+
+    def _invalidate_top_cache(self):
+        self._top_heap = None
+        self._top_sorted = None
+
+    def invalidate_cache(self):
+        """Drops the cached top-N, e.g. after the table was changed outside add_score()."""
+        with self._lock:
+            self._invalidate_top_cache()
+
+    def cache_stats(self):
+        """Returns the top-N cache counters and hit rate as a dict."""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "size": self.top_cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "updates": self.cache_updates,
+            "skips": self.cache_skips,
+        }
+
+    def get_top_scores(self, count=10, window="all"):
+        """
+        Retrieves the top N scores from the leaderboard.
 
         Args:
             count (int): The number of top scores to retrieve.
+            window (str): "all" for all-time, or "daily"/"weekly" for the current day/ISO week
+                          (at most `window_size` entries).
 
         Returns:
-            list: A list of Score objects (or dictionaries/tuples if processed).
+            list: A list of (name, score, timestamp) tuples.
                   Returns an empty list if no scores or an error occurs.
         """
         if not isinstance(count, int) or count <= 0:
             print("Error: Count must be a positive integer.")
             return []
-
-        session = self.Session()
-        try:
-            # Querying Score objects directly
-            top_scores_objects = session.query(Score).order_by(desc(Score.score), asc(Score.timestamp)).limit(count).all()
-            # You can return the objects directly or process them into tuples/dictionaries as before
-            return [(s.name, s.score, s.timestamp) for s in top_scores_objects]
-        except SQLAlchemyError as e:
-            print(f"Database error while fetching top scores: {e}")
+        if window != "all" and window not in TIME_WINDOWS:
+            print(f"Error: Unknown leaderboard window '{window}'.")
             return []
-        finally:
-            session.close()
+
+        with self._lock:
+            try:
+                if window != "all":
+                    # Small materialized table: no scan of `scores` by timestamp
+                    rows = self.backend.window_top(window, period_key(window, self.clock()), count)
+                    self.backend.commit() # End the read transaction so WAL checkpoints aren't held back
+                    return rows
+                if count > self.top_cache_size:
+                    self.cache_misses += 1
+                    rows = self.backend.top_scores(count) # More than the cache holds
+                    self.backend.commit()
+                    return rows
+                if self._top_heap is None:
+                    self.cache_misses += 1
+                    rows = self.backend.top_scores(self.top_cache_size)
+                    self.backend.commit()
+                    self._top_heap = [self._heap_entry(*row) for row in rows]
+                    heapq.heapify(self._top_heap)
+                    self._top_complete = len(rows) < self.top_cache_size
+                    self._top_sorted = rows
+                else:
+                    self.cache_hits += 1
+                    if self._top_sorted is None:
+                        self._top_sorted = [(name, score, timestamp) for score, _, _, name, timestamp
+                                            in sorted(self._top_heap, reverse=True)]
+                return self._top_sorted[:count]
+            except self.backend.errors as e:
+                self.backend.rollback()
+                self._invalidate_top_cache()
+                print(f"Database error while fetching top scores: {e}")
+                return []
 
 # Example Usage (optional - for testing the class directly)
 if __name__ == '__main__':
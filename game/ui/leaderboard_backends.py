@@ -0,0 +1,185 @@
+import datetime
+import sqlite3
+from game.core.settings import LEADERBOARD_SQLITE_CACHE_KIB
+
+# Leaderboard storage backends.
+#
+# Leaderboard keeps the caches, the rank histogram and the window bookkeeping; a backend only runs
+# the SQL. Every backend has the methods of SQLiteBackend below and an `errors` tuple of the
+# exceptions its database raises. Methods are called with the Leaderboard's lock held, and nothing
+# is committed until Leaderboard calls commit().
+#
+# "sqlite3" (the default) uses only the standard library. "sqlalchemy" lives in
+# game.ui.leaderboard_sqlalchemy and is imported only when selected, so SQLAlchemy stays off the
+# startup path. Both use the same schema, so either can open a file written by the other.
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        score INTEGER NOT NULL,
+        timestamp DATETIME)""",
+    # Matches the top-N ordering (score DESC, timestamp ASC): a top-N read is the first `count` index entries
+    "CREATE INDEX IF NOT EXISTS ix_scores_score_desc_timestamp ON scores (score DESC, timestamp)",
+    # Rows per score value, for rank queries
+    """CREATE TABLE IF NOT EXISTS score_histogram (
+        score INTEGER NOT NULL PRIMARY KEY,
+        count INTEGER NOT NULL)""",
+    # Materialized top scores of the current days/ISO weeks
+    """CREATE TABLE IF NOT EXISTS window_top_scores (
+        id INTEGER NOT NULL PRIMARY KEY,
+        "window" VARCHAR NOT NULL,
+        period VARCHAR NOT NULL,
+        name VARCHAR NOT NULL,
+        score INTEGER NOT NULL,
+        timestamp DATETIME NOT NULL)""",
+    'CREATE INDEX IF NOT EXISTS ix_window_top_scores_period_rank ON window_top_scores ("window", period, score DESC, timestamp)',
+)
+
+def tune_connection(dbapi_connection):
+    # WAL: commits append to the log instead of rewriting pages, and readers don't block the writer.
+    # synchronous=NORMAL: fsync at checkpoints rather than every commit (safe with WAL).
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size=-{LEADERBOARD_SQLITE_CACHE_KIB}") # Negative = size in KiB
+    cursor.close()
+
+def _encode_timestamp(timestamp):
+    # Same text format SQLAlchemy's DateTime uses on SQLite, so files stay interchangeable
+    return timestamp.isoformat(sep=' ', timespec='microseconds') if timestamp is not None else None
+
+def _decode_timestamp(text):
+    return datetime.datetime.fromisoformat(text) if text else None
+
+_WINDOW_ORDER = 'WHERE "window" = ? AND period = ? ORDER BY score DESC, timestamp ASC'
+
+class SQLiteBackend:
+    """Leaderboard storage on the standard library's sqlite3 module (no third-party imports)."""
+    errors = (sqlite3.Error,)
+
+    def __init__(self, db_name):
+        """
+        Args:
+            db_name (str): The name of the SQLite database file.
+        """
+        self.db_name = db_name
+        # Used by the game thread and by worker threads (AsyncLeaderboardClient, LeaderboardServer);
+        # Leaderboard's lock serializes them
+        self.connection = sqlite3.connect(db_name, check_same_thread=False)
+        tune_connection(self.connection)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+
+    def insert_scores(self, rows):
+        """Inserts (name, score, timestamp) rows with one executemany."""
+        self.connection.executemany("INSERT INTO scores (name, score, timestamp) VALUES (?, ?, ?)",
+                                    [(name, score, _encode_timestamp(timestamp)) for name, score, timestamp in rows])
+
+    def add_to_histogram(self, counts):
+        """Adds (score, count) pairs to score_histogram."""
+        self.connection.executemany(
+            "INSERT INTO score_histogram (score, count) VALUES (?, ?) "
+            "ON CONFLICT (score) DO UPDATE SET count = count + excluded.count", counts)
+
+    def histogram_counts(self):
+        return self.connection.execute("SELECT score, count FROM score_histogram").fetchall()
+
+    def recount_histogram(self):
+        """Rebuilds score_histogram from the scores table (one full pass) and returns its rows."""
+        self.connection.execute("DELETE FROM score_histogram")
+        rows = self.connection.execute("SELECT score, COUNT(*) FROM scores GROUP BY score").fetchall()
+        self.connection.executemany("INSERT INTO score_histogram (score, count) VALUES (?, ?)", rows)
+        return rows
+
+    def has_scores(self):
+        return self.connection.execute("SELECT 1 FROM scores LIMIT 1").fetchone() is not None
+
+    def top_scores(self, count, since=None):
+        """Returns the top `count` (name, score, timestamp) rows, optionally only those at or after `since`."""
+        if since is None:
+            cursor = self.connection.execute(
+                "SELECT name, score, timestamp FROM scores ORDER BY score DESC, timestamp ASC LIMIT ?", (count,))
+        else:
+            cursor = self.connection.execute(
+                "SELECT name, score, timestamp FROM scores WHERE timestamp >= ? "
+                "ORDER BY score DESC, timestamp ASC LIMIT ?", (_encode_timestamp(since), count))
+        return [(name, score, _decode_timestamp(timestamp)) for name, score, timestamp in cursor]
+
+    def has_window_scores(self):
+        return self.connection.execute("SELECT 1 FROM window_top_scores LIMIT 1").fetchone() is not None
+
+    def window_top(self, window, period, count):
+        cursor = self.connection.execute(
+            f"SELECT name, score, timestamp FROM window_top_scores {_WINDOW_ORDER} LIMIT ?", (window, period, count))
+        return [(name, score, _decode_timestamp(timestamp)) for name, score, timestamp in cursor]
+
+    def window_scores(self, window, period, count):
+        """Returns the scores of a window period, best first, at most `count`."""
+        cursor = self.connection.execute(
+            f"SELECT score FROM window_top_scores {_WINDOW_ORDER} LIMIT ?", (window, period, count))
+        return [score for score, in cursor]
+
+    def window_score_at(self, window, period, offset):
+        """Returns the score at position `offset` (0 = best) of a window period, or None."""
+        row = self.connection.execute(
+            f"SELECT score FROM window_top_scores {_WINDOW_ORDER} LIMIT 1 OFFSET ?", (window, period, offset)).fetchone()
+        return row[0] if row is not None else None
+
+    def insert_window_scores(self, window, period, rows):
+        """Inserts (name, score, timestamp) rows into a window period."""
+        self.connection.executemany(
+            'INSERT INTO window_top_scores ("window", period, name, score, timestamp) VALUES (?, ?, ?, ?, ?)',
+            [(window, period, name, score, _encode_timestamp(timestamp)) for name, score, timestamp in rows])
+
+    def trim_window(self, window, period, keep):
+        """Deletes the rows of a window period past the best `keep`."""
+        self.connection.execute(
+            f"DELETE FROM window_top_scores WHERE id IN (SELECT id FROM window_top_scores {_WINDOW_ORDER} "
+            "LIMIT -1 OFFSET ?)", (window, period, keep))
+
+    def delete_windows_before(self, window, period):
+        """Deletes the periods of `window` older than `period`; returns the number of rows removed."""
+        return self.connection.execute(
+            'DELETE FROM window_top_scores WHERE "window" = ? AND period < ?', (window, period)).rowcount
+
+    def iter_scores(self, batch_size):
+        """
+        Yields lists of up to `batch_size` (name, score, timestamp) rows in insertion order.
+        Reads on its own connection, i.e. a consistent WAL snapshot that doesn't block writers.
+        """
+        connection = sqlite3.connect(self.db_name)
+        try:
+            cursor = connection.execute("SELECT name, score, timestamp FROM scores ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [(name, score, _decode_timestamp(timestamp)) for name, score, timestamp in rows]
+        finally:
+            connection.close()
+
+def create_backend(name, db_name):
+    """
+    Opens the named backend on `db_name`.
+
+    Args:
+        name (str): "sqlite3" or "sqlalchemy".
+        db_name (str): The name of the SQLite database file.
+    """
+    if name == "sqlite3":
+        return SQLiteBackend(db_name)
+    if name == "sqlalchemy":
+        from game.ui.leaderboard_sqlalchemy import SQLAlchemyBackend # Deferred: SQLAlchemy is slow to import
+        return SQLAlchemyBackend(db_name)
+    raise ValueError(f"Unknown leaderboard backend '{name}' (expected 'sqlite3' or 'sqlalchemy').")
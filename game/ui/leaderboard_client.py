@@ -0,0 +1,127 @@
+import queue
+import threading
+from game.core.settings import LEADERBOARD_QUEUE_SIZE, LEADERBOARD_FLUSH_TIMEOUT, LEADERBOARD_TOP_COUNT
+
+_STOP = object() # Sentinel that tells the worker thread to exit
+
+class AsyncLeaderboardClient:
+    """
+    Non-blocking front for a Leaderboard: writes and reads run on a background
+    thread so a slow commit/fsync never stalls a frame.
+
+    Requests go into a bounded queue; when it is full a request is refused
+    instead of blocking the caller. Results are not delivered on the worker
+    thread: they wait in a completion queue until the game thread calls
+    dispatch_callbacks() (LeaderboardSprite does this from update()), so
+    callbacks can touch UI state safely.
+    """
+    def __init__(self, leaderboard, max_pending=LEADERBOARD_QUEUE_SIZE):
+        """
+        Args:
+            leaderboard (Leaderboard): Store that does the actual reads and writes.
+            max_pending (int): Maximum number of queued requests.
+        """
+        self.leaderboard = leaderboard
+        self.requests = queue.Queue(maxsize=max_pending)
+        self.completed = queue.SimpleQueue() # (callback, result) pairs waiting for dispatch_callbacks()
+        self.dropped = 0 # Requests refused because the queue was full
+        self.closed = False
+        self._worker = threading.Thread(target=self._worker_loop, name="leaderboard", daemon=True)
+        self._worker.start()
+
+    def _worker_loop(self):
+        while True:
+            request = self.requests.get()
+            try:
+                if request is _STOP:
+                    return
+                kind, args, on_done = request
+                if kind == "submit":
+                    name, score, count = args
+                    self.leaderboard.add_score(name, score)
+                    result = self.leaderboard.get_top_scores(count)
+                elif kind == "rank":
+                    score, = args
+                    result = self.leaderboard.get_rank_and_percentile(score) # One lookup (one round trip remotely)
+                else: # "top"
+                    result = self.leaderboard.get_top_scores(*args)
+                if on_done is not None:
+                    self.completed.put((on_done, result))
+            except Exception as e: # Keep the worker alive; the store already reports its own errors
+                print(f"AsyncLeaderboardClient: request failed: {e}")
+            finally:
+                self.requests.task_done()
+
+    def _enqueue(self, request):
+        if self.closed:
+            return False
+        try:
+            self.requests.put_nowait(request)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            print("AsyncLeaderboardClient: request queue full, request dropped.")
+            return False
+
+    def submit_score(self, name, score, on_done=None, count=LEADERBOARD_TOP_COUNT):
+        """
+        Queues a score and returns immediately.
+
+        Args:
+            on_done (callable): Called with the refreshed top `count` scores, from dispatch_callbacks().
+        Returns:
+            bool: False if the request was refused (queue full or client closed).
+        """
+        return self._enqueue(("submit", (name, score, count), on_done))
+
+    def request_top_scores(self, on_done, count=LEADERBOARD_TOP_COUNT, window="all"):
+        """Queues a top-scores read ("all", "daily" or "weekly"); on_done receives the list from dispatch_callbacks()."""
+        return self._enqueue(("top", (count, window), on_done))
+
+    def request_rank(self, score, on_done):
+        """
+        Queues a rank lookup; on_done receives (rank, percentile) from dispatch_callbacks().
+        Requests run in order, so a lookup queued after submit_score() counts that score.
+        """
+        return self._enqueue(("rank", (score,), on_done))
+
+    def dispatch_callbacks(self):
+        """
+        Runs the callbacks of completed requests on the calling thread.
+
+        Returns:
+            int: Number of callbacks run.
+        """
+        dispatched = 0
+        while True:
+            try:
+                on_done, result = self.completed.get_nowait()
+            except queue.Empty:
+                return dispatched
+            on_done(result)
+            dispatched += 1
+
+    @property
+    def pending(self):
+        """Number of requests queued or in progress."""
+        return self.requests.unfinished_tasks
+
+    def flush(self, timeout=LEADERBOARD_FLUSH_TIMEOUT):
+        """
+        Waits until every queued request has been written.
+
+        Returns:
+            bool: True if the queue drained within `timeout` seconds.
+        """
+        with self.requests.all_tasks_done:
+            return self.requests.all_tasks_done.wait_for(lambda: self.requests.unfinished_tasks == 0, timeout)
+
+    def close(self, timeout=LEADERBOARD_FLUSH_TIMEOUT):
+        """Flushes pending writes (e.g. on exit) and stops the worker thread."""
+        if self.closed:
+            return
+        self.closed = True
+        if not self.flush(timeout):
+            print(f"AsyncLeaderboardClient: {self.pending} requests still pending after {timeout}s.")
+        self.requests.put(_STOP)
+        self._worker.join(timeout)
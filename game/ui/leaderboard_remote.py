@@ -0,0 +1,239 @@
+import datetime
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from game.core.settings import (
+    LEADERBOARD_SERVER_HOST, LEADERBOARD_SERVER_PORT, LEADERBOARD_REMOTE_TIMEOUT, LEADERBOARD_REMOTE_RETRIES,
+    LEADERBOARD_REMOTE_BACKOFF, LEADERBOARD_REMOTE_BACKOFF_MAX, LEADERBOARD_REMOTE_BATCH_SIZE,
+    LEADERBOARD_REMOTE_BATCH_INTERVAL, LEADERBOARD_REMOTE_TOP_TTL, LEADERBOARD_REMOTE_MAX_PENDING
+)
+
+class RemoteLeaderboard:
+    """
+    Leaderboard backend that talks to a LeaderboardServer instead of a local SQLite file.
+
+    It has the same interface as Leaderboard (add_score, add_scores, get_top_scores, get_rank,
+    get_percentile, get_rank_and_percentile, close), so Game and AsyncLeaderboardClient use it unchanged.
+
+    - Submissions are buffered. They are sent as one batch when `batch_size` scores are waiting,
+      when `batch_interval` seconds have passed (a background thread), before any read, and on close.
+    - Top-N results are cached for `top_ttl` seconds per (count, window). A flush of our own
+      scores clears the cache.
+    - A failed request is retried with exponential backoff plus jitter, on a fresh connection.
+      Batches carry an id so a resend after a lost response isn't counted twice. Scores that still
+      can't be delivered stay buffered for the next flush (up to `max_pending`).
+    """
+    def __init__(self, host=LEADERBOARD_SERVER_HOST, port=LEADERBOARD_SERVER_PORT, timeout=LEADERBOARD_REMOTE_TIMEOUT,
+                 retries=LEADERBOARD_REMOTE_RETRIES, batch_size=LEADERBOARD_REMOTE_BATCH_SIZE,
+                 batch_interval=LEADERBOARD_REMOTE_BATCH_INTERVAL, top_ttl=LEADERBOARD_REMOTE_TOP_TTL,
+                 max_pending=LEADERBOARD_REMOTE_MAX_PENDING):
+        """
+        Args:
+            host (str), port (int): Address of the LeaderboardServer.
+            timeout (float): Seconds to wait for a connection or a response.
+            retries (int): Extra attempts after a failed request.
+            batch_size (int): Buffered scores that trigger a send.
+            batch_interval (float): Longest a score waits in the buffer (None: only size, reads and close send).
+            top_ttl (float): Seconds a top-N result is served from the cache.
+            max_pending (int): Buffered scores kept while the server is unreachable; the oldest are dropped beyond it.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.batch_size = batch_size
+        self.top_ttl = top_ttl
+        self.max_pending = max_pending
+
+        self._socket = None
+        self._reader = None
+        self._request_ids = itertools.count(1)
+        self._client_id = uuid.uuid4().hex # Prefix of this client's batch ids
+        self._batch_ids = itertools.count(1)
+        self._lock = threading.RLock() # One request on the connection at a time
+        self._pending = [] # (name, score) not sent yet
+        self._in_flight = None # (batch id, rows) being sent; resent with the same id on retry
+        self._top_cache = {} # (count, window) -> (expires_at, rows)
+        self.dropped = 0 # Scores given up on because the buffer overflowed
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.retried = 0
+
+        self._closed = threading.Event()
+        self._flusher = None
+        if batch_interval is not None:
+            self._flusher = threading.Thread(target=self._flush_loop, args=(batch_interval,),
+                                             name="leaderboard-remote", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self, interval):
+        while not self._closed.wait(interval):
+            self.flush()
+
+    # --- Connection ---------------------------------------------------------------
+
+    def _connect(self):
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # Small request lines, don't wait for ACKs
+        self._reader = self._socket.makefile("rb")
+
+    def _disconnect(self):
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+    def _request(self, payload):
+        """
+        Sends one request and returns its result, retrying with backoff. Caller holds the lock.
+
+        Raises:
+            ConnectionError: If every attempt failed; the caller decides what to fall back to.
+        """
+        payload["id"] = next(self._request_ids)
+        line = json.dumps(payload).encode() + b"\n"
+        delay = LEADERBOARD_REMOTE_BACKOFF
+        for attempt in range(self.retries + 1):
+            try:
+                if self._socket is None:
+                    self._connect()
+                self._socket.sendall(line)
+                response = self._reader.readline()
+                if not response:
+                    raise ConnectionError("server closed the connection")
+                response = json.loads(response)
+                if not response.get("ok"):
+                    raise ConnectionError(response.get("error", "request failed"))
+                return response.get("result")
+            except (OSError, ValueError) as e: # ConnectionError and socket.timeout are OSErrors
+                self._disconnect()
+                if attempt == self.retries:
+                    raise ConnectionError(f"leaderboard server {self.host}:{self.port} unreachable: {e}") from e
+                self.retried += 1
+                time.sleep(delay * random.uniform(0.5, 1.5)) # Jitter so many clients don't retry in lockstep
+                delay = min(delay * 2, LEADERBOARD_REMOTE_BACKOFF_MAX)
+
+    # --- Leaderboard interface ----------------------------------------------------------
+
+    def add_score(self, name, score):
+        """Buffers a score; it is sent with the next batch (see the class docstring)."""
+        if not isinstance(name, str) or not name.strip():
+            print("Error: Player name must be a non-empty string.")
+            return
+        if not isinstance(score, int):
+            print("Error: Score must be an integer.")
+            return
+        with self._lock:
+            self._pending.append((name, score))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add_scores(self, scores, batch_size=None):
+        """
+        Buffers many (name, score[, timestamp]) entries and sends them. Timestamps are set by the server.
+
+        Returns:
+            int: Number of entries buffered.
+        """
+        added = 0
+        with self._lock:
+            for entry in scores:
+                self._pending.append((entry[0], entry[1]))
+                added += 1
+        self.flush()
+        return added
+
+    def flush(self):
+        """
+        Sends every buffered score, one batch at a time.
+
+        Returns:
+            bool: True if nothing is left to send.
+        """
+        with self._lock:
+            while self._in_flight is not None or self._pending:
+                if self._in_flight is None:
+                    rows, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                    self._in_flight = (f"{self._client_id}-{next(self._batch_ids)}", rows)
+                batch_id, rows = self._in_flight
+                try:
+                    self._request({"op": "add_scores", "batch": batch_id, "scores": rows})
+                except ConnectionError as e:
+                    self._trim_pending()
+                    print(f"RemoteLeaderboard: {len(rows) + len(self._pending)} scores kept for later: {e}")
+                    return False
+                self._in_flight = None
+                self._top_cache.clear() # Our own scores may have changed the top-N
+            return True
+
+    def _trim_pending(self):
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.dropped += overflow
+            print(f"RemoteLeaderboard: buffer full, dropped {overflow} oldest scores.")
+
+    def get_top_scores(self, count=10, window="all"):
+        """
+        Returns the top `count` (name, score, timestamp) tuples of `window`, from the cache when fresh.
+        Returns an empty list if the server is unreachable.
+        """
+        if not isinstance(count, int) or count <= 0:
+            print("Error: Count must be a positive integer.")
+            return []
+        self.flush() # Read our own writes
+        with self._lock:
+            cached = self._top_cache.get((count, window))
+            if cached is not None and cached[0] > time.monotonic():
+                self.cache_hits += 1
+                return cached[1]
+            self.cache_misses += 1
+            try:
+                result = self._request({"op": "top", "count": count, "window": window})
+            except ConnectionError as e:
+                print(f"RemoteLeaderboard: {e}")
+                return cached[1] if cached is not None else [] # Stale beats nothing
+            rows = [(name, score, datetime.datetime.fromisoformat(timestamp) if timestamp else None)
+                    for name, score, timestamp in result]
+            self._top_cache[(count, window)] = (time.monotonic() + self.top_ttl, rows)
+            return rows
+
+    def _rank(self, score):
+        self.flush()
+        with self._lock:
+            try:
+                return self._request({"op": "rank", "score": score})
+            except ConnectionError as e:
+                print(f"RemoteLeaderboard: {e}")
+                return [None, None]
+
+    def get_rank(self, score):
+        """Returns the server's rank for `score` (see Leaderboard.get_rank), or None if unreachable."""
+        return self._rank(score)[0]
+
+    def get_percentile(self, score):
+        """Returns the server's "top X%" for `score` (see Leaderboard.get_percentile), or None if unreachable."""
+        return self._rank(score)[1]
+
+    def get_rank_and_percentile(self, score):
+        """Returns (rank, percentile) from a single "rank" request, (None, None) if unreachable."""
+        rank, percentile = self._rank(score)
+        return rank, percentile
+
+    def close(self):
+        """Stops the background flusher, sends what is buffered and closes the connection."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        with self._lock:
+            self._disconnect()
@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import collections
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from game.core.settings import (
+    LEADERBOARD_SERVER_HOST, LEADERBOARD_SERVER_PORT, LEADERBOARD_SERVER_BATCH_INTERVAL, LEADERBOARD_TOP_COUNT
+)
+from game.ui.leaderboard import valid_score
+
+MAX_REQUEST_BYTES = 1 << 20 # Longest accepted request line
+LISTEN_BACKLOG = 1024 # Queued connection attempts; a burst of cabinets connecting at once shouldn't be refused
+RECENT_BATCH_IDS = 4096 # Batch ids remembered to drop resent duplicates
+
+class LeaderboardServer:
+    """
+    Serves one Leaderboard to many game clients over newline-delimited JSON on TCP.
+
+    Every request is one JSON object per line with an "id" that the response echoes:
+        {"id": 1, "op": "add_scores", "batch": "client-7", "scores": [["Mila", 42], ...]}
+        {"id": 2, "op": "top", "count": 10, "window": "daily"}
+        {"id": 3, "op": "rank", "score": 42}
+    Responses are {"id": ..., "ok": true, "result": ...} or {"id": ..., "ok": false, "error": "..."}.
+
+    Connections are handled by one asyncio loop. The SQLite store only ever runs on a single
+    worker thread, so the loop never blocks on disk. Submissions from all clients are coalesced:
+    whatever arrives within `batch_interval` is written with one add_scores() transaction.
+    So hundreds of clients cost a handful of commits, not one commit per score behind a file lock.
+    Batch ids let a client resend after a lost response without the scores being counted twice.
+    """
+    def __init__(self, leaderboard, host=LEADERBOARD_SERVER_HOST, port=LEADERBOARD_SERVER_PORT,
+                 batch_interval=LEADERBOARD_SERVER_BATCH_INTERVAL):
+        """
+        Args:
+            leaderboard (Leaderboard): The store being served.
+            host (str): Address to listen on (loopback by default).
+            port (int): Port to listen on; 0 picks a free one (see self.port after start()).
+            batch_interval (float): Seconds submissions are collected before they are written together.
+        """
+        self.leaderboard = leaderboard
+        self.host = host
+        self.port = port
+        self.batch_interval = batch_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard-store")
+        self._server = None
+        self._pending_writes = [] # (rows, future) waiting for the next batch
+        self._write_ready = None # asyncio.Event, created on the server's loop
+        self._writer_task = None
+        self._recent_batches = collections.OrderedDict() # batch id -> future of its write (rows added)
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        # Counters, printed on stop()
+        self.connections = 0
+        self.requests = 0
+        self.write_batches = 0
+        self.rows_written = 0
+        self.duplicates = 0
+
+    async def start(self):
+        """Starts listening. Returns once the socket is bound."""
+        self._loop = asyncio.get_running_loop()
+        self._write_ready = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=MAX_REQUEST_BYTES,
+                                                  backlog=LISTEN_BACKLOG)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._writer_task = asyncio.create_task(self._write_batches())
+        print(f"LeaderboardServer: listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        """Stops accepting clients, writes what is still pending and releases the store thread."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            await self._flush_writes() # Anything queued after the last batch
+        self._executor.shutdown(wait=True)
+        print(f"LeaderboardServer: stopped after {self.requests} requests from {self.connections} connections; "
+              f"{self.rows_written} scores in {self.write_batches} batches, {self.duplicates} duplicate batches dropped.")
+
+    def start_in_thread(self):
+        """Runs the server on its own event loop thread (e.g. inside the game or a test). Returns once listening."""
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start())
+            self._started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+        self._thread = threading.Thread(target=run, name="leaderboard-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop_thread(self, timeout=None):
+        """Stops a server started with start_in_thread()."""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+    async def _handle_client(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError): # ValueError: line longer than MAX_REQUEST_BYTES
+                    break
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass # Client went away mid-response; it will retry
+        finally:
+            writer.close()
+
+    async def _respond(self, line):
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+        except (ValueError, AttributeError):
+            return {"id": None, "ok": False, "error": "malformed request"}
+        try:
+            op = request.get("op")
+            if op == "add_scores":
+                result = await self._add_scores(request.get("batch"), request.get("scores") or [])
+            elif op == "top":
+                result = await self._run(self.leaderboard.get_top_scores,
+                                         request.get("count", LEADERBOARD_TOP_COUNT), request.get("window", "all"))
+                result = [(name, score, timestamp.isoformat(sep=' ') if timestamp else None)
+                          for name, score, timestamp in result]
+            elif op == "rank":
+                score = request.get("score")
+                result = list(await self._run(self.leaderboard.get_rank_and_percentile, score))
+            else:
+                return {"id": request_id, "ok": False, "error": f"unknown op {op!r}"}
+        except Exception as e: # Report to the client instead of dropping the connection
+            return {"id": request_id, "ok": False, "error": str(e)}
+        return {"id": request_id, "ok": True, "result": result}
+
+    def _run(self, function, *args):
+        return self._loop.run_in_executor(self._executor, function, *args)
+
+    async def _add_scores(self, batch_id, scores):
+        if batch_id is not None and batch_id in self._recent_batches:
+            # Resent after a timeout or lost response: wait for (or reuse) the original write
+            self.duplicates += 1
+            return await asyncio.shield(self._recent_batches[batch_id])
+        rows = [tuple(entry[:2]) for entry in scores if isinstance(entry, (list, tuple)) and len(entry) >= 2]
+        future = self._loop.create_future()
+        if batch_id is not None:
+            self._recent_batches[batch_id] = future
+            if len(self._recent_batches) > RECENT_BATCH_IDS:
+                self._recent_batches.popitem(last=False)
+        self._pending_writes.append((rows, future))
+        self._write_ready.set()
+        return await asyncio.shield(future) # A dropped connection mustn't cancel a write other requests wait on
+
+    async def _write_batches(self):
+        while True:
+            await self._write_ready.wait()
+            await asyncio.sleep(self.batch_interval) # Let other clients' submissions join this batch
+            await self._flush_writes()
+
+    async def _flush_writes(self):
+        self._write_ready.clear()
+        pending, self._pending_writes = self._pending_writes, []
+        if not pending:
+            return
+        rows = [row for batch_rows, _ in pending for row in batch_rows]
+        try:
+            # One transaction for the whole coalesced batch, so it is stored completely or not at all,
+            # and a storage error raises instead of being printed and counted as 0 rows added
+            added = await self._run(self.leaderboard.add_scores, rows, max(len(rows), 1), True)
+        except Exception as e:
+            failed = {future for _, future in pending}
+            for batch_id in [batch_id for batch_id, future in self._recent_batches.items() if future in failed]:
+                del self._recent_batches[batch_id] # Let a resend try again
+            for future in failed:
+                future.set_exception(e)
+            return
+        self.write_batches += 1
+        self.rows_written += added
+        for batch_rows, future in pending:
+            future.set_result(sum(1 for name, score in batch_rows if valid_score(name, score))) # Invalid rows were skipped
+
+def main():
+    from game.ui.leaderboard import Leaderboard # Only the CLI opens a store itself
+
+    parser = argparse.ArgumentParser(description="Serve a leaderboard database to game clients on the local network.")
+    parser.add_argument("--db", default="leaderboard.db", help="SQLite leaderboard file")
+    parser.add_argument("--host", default=LEADERBOARD_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=LEADERBOARD_SERVER_PORT)
+    args = parser.parse_args()
+
+    async def serve():
+        server = LeaderboardServer(Leaderboard(db_name=args.db), args.host, args.port)
+        await server.start()
+        try:
+            await asyncio.Event().wait() # Until Ctrl+C
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
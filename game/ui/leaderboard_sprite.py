@@ -1,4 +1,5 @@
 \
+import math
 import pygame
 import os
 # Import settings from the correct path
@@ -10,12 +11,14 @@ from game.core.settings import (
 )
 
 class LeaderboardSprite:
-    def __init__(self, screen, font_prompt, font_input, font_scores, leaderboard_manager, settings):
+    def __init__(self, screen, font_prompt, font_input, font_scores, leaderboard_manager, settings, leaderboard_client=None):
         self.screen = screen
         self.font_prompt = font_prompt
         self.font_input = font_input
         self.font_scores = font_scores
         self.leaderboard_manager = leaderboard_manager
+        # Optional AsyncLeaderboardClient; when set, submissions never block the frame
+        self.leaderboard_client = leaderboard_client
         self.settings = settings # For SCREEN_WIDTH, SCREEN_HEIGHT, etc.
 
         self.is_active = False
@@ -44,12 +47,19 @@ class LeaderboardSprite:
         self.restart_prompt_message = "Press R to Restart, Q to Quit"
         
         self.top_scores_cache = [] # To store fetched scores for display
+        self.scores_loading = False # Waiting for the async client to deliver top scores
+        self.loading_message = "Saving score..."
+        self.player_rank = None # (rank, percentile) of the submitted score, once known
+        self.rank_message = "You placed {} (top {})"
 
     def activate(self, score):
         self.is_active = True
         self.player_score_to_submit = score
         self.current_name_input = "" # Corrected string literal
         self.display_mode = 'INPUT' # Corrected string literal
+        self.player_rank = None
+        self.top_scores_cache = [] # The previous run's list would show until the new one arrives
+        self.scores_loading = False
         self.last_cursor_toggle = pygame.time.get_ticks() # Reset cursor blink
         self.cursor_visible = True
 
@@ -64,10 +74,18 @@ class LeaderboardSprite:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
                     if self.current_name_input.strip():
-                        self.leaderboard_manager.add_score(self.current_name_input.strip(), self.player_score_to_submit)
+                        if self.leaderboard_client is not None:
+                            # Written on the client's thread; scores arrive via _on_top_scores
+                            self.top_scores_cache = [] # "Saving score..." until then
+                            self.scores_loading = self.leaderboard_client.submit_score(
+                                self.current_name_input.strip(), self.player_score_to_submit, on_done=self._on_top_scores)
+                            self.leaderboard_client.request_rank(self.player_score_to_submit, on_done=self._on_rank)
+                        else:
+                            self.leaderboard_manager.add_score(self.current_name_input.strip(), self.player_score_to_submit)
+                            self.top_scores_cache = self.leaderboard_manager.get_top_scores()
+                            self._on_rank(self.leaderboard_manager.get_rank_and_percentile(self.player_score_to_submit))
                         self.display_mode = 'SUBMITTED' # Corrected string literal
                         self.last_event_time = pygame.time.get_ticks()
-                        self.top_scores_cache = self.leaderboard_manager.get_top_scores()
                     return None
                 elif event.key == pygame.K_BACKSPACE:
                     self.current_name_input = self.current_name_input[:-1]
@@ -85,7 +103,32 @@ class LeaderboardSprite:
                     return 'QUIT'
         return None
 
+    def _on_top_scores(self, top_scores):
+        # Called from update() through the client's dispatch_callbacks(), on the game thread
+        self.top_scores_cache = top_scores
+        self.scores_loading = False
+
+    def _on_rank(self, rank_and_percentile):
+        if rank_and_percentile[0] is not None:
+            self.player_rank = rank_and_percentile
+
+    @staticmethod
+    def format_rank(rank, percentile):
+        '''Formats a rank as e.g. ("48,213th", "12%").'''
+        if rank % 100 in (11, 12, 13):
+            suffix = "th"
+        else:
+            suffix = {1: "st", 2: "nd", 3: "rd"}.get(rank % 10, "th")
+        # Rounded up so a "top" figure never flatters; one decimal near the top so the best players don't all read "top 0%"
+        if percentile < 10:
+            percent = f"{math.ceil(percentile * 10) / 10:.1f}%"
+        else:
+            percent = f"{math.ceil(percentile)}%"
+        return f"{rank:,}{suffix}", percent
+
     def update(self):
+        if self.leaderboard_client is not None:
+            self.leaderboard_client.dispatch_callbacks()
         if not self.is_active:
             return
 
@@ -135,6 +178,12 @@ class LeaderboardSprite:
             confirm_surface = self.font_prompt.render(self.submit_confirm_message, True, UI_WHITE)
             confirm_rect = confirm_surface.get_rect(center=(self.settings.SCREEN_WIDTH // 2, self.settings.SCREEN_HEIGHT // 2 - 40))
             self.screen.blit(confirm_surface, confirm_rect)
+
+            if self.player_rank is not None:
+                rank_text = self.rank_message.format(*self.format_rank(*self.player_rank))
+                rank_surface = self.font_input.render(rank_text, True, UI_SCORE_TEXT_COLOR)
+                rank_rect = rank_surface.get_rect(center=(self.settings.SCREEN_WIDTH // 2, self.settings.SCREEN_HEIGHT // 2))
+                self.screen.blit(rank_surface, rank_rect)
             
             restart_msg_surface = self.font_input.render(self.restart_prompt_message, True, UI_WHITE)
             restart_msg_rect = restart_msg_surface.get_rect(center=(self.settings.SCREEN_WIDTH // 2, self.settings.SCREEN_HEIGHT // 2 + 40))
@@ -155,7 +204,8 @@ class LeaderboardSprite:
                 self.screen.blit(entry_surface, entry_rect)
             
             if not self.top_scores_cache:
-                no_scores_surface = self.font_input.render("No scores yet!", True, UI_WHITE)
+                no_scores_text = self.loading_message if self.scores_loading else "No scores yet!"
+                no_scores_surface = self.font_input.render(no_scores_text, True, UI_WHITE)
                 no_scores_rect = no_scores_surface.get_rect(center=(self.settings.SCREEN_WIDTH // 2, start_y + 40))
                 self.screen.blit(no_scores_surface, no_scores_rect)
 
@@ -0,0 +1,157 @@
+import datetime
+from sqlalchemy import create_engine, event, insert, select, delete, func, Column, Integer, String, DateTime, Index, desc, asc
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.exc import SQLAlchemyError
+from game.ui.leaderboard_backends import tune_connection
+
+# SQLAlchemy leaderboard backend. Imported only when LEADERBOARD_BACKEND (or Leaderboard's `backend`
+# argument) selects "sqlalchemy"; see game.ui.leaderboard_backends for the interface.
+
+# Define the base for declarative models
+Base = declarative_base()
+
+class Score(Base):
+    """SQLAlchemy model for the scores table."""
+    __tablename__ = 'scores'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # Matches the top-N ordering (score DESC, timestamp ASC), so a top-N read is the
+    # first `count` index entries instead of a sort of the whole table
+    __table_args__ = (Index('ix_scores_score_desc_timestamp', score.desc(), timestamp),)
+
+    def __repr__(self):
+        return f"<Score(name='{self.name}', score={self.score}, timestamp='{self.timestamp}')>"
+
+class ScoreBucket(Base):
+    """Number of rows in `scores` per score value, kept in step by Leaderboard for rank queries."""
+    __tablename__ = 'score_histogram'
+
+    score = Column(Integer, primary_key=True, autoincrement=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class WindowScore(Base):
+    """Materialized top scores of one period (a day or an ISO week), maintained by Leaderboard."""
+    __tablename__ = 'window_top_scores'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    window = Column(String, nullable=False) # "daily" or "weekly"
+    period = Column(String, nullable=False) # e.g. "2024-03-09" or "2024-W10"; sorts chronologically
+    name = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    timestamp = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index('ix_window_top_scores_period_rank', window, period, score.desc(), timestamp),)
+
+_SCORES = Score.__table__
+_BUCKETS = ScoreBucket.__table__
+_WINDOWS = WindowScore.__table__
+
+# Histogram update: one row per distinct score, bumped by `count`
+_INSERT_BUCKET = sqlite_insert(_BUCKETS)
+_BUMP_BUCKET = _INSERT_BUCKET.on_conflict_do_update(
+    index_elements=[_BUCKETS.c.score],
+    set_={"count": _BUCKETS.c.count + _INSERT_BUCKET.excluded.count})
+
+class SQLAlchemyBackend:
+    """Leaderboard storage through a SQLAlchemy engine, with one persistent connection."""
+    errors = (SQLAlchemyError,)
+
+    def __init__(self, db_name):
+        """
+        Args:
+            db_name (str): The name of the SQLite database file.
+        """
+        self.engine = create_engine(f"sqlite:///{db_name}")
+        event.listen(self.engine, "connect", lambda dbapi_connection, record: tune_connection(dbapi_connection))
+        Base.metadata.create_all(self.engine) # Creates tables if they don't exist
+        for index in _SCORES.indexes:
+            index.create(self.engine, checkfirst=True) # create_all skips indexes of tables that already exist
+        self.Session = sessionmaker(bind=self.engine) # For ORM access; the methods below use self.connection
+        self.connection = self.engine.connect()
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
+        self.engine.dispose()
+
+    def insert_scores(self, rows):
+        if not rows:
+            return # SQLAlchemy rejects an empty executemany
+        self.connection.execute(insert(_SCORES), [{"name": name, "score": score, "timestamp": timestamp}
+                                                  for name, score, timestamp in rows])
+
+    def add_to_histogram(self, counts):
+        if not counts:
+            return
+        self.connection.execute(_BUMP_BUCKET, [{"score": score, "count": count} for score, count in counts])
+
+    def histogram_counts(self):
+        return [tuple(row) for row in self.connection.execute(select(_BUCKETS.c.score, _BUCKETS.c.count))]
+
+    def recount_histogram(self):
+        self.connection.execute(delete(_BUCKETS))
+        rows = [tuple(row) for row in self.connection.execute(select(_SCORES.c.score, func.count()).group_by(_SCORES.c.score))]
+        if rows:
+            self.connection.execute(insert(_BUCKETS), [{"score": score, "count": count} for score, count in rows])
+        return rows
+
+    def has_scores(self):
+        return self.connection.execute(select(_SCORES.c.id).limit(1)).first() is not None
+
+    def top_scores(self, count, since=None):
+        # Column projection: rows come back as plain tuples, no Score objects are built
+        query = select(_SCORES.c.name, _SCORES.c.score, _SCORES.c.timestamp)
+        if since is not None:
+            query = query.where(_SCORES.c.timestamp >= since)
+        query = query.order_by(desc(_SCORES.c.score), asc(_SCORES.c.timestamp)).limit(count)
+        return [tuple(row) for row in self.connection.execute(query)]
+
+    def has_window_scores(self):
+        return self.connection.execute(select(_WINDOWS.c.id).limit(1)).first() is not None
+
+    def _window_query(self, window, period, *columns):
+        return (select(*columns)
+                .where(_WINDOWS.c.window == window, _WINDOWS.c.period == period)
+                .order_by(desc(_WINDOWS.c.score), asc(_WINDOWS.c.timestamp)))
+
+    def window_top(self, window, period, count):
+        query = self._window_query(window, period, _WINDOWS.c.name, _WINDOWS.c.score, _WINDOWS.c.timestamp).limit(count)
+        return [tuple(row) for row in self.connection.execute(query)]
+
+    def window_scores(self, window, period, count):
+        return self.connection.execute(self._window_query(window, period, _WINDOWS.c.score).limit(count)).scalars().all()
+
+    def window_score_at(self, window, period, offset):
+        return self.connection.execute(
+            self._window_query(window, period, _WINDOWS.c.score).offset(offset).limit(1)).scalar()
+
+    def insert_window_scores(self, window, period, rows):
+        if not rows:
+            return
+        self.connection.execute(insert(_WINDOWS), [
+            {"window": window, "period": period, "name": name, "score": score, "timestamp": timestamp}
+            for name, score, timestamp in rows])
+
+    def trim_window(self, window, period, keep):
+        overflow = self._window_query(window, period, _WINDOWS.c.id).offset(keep)
+        self.connection.execute(delete(_WINDOWS).where(_WINDOWS.c.id.in_(overflow.scalar_subquery())))
+
+    def delete_windows_before(self, window, period):
+        return self.connection.execute(
+            delete(_WINDOWS).where(_WINDOWS.c.window == window, _WINDOWS.c.period < period)).rowcount
+
+    def iter_scores(self, batch_size):
+        with self.engine.connect() as connection:
+            query = select(_SCORES.c.name, _SCORES.c.score, _SCORES.c.timestamp).order_by(_SCORES.c.id)
+            for rows in connection.execution_options(yield_per=batch_size).execute(query).partitions():
+                yield [tuple(row) for row in rows]
@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+from math import isqrt
+
+class ScoreHistogram:
+    '''
+    Number of recorded scores per distinct score value, with a Fenwick
+    (binary indexed) tree over the sorted values.
+
+    "How many scores are above x" is a prefix sum, so rank queries cost
+    O(log distinct scores) no matter how many rows the scores table has.
+    Adding a score whose value is already known updates the tree in
+    O(log distinct scores). New values go into a small sorted side list that
+    queries scan directly; once it outgrows sqrt(distinct scores) it is merged
+    and the tree rebuilt, so the O(distinct scores) rebuild is amortized.
+    '''
+    def __init__(self, counts=None):
+        '''
+        Args:
+            counts (iterable): Optional (score, count) pairs to start from.
+        '''
+        self.keys = [] # Sorted distinct scores
+        self.counts = [] # Number of scores per key
+        self.total = 0
+        self._tree = [0] # 1-based Fenwick tree over self.counts
+        self._pending_keys = [] # Sorted scores not in self.keys yet
+        self._pending_counts = []
+        if counts is not None:
+            self.load(counts)
+
+    def load(self, counts):
+        '''Replaces the histogram with the given (score, count) pairs.'''
+        merged = {}
+        for score, count in counts:
+            merged[score] = merged.get(score, 0) + count
+        self.keys = sorted(merged)
+        self.counts = [merged[score] for score in self.keys]
+        self.total = sum(self.counts)
+        self._build()
+
+    def _build(self):
+        size = len(self.counts)
+        tree = [0] + self.counts
+        for i in range(1, size + 1): # O(n) construction: push each node into its parent
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._pending_keys = []
+        self._pending_counts = []
+
+    def add(self, score, count=1):
+        '''Records `count` more occurrences of `score`.'''
+        self._add(score, count)
+        if len(self._pending_keys) > max(32, isqrt(len(self.keys))):
+            self._merge_pending()
+
+    def add_many(self, counts):
+        '''Records several (score, count) pairs; a large batch is merged in a single rebuild.'''
+        counts = list(counts)
+        if len(counts) <= max(32, isqrt(len(self.keys))):
+            for score, count in counts:
+                self.add(score, count)
+            return
+        self.load(list(zip(self.keys, self.counts)) + list(zip(self._pending_keys, self._pending_counts)) + counts)
+
+    def _add(self, score, count):
+        keys = self.keys
+        i = bisect_left(keys, score)
+        self.total += count
+        if i < len(keys) and keys[i] == score:
+            self.counts[i] += count
+            tree = self._tree
+            size = len(keys)
+            i += 1
+            while i <= size:
+                tree[i] += count
+                i += i & -i
+            return
+        pending = self._pending_keys
+        j = bisect_left(pending, score)
+        if j < len(pending) and pending[j] == score:
+            self._pending_counts[j] += count
+            return
+        pending.insert(j, score)
+        self._pending_counts.insert(j, count)
+
+    def _merge_pending(self):
+        self.load(list(zip(self.keys, self.counts)) + list(zip(self._pending_keys, self._pending_counts)))
+
+    def _prefix(self, end):
+        # Sum of counts[0:end]
+        tree = self._tree
+        total = 0
+        while end > 0:
+            total += tree[end]
+            end -= end & -end
+        return total
+
+    def count_below(self, score):
+        '''Number of recorded scores strictly lower than `score`.'''
+        pending = sum(self._pending_counts[:bisect_left(self._pending_keys, score)])
+        return self._prefix(bisect_left(self.keys, score)) + pending
+
+    def count_above(self, score):
+        '''Number of recorded scores strictly higher than `score`.'''
+        return self.total - self._prefix(bisect_right(self.keys, score)) \
+            - sum(self._pending_counts[:bisect_right(self._pending_keys, score)])
@@ -0,0 +1,185 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+import pygame
+from game.core.settings import ASSET_DIR, ASSET_PACK_FILE
+
+# Asset pack: all images of an asset directory in one file, read through a memory map.
+#
+# Layout (little endian):
+#   header   MAGIC, VERSION, flags (unused), index offset (u64), index length (u64)
+#   blobs    one per image, each starting on a BLOB_ALIGN boundary
+#   index    UTF-8 JSON: {key: [offset, length, width, height, encoding]}
+#
+# Keys are the image paths relative to the packed directory, with "/" separators
+# (e.g. "1st Character/Walk/1st CharacterWalk1.png"). An image is stored either as raw RGBA
+# pixels ("rgba", decoded once at pack time; loading is a Surface over the mapped bytes)
+# or as the original PNG bytes ("png", smaller; decoded on load).
+
+MAGIC = b"MWPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+BLOB_ALIGN = 16
+ENCODINGS = ("rgba", "png")
+IMAGE_EXTENSIONS = (".png",)
+
+def find_images(directory):
+    """Returns {key: file path} for every image under `directory`, sorted by key."""
+    images = {}
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(root, file_name)
+                images[os.path.relpath(path, directory).replace(os.sep, "/")] = path
+    return images
+
+def build_pack(directory, pack_file, encoding="rgba"):
+    """
+    Packs every image under `directory` into `pack_file`.
+
+    Args:
+        directory (str): Asset directory to pack (e.g. ASSET_DIR).
+        pack_file (str): Archive to write; replaced if it exists.
+        encoding (str): "rgba" (pre-decoded pixels) or "png" (original compressed bytes).
+
+    Returns:
+        dict: The index that was written.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown asset encoding '{encoding}' (expected one of {ENCODINGS}).")
+    index = {}
+    with open(pack_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0)) # Index position is filled in at the end
+        for key, path in find_images(directory).items():
+            image = pygame.image.load(path) # Also validates PNGs packed as "png"
+            width, height = image.get_size()
+            if encoding == "rgba":
+                data = pygame.image.tobytes(image, "RGBA")
+            else:
+                with open(path, "rb") as source:
+                    data = source.read()
+            f.write(b"\0" * (-f.tell() % BLOB_ALIGN))
+            index[key] = [f.tell(), len(data), width, height, encoding]
+            f.write(data)
+        index_data = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        index_offset = f.tell()
+        f.write(index_data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index_data)))
+    return index
+
+
+class AssetPack:
+    '''
+    Read access to a pack written by build_pack().
+
+    The file is memory-mapped copy-on-write: "rgba" images become Surfaces over slices of
+    the mapping (pygame.image.frombuffer), so loading copies no pixels and the OS pages
+    them in on first use. Drawing on such a Surface changes only this process's copy.
+    The Surfaces keep the mapping alive, so they stay valid after close().
+    '''
+    def __init__(self, pack_file=ASSET_PACK_FILE):
+        """
+        Args:
+            pack_file (str): Archive written by build_pack().
+
+        Raises:
+            ValueError: If the file is not an asset pack of this version.
+        """
+        self.pack_file = pack_file
+        with open(pack_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) # The mapping outlives the descriptor
+        self._view = memoryview(self._map)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{pack_file} is not an asset pack.")
+        magic, version, _, index_offset, index_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{pack_file} is not a version {VERSION} asset pack.")
+        self.index = json.loads(bytes(self._view[index_offset:index_offset + index_length]))
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def keys(self, prefix=""):
+        """Returns the image keys starting with `prefix` (e.g. "1st Character/Walk/")."""
+        return [key for key in self.index if key.startswith(prefix)]
+
+    def load(self, key):
+        """
+        Returns the image stored under `key` as a Surface.
+
+        Raises:
+            KeyError: If the pack has no such image.
+        """
+        offset, length, width, height, encoding = self.index[key]
+        data = self._view[offset:offset + length]
+        if encoding == "rgba":
+            return pygame.image.frombuffer(data, (width, height), "RGBA") # No copy: pixels stay in the mapping
+        return pygame.image.load(io.BytesIO(data), key) # Name hint tells SDL_image the format
+
+    def load_all(self, prefix=""):
+        """Returns {key: Surface} for every image starting with `prefix`."""
+        return {key: self.load(key) for key in self.keys(prefix)}
+
+    def close(self):
+        """Releases the pack's own reference to the mapping; it is unmapped once no Surface uses it."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass # Surfaces still point into it
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_images(directory=ASSET_DIR, pack_file=ASSET_PACK_FILE, prefix=""):
+    """
+    Returns {key: Surface} for the images under `directory`, read from `pack_file` when it exists
+    and from the loose files otherwise. Keys are the same either way.
+
+    Args:
+        directory (str): Loose asset directory.
+        pack_file (str): Asset pack built from `directory` (None: always use the loose files).
+        prefix (str): Only keys starting with this, e.g. "2nd Character/".
+    """
+    if pack_file is not None and os.path.exists(pack_file):
+        return AssetPack(pack_file).load_all(prefix)
+    return {key: pygame.image.load(path) for key, path in find_images(directory).items() if key.startswith(prefix)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect a memory-mapped asset pack.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="pack every image of a directory into one file")
+    pack.add_argument("directory", nargs="?", default=ASSET_DIR)
+    pack.add_argument("pack_file", nargs="?", default=ASSET_PACK_FILE)
+    pack.add_argument("--encoding", choices=ENCODINGS, default="rgba",
+                      help="rgba: pre-decoded pixels, fastest to load; png: original bytes, smallest file")
+    listing = commands.add_parser("list", help="list the images in a pack")
+    listing.add_argument("pack_file", nargs="?", default=ASSET_PACK_FILE)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        index = build_pack(args.directory, args.pack_file, args.encoding)
+        print(f"Packed {len(index)} images from '{args.directory}' into {args.pack_file} "
+              f"({os.path.getsize(args.pack_file)} bytes, {args.encoding}).")
+    else:
+        with AssetPack(args.pack_file) as asset_pack:
+            for key, (offset, length, width, height, encoding) in asset_pack.index.items():
+                print(f"{offset:>10} {length:>9} {width:>5}x{height:<5} {encoding:<5} {key}")
+
+if __name__ == '__main__':
+    main()
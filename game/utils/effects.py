@@ -4,13 +4,15 @@ from game.core.settings import MELEE_ATTACK_COLOR, MELEE_VISUAL_DURATION, GRENAD
 # Add any other specific settings constants if AttackVisual or ExplosionEffect use them directly.
 
 class AttackVisual(pygame.sprite.Sprite):
-    def __init__(self, center_pos, width, height, direction_vector, color=None, duration=None):
+    def __init__(self, center_pos, width, height, direction_vector, color=None, duration=None, timers=None):
         super().__init__()
         # Use provided color or default from settings
         self.color = color if color is not None else MELEE_ATTACK_COLOR
         # Use provided duration or default from settings
         self.duration = duration if duration is not None else MELEE_VISUAL_DURATION
-        self.creation_time = pygame.time.get_ticks()
+        self.creation_time = timers.current_time if timers is not None else pygame.time.get_ticks()
+        # With a timer wheel the visual expires through a callback instead of polling in update()
+        self.expiry_timer = timers.schedule(self.creation_time + self.duration, self.kill) if timers is not None else None
 
         vis_width = max(1, int(width))
         vis_height = max(1, int(height))
@@ -26,29 +28,35 @@ class AttackVisual(pygame.sprite.Sprite):
             self.rect = self.image.get_rect(center=center_pos)
 
     def update(self):
+        if self.expiry_timer is not None:
+            return # Expiry handled by the timer wheel
         current_time = pygame.time.get_ticks()
         if current_time - self.creation_time > self.duration:
             self.kill()
 
 class ExplosionEffect(pygame.sprite.Sprite):
-    def __init__(self, center, radius, color, duration=200): # Duration in ms
+    def __init__(self, center, radius, color, duration=200, timers=None): # Duration in ms
         super().__init__()
         self.radius = radius
         self.color = color # Expect GRENADE_EXPLOSION_COLOR to be passed if that's the default
         self.image = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
         pygame.draw.circle(self.image, self.color, (radius, radius), radius)
         self.rect = self.image.get_rect(center=center)
-        self.creation_time = pygame.time.get_ticks()
+        self.creation_time = timers.current_time if timers is not None else pygame.time.get_ticks()
         self.duration = duration
+        self.expiry_timer = timers.schedule(self.creation_time + duration, self.kill) if timers is not None else None
 
     def update(self):
+        if self.expiry_timer is not None:
+            return # Expiry handled by the timer wheel
         current_time = pygame.time.get_ticks()
         if current_time - self.creation_time > self.duration:
             self.kill()
 
 class EffectManager:
-    def __init__(self):
+    def __init__(self, timers=None):
         self.effects = pygame.sprite.Group() # This group will be managed by EffectManager
+        self.timers = timers # Optional TimerWheel; effects then expire via callbacks instead of per-frame polling
 
     def create_attack_visual(self, center_pos, width, height, direction_vector, color=None, duration=None):
         # Uses MELEE_ATTACK_COLOR, MELEE_VISUAL_DURATION from settings if not provided
@@ -68,7 +76,8 @@ class EffectManager:
             height=height,
             direction_vector=direction_vector,
             color=color, # Pass None to use AttackVisual's default
-            duration=duration # Pass None to use AttackVisual's default
+            duration=duration, # Pass None to use AttackVisual's default
+            timers=self.timers
         )
         self.effects.add(effect)
         # Note: The original plan was to add to self.effects AND self.all_sprites.
@@ -96,11 +105,14 @@ class EffectManager:
             center=center_pos,
             radius=radius,
             color=final_color, # ExplosionEffect requires color
-            duration=duration if duration is not None else 200 # Pass explicit duration or ExplosionEffect's default
+            duration=duration if duration is not None else 200, # Pass explicit duration or ExplosionEffect's default
+            timers=self.timers
         )
         self.effects.add(effect)
 
     def update(self, dt=None): # dt might be needed if effects have dt-sensitive updates
+        if self.timers is not None:
+            return # Effects expire through the timer wheel; nothing to poll
         self.effects.update() # Pygame groups call update on their sprites (AttackVisual, ExplosionEffect already have update())
 
     def draw(self, surface, camera): # Effects need to be drawn relative to camera
@@ -1,3 +1,4 @@
+import math
 import random
 import pygame
 # Import settings from the correct path
@@ -37,17 +38,27 @@ WEAPON_DATA = {
         "type": "grenade", # New type for special handling
         "fuse_time": GRENADE_FUSE_TIME,
         "explosion_radius": (SCREEN_WIDTH + SCREEN_HEIGHT) / 2 * GRENADE_EXPLOSION_RADIUS_FACTOR
+    },
+    "laser": {
+        "name": "Toy Laser",
+        "damage": 4,
+        "fire_rate": 0.05, # seconds per shot; hitscan is cheap enough for a very high rate
+        "range": 600, # pixels, length of the beam
+        "type": "hitscan", # Resolved instantly with a raycast, no projectile is spawned
+        "projectile_speed": None,
+        "projectile_color": (0, 255, 255, 200) # Beam color
+    },
+    "shotgun": {
+        "name": "Shotgun",
+        "damage": 5, # Per pellet
+        "fire_rate": 0.8,
+        "projectile_speed": 10,
+        "projectile_color": (200, 0, 0),
+        "type": "ranged",
+        "pellets": 10, # Pellets per shot, fired together as one Volley
+        "spread_angle": 20 # Degrees between the outermost pellets
     }
-    # Add more weapons here in the future, e.g.:
-    # "shotgun": {
-    #     "name": "Shotgun",
-    #     "damage": 5, # Per pellet
-    #     "fire_rate": 0.8,
-    #     "projectile_speed": 10,
-    #     "projectile_color": (200, 0, 0),
-    #     "pellets": 5, # Custom attribute for shotgun
-    #     "spread_angle": 20 # Degrees
-    # }
+    # Add more weapons here in the future
 }
 
 class Weapon:
@@ -58,9 +69,18 @@ class Weapon:
         self.type = type
         self.projectile_speed = projectile_speed
         self.projectile_color = projectile_color
+        # Cooldown in ms, precomputed so WeaponSystem doesn't redo it on every use
+        self.cooldown_ms = max(fire_rate, 0.001) * 1000
         # Store any additional weapon-specific attributes like 'range' for melee
         for key, value in kwargs.items():
             setattr(self, key, value)
+        # Multi-pellet weapons: (cos, sin) of each pellet's angle off the aim direction, spread
+        # evenly over spread_angle. Computed once here so a shot only has to rotate the aim by them.
+        pellets = getattr(self, 'pellets', 1)
+        if pellets > 1:
+            spread = math.radians(getattr(self, 'spread_angle', 0))
+            angles = [spread * (i / (pellets - 1) - 0.5) for i in range(pellets)]
+            self.pellet_rotations = [(math.cos(angle), math.sin(angle)) for angle in angles]
 
     def __str__(self):
         attrs = [f"{key}: {getattr(self, key)}" for key in vars(self) if key != 'name']
@@ -1,5 +1,82 @@
-from game.core.game import Game
+import time
+STARTED = time.perf_counter() # Before any game import, so --startup-profile includes import time
 
-if __name__ == '__main__':
-    game = Game()
+import argparse
+
+def _address(text):
+    # "host:port", "host" or "" -> CoopServer / CoopClient keyword arguments
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    address = {}
+    if host:
+        address["host"] = host
+    if port:
+        address["port"] = int(port)
+    return address
+
+def main():
+    parser = argparse.ArgumentParser(description="Mila Wick: Toddler's Revenge")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print the time spent in each startup phase up to the first frame")
+    parser.add_argument("--serve", nargs="?", const="", metavar="HOST:PORT",
+                        help="run a headless co-op server instead of the game (default address from settings)")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="join a co-op server")
+    parser.add_argument("--bot", action="store_true",
+                        help="let the scripted bot play (restarting on death) and report frame time and memory")
+    parser.add_argument("--headless", action="store_true", help="with --bot: no window, as fast as it goes")
+    parser.add_argument("--minutes", type=float,
+                        help="with --bot: game minutes to play (headless default from settings, windowed until closed)")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="trace allocations, checkpoint them at each wave and write a report at exit")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        from game.net.coop_server import CoopServer
+        server = CoopServer(**_address(args.serve))
+        try:
+            server.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return
+    if args.connect:
+        from game.net.coop_client import CoopClient
+        from game.net.coop_view import CoopView
+        client = CoopClient(**_address(args.connect))
+        if not client.connect():
+            print(f"No co-op server answered at {args.connect}.")
+            client.close()
+            return
+        CoopView(client).run()
+        return
+
+    from game.core.settings import MEMORY_MONITOR
+    memory_report = args.memory_report or MEMORY_MONITOR
+    if args.bot and args.headless:
+        from game.core.settings import SOAK_MINUTES
+        from game.env.soak import run_soak
+        from game.core.memory_monitor import MemoryMonitor
+        run_soak(args.minutes if args.minutes is not None else SOAK_MINUTES,
+                 memory_monitor=MemoryMonitor() if memory_report else None)
+        return
+
+    profiler = None
+    if args.startup_profile:
+        from game.core.startup import StartupProfiler
+        profiler = StartupProfiler(STARTED)
+    from game.core.game import Game
+    if profiler is not None:
+        profiler.mark("imports")
+    if args.bot:
+        from game.env.bot_input import BotInput
+        from game.env.soak import SoakMonitor
+        game = Game(startup_profiler=profiler, soak_monitor=SoakMonitor(minutes=args.minutes),
+                    memory_monitor=memory_report)
+        game.input_source = BotInput(game)
+        game.player.input_source = game.input_source # The first player was made before the game existed
+    else:
+        game = Game(startup_profiler=profiler, memory_monitor=memory_report)
     game.run()
+
+if __name__ == '__main__':
+    main()
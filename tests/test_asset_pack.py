@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pygame
+from game.utils.asset_pack import AssetPack, build_pack, load_images
+
+class TestAssetPack(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.assets = os.path.join(self.tmp.name, "My Characters")
+        # Nested directories with spaces, like "Platformer Characters/1st Character/Walk"
+        for character, color in (("1st Character", (255, 0, 0, 255)), ("2nd Character", (0, 0, 255, 128))):
+            os.makedirs(os.path.join(self.assets, character, "Walk"))
+            for frame in range(2):
+                image = pygame.Surface((6 + frame, 4), pygame.SRCALPHA)
+                image.fill(color)
+                image.set_at((0, 0), (frame, 2, 3, 4))
+                pygame.image.save(image, os.path.join(self.assets, character, "Walk", f"{character}Walk{frame}.png"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSameImages(self, images, expected):
+        self.assertEqual(sorted(images), sorted(expected))
+        for key, image in images.items():
+            self.assertEqual(image.get_size(), expected[key].get_size(), key)
+            self.assertEqual(pygame.image.tobytes(image, "RGBA"), pygame.image.tobytes(expected[key], "RGBA"), key)
+
+    def test_both_encodings_match_the_loose_files(self):
+        loose = load_images(self.assets, pack_file=None)
+        self.assertEqual(len(loose), 4)
+        self.assertIn("2nd Character/Walk/2nd CharacterWalk1.png", loose)
+        for encoding in ("rgba", "png"):
+            pack_file = os.path.join(self.tmp.name, f"{encoding}.pack")
+            build_pack(self.assets, pack_file, encoding)
+            with AssetPack(pack_file) as pack:
+                self.assertSameImages(pack.load_all(), loose)
+                self.assertEqual(pack.keys("1st Character/"), ["1st Character/Walk/1st CharacterWalk0.png",
+                                                               "1st Character/Walk/1st CharacterWalk1.png"])
+            self.assertSameImages(load_images(self.assets, pack_file), loose) # Prefers the pack when it exists
+
+    def test_raw_surfaces_are_views_of_the_mapping(self):
+        pack_file = os.path.join(self.tmp.name, "rgba.pack")
+        build_pack(self.assets, pack_file)
+        pack = AssetPack(pack_file)
+        key = "1st Character/Walk/1st CharacterWalk0.png"
+        first, second = pack.load(key), pack.load(key)
+        first.fill((9, 9, 9, 9)) # Same pixels: no copy was made
+        self.assertEqual(tuple(second.get_at((0, 0))), (9, 9, 9, 9))
+        pack.close()
+        self.assertEqual(tuple(first.get_at((1, 1))), (9, 9, 9, 9)) # Still valid after close()
+        with AssetPack(pack_file) as reopened: # Writes were copy-on-write, the file is unchanged
+            self.assertEqual(tuple(reopened.load(key).get_at((1, 1))), (255, 0, 0, 255))
+
+    def test_rejects_other_files(self):
+        other = os.path.join(self.tmp.name, "not_a_pack.bin")
+        with open(other, "wb") as f:
+            f.write(b"PNG?" + bytes(64))
+        with self.assertRaises(ValueError):
+            AssetPack(other)
+
+if __name__ == '__main__':
+    unittest.main()
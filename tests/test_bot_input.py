@@ -0,0 +1,59 @@
+import unittest
+import contextlib
+import io
+import os
+import random
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.simulation import Simulation
+from game.entities.player import Player
+from game.env.bot_input import BotInput
+from game.env.soak import run_soak
+
+class FixedInput:
+    human = False
+
+    def poll(self, player):
+        return ()
+
+    def movement(self, player):
+        return (1, 0)
+
+class TestBotInput(unittest.TestCase):
+
+    def test_player_moves_from_its_input_source(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = Player(100, 300, input_source=FixedInput())
+        player.update()
+        self.assertEqual(player.rect.center, (100 + player.speed, 300))
+        self.assertEqual((player.direction.x, player.direction.y), (1, 0))
+
+    def test_bot_plays_a_simulation(self):
+        random.seed(3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation = Simulation()
+            bot = BotInput(simulation)
+            player = simulation.player
+            for _ in range(3600): # One minute of game time
+                commands = [(player, command, argument) for command, argument in bot.poll(player)]
+                simulation.step({player: bot.movement(player)}, commands)
+                if simulation.game_over:
+                    break
+        self.assertEqual(bot.polls, 3600)
+        self.assertGreater(simulation.kills, 0)
+
+    def test_headless_soak_reports(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            monitor = run_soak(minutes=1, report_minutes=0.5, seed=1)
+        self.assertEqual(len(monitor.reports), 2)
+        self.assertEqual(monitor.frames, 3600)
+        self.assertGreater(monitor.reports[-1]["gc_objects"], 0)
+        self.assertIn("Soak done", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
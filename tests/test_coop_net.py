@@ -0,0 +1,192 @@
+import unittest
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import pygame
+from types import SimpleNamespace
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.simulation import Simulation
+from game.entities.npc import NPC
+from game.net import protocol
+from game.net.coop_client import CoopClient
+from game.net.coop_server import CoopServer
+from game.net.coop_view import CoopView
+
+def client_view(view):
+    return {net_id: state[:6] for net_id, state in view.items()}
+
+class TestSnapshotDelta(unittest.TestCase):
+
+    def random_state(self, rng, handle):
+        return (rng.randrange(4), rng.randrange(4000), rng.randrange(2200), rng.randrange(256), rng.randrange(256),
+                rng.randrange(8), handle)
+
+    def test_delta_applied_to_baseline_gives_the_view(self):
+        rng = random.Random(3)
+        baseline = {net_id: self.random_state(rng, net_id) for net_id in rng.sample(range(5000), 300)}
+        view = {}
+        for net_id, state in baseline.items():
+            roll = rng.random()
+            if roll < 0.1:
+                continue # Left the view
+            if roll < 0.2:
+                state = self.random_state(rng, state[6] + (1 << 20)) # Slot reused by another entity
+            elif roll < 0.6:
+                kind, x, y, health, facing, flags, handle = state
+                state = (kind, max(0, x + rng.randint(-3, 3)), max(0, y + rng.randint(-300, 300)), health, (facing + 1) % 256,
+                         flags ^ 1, handle)
+            view[net_id] = state
+        for net_id in rng.sample(range(5000, 6000), 50): # Came into view
+            view[net_id] = self.random_state(rng, net_id)
+
+        delta = bytearray()
+        protocol.encode_entities(delta, view, baseline)
+        decoded, new_ids, offset = protocol.decode_entities(bytes(delta), 0, client_view(baseline))
+        self.assertEqual(offset, len(delta))
+        self.assertEqual(decoded, client_view(view))
+        self.assertEqual(new_ids, {net_id for net_id, state in view.items()
+                                   if net_id not in baseline or baseline[net_id][6] != state[6]})
+
+        full = bytearray()
+        protocol.encode_entities(full, view, {})
+        self.assertEqual(protocol.decode_entities(bytes(full), 0, {})[0], client_view(view))
+        self.assertLess(len(delta), len(full))
+
+        unchanged = bytearray()
+        protocol.encode_entities(unchanged, view, view)
+        self.assertEqual(len(unchanged), 2) # No removals, no records
+
+    def test_partly_damaged_npc_is_quantized(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation = Simulation()
+            npc = NPC(500, 300, event_manager=simulation.event_manager)
+            simulation.entity_manager.add_entity(npc, "npc")
+        npc.take_damage(20 * 0.37) # Linear grenade falloff leaves float health
+        view, _ = protocol.capture_view(simulation.entity_manager, npc.rect)
+        state = view[protocol.net_id(npc)]
+        self.assertEqual(state[3], int(npc.health * 255 // npc.max_health))
+        self.assertIsInstance(state[3], int)
+        delta = bytearray()
+        protocol.encode_entities(delta, view, {})
+        self.assertEqual(protocol.decode_entities(bytes(delta), 0, {})[0], client_view(view))
+
+class TestCoopViewInterpolation(unittest.TestCase):
+
+    def test_reused_slot_is_snapped_not_slid(self):
+        npc, reused = protocol.KIND_NPC, 7
+        baseline = {1: (npc, 100, 100, 255, 0, 0, 1), reused: (npc, 100, 100, 255, 0, 0, reused)}
+        moved = {1: (npc, 120, 100, 255, 0, 0, 1),
+                 reused: (npc, 3000, 2000, 255, 0, 0, reused + (1 << 20))} # Same kind, another NPC
+        delta = bytearray()
+        protocol.encode_entities(delta, moved, baseline)
+        entities, new_ids, _ = protocol.decode_entities(bytes(delta), 0, client_view(baseline))
+        self.assertEqual(new_ids, {reused})
+
+        view = CoopView.__new__(CoopView) # No window: only _positions() is exercised
+        view.client = SimpleNamespace(snapshot_rate=20)
+        view._latest_shown_at = pygame.time.get_ticks() / 1000.0 # Just received: interpolation has barely started
+        positions = view._positions(SimpleNamespace(entities=entities, new_ids=new_ids),
+                                    SimpleNamespace(entities=client_view(baseline)))
+        self.assertLess(positions[1][0], 110) # Still on its way from 100 to 120
+        self.assertEqual(positions[reused], (3000, 2000))
+
+class TestCoopSimulation(unittest.TestCase):
+
+    def setUp(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.simulation = Simulation()
+            self.second = self.simulation.add_player(3000, 1500) # Far from the first player (400, 300)
+
+    def add_npc(self, x, y, health=None):
+        npc = NPC(x, y, event_manager=self.simulation.event_manager, health=health)
+        self.simulation.entity_manager.add_entity(npc, "npc")
+        return npc
+
+    def test_npc_chases_the_nearest_player(self):
+        npc = self.add_npc(3100, 1500)
+        start_x = npc.rect.centerx
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.simulation.step()
+        self.assertIs(self.simulation.blackboard.nearest_player(*npc.rect.center)[0], self.second)
+        self.assertTrue(npc.is_following_player)
+        self.assertLess(npc.rect.centerx, start_x) # Towards the second player, not up to the first
+
+    def test_kill_is_credited_to_the_shooter(self):
+        first = self.simulation.player
+        self.second.face((1, 0))
+        npc = self.add_npc(3150, 1490, health=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(30):
+                self.simulation.step(commands=[(self.second, "fire", None)])
+                if npc.health <= 0:
+                    break
+        self.assertEqual(npc.health, 0)
+        self.assertEqual(self.simulation.kills, 1)
+        self.assertEqual(self.second.kills, 1)
+        self.assertEqual(first.kills, 0)
+
+class TestCoopLoopback(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation = Simulation()
+            for i in range(200):
+                simulation.entity_manager.add_entity(NPC(random.randint(0, 3800), random.randint(0, 2100),
+                                                         event_manager=simulation.event_manager), "npc")
+            self.server = CoopServer(simulation, port=0).start()
+        self.clients = [CoopClient(port=self.server.port) for _ in range(2)]
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.server.close()
+
+    def run_ticks(self, ticks, inputs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for tick in range(ticks):
+                for client in self.clients:
+                    client.poll()
+                    client.send_input(**inputs(tick))
+                time.sleep(0.001) # Let the datagrams cross
+                self.server.step()
+            time.sleep(0.01)
+            for client in self.clients:
+                client.poll()
+
+    def test_clients_see_what_the_server_sent(self):
+        hello = protocol.HELLO.pack(protocol.MSG_HELLO, protocol.PROTOCOL_VERSION)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for client in self.clients:
+                for _ in range(100):
+                    client._socket.send(hello)
+                    time.sleep(0.001)
+                    self.server.step()
+                    time.sleep(0.001)
+                    client.poll()
+                    if client.connected:
+                        break
+        self.assertTrue(all(client.connected for client in self.clients))
+        self.assertEqual(len(self.server.simulation.players), 2)
+
+        self.run_ticks(90, lambda tick: {"movement": (1, 1), "fire": tick == 40, "weapon": "shotgun" if tick >= 20 else None})
+        for client, session in zip(self.clients, self.server.sessions.values()):
+            latest = client.latest
+            self.assertIsNotNone(latest)
+            self.assertEqual(latest.entities, client_view(session.history[latest.tick]))
+            self.assertGreater(latest.baseline_tick, 0) # Deltas after the first snapshot
+            self.assertEqual(client.full_snapshots, 1)
+            self.assertEqual(client.dropped, 0)
+            self.assertEqual(latest.weapon_key, "shotgun")
+            self.assertEqual(latest.entities[latest.player_id][0], protocol.KIND_PLAYER)
+
+if __name__ == '__main__':
+    unittest.main()
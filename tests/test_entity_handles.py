@@ -0,0 +1,72 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.blackboard import Blackboard
+from game.entities.npc import NPC
+from game.systems.entity_manager import EntityManager
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.utils.effects import EffectManager
+
+class TestEntityHandles(unittest.TestCase):
+
+    def setUp(self):
+        self.entity_manager = EntityManager()
+        self.blackboard = Blackboard()
+        self.weapon_system = WeaponSystem(self.entity_manager, EffectManager(), CombatManager(self.entity_manager),
+                                          blackboard=self.blackboard)
+
+    def test_stale_handle_does_not_resolve_to_slot_reuser(self):
+        first = NPC(100, 100)
+        self.entity_manager.add_entity(first, "npc")
+        old_handle = first.handle
+        self.assertIs(self.entity_manager.resolve(old_handle), first)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            first.kill()
+        self.assertIsNone(self.entity_manager.resolve(old_handle))
+
+        second = NPC(200, 200)
+        self.entity_manager.add_entity(second, "npc")
+        self.assertNotEqual(second.handle, old_handle)
+        self.assertIsNone(self.entity_manager.resolve(old_handle))
+        self.assertIs(self.entity_manager.resolve(second.handle), second)
+
+    def test_new_npc_does_not_inherit_dead_npcs_cooldown(self):
+        self.blackboard.current_time = 10000
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = NPC(100, 100)
+            self.entity_manager.add_entity(first, "npc")
+            self.assertTrue(self.weapon_system.use_weapon(first))
+            self.assertFalse(self.weapon_system.use_weapon(first)) # Cooling down
+            first.kill()
+
+            second = NPC(100, 100) # Takes the freed slot
+            self.entity_manager.add_entity(second, "npc")
+            self.assertTrue(self.weapon_system.use_weapon(second))
+
+    def test_cooldown_rows_stay_flat_over_many_spawns(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            for wave in range(200):
+                self.blackboard.current_time = 10000 + wave * 5000
+                npcs = [NPC(100 + i, 100) for i in range(10)]
+                for npc in npcs:
+                    self.entity_manager.add_entity(npc, "npc")
+                    self.weapon_system.use_weapon(npc)
+                for npc in npcs:
+                    npc.kill()
+        self.assertEqual(self.entity_manager.handle_capacity, 10)
+        self.assertEqual(self.weapon_system.cooldowns.rows, 10)
+        self.assertEqual(self.weapon_system.last_use_times, {})
+
+if __name__ == '__main__':
+    unittest.main()
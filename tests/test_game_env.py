@@ -0,0 +1,73 @@
+import unittest
+import contextlib
+import io
+import os
+import random
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.env.game_env import GameEnv, observation_size, OBS_HEALTH, OBS_WEAPON, OBS_NPCS, NPC_PRESENT
+from game.env.vector_env import VectorGameEnv
+
+def actions(seed, count):
+    rng = random.Random(seed)
+    return [(rng.randint(-1, 1), rng.randint(-1, 1), int(rng.random() < 0.3), rng.choice([0] * 8 + [1, 2, 3, 4, 5]))
+            for _ in range(count)]
+
+class TestGameEnv(unittest.TestCase):
+
+    def run_episode(self, seed, steps):
+        env = GameEnv(max_steps=steps)
+        with contextlib.redirect_stdout(io.StringIO()):
+            observation, info = env.reset(seed=seed)
+            observations = [list(observation)]
+            for action in actions(seed, steps):
+                observation, reward, terminated, truncated, info = env.step(action)
+                observations.append(list(observation))
+                if terminated or truncated:
+                    break
+        return env, observations, terminated, truncated
+
+    def test_same_seed_same_episode(self):
+        env, first, terminated, truncated = self.run_episode(4, 60)
+        self.assertEqual(len(first[0]), observation_size())
+        self.assertTrue(truncated)
+        self.assertFalse(terminated)
+        self.assertEqual(env.episode_steps, 60)
+        self.assertEqual(first[0][OBS_HEALTH], 1.0)
+        self.assertTrue(any(observation[OBS_NPCS + NPC_PRESENT] for observation in first)) # The wave reached the player
+        self.assertTrue(any(observation[OBS_WEAPON] for observation in first)) # Weapon switches went through
+        _, second, _, _ = self.run_episode(4, 60)
+        self.assertEqual(first, second)
+
+class TestVectorGameEnv(unittest.TestCase):
+
+    def test_workers_match_an_in_process_env(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            vector = VectorGameEnv(3, num_workers=2, max_steps=25)
+            local = GameEnv(max_steps=25)
+            try:
+                observations, infos = vector.reset(seed=10)
+                # 3 envs over 2 workers: env 2 is alone in its worker, so its random stream is its own
+                local_observation, _ = local.reset(seed=12)
+                self.assertEqual(observations.tolist()[2], list(local_observation))
+                for step, batch in enumerate(zip(*(actions(seed, 30) for seed in range(3)))):
+                    observations, rewards, terminated, truncated, infos = vector.step(batch)
+                    local_observation, reward, done, cut, _ = local.step(batch[2])
+                    if done or cut:
+                        local_observation, _ = local.reset()
+                    self.assertEqual(observations.tolist()[2], list(local_observation))
+                    self.assertAlmostEqual(rewards.tolist()[2], reward, places=5)
+                    self.assertEqual(truncated.tolist(), [step == 24] * 3)
+                    if step == 24:
+                        self.assertEqual(infos["episode_steps"], [25] * 3) # The episode that ended
+                self.assertEqual(infos["episodes"], [1] * 3)
+                self.assertEqual(infos["episode_steps"], [5] * 3)
+            finally:
+                vector.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pygame
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.ui.leaderboard import Leaderboard
+from game.ui.leaderboard_client import AsyncLeaderboardClient
+from game.ui.leaderboard_sprite import LeaderboardSprite
+
+class SlowLeaderboard:
+    """In-memory store whose writes wait until the test releases them, like a slow fsync."""
+    def __init__(self):
+        self.scores = []
+        self.release = threading.Event()
+        self.write_threads = []
+
+    def add_score(self, name, score):
+        self.release.wait(5)
+        self.write_threads.append(threading.current_thread())
+        self.scores.append((name, score, None))
+
+    def get_top_scores(self, count=10):
+        return sorted(self.scores, key=lambda s: -s[1])[:count]
+
+    def get_rank_and_percentile(self, score):
+        rank = 1 + sum(1 for entry in self.scores if entry[1] > score)
+        return rank, 100.0 * rank / max(len(self.scores), 1)
+
+class TestAsyncLeaderboardClient(unittest.TestCase):
+
+    def test_submit_returns_before_the_write_and_callbacks_run_on_dispatch(self):
+        store = SlowLeaderboard()
+        client = AsyncLeaderboardClient(store)
+        received = []
+        start = time.perf_counter()
+        self.assertTrue(client.submit_score("Mila", 42, on_done=received.append))
+        self.assertLess(time.perf_counter() - start, 0.1) # Didn't wait for the blocked write
+        self.assertEqual(client.dispatch_callbacks(), 0)
+
+        store.release.set()
+        self.assertTrue(client.flush(5))
+        self.assertEqual(received, []) # Not delivered on the worker thread
+        self.assertEqual(client.dispatch_callbacks(), 1)
+        self.assertEqual(received, [[("Mila", 42, None)]])
+        self.assertIsNot(store.write_threads[0], threading.current_thread())
+        client.close()
+
+    def test_full_queue_refuses_instead_of_blocking(self):
+        store = SlowLeaderboard()
+        client = AsyncLeaderboardClient(store, max_pending=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [client.submit_score(f"P{i}", i) for i in range(6)]
+        # At most one request is being processed by the worker while two wait in the queue
+        self.assertEqual(results[:2], [True, True])
+        self.assertLessEqual(results.count(True), 3)
+        self.assertEqual(client.dropped, results.count(False))
+        store.release.set()
+        client.close()
+        self.assertEqual(len(store.scores), results.count(True))
+
+    def test_close_flushes_writes_to_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "scores.db")
+            with contextlib.redirect_stdout(io.StringIO()):
+                client = AsyncLeaderboardClient(Leaderboard(db_name=db_name))
+                for i in range(20):
+                    client.submit_score(f"Player{i}", i)
+                client.close()
+                top = Leaderboard(db_name=db_name).get_top_scores(3)
+            self.assertEqual([score for _, score, _ in top], [19, 18, 17])
+            self.assertFalse(client.submit_score("Late", 1)) # Closed clients refuse new work
+
+    def test_second_game_over_waits_for_its_own_scores(self):
+        store = SlowLeaderboard()
+        store.release.set()
+        client = AsyncLeaderboardClient(store)
+        sprite = LeaderboardSprite(None, None, None, None, store, SimpleNamespace(SCREEN_WIDTH=800, SCREEN_HEIGHT=600),
+                                   leaderboard_client=client)
+        enter = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode="")
+        for name, score in (("First", 10), ("Second", 20)):
+            sprite.activate(score)
+            self.assertEqual(sprite.top_scores_cache, []) # Not the previous run's list
+            sprite.current_name_input = name
+            sprite.handle_event(enter)
+            self.assertTrue(sprite.scores_loading)
+            self.assertEqual(sprite.top_scores_cache, [])
+            self.assertTrue(client.flush(5))
+            sprite.update()
+            self.assertFalse(sprite.scores_loading)
+            self.assertEqual(sprite.top_scores_cache[0][:2], (name, score))
+        client.close()
+
+if __name__ == '__main__':
+    unittest.main()
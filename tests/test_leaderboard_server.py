@@ -0,0 +1,138 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.ui.leaderboard import Leaderboard
+from game.ui.leaderboard_remote import RemoteLeaderboard
+from game.ui.leaderboard_server import LeaderboardServer
+
+CLIENTS = 200
+SCORES_PER_CLIENT = 5
+
+class TestLeaderboardServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=os.path.join(self.tmp.name, "scores.db"))
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop_thread(5)
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _start_server(self, port=0):
+        self.server = LeaderboardServer(self.leaderboard, "127.0.0.1", port).start_in_thread()
+        return self.server.port
+
+    def test_hundreds_of_concurrent_clients(self):
+        port = self._start_server()
+        errors = []
+        barrier = threading.Barrier(CLIENTS)
+        flushed = threading.Barrier(CLIENTS)
+
+        def play(index):
+            client = RemoteLeaderboard("127.0.0.1", port, batch_interval=None, batch_size=SCORES_PER_CLIENT)
+            try:
+                barrier.wait(10) # Everyone submits at once
+                for game in range(SCORES_PER_CLIENT):
+                    client.add_score(f"C{index}", index * SCORES_PER_CLIENT + game)
+                client.flush()
+                flushed.wait(30) # Ranks only hold still once every client's scores are in
+                top = client.get_top_scores(3)
+                if client.get_rank(top[-1][1]) != 3:
+                    errors.append(index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                client.close()
+
+        threads = [threading.Thread(target=play, args=(i,)) for i in range(CLIENTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.leaderboard.score_count(), CLIENTS * SCORES_PER_CLIENT)
+        best = CLIENTS * SCORES_PER_CLIENT - 1
+        self.assertEqual([score for _, score, _ in self.leaderboard.get_top_scores(2)], [best, best - 1])
+        self.assertLess(self.server.write_batches, CLIENTS // 2) # Submissions were coalesced into few commits
+
+    def test_client_retries_until_the_server_is_up(self):
+        with socket.socket() as probe: # Find a free port, then leave it closed for a moment
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        client = RemoteLeaderboard("127.0.0.1", port, batch_interval=None)
+        client.add_score("Early", 7)
+        starter = threading.Timer(0.2, self._start_server, args=(port,))
+        starter.start()
+        top = client.get_top_scores(1) # Flushes first, backing off until the server listens
+        starter.join()
+        self.assertEqual([(name, score) for name, score, _ in top], [("Early", 7)])
+        self.assertGreater(client.retried, 0)
+        client.close()
+
+    def test_resent_batch_is_written_once_and_top_n_is_cached(self):
+        port = self._start_server()
+        with socket.create_connection(("127.0.0.1", port)) as connection:
+            reader = connection.makefile("rb")
+            for request_id in (1, 2): # Same batch id twice, as after a lost response
+                request = {"id": request_id, "op": "add_scores", "batch": "test-1", "scores": [["A", 5], ["B", 6]]}
+                connection.sendall(json.dumps(request).encode() + b"\n")
+                self.assertEqual(json.loads(reader.readline()), {"id": request_id, "ok": True, "result": 2})
+            reader.close()
+        self.assertEqual(self.leaderboard.score_count(), 2)
+
+        client = RemoteLeaderboard("127.0.0.1", port, batch_interval=None, top_ttl=60)
+        first = client.get_top_scores(2)
+        self.assertEqual(client.get_top_scores(2), first)
+        self.assertEqual((client.cache_hits, client.cache_misses), (1, 1))
+        client.add_score("C", 9) # Our own write clears the cache
+        self.assertEqual(client.get_top_scores(2)[0][:2], ("C", 9))
+        self.assertEqual(client.cache_misses, 2)
+        client.close()
+    def test_rank_and_percentile_come_from_one_request(self):
+        port = self._start_server()
+        self.leaderboard.add_scores([("A", 5), ("B", 6), ("C", 7), ("D", 8)])
+        client = RemoteLeaderboard("127.0.0.1", port, batch_interval=None)
+        ops = []
+        request = client._request
+        client._request = lambda payload: ops.append(payload["op"]) or request(payload)
+        self.assertEqual(client.get_rank_and_percentile(6), (3, 75.0))
+        self.assertEqual(ops, ["rank"])
+        client.close()
+
+    def test_storage_error_reaches_the_client(self):
+        port = self._start_server()
+        insert_scores = self.leaderboard.backend.insert_scores
+        def fail(rows):
+            raise sqlite3.OperationalError("disk I/O error")
+        self.leaderboard.backend.insert_scores = fail
+        client = RemoteLeaderboard("127.0.0.1", port, batch_interval=None, retries=1)
+        client.add_score("Lost", 3)
+        self.assertFalse(client.flush()) # Not acknowledged: the score stays buffered
+        self.assertEqual(self.server.rows_written, 0)
+        self.leaderboard.backend.insert_scores = insert_scores
+        self.assertTrue(client.flush()) # The same batch id is written this time, not taken for a duplicate
+        self.assertEqual([(name, score) for name, score, _ in self.leaderboard.get_top_scores(1)], [("Lost", 3)])
+        self.assertEqual(self.server.rows_written, 1)
+        client.close()
+
+if __name__ == '__main__':
+    unittest.main()
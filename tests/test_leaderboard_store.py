@@ -0,0 +1,278 @@
+import unittest
+import contextlib
+import datetime
+import io
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.ui.leaderboard import Leaderboard
+
+def query_file(db_name, sql, params=()):
+    """Runs `sql` on its own sqlite3 connection to the database file and returns all rows."""
+    connection = sqlite3.connect(db_name)
+    try:
+        return connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+def query_backend(leaderboard, sql):
+    """Runs `sql` on the leaderboard's own connection (for per-connection settings like PRAGMAs)."""
+    connection = leaderboard.backend.connection
+    if hasattr(connection, "exec_driver_sql"): # SQLAlchemy Connection
+        return connection.exec_driver_sql(sql).fetchall()
+    return connection.execute(sql).fetchall()
+
+class TestLeaderboardStore(unittest.TestCase):
+    backend = "sqlite3"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp.name, "scores.db")
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=self.db_name, backend=self.backend)
+
+    def tearDown(self):
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def test_connection_is_tuned_and_top_n_uses_the_index(self):
+        self.assertEqual(query_backend(self.leaderboard, "PRAGMA journal_mode")[0][0], "wal")
+        self.assertEqual(query_backend(self.leaderboard, "PRAGMA synchronous")[0][0], 1) # NORMAL
+        plan = query_file(self.db_name, "EXPLAIN QUERY PLAN SELECT name, score, timestamp FROM scores "
+                                        "ORDER BY score DESC, timestamp ASC LIMIT 10")
+        self.assertIn("USING INDEX ix_scores_score_desc_timestamp", " ".join(str(row) for row in plan))
+        self.assertNotIn("TEMP B-TREE", " ".join(str(row) for row in plan)) # No sort step
+
+    def test_top_scores_are_plain_tuples_ordered_by_score_then_time(self):
+        for name, score in (("A", 10), ("B", 30), ("C", 30), ("D", 20)):
+            self.leaderboard.add_score(name, score)
+        top = self.leaderboard.get_top_scores(3)
+        self.assertEqual([(name, score) for name, score, _ in top], [("B", 30), ("C", 30), ("D", 20)])
+        self.assertIs(type(top[0]), tuple)
+
+    def test_index_is_added_to_an_existing_database(self):
+        self.leaderboard.close()
+        connection = sqlite3.connect(self.db_name)
+        connection.execute("DROP INDEX ix_scores_score_desc_timestamp")
+        connection.commit()
+        connection.close()
+
+        self.leaderboard = Leaderboard(db_name=self.db_name, backend=self.backend)
+        indexes = query_file(self.db_name, "PRAGMA index_list(scores)")
+        self.assertIn("ix_scores_score_desc_timestamp", [row[1] for row in indexes])
+
+    def test_files_are_interchangeable_between_backends(self):
+        self.leaderboard.add_score("A", 10)
+        self.leaderboard.add_score("B", 20)
+        self.leaderboard.close()
+        other = "sqlalchemy" if self.backend == "sqlite3" else "sqlite3"
+        self.leaderboard = Leaderboard(db_name=self.db_name, backend=other)
+        self.leaderboard.add_score("C", 15)
+        self.assertEqual([(name, score) for name, score, _ in self.leaderboard.get_top_scores(3)],
+                         [("B", 20), ("C", 15), ("A", 10)])
+        self.assertEqual(self.leaderboard.get_rank(15), 2)
+        self.assertEqual([name for name, _, _ in self.leaderboard.get_top_scores(3, window="daily")], ["B", "C", "A"])
+
+class TestLeaderboardStoreSQLAlchemy(TestLeaderboardStore):
+    backend = "sqlalchemy"
+
+class TestTopScoreCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=os.path.join(self.tmp.name, "scores.db"), top_cache_size=5)
+
+    def tearDown(self):
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _table_top(self, count):
+        with self.leaderboard._lock:
+            return self.leaderboard.backend.top_scores(count)
+
+    def test_cache_matches_table_through_random_writes(self):
+        rng = random.Random(3)
+        for i in range(200):
+            self.leaderboard.add_score(f"P{i}", rng.randrange(50))
+            if i % 7 == 0:
+                self.assertEqual(self.leaderboard.get_top_scores(5), self._table_top(5))
+        self.assertEqual(self.leaderboard.get_top_scores(3), self._table_top(3))
+        stats = self.leaderboard.cache_stats()
+        self.assertEqual(stats["misses"], 1) # Only the first read went to the table
+        self.assertGreater(stats["skips"], 100) # Most scores couldn't reach the top 5
+
+    def test_low_score_does_not_touch_cached_top(self):
+        for score in (50, 40, 30, 20, 10, 5):
+            self.leaderboard.add_score("A", score)
+        before = self.leaderboard.get_top_scores(5)
+        self.leaderboard.add_score("B", 1)
+        self.assertEqual(self.leaderboard.cache_stats()["skips"], 1)
+        self.assertEqual(self.leaderboard.get_top_scores(5), before)
+        self.leaderboard.add_score("C", 45)
+        self.assertEqual([score for _, score, _ in self.leaderboard.get_top_scores(5)], [50, 45, 40, 30, 20])
+
+    def test_larger_request_than_cache_reads_the_table(self):
+        for score in range(8):
+            self.leaderboard.add_score("A", score)
+        self.assertEqual(len(self.leaderboard.get_top_scores(8)), 8)
+        self.assertEqual(self.leaderboard.cache_stats()["misses"], 1)
+
+class TestRankQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp.name, "scores.db")
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=self.db_name)
+
+    def tearDown(self):
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _naive_rank(self, score):
+        return query_file(self.db_name, "SELECT COUNT(*) FROM scores WHERE score > ?", (score,))[0][0] + 1
+
+    def test_rank_and_percentile_match_a_count_over_the_table(self):
+        rng = random.Random(5)
+        for i in range(300):
+            self.leaderboard.add_score(f"P{i}", rng.randrange(-20, 80))
+        for score in (-50, -20, 0, 33, 79, 200):
+            self.assertEqual(self.leaderboard.get_rank(score), self._naive_rank(score))
+        self.assertEqual(self.leaderboard.score_count(), 300)
+        self.assertEqual(self.leaderboard.get_percentile(1000), 100 / 300)
+        self.assertEqual(self.leaderboard.get_percentile(-1000), 100.0)
+
+    def test_histogram_persists_and_is_built_for_older_tables(self):
+        for score in (5, 5, 9, 1):
+            self.leaderboard.add_score("A", score)
+        self.leaderboard.close()
+        self.leaderboard = Leaderboard(db_name=self.db_name)
+        self.assertEqual(self.leaderboard.get_rank(5), 2)
+
+        # A table filled without add_score (or before the histogram existed) is counted once on open
+        self.leaderboard.close()
+        connection = sqlite3.connect(self.db_name)
+        connection.execute("DELETE FROM score_histogram")
+        connection.executemany("INSERT INTO scores (name, score) VALUES ('B', ?)", [(7,), (7,), (10,)])
+        connection.commit()
+        connection.close()
+        self.leaderboard = Leaderboard(db_name=self.db_name)
+        self.assertEqual([self.leaderboard.get_rank(s) for s in (10, 9, 7, 5, 1)], [1, 2, 3, 5, 7])
+
+class TestTimeWindows(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp.name, "scores.db")
+        self.now = datetime.datetime(2024, 3, 6, 12, 0) # A Wednesday
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=self.db_name, window_size=3, clock=self._clock)
+
+    def tearDown(self):
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def _clock(self):
+        self.now += datetime.timedelta(seconds=1) # Distinct timestamps for every score
+        return self.now
+
+    def _scores(self, window, count=10):
+        return [(name, score) for name, score, _ in self.leaderboard.get_top_scores(count, window=window)]
+
+    def test_windows_keep_the_top_of_the_current_period(self):
+        for name, score in (("A", 10), ("B", 50), ("C", 30), ("D", 20), ("E", 5)):
+            self.leaderboard.add_score(name, score)
+        self.now += datetime.timedelta(days=1) # Thursday: new day, same week
+        for name, score in (("F", 40), ("G", 1)):
+            self.leaderboard.add_score(name, score)
+
+        self.assertEqual(self._scores("daily"), [("F", 40), ("G", 1)])
+        self.assertEqual(self._scores("weekly"), [("B", 50), ("F", 40), ("C", 30)])
+        self.assertEqual(self._scores("all", 4), [("B", 50), ("F", 40), ("C", 30), ("D", 20)])
+        rows = query_file(self.db_name, "SELECT COUNT(*) FROM window_top_scores")[0][0]
+        self.assertEqual(rows, 3 + 3 + 2) # Wednesday, the week, Thursday: never more than window_size each
+        self.assertEqual(self.leaderboard.get_top_scores(5, window="monthly"), [])
+
+    def test_old_periods_are_compacted_on_rollover(self):
+        self.leaderboard.add_score("Old", 99)
+        self.now += datetime.timedelta(weeks=10)
+        self.leaderboard.add_score("New", 1)
+        periods = [row[0] for row in query_file(self.db_name, "SELECT DISTINCT period FROM window_top_scores ORDER BY period")]
+        self.assertEqual(periods, ["2024-05-15", "2024-W20"])
+        self.assertEqual(self._scores("weekly"), [("New", 1)])
+
+class TestBulkScores(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.leaderboard = Leaderboard(db_name=os.path.join(self.tmp.name, "scores.db"))
+
+    def tearDown(self):
+        self.leaderboard.close()
+        self.quiet.__exit__(None, None, None)
+        self.tmp.cleanup()
+
+    def test_add_scores_batches_and_keeps_caches_consistent(self):
+        self.assertEqual(self.leaderboard.get_top_scores(1), []) # Loads the (empty) top-N cache
+        old = datetime.datetime(2020, 1, 1)
+        entries = ((f"P{i}", i % 500, old) for i in range(2000))
+        added = self.leaderboard.add_scores(itertools.chain(entries, [("", 5), ("Bad", "7"), ("Now", 900)]), batch_size=300)
+        self.assertEqual(added, 2001)
+        self.assertEqual([score for _, score, _ in self.leaderboard.get_top_scores(3)], [900, 499, 499])
+        self.assertEqual(self.leaderboard.get_rank(499), 2)
+        self.assertEqual(self.leaderboard.score_count(), 2001)
+        # Only the score stamped now reaches today's leaderboard
+        self.assertEqual([name for name, _, _ in self.leaderboard.get_top_scores(10, window="daily")], ["Now"])
+
+    def test_export_and_import_round_trip(self):
+        rows = [("A", 3, datetime.datetime(2021, 5, 1, 10, 0)), ("B, Jr.", 9, datetime.datetime(2021, 5, 2, 11, 30))]
+        self.leaderboard.add_scores(rows)
+        for extension in ("csv", "jsonl"):
+            path = os.path.join(self.tmp.name, f"scores.{extension}")
+            self.assertEqual(self.leaderboard.export_scores(path, batch_size=1), 2)
+            other = Leaderboard(db_name=os.path.join(self.tmp.name, f"copy_{extension}.db"))
+            self.assertEqual(other.import_scores(path), 2)
+            self.assertEqual(other.get_top_scores(5), self.leaderboard.get_top_scores(5))
+            other.close()
+    def test_import_converts_offset_timestamps_to_utc(self):
+        path = os.path.join(self.tmp.name, "scores.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"name": "Z", "score": 4, "timestamp": "2021-05-01T10:00:00Z"}\n')
+            f.write('{"name": "Offset", "score": 6, "timestamp": "2021-05-01T12:00:00+02:00"}\n')
+        self.assertEqual(self.leaderboard.import_scores(path), 2)
+        utc = datetime.datetime(2021, 5, 1, 10, 0)
+        self.assertEqual(self.leaderboard.get_top_scores(5), [("Offset", 6, utc), ("Z", 4, utc)])
+        self.assertEqual(self.leaderboard.score_count(), 2)
+
+    def test_failed_batch_is_rolled_back(self):
+        def fail(*args):
+            raise TypeError("window update failed")
+        self.leaderboard._add_to_window = fail
+        with self.assertRaises(TypeError):
+            self.leaderboard.add_scores([("A", 3)])
+        del self.leaderboard._add_to_window
+        self.leaderboard.add_score("B", 1) # Commits; must not carry A's row along
+        self.assertEqual([name for name, _, _ in self.leaderboard.get_top_scores(5)], ["B"])
+        self.assertEqual(self.leaderboard.score_count(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
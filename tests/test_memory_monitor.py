@@ -0,0 +1,50 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.memory_monitor import MemoryMonitor
+from game.core.simulation import Simulation
+
+class TestMemoryMonitor(unittest.TestCase):
+
+    def test_checkpoints_at_wave_boundaries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory_report.txt")
+            with contextlib.redirect_stdout(io.StringIO()):
+                monitor = MemoryMonitor(report_path=path, top=5).start()
+                simulation = Simulation(wave_options={"first_wave": 5, "rest_period": 100})
+                monitor.watch(simulation)
+                simulation.step()
+                killed = list(simulation.entity_manager.npcs) # Held here after they are killed
+                for npc in killed:
+                    npc.kill()
+                for _ in range(3):
+                    simulation.step()
+                cleared = monitor.checkpoints[-1]
+                for _ in range(10): # Rest period over: wave 6
+                    simulation.step()
+                monitor.close()
+            self.assertFalse(tracemalloc.is_tracing())
+            labels = [checkpoint["label"] for checkpoint in monitor.checkpoints]
+            self.assertEqual(labels, ["start", "wave 5 started", "wave 5 cleared", "wave 6 started", "exit"])
+            self.assertEqual(len(killed), 5)
+            total, in_groups, surface_bytes = cleared["sprites"]["NPC"]
+            self.assertEqual(total - in_groups, 5) # The killed NPCs this test still references
+            self.assertGreater(surface_bytes, 0)
+            self.assertEqual(cleared["containers"]["entity_manager.entities"], 1) # Only the player
+            self.assertTrue(cleared["top_sites"])
+            with open(path) as report:
+                text = report.read()
+            self.assertIn("wave 6 started", text)
+            self.assertIn("Growth since the previous checkpoint:", text)
+
+if __name__ == '__main__':
+    unittest.main()
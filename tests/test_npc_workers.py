@@ -0,0 +1,107 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.blackboard import Blackboard
+from game.entities.player import Player
+from game.entities.npc import NPC
+from game.systems.entity_manager import EntityManager
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.systems.npc_workers import NPCWorkerPool
+from game.utils.effects import EffectManager
+
+NPC_POSITIONS = [(100, 100), (600, 380), (2000, 900), (1300, 700), (3500, 2000)]
+
+class TestNPCWorkerPool(unittest.TestCase):
+
+    def _build_world(self, player_positions=((640, 360),)):
+        entity_manager = EntityManager()
+        effect_manager = EffectManager()
+        combat_manager = CombatManager(entity_manager)
+        blackboard = Blackboard()
+        weapon_system = WeaponSystem(entity_manager, effect_manager, combat_manager, blackboard=blackboard)
+        for x, y in player_positions:
+            entity_manager.add_entity(Player(x, y), "player")
+        for x, y in NPC_POSITIONS:
+            entity_manager.add_entity(NPC(x, y), "npc")
+        return entity_manager, effect_manager, combat_manager, weapon_system, blackboard
+
+    def _compare_with_main_thread(self, player_positions):
+        """Runs the same world through NPC.update() and the pool; returns the pooled NPCs."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference = self._build_world(player_positions)
+            pooled = self._build_world(player_positions)
+            pool = NPCWorkerPool(2, capacity=16)
+            try:
+                for tick in range(40):
+                    em, fx, cm, ws, bb = reference
+                    bb.refresh(em, current_time=tick * 16)
+                    for npc in em.npcs:
+                        npc.update(em, cm, fx, ws, blackboard=bb)
+                    em, fx, cm, ws, bb = pooled
+                    bb.refresh(em, current_time=tick * 16)
+                    pool.step(em, bb, ws, cm, fx)
+            finally:
+                pool.close()
+
+        ref_npcs = sorted(reference[0].npcs, key=lambda n: (n.start_x, n.start_y))
+        pool_npcs = sorted(pooled[0].npcs, key=lambda n: (n.start_x, n.start_y))
+        self.assertEqual(len(ref_npcs), len(pool_npcs))
+        for ref, got in zip(ref_npcs, pool_npcs):
+            # Both paths round to whole pixels each tick; allow 1 px for float noise in the directions
+            self.assertLessEqual(abs(ref.rect.x - got.rect.x), 1)
+            self.assertLessEqual(abs(ref.rect.y - got.rect.y), 1)
+            self.assertEqual(ref.is_following_player, got.is_following_player)
+        return pool_npcs
+
+    def test_workers_match_main_thread_update(self):
+        """Shared-memory workers should move NPCs like NPC.update() does."""
+        self._compare_with_main_thread(((640, 360),))
+
+    def test_workers_chase_the_nearest_player(self):
+        npcs = self._compare_with_main_thread(((640, 360), (2100, 950)))
+        chaser = next(npc for npc in npcs if (npc.start_x, npc.start_y) == (2000, 900))
+        self.assertTrue(chaser.is_following_player)
+        self.assertGreater(chaser.rect.x, 2000) # Towards the second player, not back to the first
+        with contextlib.redirect_stdout(io.StringIO()):
+            em, fx, cm, ws, bb = self._build_world(((640, 360), (2100, 950)))
+            second = em.players.sprites()[1]
+            for npc in em.npcs.sprites():
+                npc.kill()
+            em.add_entity(NPC(2080, 935), "npc") # In knife range of the second player
+            pool = NPCWorkerPool(1, capacity=4)
+            try:
+                bb.refresh(em, current_time=1000)
+                pool.step(em, bb, ws, cm, fx)
+            finally:
+                pool.close()
+        self.assertLess(second.health, second.max_health)
+        self.assertEqual(em.players.sprites()[0].health, em.players.sprites()[0].max_health)
+
+    def test_slots_are_released_when_npcs_die(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            em, fx, cm, ws, bb = self._build_world()
+            pool = NPCWorkerPool(1, capacity=len(NPC_POSITIONS))
+            try:
+                bb.refresh(em, current_time=0)
+                pool.step(em, bb, ws, cm, fx)
+                self.assertEqual(len(pool._free_slots), 0)
+                em.npcs.sprites()[0].kill()
+                em.add_entity(NPC(50, 50), "npc")
+                bb.refresh(em, current_time=16)
+                pool.step(em, bb, ws, cm, fx)
+                self.assertEqual(len(pool._slots), len(NPC_POSITIONS))
+            finally:
+                pool.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.render_snapshot import SnapshotBuffer
+
+class TestSnapshotBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = SnapshotBuffer()
+
+    def _publish(self, frame):
+        snapshot = self.buffer.begin_write()
+        snapshot.frame = frame
+        snapshot.sprites.append((None, frame, frame))
+        self.buffer.publish()
+
+    def test_reader_gets_latest_published_frame(self):
+        self._publish(1)
+        self._publish(2)
+        self._publish(3)
+        latest = self.buffer.latest()
+        self.assertEqual(latest.frame, 3)
+        self.assertEqual(latest.sprites, [(None, 3, 3)])
+
+    def test_reader_repeats_frame_until_a_new_one_is_published(self):
+        self._publish(1)
+        first = self.buffer.latest()
+        self.assertIs(self.buffer.latest(), first)
+        self._publish(2)
+        self.assertEqual(self.buffer.latest().frame, 2)
+
+    def test_writer_never_reuses_the_snapshot_being_read(self):
+        self._publish(1)
+        front = self.buffer.latest()
+        for frame in range(2, 6):
+            self.assertIsNot(self.buffer.begin_write(), front)
+            self._publish(frame)
+        # The front snapshot was left untouched while the writer kept going
+        self.assertEqual(front.frame, 1)
+        self.assertEqual(front.sprites, [(None, 1, 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pygame
+from game.entities.npc import NPC
+from game.entities.player import Player
+from game.entities.projectile import Projectile
+from game.systems.entity_manager import EntityManager
+from game.systems.spatial_grid import SpatialGrid, falloff_weights
+from game.entities.grenade import Grenade
+from game.systems.combat_system import CombatManager
+from game.systems.weapon_system import WeaponSystem
+from game.utils.effects import EffectManager
+
+class FastWeapon:
+    projectile_color = (255, 0, 0)
+    projectile_speed = 80 # Much more than an NPC's 30px width per frame
+    damage = 10
+
+class TestSweptCollision(unittest.TestCase):
+
+    def test_segment_hits_earliest_box(self):
+        near = pygame.sprite.Sprite()
+        near.rect = pygame.Rect(100, 90, 30, 30)
+        far = pygame.sprite.Sprite()
+        far.rect = pygame.Rect(300, 90, 30, 30)
+        grid = SpatialGrid(cell_size=64)
+        grid.rebuild([far, near])
+
+        sprite, t = grid.first_hit(0, 100, 400, 100)
+        self.assertIs(sprite, near)
+        self.assertAlmostEqual(t, 0.25)
+        # Reversed direction reaches the far box first
+        sprite, _ = grid.first_hit(400, 100, 0, 100)
+        self.assertIs(sprite, far)
+        # A segment passing above both boxes misses; growing it by the moving box's half height hits
+        self.assertEqual(grid.first_hit(0, 80, 400, 80), (None, None))
+        self.assertIs(grid.first_hit(0, 80, 400, 80, half_w=5, half_h=12)[0], near)
+
+    def test_fast_projectile_does_not_tunnel(self):
+        entity_manager = EntityManager()
+        with contextlib.redirect_stdout(io.StringIO()):
+            npc = NPC(500, 500)
+            entity_manager.add_entity(npc, "npc")
+            # Starts left of the NPC; one update jumps 80px, past the NPC's far edge
+            projectile = Projectile(npc.rect.left - 30, npc.rect.centery, pygame.math.Vector2(1, 0), FastWeapon())
+            entity_manager.add_entity(projectile, "projectile")
+            projectile.update()
+            self.assertFalse(projectile.rect.colliderect(npc.rect)) # End rect alone would miss
+            entity_manager.handle_collisions(EffectManager())
+
+        self.assertEqual(npc.health, npc.max_health - FastWeapon.damage)
+        self.assertFalse(projectile.groups()) # Projectile was consumed by the hit
+
+class TestHitscan(unittest.TestCase):
+
+    def _box(self, x, y, size=30):
+        sprite = pygame.sprite.Sprite()
+        sprite.rect = pygame.Rect(x, y, size, size)
+        return sprite
+
+    def test_raycast_returns_closest_hit_across_cells(self):
+        near = self._box(300, 290)
+        far = self._box(520, 290)
+        behind = self._box(40, 290) # Behind the origin
+        grid = SpatialGrid(cell_size=64)
+        grid.rebuild([far, behind, near])
+
+        sprite, distance = grid.raycast(100, 300, 1, 0, 1000)
+        self.assertIs(sprite, near)
+        self.assertAlmostEqual(distance, 200)
+        # Out of range, and a diagonal ray that passes between the boxes
+        self.assertEqual(grid.raycast(100, 300, 1, 0, 150), (None, None))
+        self.assertEqual(grid.raycast(100, 300, 0.6, -0.8, 1000), (None, None))
+        # Dead sprites are looked past
+        near.alive = False
+        self.assertIs(grid.raycast(100, 300, 1, 0, 1000, skip_dead=True)[0], far)
+
+    def test_laser_damages_first_npc_without_spawning_projectiles(self):
+        entity_manager = EntityManager()
+        effect_manager = EffectManager()
+        weapon_system = WeaponSystem(entity_manager, effect_manager, CombatManager(entity_manager))
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = Player(100, 300)
+            player.equip_weapon("laser")
+            player.direction = pygame.math.Vector2(1, 0)
+            entity_manager.add_entity(player, "player")
+            near = NPC(player.rect.centerx + 150, player.rect.centery - 15)
+            far = NPC(player.rect.centerx + 300, player.rect.centery - 15)
+            entity_manager.add_entity(near, "npc")
+            entity_manager.add_entity(far, "npc")
+            entity_manager.handle_collisions(effect_manager) # Builds the NPC grid, as every frame does
+
+            self.assertTrue(weapon_system.use_weapon(player))
+
+        self.assertEqual(near.health, near.max_health - player.weapon.damage)
+        self.assertEqual(far.health, far.max_health)
+        self.assertEqual(len(entity_manager.projectiles), 0)
+        self.assertEqual(len(effect_manager.effects), 1) # The beam
+
+class TestVolley(unittest.TestCase):
+
+    def test_shotgun_fires_one_volley_resolved_in_one_pass(self):
+        entity_manager = EntityManager()
+        effect_manager = EffectManager()
+        weapon_system = WeaponSystem(entity_manager, effect_manager, CombatManager(entity_manager))
+        with contextlib.redirect_stdout(io.StringIO()):
+            player = Player(100, 300)
+            player.equip_weapon("shotgun")
+            player.direction = pygame.math.Vector2(1, 0)
+            entity_manager.add_entity(player, "player")
+            npc = NPC(player.rect.right + 40, player.rect.centery - 15)
+            npc.health = npc.max_health = 1000 # Survives every pellet
+            entity_manager.add_entity(npc, "npc")
+
+            self.assertTrue(weapon_system.use_weapon(player))
+            self.assertEqual(len(entity_manager.volleys), 1)
+            self.assertEqual(len(entity_manager.projectiles), 0)
+            volley = entity_manager.volleys.sprites()[0]
+            self.assertEqual(len(volley.render_items()), player.weapon.pellets)
+
+            for _ in range(10):
+                volley.update()
+                entity_manager.handle_collisions(effect_manager)
+
+        # At point blank the whole 20 degree spread lands on the 30px NPC
+        self.assertEqual(npc.health, 1000 - player.weapon.pellets * player.weapon.damage)
+        self.assertFalse(volley.groups()) # Removed with its last pellet
+
+class TestAreaOfEffect(unittest.TestCase):
+
+    def test_query_radius_filters_by_centre_distance(self):
+        sprites = []
+        for x in (100, 150, 190, 400):
+            sprite = pygame.sprite.Sprite()
+            sprite.rect = pygame.Rect(0, 0, 30, 30)
+            sprite.rect.center = (x, 100)
+            sprites.append(sprite)
+        grid = SpatialGrid(cell_size=64)
+        grid.rebuild(sprites)
+
+        found, dist_sqs = grid.query_radius(100, 100, 90)
+        self.assertEqual(sorted(zip([s.rect.centerx for s in found], dist_sqs)), [(100, 0), (150, 2500), (190, 8100)])
+        self.assertEqual(falloff_weights(dist_sqs, 90, "none"), [1.0] * 3)
+        weights = dict(zip([s.rect.centerx for s in found], falloff_weights(dist_sqs, 90, "linear")))
+        self.assertAlmostEqual(weights[100], 1.0)
+        self.assertAlmostEqual(weights[190], 0.0)
+
+    def test_grenade_explosion_uses_grid_radius_query(self):
+        entity_manager = EntityManager()
+        effect_manager = EffectManager()
+        weapon = type('GrenadeStats', (), {"projectile_color": (255, 165, 0), "projectile_speed": 0,
+                                           "damage": 40, "explosion_radius": 100})()
+        with contextlib.redirect_stdout(io.StringIO()):
+            near = NPC(500, 500)
+            far = NPC(800, 500)
+            entity_manager.add_entity(near, "npc")
+            entity_manager.add_entity(far, "npc")
+            entity_manager.npc_grid.rebuild(entity_manager.npcs)
+            grenade = Grenade(near.rect.centerx + 50, near.rect.centery, pygame.math.Vector2(1, 0), weapon,
+                              entity_manager.npcs, spatial_index=entity_manager.npc_grid)
+            entity_manager.add_entity(grenade, "projectile")
+            grenade.explode(effect_manager)
+
+        self.assertEqual(near.health, near.max_health - 40)
+        self.assertEqual(far.health, far.max_health)
+        self.assertEqual(len(effect_manager.effects), 1)
+        self.assertFalse(grenade.groups())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import pygame
+from game.core.startup import BackgroundLoader, StartupProfiler
+from game.ui.font_manager import FontManager
+
+class TestFontManager(unittest.TestCase):
+
+    def setUp(self):
+        pygame.font.init()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmp.name, "fonts.json")
+        # Any existing file stands in for an installed font
+        self.font_file = pygame.font.get_default_font()
+        self.font_path = os.path.join(os.path.dirname(pygame.__file__), self.font_file)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_default_font_needs_no_lookup(self):
+        with patch("pygame.font.match_font") as match_font:
+            fonts = FontManager(self.cache_file)
+            font = fonts.get(None, 36)
+            self.assertIs(fonts.get(None, 36), font) # Created once
+            match_font.assert_not_called()
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_resolved_paths_are_remembered_across_runs(self):
+        with patch("pygame.font.match_font", return_value=self.font_path) as match_font:
+            fonts = FontManager(self.cache_file)
+            fonts.get("Arial", 24)
+            fonts.get("arial", 48) # Same family, other size: no second lookup
+            self.assertEqual(match_font.call_count, 1)
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f), {"arial|0|0": self.font_path})
+
+        with patch("pygame.font.match_font", return_value=None) as match_font, contextlib.redirect_stdout(io.StringIO()):
+            restarted = FontManager(self.cache_file)
+            self.assertIsNotNone(restarted.get("arial", 24))
+            restarted.get("missing", 24) # Not installed: looked up once, then remembered as None
+            match_font.assert_called_once()
+        self.assertEqual(restarted.resolved, 1)
+        self.assertIsNone(FontManager(self.cache_file).font_path("missing"))
+
+class TestBackgroundLoader(unittest.TestCase):
+
+    def test_runs_tasks_in_order_and_reports_progress(self):
+        gate = threading.Event()
+        loader = BackgroundLoader([("first", lambda: 1), ("second", lambda: gate.wait(5) and 2),
+                                   ("broken", lambda: 1 / 0)])
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader.start()
+            self.assertFalse(loader.wait(0.05)) # Held up by "second"
+            self.assertEqual(loader.current, "second")
+            self.assertAlmostEqual(loader.progress, 1 / 3)
+            gate.set()
+            self.assertTrue(loader.wait(5))
+        self.assertTrue(loader.done)
+        self.assertEqual(loader.results, {"first": 1, "second": 2})
+        self.assertIsInstance(loader.errors["broken"], ZeroDivisionError)
+        self.assertEqual(list(loader.timings), ["first", "second", "broken"])
+
+    def test_profiler_phases_follow_marks(self):
+        profiler = StartupProfiler(started=0.0)
+        profiler.marks = [("imports", 0.030), ("first frame", 0.050)]
+        self.assertEqual([(label, round(ms, 3)) for label, ms in profiler.phases()],
+                         [("imports", 30.0), ("first frame", 20.0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import os
+import random
+import sys
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.timer_wheel import TimerWheel
+
+class TestTimerWheel(unittest.TestCase):
+
+    def setUp(self):
+        self.wheel = TimerWheel(start_time=1000)
+        self.fired = []
+
+    def _record(self, label):
+        self.fired.append((label, self.wheel.current_time))
+
+    def test_timer_fires_once_deadline_is_reached(self):
+        self.wheel.schedule(1250, self._record, "fuse")
+        self.wheel.advance(1249)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.wheel.advance(1260), 1)
+        self.assertEqual([label for label, _ in self.fired], ["fuse"])
+        self.wheel.advance(5000)
+        self.assertEqual(len(self.fired), 1)
+
+    def test_timers_fire_in_deadline_order_across_levels(self):
+        deadlines = [1000 + d for d in (5, 70, 4100, 300000, 64, 4096)]
+        for deadline in deadlines:
+            self.wheel.schedule(deadline, self._record, deadline)
+        self.wheel.advance(400000)
+        self.assertEqual([label for label, _ in self.fired], sorted(deadlines))
+        for deadline, fired_at in self.fired:
+            self.assertGreaterEqual(fired_at, deadline)
+
+    def test_no_timer_fires_early_with_random_frames(self):
+        rng = random.Random(7)
+        for _ in range(2000):
+            deadline = 1000 + rng.randint(0, 50000)
+            self.wheel.schedule(deadline, self._record, deadline)
+        now = 1000
+        while self.wheel.pending:
+            now += rng.randint(1, 40)
+            self.wheel.advance(now)
+        self.assertEqual(len(self.fired), 2000)
+        for deadline, fired_at in self.fired:
+            self.assertGreaterEqual(fired_at, deadline)
+        self.assertEqual(self.wheel.stats()["fired"], 2000)
+
+    def test_cancelled_timer_does_not_fire(self):
+        timer = self.wheel.schedule(1100, self._record, "cooldown")
+        self.wheel.cancel(timer)
+        self.wheel.advance(2000)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.wheel.stats()["cancelled"], 1)
+        self.assertEqual(self.wheel.pending, 0)
+
+    def test_past_deadline_fires_on_next_advance(self):
+        self.wheel.advance(1500)
+        self.wheel.schedule(1200, self._record, "late")
+        self.wheel.advance(1500)
+        self.assertEqual([label for label, _ in self.fired], ["late"])
+
+    def test_callbacks_can_reschedule(self):
+        def tick(count):
+            self._record(count)
+            if count < 3:
+                self.wheel.schedule_in(100, tick, count + 1)
+        self.wheel.schedule(1100, tick, 1)
+        self.wheel.advance(2000)
+        self.assertEqual(self.fired, [(1, 1100), (2, 1200), (3, 1300)])
+
+    def test_clear_drops_pending_timers(self):
+        self.wheel.schedule(1100, self._record, "a")
+        self.wheel.schedule(90000, self._record, "b")
+        self.wheel.clear(now=50000)
+        self.wheel.advance(100000)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.wheel.stats()["cleared"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.env.game_env import GameEnv
+from game.env import wave_sweep
+
+class TestWaveSweep(unittest.TestCase):
+
+    def test_grid_overrides_reach_the_game(self):
+        configs = wave_sweep.parse_grid(["WAVE_FIRST_WAVE=3,5", "NPC_HEALTH=20", "GRENADE_DAMAGE=90", "shotgun.pellets=4"])
+        self.assertEqual([config["WAVE_FIRST_WAVE"] for config in configs], [3, 5])
+        self.assertEqual(wave_sweep.config_key(configs[0]),
+                         "GRENADE_DAMAGE=90 NPC_HEALTH=20 WAVE_FIRST_WAVE=3 shotgun.pellets=4")
+        with self.assertRaises(ValueError):
+            wave_sweep.parse_grid(["NPC_SPEEED=1"])
+
+        wave_options, weapon_stats = wave_sweep.env_options(configs[1])
+        env = GameEnv(wave_options=wave_options, weapon_stats=weapon_stats)
+        with contextlib.redirect_stdout(io.StringIO()):
+            env.reset(seed=1)
+            env.step((0, 0, 0, 5)) # Shotgun
+            npcs = env.simulation.entity_manager.npcs.sprites()
+            self.assertEqual(env.simulation.wave_manager.get_wave_number(), 5)
+            self.assertEqual(len(npcs), 5) # F(5)
+            self.assertEqual({npc.max_health for npc in npcs}, {20})
+            self.assertEqual(env.player.weapon.pellets, 4)
+            env.step((0, 0, 0, 3)) # Grenade launcher
+            self.assertEqual(env.player.weapon.damage, 90)
+
+    def test_interrupted_sweep_resumes(self):
+        configs = wave_sweep.parse_grid(["NPC_SPEED=2,6"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.jsonl")
+            with contextlib.redirect_stdout(io.StringIO()):
+                first = wave_sweep.run_sweep(configs[:1], 2, workers=0, results_path=path, minutes=0.2)
+                with open(path, "a") as file:
+                    file.write('{"config": "NPC_SPE') # Torn line of a killed run
+                results = wave_sweep.run_sweep(configs, 2, workers=0, results_path=path, minutes=0.2)
+            self.assertEqual(len(first), 2)
+            self.assertEqual(len(results), 4)
+            self.assertEqual(results[:2], first)
+            self.assertEqual(wave_sweep.load_results(path), results)
+            rows = wave_sweep.summarize(configs, results, 2)
+            self.assertEqual([row["config"] for row in rows], ["NPC_SPEED=2", "NPC_SPEED=6"])
+            self.assertTrue(all(row["games"] == 2 and row["frame_ms_mean"] > 0 for row in rows))
+            self.assertTrue(all(result["frames"] <= 0.2 * 60 * 60 and result["time_ms"] <= 0.2 * 60000
+                                for result in results)) # Per game
+    def test_seeded_game_does_not_depend_on_earlier_games(self):
+        task = ({"NPC_SPEED": 4}, 1, 450, 4)
+        outcome = lambda result: {name: value for name, value in result.items() if not name.startswith("frame_ms")}
+        with contextlib.redirect_stdout(io.StringIO()):
+            fresh = wave_sweep.play_game(task)
+            wave_sweep.play_game(({"NPC_SPEED": 4}, 2, 450, 4)) # Same configuration, another game first
+            after_another = wave_sweep.play_game(task)
+        self.assertEqual(outcome(after_another), outcome(fresh))
+        self.assertGreater(fresh["kills"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
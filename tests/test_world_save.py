@@ -0,0 +1,96 @@
+import unittest
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Add the project root to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from game.core.game import Game
+from game.core.world_save import WorldSaveError, read_world
+from game.entities.npc import NPC
+
+def world_signature(game):
+    entity_manager = game.entity_manager
+    player = game.player
+    return (player.rect.topleft, player.health, player.kills, player.weapon.name, tuple(player.direction),
+            sorted((npc.rect.x, npc.rect.y, npc.health, npc.is_following_player, tuple(npc.direction))
+                   for npc in entity_manager.npcs),
+            sorted((type(p).__name__, p.rect.x, p.rect.y, p.speed, p.damage) for p in entity_manager.projectiles),
+            [(volley.xs, volley.ys, volley.live) for volley in entity_manager.volleys],
+            game.wave_manager.current_wave_number, game.wave_manager.fib_a, game.wave_manager.fib_b)
+
+class TestWorldSave(unittest.TestCase):
+
+    def setUp(self):
+        # Game writes its caches and databases to the working directory
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.save_file = os.path.join(self.tmp.name, "world.bin")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.game = Game()
+            self.game.update_simulation()
+            for i in range(20):
+                self.game.entity_manager.add_entity(NPC(100 + 90 * i, 300 + 40 * (i % 5),
+                                                        event_manager=self.game.event_manager), "npc")
+            cooldowns = self.game.weapon_system.cooldowns
+            for weapon in ("pistol", "shotgun", "grenade_launcher"): # A projectile, a volley and a grenade
+                self.game.player.equip_weapon(weapon)
+                cooldowns.start(self.game.player.handle, self.game.player.weapon.type, 0) # Pistol and shotgun share one
+                self.game.weapon_system.use_weapon(self.game.player)
+            self.game.player.kills = 7
+            for _ in range(3):
+                self.game.update_simulation()
+
+    def tearDown(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.game.startup_loader.wait()
+            self.game._poll_startup()
+            if self.game.npc_worker_pool is not None:
+                self.game.npc_worker_pool.close()
+            if self.game.leaderboard_client is not None:
+                self.game.leaderboard_client.close()
+                self.game.leaderboard_manager.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_reset_does_not_credit_cleared_npcs(self):
+        self.assertTrue(self.game.entity_manager.npcs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.game.reset_game()
+        self.assertFalse(self.game.entity_manager.npcs)
+        self.assertEqual(self.game.player.kills, 0)
+
+    def test_round_trip_restores_the_world(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.game.save_game(self.save_file)
+            before = world_signature(self.game)
+            expected_random = random.random()
+            for _ in range(5): # Move on, then go back to the save
+                self.game.update_simulation()
+            self.game.load_game(self.save_file)
+        self.assertEqual(world_signature(self.game), before)
+        self.assertEqual(random.random(), expected_random) # Same random sequence as at the save
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(10): # The restored world keeps running
+                self.game.update_simulation()
+
+    def test_rejects_other_files_and_keeps_the_world(self):
+        with open(self.save_file, "wb") as f:
+            f.write(b"MWPK" + bytes(64))
+        with self.assertRaises(WorldSaveError):
+            read_world(self.save_file)
+        before = world_signature(self.game)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertFalse(self.game.load_game(self.save_file))
+        self.assertEqual(world_signature(self.game), before)
+
+if __name__ == '__main__':
+    unittest.main()